@@ -16,6 +16,7 @@ a = Analysis(
         'io',
         'queue',
         'sqlite3',
+        'http.server',
         'smtplib',
         'email.mime.text',
         'email.mime.multipart',
@@ -32,6 +33,7 @@ a = Analysis(
         'PIL',
         'PIL.Image',
         'PIL.ImageQt',
+        'numpy',
         # matplotlib
         'matplotlib',
         'matplotlib.figure',
@@ -42,9 +44,21 @@ a = Analysis(
         'controller',
         'controller.app_controller',
         'database',
+        'database.bulk_io',
         'database.db_manager',
+        'database.deal_score',
+        'database.image_hash',
+        'database.locations',
+        'database.normalize',
+        'database.page_backup',
+        'database.run_stats',
+        'database.similarity',
         'email_service_module',
         'email_service_module.email_service',
+        'events',
+        'events.event_bus',
+        'metrics',
+        'metrics.metrics_service',
         'gui',
         'gui.imot_gui_qt',
         'gui.theme_qt',
@@ -52,6 +66,7 @@ a = Analysis(
         'scheduler.scheduler_service',
         'scraper',
         'scraper.imotBgScraper',
+        'scraper.run_profiler',
     ],
     hookspath=[],
     hooksconfig={},
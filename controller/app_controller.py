@@ -24,6 +24,21 @@ class AppController:
         # (e.g. GUI) can query results without going through the scraper.
         self.db = scraper.db if scraper else None
 
+    def subscribe_events(self, event_type, callback):
+        """
+        Subscribe to typed scraper events (see events.event_bus).
+
+        Callbacks run on the scraper thread — GUI subscribers must marshal
+        to the main thread themselves.
+
+        Returns:
+            Callable that unsubscribes again (a no-op without a scraper)
+        """
+        if not self.scraper:
+            self.logger.warning("Scraper component not initialized")
+            return lambda: None
+        return self.scraper.events.subscribe(event_type, callback)
+
     def run_scraper(self) -> bool:
         """
         Delegate scraper execution to the scraper module.
@@ -109,6 +124,18 @@ class AppController:
             except Exception as e2:
                 self.logger.error(f"Also failed to send failure notification: {e2}")
 
+    # ------------------------------------------------------------------
+    # Database state
+    # ------------------------------------------------------------------
+
+    def is_db_ready(self) -> bool:
+        """False while a background schema migration is still running."""
+        return self.db.is_ready() if self.db else True
+
+    def db_migration_progress(self):
+        """(step, total, description) of the running migration, or None."""
+        return self.db.migration_progress if self.db else None
+
     # ------------------------------------------------------------------
     # Search management (delegates to db)
     # ------------------------------------------------------------------
@@ -140,6 +167,18 @@ class AppController:
             return []
         return self.db.get_properties(match["id"], status)
 
+    def get_property_rows(self, search_id: int):
+        """All properties of a search with current price, image count and days on market."""
+        return self.db.get_property_rows(search_id) if self.db else []
+
+    def search_listings(self, query: str, limit: int = 100):
+        """Full-text search over every search's listings, best match first (with snippets)."""
+        return self.db.search_listings(query, limit) if self.db else []
+
+    def find_listings_sharing_photos(self, property_id: int):
+        """Return other listings with the same (or perceptually identical) photos, most shared first."""
+        return self.db.find_listings_sharing_photos(property_id) if self.db else []
+
     def get_all_scrape_runs(self, limit: int = 200):
         """Return recent scrape run rows across all searches, newest first."""
         return self.db.get_all_scrape_runs(limit) if self.db else []
@@ -148,22 +187,62 @@ class AppController:
         """Return area avg price snapshots for a search, oldest first."""
         return self.db.get_area_stats_history(search_id, limit) if self.db else []
 
+    def get_top_deals(self, search_id: int, limit: int = 20):
+        """Return the most underpriced Active listings of a search (highest deal_score first)."""
+        return self.db.get_top_deals(search_id, limit) if self.db else []
+
+    def get_run_stats_history(self, search_id: int, limit: int = 365):
+        """Return per-run summary rows (median €/m², quartiles, counts) for a search, oldest first."""
+        return self.db.get_run_stats_history(search_id, limit) if self.db else []
+
+    def get_location_stats(self, search_id: int, run_id: int = None):
+        """Return per-location Active count and median €/m² of a run (latest by default), largest first."""
+        return self.db.get_location_stats(search_id, run_id) if self.db else []
+
+    def get_run_stats_binned(self, search_id: int, bin_by: str = "auto"):
+        """Return run_stats averaged per day / week / month (binned in SQL), oldest first."""
+        return self.db.get_run_stats_binned(search_id, bin_by) if self.db else []
+
+    def get_active_sqm_points(self, search_id: int):
+        """Return {id, first_seen, sqm, deal} NumPy arrays of the Active listings with a €/m²."""
+        return self.db.get_active_sqm_points(search_id) if self.db else None
+
     def get_scrape_history(self, search_id: int, limit: int = 365):
         """Return scrape run rows for a search, newest first."""
         return self.db.get_scrape_history(search_id, limit) if self.db else []
 
-    def backup_database(self) -> str | None:
+    def get_last_finished_run_id(self, search_id: int):
+        """Return the id of the search's newest finished scrape run, or None."""
+        return self.db.get_last_finished_run_id(search_id) if self.db else None
+
+    def export_data(self, out_dir: str, fmt: str = "csv", search_id: int | None = None,
+                    since: str | None = None, until: str | None = None) -> dict:
+        """
+        Stream properties, price history, scrape runs and area stats into
+        *out_dir* as CSV / JSONL / Parquet files. Returns {table: rows written}.
+        """
+        return self.db.export(out_dir, fmt, search_id=search_id, since=since, until=until) if self.db else {}
+
+    def import_data(self, path: str, fmt: str | None = None) -> dict:
+        """
+        Merge a historical CSV / JSONL / Parquet dump into searches, listings
+        and price history. Returns the import report (rows, rejected, rows/s, …).
+        """
+        return self.db.import_file(path, fmt) if self.db else {}
+
+    def backup_database(self, force: bool = False) -> str | None:
         """
-        Create a timestamped local backup and upload a copy to Google Drive
-        (Drive upload is best-effort; local backup always happens).
-        Keeps 7 local copies and 1 on Drive.
-        Returns the local backup file path, or None on failure.
+        Create an incremental local backup (only the pages changed since the
+        last one) and upload it to Google Drive (Drive upload is best-effort;
+        local backup always happens). At most one per day unless *force*.
+        Keeps 3 backup chains locally and 1 on Drive.
+        Returns the local backup segment path, or None on failure.
         """
         if not self.db:
             self.logger.warning("backup_database: no database available")
             return None
         try:
-            return self.db.backup(keep_local=3, keep_drive=1)
+            return self.db.backup(keep_local=3, keep_drive=1, every_n_days=0 if force else 1)
         except Exception as e:
             self.logger.error(f"Database backup failed: {e}", exc_info=True)
             return None
@@ -0,0 +1,197 @@
+"""
+Bulk I/O module for ImotScraper - handles streaming CSV / JSONL / Parquet
+export and import files chunk by chunk. Parquet needs the optional pyarrow.
+"""
+
+import csv
+import json
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from database import normalize
+
+FORMATS = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+PARQUET_COMPRESSION = "zstd"
+
+# Columns of an import file, in the order import_row() returns them (the
+# parsed numeric twins are inserted after the strings they come from)
+IMPORT_COLUMNS = ("search_name", "search_url", "record_id", "recorded_at", "price",
+                  "title", "location", "description", "link",
+                  "price_per_sqm", "area_sqm", "floor", "yard_sqm", "status")
+REQUIRED_COLUMNS = ("search_name", "record_id", "recorded_at", "price")
+STATUSES = ("Active", "Inactive")
+
+# Dumps repeat the same price / area / date strings on many rows: parse each once
+_CACHE_SIZE = 1 << 16
+_parse_price = lru_cache(_CACHE_SIZE)(normalize.parse_price)
+_parse_price_per_sqm = lru_cache(_CACHE_SIZE)(normalize.parse_price_per_sqm)
+_parse_area = lru_cache(_CACHE_SIZE)(normalize.parse_area)
+
+
+@lru_cache(_CACHE_SIZE)
+def _timestamp(value: str) -> str:
+    return datetime.fromisoformat(value).strftime("%Y-%m-%d %H:%M:%S")
+
+Chunk = Sequence[Sequence]
+
+
+def arrow_type(declared: str):
+    """pyarrow type for an SQLite declared column type, by SQLite's affinity
+    rules: INT → int64, REAL / FLOA / DOUB → float64, BLOB → binary, else string."""
+    import pyarrow as pa
+    t = (declared or "").upper()
+    if "INT" in t:
+        return pa.int64()
+    if any(k in t for k in ("REAL", "FLOA", "DOUB")):
+        return pa.float64()
+    if "BLOB" in t:
+        return pa.binary()
+    return pa.string()
+
+
+def _write_csv(path: str, columns: List[str], chunks: Iterable[Chunk]) -> int:
+    n = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk)
+            n += len(chunk)
+    return n
+
+
+def _write_jsonl(path: str, columns: List[str], chunks: Iterable[Chunk]) -> int:
+    n = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.writelines(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n"
+                         for row in chunk)
+            n += len(chunk)
+    return n
+
+
+def _write_parquet(path: str, columns: List[str], types: List[str],
+                   chunks: Iterable[Chunk]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow. Run:  pip install pyarrow") from None
+    schema = pa.schema([(c, arrow_type(t)) for c, t in zip(columns, types)])
+    n = 0
+    with pq.ParquetWriter(path, schema, compression=PARQUET_COMPRESSION) as writer:
+        for chunk in chunks:
+            arrays = [pa.array([row[i] for row in chunk], type=field.type)
+                      for i, field in enumerate(schema)]
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+            n += len(chunk)
+    return n
+
+
+def write(path: str, fmt: str, columns: List[str], types: List[str],
+          chunks: Iterable[Chunk]) -> int:
+    """
+    Write *chunks* (lists of row tuples aligned with *columns*) to *path* in
+    *fmt* ("csv", "jsonl" or "parquet"); *types* are the SQLite declared
+    types of the columns (used for the Parquet schema). Returns the number
+    of rows written. Raises ValueError for an unknown format.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    tmp = path + ".part"
+    try:
+        if fmt == "csv":
+            n = _write_csv(tmp, columns, chunks)
+        elif fmt == "jsonl":
+            n = _write_jsonl(tmp, columns, chunks)
+        else:
+            n = _write_parquet(tmp, columns, types, chunks)
+        os.replace(tmp, path)
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+    return n
+
+
+def format_for(path: str) -> str:
+    """Format name for *path* by its extension. Raises ValueError if unknown."""
+    ext = os.path.splitext(path)[1].lower()
+    for fmt, fmt_ext in FORMATS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"Cannot tell the format of {path!r} (expected one of "
+                     f"{', '.join(FORMATS.values())})")
+
+
+def read(path: str, fmt: Optional[str] = None, chunk_size: int = 50_000) -> Iterator[List[Dict]]:
+    """
+    Yield the rows of *path* as lists of at most *chunk_size* dicts
+    (column → value). *fmt* defaults to the one of the file extension.
+    CSV values are strings ("" for an empty cell).
+    """
+    fmt = fmt or format_for(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown import format {fmt!r} (expected one of {', '.join(FORMATS)})")
+    if fmt == "parquet":
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet import needs pyarrow. Run:  pip install pyarrow") from None
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+            yield batch.to_pylist()
+        return
+    with open(path, newline="" if fmt == "csv" else None, encoding="utf-8-sig") as f:
+        rows = csv.DictReader(f) if fmt == "csv" else (json.loads(line) for line in f if line.strip())
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _text(value) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    return value or None
+
+
+def import_row(row: Dict) -> Tuple:
+    """
+    Validate one import row and return it as the tuple staged by
+    DatabaseManager.import_file: the IMPORT_COLUMNS strings with the price
+    parsed into amount / currency / vat_excluded / price_eur after "price",
+    and price_per_sqm_eur / area_sqm_value / yard_sqm_value after "yard_sqm".
+    recorded_at may be a date or a timestamp and is stored as
+    "YYYY-MM-DD HH:MM:SS"; status defaults to "Inactive" (history, not a
+    live listing). Raises ValueError naming the first problem.
+    """
+    values = {c: _text(row.get(c)) for c in IMPORT_COLUMNS}
+    missing = [c for c in REQUIRED_COLUMNS if values[c] is None]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    try:
+        recorded_at = _timestamp(values["recorded_at"])
+    except ValueError:
+        raise ValueError(f"bad recorded_at {values['recorded_at']!r}") from None
+    status = (values["status"] or "Inactive").capitalize()
+    if status not in STATUSES:
+        raise ValueError(f"bad status {values['status']!r}")
+    price = _parse_price(values["price"])
+    return (values["search_name"], values["search_url"] or "", values["record_id"], recorded_at,
+            values["price"],
+            price.amount if price else None,
+            price.currency if price else None,
+            (1 if price.vat_excluded else 0) if price else None,
+            price.price_eur if price else None,
+            values["title"], values["location"], values["description"], values["link"],
+            values["price_per_sqm"], values["area_sqm"], values["floor"], values["yard_sqm"],
+            _parse_price_per_sqm(values["price_per_sqm"]),
+            _parse_area(values["area_sqm"]),
+            _parse_area(values["yard_sqm"]),
+            status)
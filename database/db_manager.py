@@ -5,15 +5,76 @@ Replaces the CSV-based storage approach with a proper relational database.
 
 import sqlite3
 import threading
+import hashlib
+import json
 import logging
+import math
 import os
+import re
 import time
 import requests
 from datetime import datetime
-from typing import List, Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Optional
+
+import numpy as np
+
+from metrics.metrics_service import REGISTRY
+from database import (bulk_io, deal_score, image_hash, locations, normalize, page_backup,
+                      run_stats, similarity)
 
 logger = logging.getLogger(__name__)
 
+_DB_WRITE_LATENCY = REGISTRY.histogram(
+    "imot_db_write_duration_seconds", "Latency of DatabaseManager write operations.", ("op",))
+_IMAGE_DOWNLOADS = REGISTRY.counter(
+    "imot_image_downloads_total", "Listing image downloads by outcome.", ("outcome",))
+
+
+# Migration progress callback: (step, total, description)
+MigrationProgress = Callable[[int, int, str], None]
+
+# Words of a free-text search; everything else (quotes, FTS5 operators) is dropped
+_FTS_WORD_RE = re.compile(r"\w+")
+
+
+def _fts_match_expression(query: str) -> Optional[str]:
+    """
+    Turn user text into a safe FTS5 MATCH expression: every word quoted and
+    prefix-matched, all words required — "ново строит" → "ново"* "строит"*.
+    Returns None when the text has no words.
+    """
+    words = _FTS_WORD_RE.findall(query or "")
+    return " ".join(f'"{w}"*' for w in words) or None
+
+
+def _search_stats_delta(sign: str, value: str, search_id: str, extra: str = "") -> str:
+    """
+    UPDATE statement applying one listing's €/m² (*value*, an SQL expression)
+    to the search_stats row of *search_id*: sign '+' adds it to the running
+    aggregates, '-' removes it (re-reading MIN / MAX through the Active
+    memberships when the removed value was the extreme). *extra* is ANDed
+    into the WHERE clause. Used by the migration 20 triggers.
+    """
+    v = value
+    if sign == "+":
+        extremes = f"""sqm_min = COALESCE(MIN(sqm_min, {v}), sqm_min, {v}),
+                       sqm_max = COALESCE(MAX(sqm_max, {v}), sqm_max, {v})"""
+    else:
+        rescan = ("(SELECT {fn}(l.price_per_sqm_eur) FROM search_membership m "
+                  "JOIN listings l ON l.id = m.listing_id "
+                  f"WHERE m.search_id = {search_id} AND m.status = 'Active')")
+        extremes = f"""sqm_min = CASE WHEN {v} <= sqm_min THEN {rescan.format(fn="MIN")} ELSE sqm_min END,
+                       sqm_max = CASE WHEN {v} >= sqm_max THEN {rescan.format(fn="MAX")} ELSE sqm_max END"""
+    return f"""
+                UPDATE search_stats
+                SET    active_count = active_count {sign} 1,
+                       sqm_count    = sqm_count {sign} ({v} IS NOT NULL),
+                       sqm_sum      = sqm_sum   {sign} COALESCE({v}, 0),
+                       sqm_sumsq    = sqm_sumsq {sign} COALESCE({v} * {v}, 0),
+                       {extremes}
+                WHERE  search_id = {search_id} {extra};"""
+
 
 class DatabaseManager:
     """
@@ -23,13 +84,52 @@ class DatabaseManager:
     Uses one connection per thread (thread-local storage) with WAL journal
     mode so the scraper thread and the GUI thread can both access the DB
     simultaneously without locking each other out.
+
+    The schema version lives in PRAGMA user_version: when it is current,
+    start-up is a single integer read.  With background_migrations=True any
+    pending migrations run on a daemon thread and every other thread's first
+    query waits until they are done (see is_ready / wait_until_ready).
     """
 
-    def __init__(self, db_path: str = "data/imot_scraper.db"):
+    def __init__(self, db_path: str = "data/imot_scraper.db",
+                 background_migrations: bool = False,
+                 on_migration_progress: Optional[MigrationProgress] = None):
         self.db_path = db_path
         os.makedirs(os.path.dirname(db_path), exist_ok=True)
         self._local = threading.local()   # one conn per thread
-        self._init_database()
+        self._ready = threading.Event()
+        self._migration_error: Optional[BaseException] = None
+        self._migration_thread_id: Optional[int] = None
+        self.migration_progress: Optional[tuple] = None   # (step, total, description) while migrating
+
+        if background_migrations:
+            threading.Thread(target=self._init_in_background, args=(on_migration_progress,),
+                             name="db-migrate", daemon=True).start()
+        else:
+            self._migration_thread_id = threading.get_ident()
+            try:
+                self._init_database(on_migration_progress)
+            finally:
+                self._ready.set()
+
+    def _init_in_background(self, progress: Optional[MigrationProgress]) -> None:
+        self._migration_thread_id = threading.get_ident()
+        try:
+            self._init_database(progress)
+        except Exception as exc:
+            logger.error(f"Database migration failed: {exc}")
+            self._migration_error = exc
+        finally:
+            self.close_all_connections()
+            self._ready.set()
+
+    def is_ready(self) -> bool:
+        """True once the schema is current (always True without background migrations)."""
+        return self._ready.is_set()
+
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until pending migrations have finished; False on timeout."""
+        return self._ready.wait(timeout)
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -42,7 +142,12 @@ class DatabaseManager:
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     def _get_connection(self) -> sqlite3.Connection:
-        """Return a thread-local SQLite connection, creating it if needed."""
+        """Return a thread-local SQLite connection, creating it if needed.
+        Waits for background migrations unless called from the migrating thread."""
+        if not self._ready.is_set() and threading.get_ident() != self._migration_thread_id:
+            self._ready.wait()
+        if self._migration_error is not None:
+            raise RuntimeError(f"Database migration failed: {self._migration_error}") from self._migration_error
         if not getattr(self._local, "conn", None):
             conn = sqlite3.connect(self.db_path, check_same_thread=False)
             conn.row_factory = sqlite3.Row
@@ -52,9 +157,19 @@ class DatabaseManager:
             self._local.conn = conn
         return self._local.conn
 
-    def _init_database(self):
-        """Create tables if they do not exist yet, and run any needed migrations."""
+    def _init_database(self, progress: Optional[MigrationProgress] = None):
+        """
+        Create tables if they do not exist yet, and run any pending migrations.
+        A database already at SCHEMA_VERSION skips both after one PRAGMA read.
+        """
         with self._get_connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version > self.SCHEMA_VERSION:
+                logger.warning(f"Database schema version {version} is newer than this "
+                               f"release ({self.SCHEMA_VERSION}) — opening it as is.")
+            if version >= self.SCHEMA_VERSION:
+                logger.info(f"Database ready at: {self.db_path}")
+                return
             # searches must exist before properties (FK dependency)
             conn.executescript("""
                 CREATE TABLE IF NOT EXISTS searches (
@@ -121,12 +236,35 @@ class DatabaseManager:
                     UNIQUE (property_id, url)
                 );
             """)
-            self._migrate(conn)
+            self._migrate(conn, version, progress)
         logger.info(f"Database ready at: {self.db_path}")
 
-    def _migrate(self, conn: sqlite3.Connection):
-        """Apply schema migrations for existing databases."""
-        # ── Migration 1: price_history old_price → price_status ──────────────
+    def _migrate(self, conn: sqlite3.Connection, from_version: int,
+                 progress: Optional[MigrationProgress] = None) -> None:
+        """
+        Apply every migration newer than *from_version* in order, bumping
+        PRAGMA user_version after each step so an interrupted upgrade resumes
+        where it stopped.  *progress* is called as (step, total, description).
+        """
+        pending = [m for m in self.MIGRATIONS if m[0] > from_version]
+        for i, (version, description, step) in enumerate(pending, 1):
+            self.migration_progress = (i, len(pending), description)
+            if progress:
+                progress(i, len(pending), description)
+            step(self, conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+        if pending:
+            logger.info(f"Schema upgraded from version {from_version} to {self.SCHEMA_VERSION} "
+                        f"({len(pending)} step{'s' if len(pending) != 1 else ''}).")
+        self.migration_progress = None
+
+    # ── Migration steps ───────────────────────────────────────────────────────
+    # Steps written before user_version existed keep their PRAGMA table_info
+    # guards: databases created by older releases report version 0 and replay
+    # every step once.  New steps can rely on the version number alone.
+
+    def _migration_1(self, conn: sqlite3.Connection) -> None:
+        """Migration 1: price_history old_price → price_status."""
         ph_cols = [r[1] for r in conn.execute("PRAGMA table_info(price_history)").fetchall()]
         if "old_price" in ph_cols:
             logger.info("Migrating price_history: replacing old_price with price_status column...")
@@ -149,13 +287,15 @@ class DatabaseManager:
             self._recalculate_price_statuses(conn)
             logger.info("Migration 1 complete.")
 
-        # ── Migration 2: add location column ─────────────────────────────────
+    def _migration_2(self, conn: sqlite3.Connection) -> None:
+        """Migration 2: add location column."""
         prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
         if "location" not in prop_cols:
             logger.info("Migrating properties: adding location column...")
             conn.execute("ALTER TABLE properties ADD COLUMN location TEXT")
 
-        # ── Migration 3: switch properties from search_name → search_id FK ───
+    def _migration_3(self, conn: sqlite3.Connection) -> None:
+        """Migration 3: switch properties from search_name → search_id FK."""
         # Clean up any stranded properties_old left by a previously interrupted migration.
         tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
         if "properties_old" in tables:
@@ -218,32 +358,37 @@ class DatabaseManager:
                 PRAGMA foreign_keys = ON;
             """)
 
-            # Add search_id to scrape_runs if it's missing
-            sr_cols = [r[1] for r in conn.execute("PRAGMA table_info(scrape_runs)").fetchall()]
-            if "search_id" not in sr_cols:
-                conn.execute("ALTER TABLE scrape_runs ADD COLUMN search_id INTEGER REFERENCES searches(id) ON DELETE CASCADE")
-                conn.execute("""
-                    UPDATE scrape_runs
-                    SET search_id = (SELECT id FROM searches WHERE searches.search_name = scrape_runs.search_name)
-                """)
-
             logger.info("Migration 3 complete.")
 
-        # ── Migration 4: add inactivated_at column to properties ─────────────
+        # Add search_id to scrape_runs if it's missing — checked outside the
+        # block above so a DB whose properties rebuild was interrupted (and
+        # then recreated empty) still gets the column.
+        sr_cols = [r[1] for r in conn.execute("PRAGMA table_info(scrape_runs)").fetchall()]
+        if "search_id" not in sr_cols:
+            conn.execute("ALTER TABLE scrape_runs ADD COLUMN search_id INTEGER REFERENCES searches(id) ON DELETE CASCADE")
+            conn.execute("""
+                UPDATE scrape_runs
+                SET search_id = (SELECT id FROM searches WHERE searches.search_name = scrape_runs.search_name)
+            """)
+
+    def _migration_4(self, conn: sqlite3.Connection) -> None:
+        """Migration 4: add inactivated_at column to properties."""
         prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
         if "inactivated_at" not in prop_cols:
             logger.info("Migrating properties: adding inactivated_at column...")
             conn.execute("ALTER TABLE properties ADD COLUMN inactivated_at DATETIME")
             logger.info("Migration 4 complete.")
 
-        # ── Migration 5: add price_per_sqm column to properties ──────────────
+    def _migration_5(self, conn: sqlite3.Connection) -> None:
+        """Migration 5: add price_per_sqm column to properties."""
         prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
         if "price_per_sqm" not in prop_cols:
             logger.info("Migrating properties: adding price_per_sqm column...")
             conn.execute("ALTER TABLE properties ADD COLUMN price_per_sqm TEXT")
             logger.info("Migration 5 complete.")
 
-        # ── Migration 6: create search_area_stats table ───────────────────────
+    def _migration_6(self, conn: sqlite3.Connection) -> None:
+        """Migration 6: create search_area_stats table."""
         tables = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
         if "search_area_stats" not in tables:
             logger.info("Migrating: creating search_area_stats table...")
@@ -258,7 +403,8 @@ class DatabaseManager:
             """)
             logger.info("Migration 6 complete.")
 
-        # ── Migration 7: add avg_price_per_sqm + active_count to scrape_runs ─
+    def _migration_7(self, conn: sqlite3.Connection) -> None:
+        """Migration 7: add avg_price_per_sqm + active_count to scrape_runs."""
         sr_cols = [r[1] for r in conn.execute("PRAGMA table_info(scrape_runs)").fetchall()]
         if "avg_price_per_sqm" not in sr_cols:
             logger.info("Migrating scrape_runs: adding avg_price_per_sqm column...")
@@ -269,14 +415,16 @@ class DatabaseManager:
             conn.execute("ALTER TABLE scrape_runs ADD COLUMN active_count INTEGER")
             logger.info("Migration 7 (active_count) complete.")
 
-        # ── Migration 8: add is_favorite column to properties ─────────────────
+    def _migration_8(self, conn: sqlite3.Connection) -> None:
+        """Migration 8: add is_favorite column to properties."""
         prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
         if "is_favorite" not in prop_cols:
             logger.info("Migrating properties: adding is_favorite column...")
             conn.execute("ALTER TABLE properties ADD COLUMN is_favorite INTEGER NOT NULL DEFAULT 0")
             logger.info("Migration 8 (is_favorite) complete.")
 
-        # ── Migration 9: add area_sqm, floor, yard_sqm columns to properties ─
+    def _migration_9(self, conn: sqlite3.Connection) -> None:
+        """Migration 9: add area_sqm, floor, yard_sqm columns to properties."""
         prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
         if "area_sqm" not in prop_cols:
             logger.info("Migrating properties: adding area_sqm column...")
@@ -290,34 +438,993 @@ class DatabaseManager:
         if any(c not in prop_cols for c in ("area_sqm", "floor", "yard_sqm")):
             logger.info("Migration 9 (area_sqm / floor / yard_sqm) complete.")
 
-        # ── Migration 10: add searches TEXT to scrape_runs ────────────────────
+    def _migration_10(self, conn: sqlite3.Connection) -> None:
+        """Migration 10: add searches TEXT to scrape_runs."""
         sr_cols = [r[1] for r in conn.execute("PRAGMA table_info(scrape_runs)").fetchall()]
         if "searches" not in sr_cols:
             logger.info("Migrating scrape_runs: adding searches column...")
             conn.execute("ALTER TABLE scrape_runs ADD COLUMN searches TEXT")
             logger.info("Migration 10 (searches) complete.")
 
+    def _migration_11(self, conn: sqlite3.Connection) -> None:
+        """Migration 11: add profile_path TEXT to scrape_runs."""
+        sr_cols = [r[1] for r in conn.execute("PRAGMA table_info(scrape_runs)").fetchall()]
+        if "profile_path" not in sr_cols:
+            logger.info("Migrating scrape_runs: adding profile_path column...")
+            conn.execute("ALTER TABLE scrape_runs ADD COLUMN profile_path TEXT")
+            logger.info("Migration 11 (profile_path) complete.")
+
+    def _migration_12(self, conn: sqlite3.Connection) -> None:
+        """Migration 12: numeric normalised price / area / €/m² columns."""
+        # Display strings stay as they are; the numeric twins are what SQL
+        # aggregates and sorts on.  Backfilled once with the same parsers
+        # used on write (registered as SQLite functions).
+        ph_cols   = [r[1] for r in conn.execute("PRAGMA table_info(price_history)").fetchall()]
+        prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
+        if "price_eur" not in ph_cols or "price_per_sqm_eur" not in prop_cols:
+            logger.info("Migrating: adding normalised numeric price / area columns...")
+            for col, decl in (("amount", "REAL"), ("currency", "TEXT"),
+                              ("vat_excluded", "INTEGER"), ("price_eur", "REAL")):
+                if col not in ph_cols:
+                    conn.execute(f"ALTER TABLE price_history ADD COLUMN {col} {decl}")
+            for col in ("price_per_sqm_eur", "area_sqm_value", "yard_sqm_value"):
+                if col not in prop_cols:
+                    conn.execute(f"ALTER TABLE properties ADD COLUMN {col} REAL")
+            self._register_normalize_functions(conn)
+            conn.execute("""
+                UPDATE price_history SET
+                    amount       = norm_price_amount(price),
+                    currency     = norm_price_currency(price),
+                    vat_excluded = norm_price_vat_excluded(price),
+                    price_eur    = norm_price_eur(price)
+            """)
+            conn.execute("""
+                UPDATE properties SET
+                    price_per_sqm_eur = norm_number(price_per_sqm),
+                    area_sqm_value    = norm_number(area_sqm),
+                    yard_sqm_value    = norm_number(yard_sqm)
+            """)
+            logger.info("Migration 12 (normalised numeric columns) complete.")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_properties_sqm "
+            "ON properties(search_id, status, price_per_sqm_eur)"
+        )
+
+    def _migration_13(self, conn: sqlite3.Connection) -> None:
+        """Migration 13: indexes for the hot query paths."""
+        # Only the UNIQUE constraints were indexed; the per-listing price
+        # lookups, status filters, link lookups and run history all scanned.
+        # tests/test_query_plans.py fails if one of these paths regresses.
+        indexes = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='index'").fetchall()}
+        if "idx_price_history_status" not in indexes:
+            logger.info("Migrating: adding hot-path indexes...")
+            conn.executescript("""
+                CREATE INDEX IF NOT EXISTS idx_price_history_status
+                    ON price_history(property_id, price_status);
+                CREATE INDEX IF NOT EXISTS idx_properties_status
+                    ON properties(search_id, status, last_seen);
+                CREATE INDEX IF NOT EXISTS idx_properties_link
+                    ON properties(link);
+                CREATE INDEX IF NOT EXISTS idx_scrape_runs_search
+                    ON scrape_runs(search_id, run_date);
+                CREATE INDEX IF NOT EXISTS idx_scrape_runs_date
+                    ON scrape_runs(run_date);
+                CREATE INDEX IF NOT EXISTS idx_area_stats_search
+                    ON search_area_stats(search_id, snapshot_date);
+            """)
+            logger.info("Migration 13 (hot-path indexes) complete.")
+
+    def _migration_14(self, conn: sqlite3.Connection) -> None:
+        """Migration 14: last_seen_run_id on properties for set-based inactivation."""
+        prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
+        if "last_seen_run_id" not in prop_cols:
+            # NULL on existing rows: listings not seen by the next run are
+            # inactivated by mark_inactive's IS NOT comparison.
+            conn.execute("ALTER TABLE properties ADD COLUMN last_seen_run_id INTEGER")
+        logger.info("Migration 14 (last_seen_run_id) complete.")
+
+    def _migration_15(self, conn: sqlite3.Connection) -> None:
+        """Migration 15: denormalised current / previous price on properties."""
+        prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
+        for col, decl in (("current_price", "TEXT"), ("current_price_eur", "REAL"),
+                          ("current_vat_excluded", "INTEGER"), ("previous_price", "TEXT"),
+                          ("price_changed_at", "DATETIME")):
+            if col not in prop_cols:
+                conn.execute(f"ALTER TABLE properties ADD COLUMN {col} {decl}")
+        conn.execute("""
+            UPDATE properties
+            SET    current_price        = cur.price,
+                   current_price_eur    = cur.price_eur,
+                   current_vat_excluded = cur.vat_excluded
+            FROM   price_history cur
+            WHERE  cur.property_id = properties.id AND cur.price_status = 'Current'
+        """)
+        conn.execute("""
+            UPDATE properties
+            SET    previous_price   = prev.price,
+                   price_changed_at = cur.recorded_at
+            FROM   price_history prev
+            JOIN   price_history cur
+                   ON cur.property_id = prev.property_id AND cur.price_status = 'Current'
+            WHERE  prev.property_id = properties.id AND prev.price_status = 'Previous'
+        """)
+        logger.info("Migration 15 (denormalised current price) complete.")
+
+    def _migration_16(self, conn: sqlite3.Connection) -> None:
+        """Migration 16: append-only price_history keyed by (property_id, seq)."""
+        ph_cols = [r[1] for r in conn.execute("PRAGMA table_info(price_history)").fetchall()]
+        if "seq" not in ph_cols:
+            conn.execute("ALTER TABLE price_history ADD COLUMN seq INTEGER")
+        if "price_status" in ph_cols:
+            # Number each property's rows oldest → newest, keeping whichever
+            # row the status cascade had marked Current as the newest.
+            conn.execute("""
+                UPDATE price_history
+                SET    seq = ranked.rn
+                FROM  (SELECT id,
+                              ROW_NUMBER() OVER (
+                                  PARTITION BY property_id
+                                  ORDER BY CASE price_status WHEN 'Older'    THEN 0
+                                                             WHEN 'Previous' THEN 1
+                                                             ELSE 2 END,
+                                           recorded_at, id) AS rn
+                       FROM   price_history) AS ranked
+                WHERE  ranked.id = price_history.id
+            """)
+            conn.execute("DROP INDEX IF EXISTS idx_price_history_status")
+            conn.execute("ALTER TABLE price_history DROP COLUMN price_status")
+        conn.executescript("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_price_history_seq
+                ON price_history(property_id, seq);
+            CREATE VIEW IF NOT EXISTS price_history_status AS
+                SELECT ph.*,
+                       CASE ROW_NUMBER() OVER (PARTITION BY property_id ORDER BY seq DESC)
+                            WHEN 1 THEN 'Current' WHEN 2 THEN 'Previous' ELSE 'Older'
+                       END AS price_status
+                FROM   price_history ph;
+        """)
+        logger.info("Migration 16 (append-only price_history) complete.")
+
+    def _migration_17(self, conn: sqlite3.Connection) -> None:
+        """Migration 17: running per-search €/m² aggregates kept by triggers."""
+        # One row per search holding count / sum / sum of squares / min / max
+        # of price_per_sqm_eur over its Active listings. Triggers on properties
+        # apply each insert, re-price, status change and delete as a delta, so
+        # get_active_price_stats is a primary-key read instead of a rescan.
+        # MIN/MAX can't be un-applied: when the current extreme leaves the set
+        # it is re-read through idx_properties_sqm (one index seek).
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS search_stats (
+                search_id    INTEGER PRIMARY KEY
+                                     REFERENCES searches(id) ON DELETE CASCADE,
+                active_count INTEGER NOT NULL DEFAULT 0,
+                sqm_count    INTEGER NOT NULL DEFAULT 0,
+                sqm_sum      REAL    NOT NULL DEFAULT 0,
+                sqm_sumsq    REAL    NOT NULL DEFAULT 0,
+                sqm_min      REAL,
+                sqm_max      REAL
+            );
+
+            CREATE TRIGGER IF NOT EXISTS trg_search_stats_search
+            AFTER INSERT ON searches
+            BEGIN
+                INSERT OR IGNORE INTO search_stats (search_id) VALUES (NEW.id);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_search_stats_insert
+            AFTER INSERT ON properties
+            WHEN NEW.status = 'Active'
+            BEGIN
+                UPDATE search_stats
+                SET    active_count = active_count + 1,
+                       sqm_count    = sqm_count + (NEW.price_per_sqm_eur IS NOT NULL),
+                       sqm_sum      = sqm_sum   + COALESCE(NEW.price_per_sqm_eur, 0),
+                       sqm_sumsq    = sqm_sumsq + COALESCE(NEW.price_per_sqm_eur * NEW.price_per_sqm_eur, 0),
+                       sqm_min      = COALESCE(MIN(sqm_min, NEW.price_per_sqm_eur), sqm_min, NEW.price_per_sqm_eur),
+                       sqm_max      = COALESCE(MAX(sqm_max, NEW.price_per_sqm_eur), sqm_max, NEW.price_per_sqm_eur)
+                WHERE  search_id = NEW.search_id;
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_search_stats_delete
+            AFTER DELETE ON properties
+            WHEN OLD.status = 'Active'
+            BEGIN
+                UPDATE search_stats
+                SET    active_count = active_count - 1,
+                       sqm_count    = sqm_count - (OLD.price_per_sqm_eur IS NOT NULL),
+                       sqm_sum      = sqm_sum   - COALESCE(OLD.price_per_sqm_eur, 0),
+                       sqm_sumsq    = sqm_sumsq - COALESCE(OLD.price_per_sqm_eur * OLD.price_per_sqm_eur, 0),
+                       sqm_min      = CASE WHEN OLD.price_per_sqm_eur <= sqm_min
+                                           THEN (SELECT MIN(price_per_sqm_eur) FROM properties
+                                                 WHERE search_id = OLD.search_id AND status = 'Active')
+                                           ELSE sqm_min END,
+                       sqm_max      = CASE WHEN OLD.price_per_sqm_eur >= sqm_max
+                                           THEN (SELECT MAX(price_per_sqm_eur) FROM properties
+                                                 WHERE search_id = OLD.search_id AND status = 'Active')
+                                           ELSE sqm_max END
+                WHERE  search_id = OLD.search_id;
+            END;
+
+            -- An update is "remove OLD, add NEW". The re-read of a lost
+            -- extreme already sees NEW, so adding NEW afterwards is idempotent.
+            CREATE TRIGGER IF NOT EXISTS trg_search_stats_update
+            AFTER UPDATE OF status, price_per_sqm_eur, search_id ON properties
+            WHEN (OLD.status = 'Active' OR NEW.status = 'Active')
+             AND (OLD.status IS NOT NEW.status
+                  OR OLD.price_per_sqm_eur IS NOT NEW.price_per_sqm_eur
+                  OR OLD.search_id IS NOT NEW.search_id)
+            BEGIN
+                UPDATE search_stats
+                SET    active_count = active_count - 1,
+                       sqm_count    = sqm_count - (OLD.price_per_sqm_eur IS NOT NULL),
+                       sqm_sum      = sqm_sum   - COALESCE(OLD.price_per_sqm_eur, 0),
+                       sqm_sumsq    = sqm_sumsq - COALESCE(OLD.price_per_sqm_eur * OLD.price_per_sqm_eur, 0),
+                       sqm_min      = CASE WHEN OLD.price_per_sqm_eur <= sqm_min
+                                           THEN (SELECT MIN(price_per_sqm_eur) FROM properties
+                                                 WHERE search_id = OLD.search_id AND status = 'Active')
+                                           ELSE sqm_min END,
+                       sqm_max      = CASE WHEN OLD.price_per_sqm_eur >= sqm_max
+                                           THEN (SELECT MAX(price_per_sqm_eur) FROM properties
+                                                 WHERE search_id = OLD.search_id AND status = 'Active')
+                                           ELSE sqm_max END
+                WHERE  search_id = OLD.search_id AND OLD.status = 'Active';
+
+                UPDATE search_stats
+                SET    active_count = active_count + 1,
+                       sqm_count    = sqm_count + (NEW.price_per_sqm_eur IS NOT NULL),
+                       sqm_sum      = sqm_sum   + COALESCE(NEW.price_per_sqm_eur, 0),
+                       sqm_sumsq    = sqm_sumsq + COALESCE(NEW.price_per_sqm_eur * NEW.price_per_sqm_eur, 0),
+                       sqm_min      = COALESCE(MIN(sqm_min, NEW.price_per_sqm_eur), sqm_min, NEW.price_per_sqm_eur),
+                       sqm_max      = COALESCE(MAX(sqm_max, NEW.price_per_sqm_eur), sqm_max, NEW.price_per_sqm_eur)
+                WHERE  search_id = NEW.search_id AND NEW.status = 'Active';
+            END;
+        """)
+        self._reseed_search_stats(conn)
+        logger.info("Migration 17 (running search stats) complete.")
+
+    @staticmethod
+    def _reseed_search_stats(conn: sqlite3.Connection) -> None:
+        """Rebuild search_stats from the current data: one grouped pass, the last full scan."""
+        conn.execute("DELETE FROM search_stats")
+        conn.execute("""
+            INSERT INTO search_stats (search_id, active_count, sqm_count, sqm_sum,
+                                      sqm_sumsq, sqm_min, sqm_max)
+            SELECT s.id,
+                   COUNT(p.id),
+                   COUNT(p.price_per_sqm_eur),
+                   COALESCE(SUM(p.price_per_sqm_eur), 0),
+                   COALESCE(SUM(p.price_per_sqm_eur * p.price_per_sqm_eur), 0),
+                   MIN(p.price_per_sqm_eur),
+                   MAX(p.price_per_sqm_eur)
+            FROM   searches s
+            LEFT JOIN properties p ON p.search_id = s.id AND p.status = 'Active'
+            GROUP  BY s.id
+        """)
+
+    def _migration_18(self, conn: sqlite3.Connection) -> None:
+        """Migration 18: run_stats — robust per-run €/m² and price summary."""
+        stat_cols = ",\n".join(
+            f"                {prefix}_{suffix} {'INTEGER' if suffix == 'count' else 'REAL'}"
+            for prefix in ("sqm", "price") for suffix in run_stats.STAT_SUFFIXES
+        )
+        conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS run_stats (
+                run_id        INTEGER PRIMARY KEY
+                                      REFERENCES scrape_runs(id) ON DELETE CASCADE,
+                search_id     INTEGER NOT NULL
+                                      REFERENCES searches(id) ON DELETE CASCADE,
+                run_date      DATETIME NOT NULL,
+                active_count  INTEGER NOT NULL DEFAULT 0,
+                new_count     INTEGER NOT NULL DEFAULT 0,
+                removed_count INTEGER NOT NULL DEFAULT 0,
+{stat_cols}
+            );
+            CREATE INDEX IF NOT EXISTS idx_run_stats_search
+                ON run_stats(search_id, run_date);
+        """)
+        # Earlier runs only have the mean; carry it (and the counts) over so
+        # the charts keep their history. The quantiles stay NULL.
+        conn.execute("""
+            INSERT OR IGNORE INTO run_stats (run_id, search_id, run_date, active_count,
+                                             new_count, removed_count, sqm_mean)
+            SELECT id, search_id, run_date, COALESCE(active_count, records_found, 0),
+                   new_records, inactive_count, avg_price_per_sqm
+            FROM   scrape_runs
+            WHERE  search_id IS NOT NULL AND success = 1
+        """)
+        logger.info("Migration 18 (run_stats) complete.")
+
+    def _migration_19(self, conn: sqlite3.Connection) -> None:
+        """Migration 19: FTS5 full-text index over title, location, description."""
+        # External-content table: the text lives only in properties, the FTS
+        # index holds the tokens. unicode61 case-folds Cyrillic and Latin
+        # alike; prefix indexes make the "word*" queries of search_listings
+        # index lookups. Triggers keep the index in step with every write.
+        prop_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
+        if "description" not in prop_cols:
+            # Databases from before description was stored never gained it
+            conn.execute("ALTER TABLE properties ADD COLUMN description TEXT")
+        conn.executescript("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS properties_fts USING fts5(
+                title, location, description,
+                content='properties', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS trg_properties_fts_insert
+            AFTER INSERT ON properties
+            BEGIN
+                INSERT INTO properties_fts (rowid, title, location, description)
+                VALUES (NEW.id, NEW.title, NEW.location, NEW.description);
+            END;
+
+            CREATE TRIGGER IF NOT EXISTS trg_properties_fts_delete
+            AFTER DELETE ON properties
+            BEGIN
+                INSERT INTO properties_fts (properties_fts, rowid, title, location, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.location, OLD.description);
+            END;
+
+            -- upsert_property rewrites title/location on every sighting;
+            -- only re-index when the text actually changed.
+            CREATE TRIGGER IF NOT EXISTS trg_properties_fts_update
+            AFTER UPDATE OF title, location, description ON properties
+            WHEN OLD.title IS NOT NEW.title
+              OR OLD.location IS NOT NEW.location
+              OR OLD.description IS NOT NEW.description
+            BEGIN
+                INSERT INTO properties_fts (properties_fts, rowid, title, location, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.location, OLD.description);
+                INSERT INTO properties_fts (rowid, title, location, description)
+                VALUES (NEW.id, NEW.title, NEW.location, NEW.description);
+            END;
+
+            INSERT INTO properties_fts (properties_fts) VALUES ('rebuild');
+        """)
+        logger.info("Migration 19 (full-text index) complete.")
+
+    def _migration_20(self, conn: sqlite3.Connection) -> None:
+        """Migration 20: one listings row per record_id + per-search search_membership."""
+        # properties held one full row per (record_id, search_id): a listing in
+        # N searches stored its content, images and price history N times.
+        # Content moves to listings (one row per imot.bg record_id); the
+        # per-search state (status, first / last seen, favourite, run stamp)
+        # moves to search_membership. Duplicates merge into the most recently
+        # seen copy, whose id becomes the listing id — so property ids held
+        # elsewhere stay valid. properties survives as a read-only view.
+        tables = {r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()}
+        if "listings" in tables:
+            return
+        logger.info("Migrating: merging per-search properties into listings + search_membership...")
+        conn.executescript("""
+            PRAGMA foreign_keys = OFF;
+            BEGIN;
+
+            DROP TRIGGER IF EXISTS trg_search_stats_insert;
+            DROP TRIGGER IF EXISTS trg_search_stats_delete;
+            DROP TRIGGER IF EXISTS trg_search_stats_update;
+            DROP TRIGGER IF EXISTS trg_properties_fts_insert;
+            DROP TRIGGER IF EXISTS trg_properties_fts_delete;
+            DROP TRIGGER IF EXISTS trg_properties_fts_update;
+            DROP TABLE   IF EXISTS properties_fts;
+            DROP VIEW    IF EXISTS price_history_status;
+
+            -- Every properties row → the id of its record's surviving copy
+            CREATE TEMP TABLE listing_map AS
+                SELECT id AS old_id,
+                       FIRST_VALUE(id) OVER (PARTITION BY record_id
+                                             ORDER BY last_seen DESC, id DESC) AS listing_id
+                FROM   properties;
+            CREATE UNIQUE INDEX temp.idx_listing_map ON listing_map(old_id);
+
+            CREATE TABLE listings (
+                id                   INTEGER PRIMARY KEY AUTOINCREMENT,
+                record_id            TEXT    NOT NULL UNIQUE,
+                title                TEXT,
+                location             TEXT,
+                description          TEXT,
+                link                 TEXT,
+                price_per_sqm        TEXT,
+                area_sqm             TEXT,
+                floor                TEXT,
+                yard_sqm             TEXT,
+                price_per_sqm_eur    REAL,
+                area_sqm_value       REAL,
+                yard_sqm_value       REAL,
+                current_price        TEXT,
+                current_price_eur    REAL,
+                current_vat_excluded INTEGER,
+                previous_price       TEXT,
+                price_changed_at     DATETIME
+            );
+
+            -- Write-once fields (description, area, floor, yard) fall back to
+            -- whichever duplicate fetched them.
+            INSERT INTO listings (id, record_id, title, location, description, link,
+                                  price_per_sqm, area_sqm, floor, yard_sqm,
+                                  price_per_sqm_eur, area_sqm_value, yard_sqm_value)
+            SELECT p.id, p.record_id, p.title, p.location,
+                   COALESCE(p.description, (SELECT MAX(d.description) FROM properties d WHERE d.record_id = p.record_id)),
+                   p.link,
+                   COALESCE(p.price_per_sqm, (SELECT MAX(d.price_per_sqm) FROM properties d WHERE d.record_id = p.record_id)),
+                   COALESCE(p.area_sqm,      (SELECT MAX(d.area_sqm)      FROM properties d WHERE d.record_id = p.record_id)),
+                   COALESCE(p.floor,         (SELECT MAX(d.floor)         FROM properties d WHERE d.record_id = p.record_id)),
+                   COALESCE(p.yard_sqm,      (SELECT MAX(d.yard_sqm)      FROM properties d WHERE d.record_id = p.record_id)),
+                   COALESCE(p.price_per_sqm_eur, (SELECT MAX(d.price_per_sqm_eur) FROM properties d WHERE d.record_id = p.record_id)),
+                   COALESCE(p.area_sqm_value,    (SELECT MAX(d.area_sqm_value)    FROM properties d WHERE d.record_id = p.record_id)),
+                   COALESCE(p.yard_sqm_value,    (SELECT MAX(d.yard_sqm_value)    FROM properties d WHERE d.record_id = p.record_id))
+            FROM   properties p
+            JOIN   listing_map m ON m.old_id = p.id AND m.listing_id = p.id;
+
+            CREATE TABLE search_membership (
+                listing_id       INTEGER NOT NULL REFERENCES listings(id) ON DELETE CASCADE,
+                search_id        INTEGER NOT NULL REFERENCES searches(id) ON DELETE CASCADE,
+                status           TEXT    NOT NULL DEFAULT 'Active',
+                first_seen       DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                last_seen        DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                inactivated_at   DATETIME,
+                is_favorite      INTEGER NOT NULL DEFAULT 0,
+                last_seen_run_id INTEGER,
+                PRIMARY KEY (listing_id, search_id)
+            );
+
+            INSERT INTO search_membership (listing_id, search_id, status, first_seen, last_seen,
+                                           inactivated_at, is_favorite, last_seen_run_id)
+            SELECT m.listing_id, p.search_id, p.status, p.first_seen, p.last_seen,
+                   p.inactivated_at, COALESCE(p.is_favorite, 0), p.last_seen_run_id
+            FROM   properties p
+            JOIN   listing_map m ON m.old_id = p.id;
+
+            -- One timeline per listing: interleave the copies' rows by time,
+            -- drop rows repeating the previous price (the same change seen by
+            -- another search) and renumber seq.
+            CREATE TABLE price_history_new (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                property_id  INTEGER NOT NULL REFERENCES listings(id) ON DELETE CASCADE,
+                seq          INTEGER NOT NULL,
+                price        TEXT    NOT NULL,
+                is_new       INTEGER NOT NULL DEFAULT 0,
+                recorded_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+                amount       REAL,
+                currency     TEXT,
+                vat_excluded INTEGER,
+                price_eur    REAL
+            );
+
+            INSERT INTO price_history_new (id, property_id, seq, price, is_new, recorded_at,
+                                           amount, currency, vat_excluded, price_eur)
+            SELECT id, listing_id,
+                   ROW_NUMBER() OVER (PARTITION BY listing_id ORDER BY recorded_at, own DESC, seq),
+                   price, is_new, recorded_at, amount, currency, vat_excluded, price_eur
+            FROM (
+                SELECT ph.*, m.listing_id, (ph.property_id = m.listing_id) AS own,
+                       LAG(ph.price) OVER (PARTITION BY m.listing_id
+                                           ORDER BY ph.recorded_at, (ph.property_id = m.listing_id) DESC,
+                                                    ph.seq) AS prev_price
+                FROM   price_history ph
+                JOIN   listing_map m ON m.old_id = ph.property_id
+            )
+            WHERE prev_price IS NULL OR prev_price <> price;
+
+            -- Images: the surviving copy's own, or a duplicate's if it had none
+            CREATE TABLE property_images_new (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                property_id INTEGER NOT NULL REFERENCES listings(id) ON DELETE CASCADE,
+                url         TEXT    NOT NULL,
+                image_data  BLOB    NOT NULL,
+                position    INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (property_id, url)
+            );
+
+            INSERT OR IGNORE INTO property_images_new (id, property_id, url, image_data, position)
+            SELECT i.id, m.listing_id, i.url, i.image_data, i.position
+            FROM   property_images i
+            JOIN   listing_map m ON m.old_id = i.property_id
+            WHERE  i.property_id = m.listing_id
+               OR  NOT EXISTS (SELECT 1 FROM property_images o WHERE o.property_id = m.listing_id)
+            ORDER  BY i.property_id = m.listing_id DESC, i.id;
+
+            DROP TABLE price_history;
+            ALTER TABLE price_history_new RENAME TO price_history;
+            DROP TABLE property_images;
+            ALTER TABLE property_images_new RENAME TO property_images;
+            DROP TABLE properties;
+            DROP TABLE listing_map;
+
+            -- Denormalised current / previous price from the merged timeline
+            UPDATE listings
+            SET    current_price        = cur.price,
+                   current_price_eur    = cur.price_eur,
+                   current_vat_excluded = cur.vat_excluded,
+                   previous_price       = prev.price,
+                   price_changed_at     = CASE WHEN prev.id IS NULL THEN NULL ELSE cur.recorded_at END
+            FROM   price_history cur
+            LEFT JOIN price_history prev
+                   ON prev.property_id = cur.property_id AND prev.seq = cur.seq - 1
+            WHERE  cur.property_id = listings.id
+              AND  cur.seq = (SELECT MAX(seq) FROM price_history WHERE property_id = listings.id);
+
+            CREATE UNIQUE INDEX idx_price_history_seq   ON price_history(property_id, seq);
+            CREATE INDEX idx_listings_link              ON listings(link);
+            CREATE INDEX idx_membership_search          ON search_membership(search_id, status, last_seen);
+
+            -- Read-compatible view with the old per-search row shape
+            CREATE VIEW properties AS
+                SELECT l.id, l.record_id, m.search_id, l.title, l.location, l.description, l.link,
+                       m.status, m.first_seen, m.last_seen, m.inactivated_at, l.price_per_sqm,
+                       m.is_favorite, l.area_sqm, l.floor, l.yard_sqm,
+                       l.price_per_sqm_eur, l.area_sqm_value, l.yard_sqm_value,
+                       m.last_seen_run_id, l.current_price, l.current_price_eur,
+                       l.current_vat_excluded, l.previous_price, l.price_changed_at
+                FROM   search_membership m
+                JOIN   listings l ON l.id = m.listing_id;
+
+            CREATE VIEW price_history_status AS
+                SELECT ph.*,
+                       CASE ROW_NUMBER() OVER (PARTITION BY property_id ORDER BY seq DESC)
+                            WHEN 1 THEN 'Current' WHEN 2 THEN 'Previous' ELSE 'Older'
+                       END AS price_status
+                FROM   price_history ph;
+
+            -- Full-text index, now over listings
+            CREATE VIRTUAL TABLE listings_fts USING fts5(
+                title, location, description,
+                content='listings', content_rowid='id',
+                tokenize='unicode61 remove_diacritics 2',
+                prefix='2 3'
+            );
+            INSERT INTO listings_fts (listings_fts) VALUES ('rebuild');
+
+            CREATE TRIGGER trg_listings_fts_insert
+            AFTER INSERT ON listings
+            BEGIN
+                INSERT INTO listings_fts (rowid, title, location, description)
+                VALUES (NEW.id, NEW.title, NEW.location, NEW.description);
+            END;
+
+            CREATE TRIGGER trg_listings_fts_delete
+            AFTER DELETE ON listings
+            BEGIN
+                INSERT INTO listings_fts (listings_fts, rowid, title, location, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.location, OLD.description);
+            END;
+
+            CREATE TRIGGER trg_listings_fts_update
+            AFTER UPDATE OF title, location, description ON listings
+            WHEN OLD.title IS NOT NEW.title
+              OR OLD.location IS NOT NEW.location
+              OR OLD.description IS NOT NEW.description
+            BEGIN
+                INSERT INTO listings_fts (listings_fts, rowid, title, location, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.location, OLD.description);
+                INSERT INTO listings_fts (rowid, title, location, description)
+                VALUES (NEW.id, NEW.title, NEW.location, NEW.description);
+            END;
+
+            COMMIT;
+            PRAGMA foreign_keys = ON;
+        """)
+
+        # search_stats: a membership entering / leaving Active applies its
+        # listing's €/m²; a listing re-priced applies the change to every
+        # search it is Active in. A lost MIN / MAX is re-read over the
+        # search's Active memberships (idx_membership_search + listing PK).
+        listing_sqm = "(SELECT price_per_sqm_eur FROM listings WHERE id = {}.listing_id)"
+        conn.executescript(f"""
+            CREATE TRIGGER trg_membership_stats_insert
+            AFTER INSERT ON search_membership
+            WHEN NEW.status = 'Active'
+            BEGIN{_search_stats_delta("+", listing_sqm.format("NEW"), "NEW.search_id")}
+            END;
+
+            CREATE TRIGGER trg_membership_stats_delete
+            AFTER DELETE ON search_membership
+            WHEN OLD.status = 'Active'
+            BEGIN{_search_stats_delta("-", listing_sqm.format("OLD"), "OLD.search_id")}
+            END;
+
+            CREATE TRIGGER trg_membership_stats_update
+            AFTER UPDATE OF status, search_id ON search_membership
+            WHEN (OLD.status = 'Active' OR NEW.status = 'Active')
+             AND (OLD.status IS NOT NEW.status OR OLD.search_id IS NOT NEW.search_id)
+            BEGIN{_search_stats_delta("-", listing_sqm.format("OLD"), "OLD.search_id", "AND OLD.status = 'Active'")}
+                {_search_stats_delta("+", listing_sqm.format("NEW"), "NEW.search_id", "AND NEW.status = 'Active'")}
+            END;
+
+            CREATE TRIGGER trg_listing_stats_update
+            AFTER UPDATE OF price_per_sqm_eur ON listings
+            WHEN OLD.price_per_sqm_eur IS NOT NEW.price_per_sqm_eur
+            BEGIN{_search_stats_delta("-", "OLD.price_per_sqm_eur", "search_stats.search_id",
+                                      "AND search_id IN (SELECT search_id FROM search_membership "
+                                      "WHERE listing_id = NEW.id AND status = 'Active')")}
+                {_search_stats_delta("+", "NEW.price_per_sqm_eur", "search_stats.search_id",
+                                     "AND search_id IN (SELECT search_id FROM search_membership "
+                                     "WHERE listing_id = NEW.id AND status = 'Active')")}
+            END;
+        """)
+        self._reseed_search_stats(conn)
+        logger.info("Migration 20 (listings + search_membership) complete.")
+
+    def _migration_21(self, conn: sqlite3.Connection) -> None:
+        """Migration 21: MinHash / LSH similarity index and relisted_from_id."""
+        # listings.minhash holds the description's MinHash signature and
+        # listing_lsh its LSH band buckets (database/similarity.py), so a new
+        # listing finds near-duplicate descriptions with one indexed lookup
+        # per band. relisted_from_id links a listing to its likely
+        # predecessor; it is set at ingest only (link_relisting), existing
+        # listings are indexed but not linked retroactively.
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(listings)").fetchall()}
+        if "minhash" not in cols:
+            conn.execute("ALTER TABLE listings ADD COLUMN minhash BLOB")
+        if "relisted_from_id" not in cols:
+            conn.execute("ALTER TABLE listings ADD COLUMN relisted_from_id INTEGER "
+                         "REFERENCES listings(id) ON DELETE SET NULL")
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS listing_lsh (
+                band       INTEGER NOT NULL,
+                bucket     INTEGER NOT NULL,
+                listing_id INTEGER NOT NULL REFERENCES listings(id) ON DELETE CASCADE,
+                PRIMARY KEY (band, bucket, listing_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_listing_lsh_listing ON listing_lsh(listing_id);
+            CREATE INDEX IF NOT EXISTS idx_listings_relisted
+                ON listings(relisted_from_id) WHERE relisted_from_id IS NOT NULL;
+
+            DROP VIEW IF EXISTS properties;
+            CREATE VIEW properties AS
+                SELECT l.id, l.record_id, m.search_id, l.title, l.location, l.description, l.link,
+                       m.status, m.first_seen, m.last_seen, m.inactivated_at, l.price_per_sqm,
+                       m.is_favorite, l.area_sqm, l.floor, l.yard_sqm,
+                       l.price_per_sqm_eur, l.area_sqm_value, l.yard_sqm_value,
+                       m.last_seen_run_id, l.current_price, l.current_price_eur,
+                       l.current_vat_excluded, l.previous_price, l.price_changed_at,
+                       l.relisted_from_id
+                FROM   search_membership m
+                JOIN   listings l ON l.id = m.listing_id;
+        """)
+
+        rows = conn.execute(
+            "SELECT id, description FROM listings WHERE minhash IS NULL AND description <> ''"
+        ).fetchall()
+        if rows:
+            logger.info(f"Migrating: indexing {len(rows)} descriptions for relisting detection...")
+        for row in rows:
+            sig = similarity.signature(row[1])
+            if sig is None:
+                continue
+            conn.execute("UPDATE listings SET minhash = ? WHERE id = ?",
+                         (similarity.to_blob(sig), row[0]))
+            conn.executemany(
+                "INSERT OR IGNORE INTO listing_lsh (band, bucket, listing_id) VALUES (?, ?, ?)",
+                [(band, key, row[0]) for band, key in enumerate(similarity.band_keys(sig))],
+            )
+        logger.info("Migration 21 (similarity index) complete.")
+
+    def _migration_22(self, conn: sqlite3.Connection) -> None:
+        """Migration 22: content-addressed image_blobs with a dHash band index."""
+        # Reposts and listings shared between agencies carry the same photos:
+        # image bytes move to image_blobs, stored once per SHA-1, and
+        # property_images keeps (listing, url, position) → blob_id. dhash is
+        # filled in later by hash_pending_images (database/image_hash.py) and
+        # indexed by its 16-bit bands in image_dhash_bands, so near-identical
+        # (re-encoded, resized) photos are found by find_listings_sharing_photos.
+        tables = {r[0] for r in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()}
+        if "image_blobs" in tables:
+            return
+        logger.info("Migrating: de-duplicating stored images into image_blobs...")
+        conn.create_function("sha1", 1, lambda b: hashlib.sha1(b).digest(), deterministic=True)
+        conn.executescript("""
+            PRAGMA foreign_keys = OFF;
+            BEGIN;
+
+            CREATE TABLE image_blobs (
+                id         INTEGER PRIMARY KEY AUTOINCREMENT,
+                sha1       BLOB    NOT NULL UNIQUE,
+                image_data BLOB    NOT NULL,
+                dhash      INTEGER
+            );
+            CREATE INDEX idx_image_blobs_unhashed ON image_blobs(id) WHERE dhash IS NULL;
+
+            CREATE TABLE image_dhash_bands (
+                band    INTEGER NOT NULL,
+                value   INTEGER NOT NULL,
+                blob_id INTEGER NOT NULL REFERENCES image_blobs(id) ON DELETE CASCADE,
+                PRIMARY KEY (band, value, blob_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX idx_image_dhash_bands_blob ON image_dhash_bands(blob_id);
+
+            CREATE TEMP TABLE image_sha AS
+                SELECT id AS image_id, sha1(image_data) AS sha1 FROM property_images;
+
+            INSERT OR IGNORE INTO image_blobs (sha1, image_data)
+            SELECT s.sha1, i.image_data
+            FROM   image_sha s
+            JOIN   property_images i ON i.id = s.image_id
+            ORDER  BY i.id;
+
+            CREATE TABLE property_images_new (
+                id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                property_id INTEGER NOT NULL REFERENCES listings(id) ON DELETE CASCADE,
+                url         TEXT    NOT NULL,
+                blob_id     INTEGER NOT NULL REFERENCES image_blobs(id),
+                position    INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (property_id, url)
+            );
+
+            INSERT INTO property_images_new (id, property_id, url, blob_id, position)
+            SELECT i.id, i.property_id, i.url, b.id, i.position
+            FROM   property_images i
+            JOIN   image_sha s ON s.image_id = i.id
+            JOIN   image_blobs b ON b.sha1 = s.sha1;
+
+            DROP TABLE property_images;
+            ALTER TABLE property_images_new RENAME TO property_images;
+            DROP TABLE image_sha;
+            CREATE INDEX idx_property_images_blob ON property_images(blob_id);
+
+            -- A blob lives as long as some listing still references it
+            CREATE TRIGGER trg_image_blobs_release
+            AFTER DELETE ON property_images
+            WHEN NOT EXISTS (SELECT 1 FROM property_images WHERE blob_id = OLD.blob_id)
+            BEGIN
+                DELETE FROM image_blobs WHERE id = OLD.blob_id;
+            END;
+
+            COMMIT;
+            PRAGMA foreign_keys = ON;
+        """)
+        logger.info("Migration 22 (image_blobs + dHash index) complete.")
+
+    def _migration_23(self, conn: sqlite3.Connection) -> None:
+        """Migration 23: per-search deal scores on search_membership."""
+        # deal_score / deal_area_score are robust z-scores of a listing's
+        # area- and floor-adjusted €/m² within its search and within its
+        # location (positive = cheaper than expected), deal_percentile its
+        # rank in the search (database/deal_score.py). Written by
+        # score_search after every run; existing searches are scored by
+        # migration 24, once their locations are interned.
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(search_membership)").fetchall()}
+        for col in ("deal_score", "deal_area_score", "deal_percentile"):
+            if col not in cols:
+                conn.execute(f"ALTER TABLE search_membership ADD COLUMN {col} REAL")
+        conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_membership_deal
+                ON search_membership(search_id, deal_score) WHERE deal_score IS NOT NULL;
+
+            DROP VIEW IF EXISTS properties;
+            CREATE VIEW properties AS
+                SELECT l.id, l.record_id, m.search_id, l.title, l.location, l.description, l.link,
+                       m.status, m.first_seen, m.last_seen, m.inactivated_at, l.price_per_sqm,
+                       m.is_favorite, l.area_sqm, l.floor, l.yard_sqm,
+                       l.price_per_sqm_eur, l.area_sqm_value, l.yard_sqm_value,
+                       m.last_seen_run_id, l.current_price, l.current_price_eur,
+                       l.current_vat_excluded, l.previous_price, l.price_changed_at,
+                       l.relisted_from_id, m.deal_score, m.deal_area_score, m.deal_percentile
+                FROM   search_membership m
+                JOIN   listings l ON l.id = m.listing_id;
+        """)
+        logger.info("Migration 23 (deal scores) complete.")
+
+    def _migration_24(self, conn: sqlite3.Connection) -> None:
+        """Migration 24: locations dictionary, listings.location_id, location_stats."""
+        # Each distinct (city, district, neighbourhood) is stored once in
+        # locations (database/locations.py) and listings reference it by
+        # location_id, so grouping by location is an indexed integer GROUP
+        # BY. listings.location keeps the scraped text: it is the display
+        # form and the FTS index (content='listings') reads it. location_id
+        # is filled in after each run by intern_pending_locations and reset
+        # by a trigger when the text changes, so upsert_property is untouched.
+        # location_stats holds the per-run count and median €/m² of each
+        # location, written by record_run_stats with the run_stats row (and
+        # deleted with it, so with the search too).
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(listings)").fetchall()}
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS locations (
+                id            INTEGER PRIMARY KEY,
+                key           TEXT    NOT NULL UNIQUE,
+                city          TEXT,
+                district      TEXT,
+                neighbourhood TEXT
+            );
+
+            CREATE TABLE IF NOT EXISTS location_stats (
+                run_id       INTEGER NOT NULL REFERENCES run_stats(run_id) ON DELETE CASCADE,
+                location_id  INTEGER NOT NULL REFERENCES locations(id),
+                search_id    INTEGER NOT NULL,
+                active_count INTEGER NOT NULL,
+                sqm_count    INTEGER NOT NULL,
+                sqm_median   REAL,
+                PRIMARY KEY (run_id, location_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_location_stats_location
+                ON location_stats(location_id, run_id);
+        """)
+        if "location_id" not in cols:
+            conn.execute("ALTER TABLE listings ADD COLUMN location_id INTEGER "
+                         "REFERENCES locations(id)")
+        conn.executescript("""
+            CREATE INDEX IF NOT EXISTS idx_listings_location ON listings(location_id);
+            CREATE INDEX IF NOT EXISTS idx_listings_location_pending
+                ON listings(id) WHERE location_id IS NULL AND location <> '';
+
+            CREATE TRIGGER IF NOT EXISTS trg_listings_location_changed
+            AFTER UPDATE OF location ON listings
+            WHEN OLD.location IS NOT NEW.location
+            BEGIN
+                UPDATE listings SET location_id = NULL WHERE id = NEW.id;
+            END;
+
+            DROP VIEW IF EXISTS properties;
+            CREATE VIEW properties AS
+                SELECT l.id, l.record_id, m.search_id, l.title, l.location, l.description, l.link,
+                       m.status, m.first_seen, m.last_seen, m.inactivated_at, l.price_per_sqm,
+                       m.is_favorite, l.area_sqm, l.floor, l.yard_sqm,
+                       l.price_per_sqm_eur, l.area_sqm_value, l.yard_sqm_value,
+                       m.last_seen_run_id, l.current_price, l.current_price_eur,
+                       l.current_vat_excluded, l.previous_price, l.price_changed_at,
+                       l.relisted_from_id, m.deal_score, m.deal_area_score, m.deal_percentile,
+                       l.location_id
+                FROM   search_membership m
+                JOIN   listings l ON l.id = m.listing_id;
+        """)
+
+        logger.info("Migrating: interning listing locations...")
+        self._intern_pending_locations(conn)
+        for (search_id,) in conn.execute("SELECT id FROM searches").fetchall():
+            self._write_deal_scores(conn, search_id)
+        logger.info("Migration 24 (locations) complete.")
+
+    def _migration_25(self, conn: sqlite3.Connection) -> None:
+        """Migration 25: search_membership.last_price, the price each search last saw."""
+        # listings.current_price is shared: once the first search of a run
+        # stores a new price, every other search holding the listing would
+        # compare against it and miss the change. Each membership keeps the
+        # price its own search last saw (written by upsert_property and
+        # touch_properties); history is still appended once per listing.
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(search_membership)").fetchall()}
+        if "last_price" not in cols:
+            conn.execute("ALTER TABLE search_membership ADD COLUMN last_price TEXT")
+        conn.executescript("""
+            UPDATE search_membership
+            SET    last_price = (SELECT current_price FROM listings WHERE id = listing_id)
+            WHERE  last_price IS NULL;
+
+            DROP VIEW IF EXISTS properties;
+            CREATE VIEW properties AS
+                SELECT l.id, l.record_id, m.search_id, l.title, l.location, l.description, l.link,
+                       m.status, m.first_seen, m.last_seen, m.inactivated_at, l.price_per_sqm,
+                       m.is_favorite, l.area_sqm, l.floor, l.yard_sqm,
+                       l.price_per_sqm_eur, l.area_sqm_value, l.yard_sqm_value,
+                       m.last_seen_run_id, l.current_price, l.current_price_eur,
+                       l.current_vat_excluded, l.previous_price, l.price_changed_at,
+                       l.relisted_from_id, m.deal_score, m.deal_area_score, m.deal_percentile,
+                       l.location_id, m.last_price
+                FROM   search_membership m
+                JOIN   listings l ON l.id = m.listing_id;
+        """)
+        logger.info("Migration 25 (per-search last price) complete.")
+
+    def _migration_26(self, conn: sqlite3.Connection) -> None:
+        """Migration 26: scrape_runs.status, so an open run is not read as failed."""
+        # begin_scrape_run opens the row as 'running' and log_scrape_run
+        # closes it as 'finished'; success only means something once the
+        # row is finished. A row still 'running' after its execution ended
+        # was interrupted. Rows opened before this step carry the old
+        # in-progress marker in error_message instead.
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(scrape_runs)").fetchall()}
+        if "status" not in cols:
+            conn.execute("ALTER TABLE scrape_runs ADD COLUMN status TEXT NOT NULL DEFAULT 'finished'")
+        conn.execute("""
+            UPDATE scrape_runs SET status = 'running', error_message = NULL
+            WHERE  error_message = 'Run in progress (or interrupted)'
+        """)
+        logger.info("Migration 26 (scrape run status) complete.")
+
+    def _migration_27(self, conn: sqlite3.Connection) -> None:
+        """Migration 27: unparseable locations leave the pending set."""
+        # A location text locations.parse() can't split used to keep its
+        # listing at location_id NULL, so every run selected and re-parsed
+        # it. It now points at the reserved locations row 0 (key ''), which
+        # _intern_pending_locations adds on first need; the properties view
+        # shows it as NULL, so stats and exports never group by it.
+        conn.executescript("""
+            DROP VIEW IF EXISTS properties;
+            CREATE VIEW properties AS
+                SELECT l.id, l.record_id, m.search_id, l.title, l.location, l.description, l.link,
+                       m.status, m.first_seen, m.last_seen, m.inactivated_at, l.price_per_sqm,
+                       m.is_favorite, l.area_sqm, l.floor, l.yard_sqm,
+                       l.price_per_sqm_eur, l.area_sqm_value, l.yard_sqm_value,
+                       m.last_seen_run_id, l.current_price, l.current_price_eur,
+                       l.current_vat_excluded, l.previous_price, l.price_changed_at,
+                       l.relisted_from_id, m.deal_score, m.deal_area_score, m.deal_percentile,
+                       NULLIF(l.location_id, 0) AS location_id, m.last_price
+                FROM   search_membership m
+                JOIN   listings l ON l.id = m.listing_id;
+        """)
+        self._intern_pending_locations(conn)
+        logger.info("Migration 27 (unparseable locations) complete.")
+
+    def _migration_28(self, conn: sqlite3.Connection) -> None:
+        """Migration 28: image_blobs.hash_failed, so undecodable images leave the pending set."""
+        # Bytes Pillow can't decode used to keep dhash NULL and were read and
+        # decoded again by every hash_pending_images pass. They are now
+        # flagged once; idx_image_blobs_unhashed covers only the images
+        # still worth trying.
+        cols = {r[1] for r in conn.execute("PRAGMA table_info(image_blobs)").fetchall()}
+        if "hash_failed" not in cols:
+            conn.execute("ALTER TABLE image_blobs ADD COLUMN hash_failed INTEGER NOT NULL DEFAULT 0")
+        conn.executescript("""
+            DROP INDEX IF EXISTS idx_image_blobs_unhashed;
+            CREATE INDEX idx_image_blobs_unhashed
+                ON image_blobs(id) WHERE dhash IS NULL AND hash_failed = 0;
+        """)
+        logger.info("Migration 28 (failed image hashes) complete.")
+
+    # (user_version, description, step) — append new steps at the end and
+    # bump SCHEMA_VERSION; never renumber or rewrite a released step.
+    MIGRATIONS = (
+        (1, "price_history old_price → price_status", _migration_1),
+        (2, "add location column", _migration_2),
+        (3, "switch properties from search_name → search_id FK", _migration_3),
+        (4, "add inactivated_at column to properties", _migration_4),
+        (5, "add price_per_sqm column to properties", _migration_5),
+        (6, "create search_area_stats table", _migration_6),
+        (7, "add avg_price_per_sqm + active_count to scrape_runs", _migration_7),
+        (8, "add is_favorite column to properties", _migration_8),
+        (9, "add area_sqm, floor, yard_sqm columns to properties", _migration_9),
+        (10, "add searches TEXT to scrape_runs", _migration_10),
+        (11, "add profile_path TEXT to scrape_runs", _migration_11),
+        (12, "numeric normalised price / area / €/m² columns", _migration_12),
+        (13, "indexes for the hot query paths", _migration_13),
+        (14, "last_seen_run_id on properties", _migration_14),
+        (15, "denormalised current / previous price on properties", _migration_15),
+        (16, "append-only price_history with seq", _migration_16),
+        (17, "running per-search €/m² aggregates", _migration_17),
+        (18, "run_stats per-run summary table", _migration_18),
+        (19, "FTS5 index over title / location / description", _migration_19),
+        (20, "listings + search_membership (one row per listing)", _migration_20),
+        (21, "MinHash / LSH similarity index, relisted_from_id", _migration_21),
+        (22, "content-addressed image_blobs + dHash band index", _migration_22),
+        (23, "per-search deal scores on search_membership", _migration_23),
+        (24, "locations dictionary + per-run location_stats", _migration_24),
+        (25, "search_membership.last_price per search", _migration_25),
+        (26, "scrape_runs.status running / finished", _migration_26),
+        (27, "reserved locations row 0 for unparseable text", _migration_27),
+        (28, "image_blobs.hash_failed for undecodable images", _migration_28),
+    )
+    SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+    @staticmethod
+    def _register_normalize_functions(conn: sqlite3.Connection) -> None:
+        """Expose the database.normalize parsers to SQL (for backfills)."""
+        conn.create_function("norm_price_amount", 1, normalize.sql_price_amount, deterministic=True)
+        conn.create_function("norm_price_currency", 1, normalize.sql_price_currency, deterministic=True)
+        conn.create_function("norm_price_vat_excluded", 1, normalize.sql_price_vat_excluded, deterministic=True)
+        conn.create_function("norm_price_eur", 1, normalize.sql_price_eur, deterministic=True)
+        conn.create_function("norm_number", 1, normalize.parse_number, deterministic=True)
+
     def _recalculate_price_statuses(self, conn: sqlite3.Connection):
         """
         After a migration, set price_status correctly for all rows:
           newest row per property  → Current
           second newest            → Previous
           all older rows           → Older
+        One set-based UPDATE ranked with a window function.
         """
-        property_ids = [r[0] for r in conn.execute("SELECT DISTINCT property_id FROM price_history").fetchall()]
-        for pid in property_ids:
-            rows = conn.execute(
-                "SELECT id FROM price_history WHERE property_id = ? ORDER BY recorded_at DESC",
-                (pid,)
-            ).fetchall()
-            for i, row in enumerate(rows):
-                if i == 0:
-                    status = "Current"
-                elif i == 1:
-                    status = "Previous"
-                else:
-                    status = "Older"
-                conn.execute("UPDATE price_history SET price_status = ? WHERE id = ?", (status, row[0]))
+        conn.execute("""
+            UPDATE price_history
+            SET    price_status = CASE ranked.rn WHEN 1 THEN 'Current'
+                                                 WHEN 2 THEN 'Previous'
+                                                 ELSE 'Older' END
+            FROM  (SELECT id,
+                          ROW_NUMBER() OVER (PARTITION BY property_id
+                                             ORDER BY recorded_at DESC, id DESC) AS rn
+                   FROM   price_history) AS ranked
+            WHERE  ranked.id = price_history.id
+        """)
 
     # ------------------------------------------------------------------
     # Core write operations
@@ -337,57 +1444,101 @@ class DatabaseManager:
         area_sqm: Optional[str] = None,
         floor: Optional[str] = None,
         yard_sqm: Optional[str] = None,
+        run_id: Optional[int] = None,
     ) -> int:
         """
-        Insert a new property or update an existing one.
-        Records a price_history row ONLY when the property is new or the price changed.
+        Insert or update a listing and this search's membership of it.
+        The listing row (content, price, images, history) is shared by every
+        search that finds the same record_id; status, first / last seen,
+        favourite and the run stamp live in search_membership per search.
+        Appends one price_history row (next seq for the listing) ONLY when the
+        listing has no price yet or the price changed — existing rows are never
+        rewritten, and a change seen by several searches is recorded once.
+        The membership's last_price is set to *price* either way: it is what
+        the scraper compares against, so each search notices the change.
+        is_new flags the listing as new to *this* search (the membership is
+        created either way); the history row's is_new marks the first price.
         Description is stored on first fetch and never overwritten (changes are rare
         and the detail page is only fetched for new listings).
         price_per_sqm is always updated when provided (e.g. "10.43 €/m²").
         area_sqm, floor, yard_sqm are stored on first fetch and never overwritten.
-        Returns the property id.
+        Numeric twins (price_per_sqm_eur, area_sqm_value, yard_sqm_value and the
+        price_history amount / currency / vat_excluded / price_eur) are parsed here.
+        The denormalised current_price / current_price_eur / current_vat_excluded /
+        previous_price / price_changed_at columns are updated together with the
+        price_history row, so listing reads never need to join it.
+        run_id stamps last_seen_run_id so mark_inactive keeps the listing Active.
+        Returns the listing id.
         """
-        with self._get_connection() as conn:
+        with _DB_WRITE_LATENCY.time(op="upsert_property"), self._get_connection() as conn:
             cursor = conn.cursor()
             now = self._local_now()
 
-            cursor.execute("""
-                INSERT INTO properties (record_id, search_id, title, location, description, link, status, first_seen, last_seen, price_per_sqm, area_sqm, floor, yard_sqm)
-                VALUES (?, ?, ?, ?, ?, ?, 'Active', ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(record_id, search_id) DO UPDATE SET
+            row = cursor.execute("""
+                INSERT INTO listings (record_id, title, location, description, link,
+                                      price_per_sqm, area_sqm, floor, yard_sqm,
+                                      price_per_sqm_eur, area_sqm_value, yard_sqm_value)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(record_id) DO UPDATE SET
                     title          = excluded.title,
                     location       = excluded.location,
-                    description    = COALESCE(excluded.description,  properties.description),
+                    description    = COALESCE(excluded.description,  listings.description),
                     link           = excluded.link,
-                    status         = 'Active',
-                    last_seen      = excluded.last_seen,
-                    inactivated_at = NULL,
-                    price_per_sqm  = COALESCE(excluded.price_per_sqm, properties.price_per_sqm),
-                    area_sqm       = COALESCE(excluded.area_sqm,      properties.area_sqm),
-                    floor          = COALESCE(excluded.floor,         properties.floor),
-                    yard_sqm       = COALESCE(excluded.yard_sqm,      properties.yard_sqm)
-            """, (record_id, search_id, title, location, description, link, now, now,
-                  price_per_sqm, area_sqm, floor, yard_sqm))
-
-            cursor.execute(
-                "SELECT id FROM properties WHERE record_id = ? AND search_id = ?",
-                (record_id, search_id)
-            )
-            property_id = cursor.fetchone()["id"]
+                    price_per_sqm  = COALESCE(excluded.price_per_sqm, listings.price_per_sqm),
+                    area_sqm       = COALESCE(excluded.area_sqm,      listings.area_sqm),
+                    floor          = COALESCE(excluded.floor,         listings.floor),
+                    yard_sqm       = COALESCE(excluded.yard_sqm,      listings.yard_sqm),
+                    price_per_sqm_eur = COALESCE(excluded.price_per_sqm_eur, listings.price_per_sqm_eur),
+                    area_sqm_value    = COALESCE(excluded.area_sqm_value,    listings.area_sqm_value),
+                    yard_sqm_value    = COALESCE(excluded.yard_sqm_value,    listings.yard_sqm_value)
+                RETURNING id, current_price
+            """, (record_id, title, location, description, link,
+                  price_per_sqm, area_sqm, floor, yard_sqm,
+                  normalize.parse_price_per_sqm(price_per_sqm),
+                  normalize.parse_area(area_sqm), normalize.parse_area(yard_sqm))).fetchone()
+            property_id = row["id"]
+            first_price = row["current_price"] is None
 
-            if is_new or self._price_changed(cursor, property_id, price):
-                cursor.execute("""
-                    UPDATE price_history SET price_status = 'Older'
-                    WHERE property_id = ? AND price_status = 'Previous'
-                """, (property_id,))
+            cursor.execute("""
+                INSERT INTO search_membership (listing_id, search_id, status, first_seen, last_seen,
+                                               last_seen_run_id, last_price)
+                VALUES (?, ?, 'Active', ?, ?, ?, ?)
+                ON CONFLICT(listing_id, search_id) DO UPDATE SET
+                    status           = 'Active',
+                    last_seen        = excluded.last_seen,
+                    inactivated_at   = NULL,
+                    last_seen_run_id = excluded.last_seen_run_id,
+                    last_price       = excluded.last_price
+            """, (property_id, search_id, now, now, run_id, price))
+
+            if first_price or row["current_price"] != price:
+                # Append-only: one insert at the next seq; Current / Previous
+                # are derived from seq order (see get_price_history).
+                parsed = normalize.parse_price(price)
                 cursor.execute("""
-                    UPDATE price_history SET price_status = 'Previous'
-                    WHERE property_id = ? AND price_status = 'Current'
-                """, (property_id,))
+                    INSERT INTO price_history (property_id, seq, price, is_new, recorded_at,
+                                               amount, currency, vat_excluded, price_eur)
+                    VALUES (?, COALESCE((SELECT MAX(seq) FROM price_history WHERE property_id = ?), 0) + 1,
+                            ?, ?, ?, ?, ?, ?, ?)
+                """, (property_id, property_id, price, 1 if first_price else 0, now,
+                      parsed.amount if parsed else None,
+                      parsed.currency if parsed else None,
+                      (1 if parsed.vat_excluded else 0) if parsed else None,
+                      parsed.price_eur if parsed else None))
+                # Keep the denormalised price columns in step, same transaction
                 cursor.execute("""
-                    INSERT INTO price_history (property_id, price, price_status, is_new, recorded_at)
-                    VALUES (?, ?, 'Current', ?, ?)
-                """, (property_id, price, 1 if is_new else 0, now))
+                    UPDATE listings
+                    SET    previous_price       = current_price,
+                           price_changed_at     = CASE WHEN current_price IS NULL
+                                                       THEN price_changed_at ELSE ? END,
+                           current_price        = ?,
+                           current_price_eur    = ?,
+                           current_vat_excluded = ?
+                    WHERE  id = ?
+                """, (now, price,
+                      parsed.price_eur if parsed else None,
+                      (1 if parsed.vat_excluded else 0) if parsed else None,
+                      property_id))
 
             return property_id
 
@@ -402,6 +1553,9 @@ class DatabaseManager:
 
         - Uses INSERT OR IGNORE so re-scraping a property never overwrites or
           duplicates existing images.
+        - Bytes are stored once in image_blobs, keyed by their SHA-1: a photo
+          already stored for another listing (a repost, or the same flat
+          under two agencies) is only referenced again.
         - A small delay (0.1 s) is inserted between downloads to be polite.
         - If a download fails the URL is skipped and a warning is logged.
         - Returns the number of images actually saved.
@@ -425,18 +1579,35 @@ class DatabaseManager:
                     resp = requests.get(url, timeout=15)
                 resp.raise_for_status()
                 image_data = resp.content
+                digest = hashlib.sha1(image_data).digest()
 
-                with self._get_connection() as conn:
+                with _DB_WRITE_LATENCY.time(op="insert_image"), self._get_connection() as conn:
                     conn.execute(
+                        "INSERT OR IGNORE INTO image_blobs (sha1, image_data) VALUES (?, ?)",
+                        (digest, image_data),
+                    )
+                    blob_id = conn.execute(
+                        "SELECT id FROM image_blobs WHERE sha1 = ?", (digest,)
+                    ).fetchone()["id"]
+                    cur = conn.execute(
                         """
                         INSERT OR IGNORE INTO property_images
-                            (property_id, url, image_data, position)
+                            (property_id, url, blob_id, position)
                         VALUES (?, ?, ?, ?)
                         """,
-                        (property_id, url, image_data, pos),
+                        (property_id, url, blob_id, pos),
                     )
+                    if cur.rowcount == 0:
+                        # URL already stored: drop the blob if this call created it
+                        conn.execute(
+                            """DELETE FROM image_blobs WHERE id = ?
+                               AND NOT EXISTS (SELECT 1 FROM property_images WHERE blob_id = ?)""",
+                            (blob_id, blob_id),
+                        )
                 saved += 1
+                _IMAGE_DOWNLOADS.inc(outcome="ok")
             except Exception as exc:
+                _IMAGE_DOWNLOADS.inc(outcome="error")
                 logger.warning(f"Could not download image {url}: {exc}")
 
         return saved
@@ -449,10 +1620,11 @@ class DatabaseManager:
         with self._get_connection() as conn:
             rows = conn.execute(
                 """
-                SELECT id, url, image_data, position
-                FROM   property_images
-                WHERE  property_id = ?
-                ORDER  BY position
+                SELECT i.id, i.url, b.image_data, i.position
+                FROM   property_images i
+                JOIN   image_blobs b ON b.id = i.blob_id
+                WHERE  i.property_id = ?
+                ORDER  BY i.position
                 """,
                 (property_id,),
             ).fetchall()
@@ -472,55 +1644,353 @@ class DatabaseManager:
         with self._get_connection() as conn:
             row = conn.execute(
                 """
-                SELECT image_data
-                FROM   property_images
-                WHERE  property_id = ?
-                ORDER  BY position
+                SELECT b.image_data
+                FROM   property_images i
+                JOIN   image_blobs b ON b.id = i.blob_id
+                WHERE  i.property_id = ?
+                ORDER  BY i.position
                 LIMIT  1
                 """,
                 (property_id,),
             ).fetchone()
         return row["image_data"] if row else None
 
-    def _price_changed(self, cursor: sqlite3.Cursor, property_id: int, new_price: str) -> bool:
-        """Return True if the new price differs from the current recorded price."""
-        row = cursor.execute(
-            "SELECT price FROM price_history WHERE property_id = ? AND price_status = 'Current'",
-            (property_id,)
+    def get_image_ids(self, property_id: int) -> List[Dict]:
+        """
+        Return ordered image metadata for a property WITHOUT the BLOBs.
+        Each dict has keys: id, url, position, size (bytes).
+        Pair with read_image_blob() to load one image at a time.
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT i.id, i.url, i.position, length(b.image_data) AS size
+                FROM   property_images i
+                JOIN   image_blobs b ON b.id = i.blob_id
+                WHERE  i.property_id = ?
+                ORDER  BY i.position
+                """,
+                (property_id,),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def read_image_blob(self, image_id: int, chunk_size: int = 64 * 1024) -> Optional[bytes]:
+        """
+        Read one image's bytes with SQLite incremental blob I/O (chunked reads
+        straight from the page cache, no row materialisation).
+        Falls back to a plain SELECT on Python builds without blobopen().
+        Returns None if the image row no longer exists.
+        """
+        conn = self._get_connection()
+        if not hasattr(conn, "blobopen"):
+            row = conn.execute(
+                """SELECT b.image_data FROM property_images i
+                   JOIN image_blobs b ON b.id = i.blob_id WHERE i.id = ?""", (image_id,)
+            ).fetchone()
+            return row["image_data"] if row else None
+        row = conn.execute(
+            "SELECT blob_id FROM property_images WHERE id = ?", (image_id,)
         ).fetchone()
-        return row is not None and row["price"] != new_price
+        if row is None:
+            return None   # row deleted (e.g. property removed) since the ids were listed
+        try:
+            with conn.blobopen("image_blobs", "image_data", row["blob_id"], readonly=True) as blob:
+                data = bytearray()
+                while True:
+                    chunk = blob.read(chunk_size)
+                    if not chunk:
+                        break
+                    data += chunk
+            return bytes(data)
+        except sqlite3.OperationalError:
+            return None   # blob released between the two reads
+
+    def hash_pending_images(self, max_workers: int = 4, batch_size: int = 64) -> int:
+        """
+        Compute the perceptual hash (image_hash.dhash) of every stored image
+        that has none yet and index it in image_dhash_bands.
+
+        Images are read in id order, *batch_size* at a time, and decoded on a
+        pool of *max_workers* threads (Pillow releases the GIL while
+        decoding); each batch is written in one transaction. Images Pillow
+        can't read keep dhash NULL and get hash_failed = 1, so later passes
+        don't decode them again. Returns the number of images hashed.
+        """
+        hashed, last_id = 0, 0
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            while True:
+                with self._get_connection() as conn:
+                    rows = conn.execute(
+                        """
+                        SELECT id, image_data FROM image_blobs
+                        WHERE  dhash IS NULL AND hash_failed = 0 AND id > ?
+                        ORDER  BY id
+                        LIMIT  ?
+                        """,
+                        (last_id, batch_size),
+                    ).fetchall()
+                if not rows:
+                    break
+                last_id = rows[-1]["id"]
+                hashes = list(pool.map(image_hash.dhash, [r["image_data"] for r in rows]))
+                done = [(h, r["id"]) for r, h in zip(rows, hashes) if h is not None]
+                failed = [(r["id"],) for r, h in zip(rows, hashes) if h is None]
+                with _DB_WRITE_LATENCY.time(op="hash_images"), self._get_connection() as conn:
+                    conn.executemany("UPDATE image_blobs SET dhash = ? WHERE id = ?", done)
+                    conn.executemany("UPDATE image_blobs SET hash_failed = 1 WHERE id = ?", failed)
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO image_dhash_bands (band, value, blob_id) VALUES (?, ?, ?)",
+                        [(band, value, blob_id)
+                         for h, blob_id in done
+                         for band, value in enumerate(image_hash.bands(h))],
+                    )
+                hashed += len(done)
+        if hashed:
+            logger.info(f"Hashed {hashed} stored images.")
+        return hashed
 
-    def mark_inactive(self, search_id: int, active_record_ids: List[str]) -> int:
+    def find_listings_sharing_photos(self, property_id: int) -> List[Dict]:
         """
-        Set status = 'Inactive' for every property in this search
-        whose record_id is NOT in active_record_ids.
-        Returns the number of rows marked inactive.
+        Return the other listings that have at least one of this listing's
+        photos: byte-identical (same image_blobs row) or perceptually the
+        same, i.e. dHashes at most image_hash.MAX_DISTANCE bits apart.
+
+        Near matches come from one PK seek per dHash band (multi-index
+        hashing, see database/image_hash.py), confirmed by Hamming distance;
+        images not hashed yet (see hash_pending_images) only match exactly.
+
+        One dict per listing: the listings row plus search_id, search_name,
+        status and is_favorite as in search_listings, and shared_photos (how
+        many distinct photos match). Most shared photos first.
         """
         with self._get_connection() as conn:
-            cursor = conn.cursor()
+            own = conn.execute(
+                """
+                SELECT DISTINCT b.id, b.dhash
+                FROM   property_images i
+                JOIN   image_blobs b ON b.id = i.blob_id
+                WHERE  i.property_id = ?
+                """,
+                (property_id,),
+            ).fetchall()
+            matched = {r["id"] for r in own}
+            lookup = " UNION ".join(
+                ["SELECT blob_id FROM image_dhash_bands WHERE band = ? AND value = ?"] * image_hash.BANDS)
+            for r in own:
+                if r["dhash"] is None:
+                    continue
+                params = [v for band, value in enumerate(image_hash.bands(r["dhash"]))
+                          for v in (band, value)]
+                matched.update(
+                    c["id"] for c in conn.execute(
+                        f"SELECT id, dhash FROM image_blobs WHERE id IN ({lookup})", params)
+                    if image_hash.hamming(r["dhash"], c["dhash"]) <= image_hash.MAX_DISTANCE
+                )
+            if not matched:
+                return []
+            rows = conn.execute(
+                f"""
+                SELECT l.*,
+                       (SELECT MIN(m.search_id) FROM search_membership m
+                         WHERE m.listing_id = l.id)                 AS search_id,
+                       (SELECT GROUP_CONCAT(s.search_name, ', ')
+                          FROM search_membership m JOIN searches s ON s.id = m.search_id
+                         WHERE m.listing_id = l.id)                 AS search_name,
+                       (SELECT MIN(m.status) FROM search_membership m
+                         WHERE m.listing_id = l.id)                 AS status,
+                       (SELECT MAX(m.is_favorite) FROM search_membership m
+                         WHERE m.listing_id = l.id)                 AS is_favorite,
+                       COUNT(DISTINCT i.blob_id)                    AS shared_photos
+                FROM   property_images i
+                JOIN   listings l ON l.id = i.property_id
+                WHERE  i.blob_id IN ({",".join("?" * len(matched))}) AND i.property_id <> ?
+                GROUP  BY l.id
+                ORDER  BY shared_photos DESC, l.id DESC
+                """,
+                [*matched, property_id],
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    def link_relisting(self, listing_id: int) -> Optional[Dict]:
+        """
+        Add a newly stored listing to the similarity index and link it to
+        its likely predecessor — an earlier listing of the same flat under
+        another record_id (reposted by another agency or after expiry).
+
+        The description's MinHash signature is stored with its LSH band
+        buckets; listings sharing a bucket are candidates, confirmed when
+        the estimated description similarity reaches similarity.THRESHOLD
+        and area / floor / location don't contradict (see
+        database/similarity.py). The best candidate is stored in
+        relisted_from_id.
+
+        A listing already indexed (e.g. stored earlier by another search) is
+        not matched again: its stored link is returned.
+
+        Returns {id, record_id, title, similarity} of the predecessor, or
+        None (no usable description, or no match). similarity is None for a link
+        stored earlier.
+        """
+        with _DB_WRITE_LATENCY.time(op="link_relisting"), self._get_connection() as conn:
+            row = conn.execute(
+                """SELECT id, description, location, floor, area_sqm_value, minhash, relisted_from_id
+                   FROM   listings WHERE id = ?""",
+                (listing_id,)
+            ).fetchone()
+            if row and row["minhash"] is not None:
+                prev = conn.execute(
+                    "SELECT id, record_id, title FROM listings WHERE id = ?",
+                    (row["relisted_from_id"],)
+                ).fetchone()
+                return dict(prev, similarity=None) if prev else None
+            sig = similarity.signature(row["description"]) if row else None
+            if sig is None:
+                return None
+            keys = similarity.band_keys(sig)
+
+            # One PK seek per band; UNION drops listings sharing several bands
+            lookup = " UNION ".join(
+                ["SELECT listing_id FROM listing_lsh WHERE band = ? AND bucket = ?"] * len(keys))
+            candidates = conn.execute(
+                f"""
+                SELECT id, record_id, title, location, floor, area_sqm_value, minhash
+                FROM   listings
+                WHERE  id IN ({lookup}) AND id <> ?
+                """,
+                [v for band, key in enumerate(keys) for v in (band, key)] + [listing_id],
+            ).fetchall()
+
+            best, best_score = None, 0.0
+            for c in candidates:
+                score = similarity.similarity(sig, similarity.from_blob(c["minhash"]))
+                if (score >= similarity.THRESHOLD and score >= best_score
+                        and similarity.attributes_match(dict(row), dict(c))):
+                    best, best_score = c, score          # ties → the most recent listing
+            conn.execute(
+                "UPDATE listings SET minhash = ?, relisted_from_id = ? WHERE id = ?",
+                (similarity.to_blob(sig), best["id"] if best else None, listing_id),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO listing_lsh (band, bucket, listing_id) VALUES (?, ?, ?)",
+                [(band, key, listing_id) for band, key in enumerate(keys)],
+            )
+            if best is None:
+                return None
+            return {"id": best["id"], "record_id": best["record_id"],
+                    "title": best["title"], "similarity": best_score}
+
+    UNPARSED_LOCATION_ID = 0    # locations row of text parse() can't split (read as NULL)
+
+    @staticmethod
+    def _intern_pending_locations(conn: sqlite3.Connection) -> int:
+        """Set location_id of every listing that lacks one on *conn*; see intern_pending_locations."""
+        rows = conn.execute(
+            "SELECT id, location FROM listings WHERE location_id IS NULL AND location <> ''"
+        ).fetchall()
+        ids: Dict[str, int] = {}
+        for _, location in rows:
+            if location in ids:
+                continue
+            parsed = locations.parse(location)
+            if parsed is None:
+                # Unparseable: the reserved row 0, so the listing is not pending any more
+                conn.execute("INSERT OR IGNORE INTO locations (id, key) VALUES (?, '')",
+                             (DatabaseManager.UNPARSED_LOCATION_ID,))
+                ids[location] = DatabaseManager.UNPARSED_LOCATION_ID
+                continue
+            # The no-op update makes RETURNING yield the id of an existing row
+            ids[location] = conn.execute(
+                """
+                INSERT INTO locations (key, city, district, neighbourhood)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET key = excluded.key
+                RETURNING id
+                """,
+                (locations.key(parsed), *parsed),
+            ).fetchone()[0]
+        conn.executemany("UPDATE listings SET location_id = ? WHERE id = ?",
+                         [(ids[location], listing_id) for listing_id, location in rows])
+        return len(rows)
+
+    def intern_pending_locations(self) -> int:
+        """
+        Parse the location text of listings without a location_id (new, or
+        whose location changed) into (city, district, neighbourhood) — see
+        database/locations.py — and point them at their row in the locations
+        dictionary, adding rows on first sight. Text locations.parse() can't
+        split points at the reserved row UNPARSED_LOCATION_ID, which the
+        properties view reads as NULL, so it is not parsed again. Run after
+        every scrape, before the listings are scored and summarised; each
+        distinct string is parsed once. Returns the number of listings updated.
+        """
+        with _DB_WRITE_LATENCY.time(op="intern_locations"), self._get_connection() as conn:
+            return self._intern_pending_locations(conn)
+
+    def touch_properties(self, search_id: int, record_ids: List[str], run_id: int,
+                         prices: Optional[List[str]] = None) -> None:
+        """
+        Stamp listings seen unchanged in this run: last_seen = now,
+        last_seen_run_id = *run_id* and status back to Active (a listing that
+        reappears is live again), in one executemany over the
+        (listing_id, search_id) membership key.  *prices*, parallel to
+        *record_ids*, are the prices they were seen at and become the
+        memberships' last_price.  New / changed listings are stamped by
+        upsert_property instead.
+        """
+        if not record_ids:
+            return
+        if prices is None:
+            prices = [None] * len(record_ids)
+        with _DB_WRITE_LATENCY.time(op="touch_properties"), self._get_connection() as conn:
             now = self._local_now()
-            if active_record_ids:
-                placeholders = ",".join("?" * len(active_record_ids))
-                cursor.execute(f"""
-                    UPDATE properties
-                    SET    status         = 'Inactive',
-                           inactivated_at = ?
-                    WHERE  search_id = ?
-                      AND  status    = 'Active'
-                      AND  record_id NOT IN ({placeholders})
-                """, [now, search_id] + active_record_ids)
-            else:
-                cursor.execute("""
-                    UPDATE properties
-                    SET    status         = 'Inactive',
-                           inactivated_at = ?
-                    WHERE  search_id = ?
-                      AND  status    = 'Active'
-                """, (now, search_id))
-            count = cursor.rowcount
+            conn.executemany(
+                """
+                UPDATE search_membership
+                SET    last_seen = ?, last_seen_run_id = ?,
+                       status = 'Active', inactivated_at = NULL,
+                       last_price = COALESCE(?, last_price)
+                WHERE  listing_id = (SELECT id FROM listings WHERE record_id = ?)
+                  AND  search_id = ?
+                """,
+                [(now, run_id, price, rid, search_id) for rid, price in zip(record_ids, prices)],
+            )
+
+    def mark_inactive(self, search_id: int, run_id: int) -> List[str]:
+        """
+        Set status = 'Inactive' for every Active membership of this search that
+        was not stamped with *run_id* (see upsert_property / touch_properties).
+        The listing itself stays: other searches may still see it.
+        One indexed UPDATE regardless of search size.
+        Returns the record_ids marked inactive.
+        """
+        with _DB_WRITE_LATENCY.time(op="mark_inactive"), self._get_connection() as conn:
+            rows = conn.execute("""
+                UPDATE search_membership
+                SET    status         = 'Inactive',
+                       inactivated_at = ?
+                WHERE  search_id = ?
+                  AND  status    = 'Active'
+                  AND  last_seen_run_id IS NOT ?
+                RETURNING (SELECT record_id FROM listings WHERE id = listing_id) AS record_id
+            """, (self._local_now(), search_id, run_id)).fetchall()
+            count = len(rows)
             if count:
                 logger.info(f"Marked {count} propert{'y' if count == 1 else 'ies'} as Inactive for search_id={search_id}")
-            return count
+            return [r["record_id"] for r in rows]
+
+    def begin_scrape_run(self, search_name: str, search_id: Optional[int] = None) -> int:
+        """
+        Open the scrape_runs row for one search and return its id — the run
+        id listings are stamped with.  run_date is the start of the run; the
+        row stays status = 'running' (success not yet known) until
+        log_scrape_run finishes it, so a crash leaves it 'running'.
+        """
+        with _DB_WRITE_LATENCY.time(op="begin_scrape_run"), self._get_connection() as conn:
+            cursor = conn.execute("""
+                INSERT INTO scrape_runs (searches, search_name, search_id, run_date, success, status)
+                VALUES (?, ?, ?, ?, 0, 'running')
+            """, (search_name, search_name, search_id, self._local_now()))
+            return cursor.lastrowid
 
     def log_scrape_run(
         self,
@@ -534,18 +2004,48 @@ class DatabaseManager:
         avg_price_per_sqm: Optional[float] = None,
         active_count: Optional[int] = None,
         search_id: Optional[int] = None,
+        run_id: Optional[int] = None,
     ):
-        """Persist one summary row for a scrape execution (one row per search)."""
-        with self._get_connection() as conn:
+        """
+        Persist one summary row for a scrape execution (one row per search).
+        With *run_id* the row opened by begin_scrape_run is completed
+        (status = 'finished'); otherwise a new, finished row is inserted.
+        """
+        values = (records_found, new_records, changed_prices, inactive_count,
+                  1 if success else 0, error_message, avg_price_per_sqm, active_count)
+        with _DB_WRITE_LATENCY.time(op="log_scrape_run"), self._get_connection() as conn:
+            if run_id is not None:
+                conn.execute("""
+                    UPDATE scrape_runs
+                    SET    records_found = ?, new_records = ?, changed_prices = ?,
+                           inactive_count = ?, success = ?, error_message = ?,
+                           avg_price_per_sqm = ?, active_count = ?, status = 'finished'
+                    WHERE  id = ?
+                """, values + (run_id,))
+                return
             conn.execute("""
                 INSERT INTO scrape_runs
                     (searches, search_name, search_id, run_date, records_found, new_records,
                      changed_prices, inactive_count, success, error_message,
                      avg_price_per_sqm, active_count)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (searches, searches, search_id, self._local_now(), records_found, new_records,
-                  changed_prices, inactive_count, 1 if success else 0, error_message,
-                  avg_price_per_sqm, active_count))
+            """, (searches, searches, search_id, self._local_now()) + values)
+
+    def attach_profile_report(self, run_ids: List[int], report_path: str) -> int:
+        """
+        Link a profiling report to the scrape_runs rows of the profiled
+        execution — the run ids begin_scrape_run returned during it.  Rows of
+        other executions (a scheduled run overlapping a manual one) are left
+        alone.  Returns the number of rows updated.
+        """
+        if not run_ids:
+            return 0
+        with self._get_connection() as conn:
+            cursor = conn.execute(
+                f"UPDATE scrape_runs SET profile_path = ? WHERE id IN ({','.join('?' * len(run_ids))})",
+                (report_path, *run_ids),
+            )
+            return cursor.rowcount
 
     # ------------------------------------------------------------------
     # Read operations
@@ -566,6 +2066,36 @@ class DatabaseManager:
                 ).fetchall()
             return [dict(r) for r in rows]
 
+    def get_property_rows(self, search_id: int) -> List[Dict]:
+        """
+        Return every property of a search with the columns the results table
+        needs, in ONE query: all property columns (including the denormalised
+        current_price / current_price_eur / current_vat_excluded) plus
+        image_count, relisted_from_record (record_id of the listing this one
+        reposts, see link_relisting) and days_on_market (first_seen → today
+        for active rows, → inactivated_at / last_seen for inactive ones).
+        Active rows come first, most recently seen first.
+        """
+        today = self._local_now()[:10]
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT p.*,
+                       (SELECT COUNT(*) FROM property_images i
+                         WHERE i.property_id = p.id) AS image_count,
+                       (SELECT o.record_id FROM listings o
+                         WHERE o.id = p.relisted_from_id) AS relisted_from_record,
+                       CAST(julianday(CASE WHEN p.status = 'Active' THEN ?
+                                           ELSE date(COALESCE(p.inactivated_at, p.last_seen)) END)
+                            - julianday(date(p.first_seen)) AS INTEGER) AS days_on_market
+                FROM   properties p
+                WHERE  p.search_id = ?
+                ORDER  BY p.status <> 'Active', p.last_seen DESC
+                """,
+                (today, search_id),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
     def get_link_for_record(self, record_id: str, search_id: int) -> Optional[str]:
         """Return the listing URL for a given record_id / search_id pair, or None."""
         with self._get_connection() as conn:
@@ -584,40 +2114,128 @@ class DatabaseManager:
             ).fetchone()
             return dict(row) if row else None
 
+    def get_property(self, property_id: int, search_id: Optional[int] = None) -> Optional[Dict]:
+        """Return a single property dict by primary key (as seen by *search_id*
+        if given, else by any search), or None."""
+        with self._get_connection() as conn:
+            if search_id is None:
+                row = conn.execute(
+                    "SELECT * FROM properties WHERE id = ?",
+                    (property_id,)
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT * FROM properties WHERE id = ? AND search_id = ?",
+                    (property_id, search_id)
+                ).fetchone()
+            return dict(row) if row else None
+
+    def search_listings(self, query: str, limit: int = 100,
+                        search_id: Optional[int] = None,
+                        highlight: tuple = ("«", "»")) -> List[Dict]:
+        """
+        Full-text search over title, location and description of all
+        listings (or only those in *search_id*) through the listings_fts index.
+        Every word must match, as a prefix; results are ranked by bm25 with
+        title hits weighted above location and description.
+
+        One dict per listing: the listings row plus search_id (the first
+        search it belongs to), search_name (all of them, comma-separated),
+        status (Active if Active in any), is_favorite (in any), snippet (the
+        best matching fragment, hits wrapped in *highlight*) and rank (lower
+        is better). Returns [] for a query without words.
+        """
+        match = _fts_match_expression(query)
+        if match is None:
+            return []
+        start, end = highlight
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT l.*,
+                       (SELECT MIN(m.search_id) FROM search_membership m
+                         WHERE m.listing_id = l.id)                 AS search_id,
+                       (SELECT GROUP_CONCAT(s.search_name, ', ')
+                          FROM search_membership m JOIN searches s ON s.id = m.search_id
+                         WHERE m.listing_id = l.id)                 AS search_name,
+                       (SELECT MIN(m.status) FROM search_membership m
+                         WHERE m.listing_id = l.id)                 AS status,
+                       (SELECT MAX(m.is_favorite) FROM search_membership m
+                         WHERE m.listing_id = l.id)                 AS is_favorite,
+                       snippet(listings_fts, -1, ?, ?, '…', 12)     AS snippet,
+                       bm25(listings_fts, 10.0, 5.0, 1.0)           AS rank
+                FROM   listings_fts
+                JOIN   listings l ON l.id = listings_fts.rowid
+                WHERE  listings_fts MATCH ?
+                  AND  (? IS NULL OR EXISTS (SELECT 1 FROM search_membership m
+                                              WHERE m.listing_id = l.id AND m.search_id = ?))
+                ORDER  BY rank
+                LIMIT  ?
+                """,
+                (start, end, match, search_id, search_id, limit),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    def get_listing(self, record_id: str) -> Optional[Dict]:
+        """
+        Return the listings row for an imot.bg record_id, whichever search
+        found it, or None. Lets a search skip the detail fetch for a listing
+        another search already stored.
+        """
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT * FROM listings WHERE record_id = ?",
+                (record_id,)
+            ).fetchone()
+            return dict(row) if row else None
+
     def is_favorite(self, record_id: str, search_id: int) -> bool:
-        """Return True if the property is marked as a favorite."""
+        """Return True if the property is marked as a favorite in this search."""
         with self._get_connection() as conn:
             row = conn.execute(
-                "SELECT is_favorite FROM properties WHERE record_id = ? AND search_id = ? LIMIT 1",
+                """
+                SELECT is_favorite FROM search_membership
+                WHERE  listing_id = (SELECT id FROM listings WHERE record_id = ?)
+                  AND  search_id  = ?
+                """,
                 (record_id, search_id)
             ).fetchone()
             return bool(row["is_favorite"]) if row else False
 
     def toggle_favorite(self, record_id: str, search_id: int) -> bool:
         """
-        Flip is_favorite for the given property.
+        Flip is_favorite for the given property in this search.
         Returns the NEW state (True = now a favorite, False = removed).
         """
         with self._get_connection() as conn:
-            conn.execute(
+            row = conn.execute(
                 """
-                UPDATE properties
+                UPDATE search_membership
                 SET    is_favorite = CASE WHEN is_favorite = 1 THEN 0 ELSE 1 END
-                WHERE  record_id = ? AND search_id = ?
+                WHERE  listing_id = (SELECT id FROM listings WHERE record_id = ?)
+                  AND  search_id  = ?
+                RETURNING is_favorite
                 """,
                 (record_id, search_id),
-            )
-            row = conn.execute(
-                "SELECT is_favorite FROM properties WHERE record_id = ? AND search_id = ? LIMIT 1",
-                (record_id, search_id)
             ).fetchone()
             return bool(row["is_favorite"]) if row else False
 
     def get_price_history(self, property_id: int) -> List[Dict]:
-        """Return full price history for a single property, newest first."""
+        """
+        Return full price history for a single property, newest first, with
+        price_status (Current / Previous / Older) derived from seq order.
+        """
         with self._get_connection() as conn:
             rows = conn.execute(
-                "SELECT * FROM price_history WHERE property_id = ? ORDER BY recorded_at DESC",
+                """
+                SELECT *,
+                       CASE ROW_NUMBER() OVER (ORDER BY seq DESC)
+                            WHEN 1 THEN 'Current' WHEN 2 THEN 'Previous' ELSE 'Older'
+                       END AS price_status
+                FROM   price_history
+                WHERE  property_id = ?
+                ORDER  BY seq DESC
+                """,
                 (property_id,)
             ).fetchall()
             return [dict(r) for r in rows]
@@ -625,7 +2243,8 @@ class DatabaseManager:
     def get_new_and_changed_since_last_run(self, search_id: int) -> Dict[str, List[Dict]]:
         """
         Return new listings and price changes recorded in the most recent scrape run.
-        For changed prices, also fetches the previous price for display.
+        Reads only properties (first_seen / price_changed_at and the
+        denormalised current / previous price).
         Useful for building email reports.
         """
         with self._get_connection() as conn:
@@ -641,30 +2260,21 @@ class DatabaseManager:
             since = last_run["run_date"]
 
             new_records = conn.execute("""
-                SELECT p.record_id, p.title, p.link, ph.price, ph.recorded_at
-                FROM   price_history ph
-                JOIN   properties    p ON p.id = ph.property_id
-                WHERE  p.search_id  = ?
-                  AND  ph.is_new    = 1
-                  AND  ph.recorded_at >= ?
-                ORDER  BY ph.recorded_at DESC
+                SELECT record_id, title, link, current_price AS price,
+                       first_seen AS recorded_at
+                FROM   properties
+                WHERE  search_id  = ?
+                  AND  first_seen >= ?
+                ORDER  BY first_seen DESC
             """, (search_id, since)).fetchall()
 
             changed_records = conn.execute("""
-                SELECT p.record_id, p.title, p.link,
-                       cur.price    AS current_price,
-                       prev.price   AS previous_price,
-                       cur.recorded_at
-                FROM   price_history cur
-                JOIN   properties    p    ON p.id  = cur.property_id
-                LEFT JOIN price_history prev
-                       ON prev.property_id = cur.property_id
-                      AND prev.price_status = 'Previous'
-                WHERE  p.search_id      = ?
-                  AND  cur.price_status = 'Current'
-                  AND  cur.is_new       = 0
-                  AND  cur.recorded_at >= ?
-                ORDER  BY cur.recorded_at DESC
+                SELECT record_id, title, link, current_price, previous_price,
+                       price_changed_at AS recorded_at
+                FROM   properties
+                WHERE  search_id        = ?
+                  AND  price_changed_at >= ?
+                ORDER  BY price_changed_at DESC
             """, (search_id, since)).fetchall()
 
             return {
@@ -681,11 +2291,21 @@ class DatabaseManager:
             ).fetchall()
             return [dict(r) for r in rows]
 
+    def get_last_finished_run_id(self, search_id: int) -> Optional[int]:
+        """Return the id of the search's newest finished scrape run, or None."""
+        with self._get_connection() as conn:
+            row = conn.execute(
+                "SELECT id FROM scrape_runs WHERE search_id = ? AND status != 'running' "
+                "ORDER BY run_date DESC, id DESC LIMIT 1",
+                (search_id,)
+            ).fetchone()
+            return row["id"] if row else None
+
     def get_all_scrape_runs(self, limit: int = 200) -> List[Dict]:
         """Return the most recent scrape runs across all searches, newest first."""
         with self._get_connection() as conn:
             rows = conn.execute(
-                "SELECT * FROM scrape_runs ORDER BY run_date DESC LIMIT ?",
+                "SELECT * FROM scrape_runs ORDER BY run_date DESC, id DESC LIMIT ?",
                 (limit,)
             ).fetchall()
             return [dict(r) for r in rows]
@@ -693,54 +2313,80 @@ class DatabaseManager:
     def backfill_price_per_sqm(self, record_id: str, search_id: int,
                                 price_per_sqm: str) -> None:
         """
-        Set price_per_sqm on an existing row ONLY when the column is currently
-        NULL.  Called for unchanged listings so existing rows get backfilled on
-        the next scrape run without triggering a full upsert.
+        Set price_per_sqm on an existing listing ONLY when the column is
+        currently NULL.  Called for unchanged listings so existing rows get
+        backfilled on the next scrape run without triggering a full upsert.
+        The listing is shared, so every search it belongs to sees the value.
         """
-        with self._get_connection() as conn:
+        with _DB_WRITE_LATENCY.time(op="backfill_price_per_sqm"), self._get_connection() as conn:
             conn.execute(
                 """
-                UPDATE properties
-                SET    price_per_sqm = ?
-                WHERE  record_id = ? AND search_id = ?
+                UPDATE listings
+                SET    price_per_sqm = ?, price_per_sqm_eur = ?
+                WHERE  record_id = ?
                   AND  (price_per_sqm IS NULL OR price_per_sqm = '')
+                  AND  id IN (SELECT listing_id FROM search_membership WHERE search_id = ?)
                 """,
-                (price_per_sqm, record_id, search_id),
+                (price_per_sqm, normalize.parse_price_per_sqm(price_per_sqm), record_id, search_id),
             )
 
-    def record_area_stats_snapshot(self, search_id: int) -> Optional[float]:
+    def get_active_price_stats(self, search_id: int) -> Dict:
         """
-        Compute the average price_per_sqm (numeric EUR value) across all
-        *Active* properties in this search that have a price_per_sqm stored,
-        insert a snapshot row into search_area_stats, and return the average.
-        Returns None if no numeric values are available.
+        Return {active_count, avg_price_per_sqm, sqm_count, min_price_per_sqm,
+        max_price_per_sqm, stddev_price_per_sqm} for the Active properties of
+        a search. Reads the running aggregates in search_stats (kept current by
+        triggers on search_membership and listings, see migrations 17 and 20)
+        — one primary-key lookup,
+        independent of the number of listings. The €/m² figures are rounded
+        to 2 decimals, None if no values.
         """
         with self._get_connection() as conn:
-            rows = conn.execute(
-                """SELECT price_per_sqm FROM properties
-                   WHERE search_id = ? AND status = 'Active' AND price_per_sqm IS NOT NULL""",
-                (search_id,)
-            ).fetchall()
-
-        values: List[float] = []
-        for row in rows:
-            raw = row["price_per_sqm"]
-            try:
-                # stored as "10.43 €/m²" — extract the leading float
-                numeric = float(raw.split()[0].replace(",", "."))
-                values.append(numeric)
-            except (ValueError, AttributeError, IndexError):
-                pass
+            row = conn.execute(
+                """
+                SELECT active_count, sqm_count, sqm_sum, sqm_sumsq, sqm_min, sqm_max
+                FROM   search_stats
+                WHERE  search_id = ?
+                """,
+                (search_id,),
+            ).fetchone()
+        n = row["sqm_count"] if row else 0
+        stats = {
+            "active_count":         row["active_count"] if row else 0,
+            "avg_price_per_sqm":    None,
+            "sqm_count":            n,
+            "min_price_per_sqm":    None,
+            "max_price_per_sqm":    None,
+            "stddev_price_per_sqm": None,
+        }
+        if n:
+            mean = row["sqm_sum"] / n
+            stats.update(
+                avg_price_per_sqm=round(mean, 2),
+                min_price_per_sqm=round(row["sqm_min"], 2),
+                max_price_per_sqm=round(row["sqm_max"], 2),
+                # Population std-dev; clamp the float rounding of sumsq/n - mean²
+                stddev_price_per_sqm=round(math.sqrt(max(row["sqm_sumsq"] / n - mean * mean, 0.0)), 2),
+            )
+        return stats
 
-        if not values:
+    def record_area_stats_snapshot(self, search_id: int) -> Optional[float]:
+        """
+        Insert a snapshot of the average price_per_sqm (numeric EUR value)
+        across the *Active* properties of this search into search_area_stats,
+        and return the average. The figure comes from the running aggregates
+        (get_active_price_stats), so no listing is re-read.
+        Returns None if no numeric values are available.
+        """
+        stats = self.get_active_price_stats(search_id)
+        avg = stats["avg_price_per_sqm"]
+        if avg is None:
             return None
 
-        avg = round(sum(values) / len(values), 2)
-        with self._get_connection() as conn:
+        with _DB_WRITE_LATENCY.time(op="area_stats_snapshot"), self._get_connection() as conn:
             conn.execute(
                 """INSERT INTO search_area_stats (search_id, snapshot_date, avg_price_per_sqm, sample_count)
                    VALUES (?, ?, ?, ?)""",
-                (search_id, self._local_now(), avg, len(values))
+                (search_id, self._local_now(), avg, stats["sqm_count"])
             )
         return avg
 
@@ -757,13 +2403,551 @@ class DatabaseManager:
             ).fetchall()
             return [dict(r) for r in rows]
 
+    def record_run_stats(self, search_id: int, run_id: int,
+                         new_count: int, removed_count: int) -> Dict:
+        """
+        Summarise the Active listings of a search at the end of run *run_id*
+        and store the row in run_stats: median, quartiles, P10/P90, mean and
+        trimmed mean of price_per_sqm_eur and current_price_eur (see
+        database/run_stats.py), plus the active / new / removed counts.
+        The same read feeds location_stats: the Active count and median
+        €/m² of every location of the search for this run.
+        One read of the numeric columns; the summaries are vectorised.
+        Returns the stored run_stats row as a dict.
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """SELECT price_per_sqm_eur, current_price_eur, location_id
+                   FROM   properties
+                   WHERE  search_id = ? AND status = 'Active'""",
+                (search_id,),
+            ).fetchall()
+        stats = {"run_id": run_id, "search_id": search_id, "active_count": len(rows),
+                 "new_count": new_count, "removed_count": removed_count}
+        stats.update(run_stats.summarise((r[0] for r in rows), "sqm"))
+        stats.update(run_stats.summarise((r[1] for r in rows), "price"))
+
+        cols = list(stats)
+        with _DB_WRITE_LATENCY.time(op="run_stats"), self._get_connection() as conn:
+            stats["run_date"] = conn.execute(
+                f"""INSERT OR REPLACE INTO run_stats ({", ".join(cols)}, run_date)
+                    VALUES ({", ".join("?" for _ in cols)},
+                            COALESCE((SELECT run_date FROM scrape_runs WHERE id = ?), ?))
+                    RETURNING run_date""",
+                [stats[c] for c in cols] + [run_id, self._local_now()],
+            ).fetchone()[0]
+            by_location = run_stats.group_medians([r[2] for r in rows], [r[0] for r in rows])
+            conn.execute("DELETE FROM location_stats WHERE run_id = ?", (run_id,))
+            conn.executemany(
+                """INSERT INTO location_stats (run_id, location_id, search_id,
+                                               active_count, sqm_count, sqm_median)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                [(run_id, location_id, search_id, *figures)
+                 for location_id, figures in by_location.items()],
+            )
+        return stats
+
+    def get_location_stats(self, search_id: int, run_id: Optional[int] = None) -> List[Dict]:
+        """
+        Return the location_stats of one run of a search — the latest by
+        default — joined with the location names: {location_id, city,
+        district, neighbourhood, active_count, sqm_count, sqm_median},
+        largest location first. One primary-key range read.
+        """
+        with self._get_connection() as conn:
+            if run_id is None:
+                row = conn.execute(
+                    """SELECT run_id FROM run_stats WHERE search_id = ?
+                       ORDER BY run_date DESC, run_id DESC LIMIT 1""",
+                    (search_id,),
+                ).fetchone()
+                if row is None:
+                    return []
+                run_id = row[0]
+            rows = conn.execute(
+                """
+                SELECT s.location_id, loc.city, loc.district, loc.neighbourhood,
+                       s.active_count, s.sqm_count, s.sqm_median
+                FROM   location_stats s
+                JOIN   locations loc ON loc.id = s.location_id
+                WHERE  s.run_id = ? AND s.search_id = ?
+                ORDER  BY s.active_count DESC, s.sqm_median DESC
+                """,
+                (run_id, search_id),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    @staticmethod
+    def _write_deal_scores(conn: sqlite3.Connection, search_id: int) -> Dict[int, Dict]:
+        """Score the Active listings of *search_id* on *conn*; see score_search."""
+        rows = conn.execute(
+            """
+            SELECT m.listing_id, l.price_per_sqm_eur, l.area_sqm_value, l.floor,
+                   NULLIF(l.location_id, 0)
+            FROM   search_membership m
+            JOIN   listings l ON l.id = m.listing_id
+            WHERE  m.search_id = ? AND m.status = 'Active'
+            """,
+            (search_id,),
+        ).fetchall()
+        result = deal_score.scores([r[1] for r in rows], [r[2] for r in rows],
+                                   [r[3] for r in rows], [r[4] for r in rows])
+
+        def _value(x):
+            return None if math.isnan(x) else round(float(x), 2)
+
+        scored = {
+            r[0]: {"deal_score": _value(sc), "deal_area_score": _value(area),
+                   "deal_percentile": _value(pct)}
+            for r, sc, area, pct in zip(rows, result["score"], result["area_score"],
+                                        result["percentile"])
+        }
+        # Inactive memberships and listings that lost their €/m² drop out
+        conn.execute(
+            """UPDATE search_membership
+               SET    deal_score = NULL, deal_area_score = NULL, deal_percentile = NULL
+               WHERE  search_id = ? AND deal_score IS NOT NULL""",
+            (search_id,),
+        )
+        conn.executemany(
+            """UPDATE search_membership
+               SET    deal_score = ?, deal_area_score = ?, deal_percentile = ?
+               WHERE  listing_id = ? AND search_id = ?""",
+            [(v["deal_score"], v["deal_area_score"], v["deal_percentile"], listing_id, search_id)
+             for listing_id, v in scored.items() if v["deal_score"] is not None],
+        )
+        return scored
+
+    def score_search(self, search_id: int) -> Dict[int, Dict]:
+        """
+        Recompute the deal scores of a search's Active listings (run after
+        every scrape): the area- and floor-adjusted €/m² of each listing as a
+        robust z-score within the search (deal_score) and within its
+        location (deal_area_score), plus its percentile rank
+        (deal_percentile, 0 = cheapest) — see database/deal_score.py.
+        One read of the Active set, one vectorised pass, one transaction.
+
+        Returns {listing_id: {deal_score, deal_area_score, deal_percentile}};
+        values are None when the search has too few priced listings.
+        """
+        with _DB_WRITE_LATENCY.time(op="score_search"), self._get_connection() as conn:
+            return self._write_deal_scores(conn, search_id)
+
+    def get_top_deals(self, search_id: int, limit: int = 20) -> List[Dict]:
+        """
+        Return the Active listings of a search with the highest deal_score
+        (most underpriced first), as properties rows. Served by
+        idx_membership_deal — no scan of the search.
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT * FROM properties
+                WHERE  search_id = ? AND deal_score IS NOT NULL
+                ORDER  BY deal_score DESC
+                LIMIT  ?
+                """,
+                (search_id, limit),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    # strftime() bucket of a run_date per chart bin size (week: Monday-based)
+    _BIN_FORMATS = {"day": "%Y-%m-%d", "week": "%Y-%W", "month": "%Y-%m"}
+
+    def get_run_stats_binned(self, search_id: int, bin_by: str = "auto") -> List[Dict]:
+        """
+        Return the run_stats history of a search averaged per day, week or
+        month, oldest first (for charting): {run_date (mean date of the
+        bin's runs), sqm_level (median €/m², the mean for runs recorded
+        before run_stats had medians), sqm_q1, sqm_q3, active_count,
+        run_count}. "auto" picks day up to 90 days of history, week up to a
+        year, month beyond. The binning is one GROUP BY over
+        idx_run_stats_search, so multi-year histories come back as a few
+        dozen rows.
+        """
+        with self._get_connection() as conn:
+            if bin_by == "auto":
+                span = conn.execute(
+                    """SELECT julianday(MAX(run_date)) - julianday(MIN(run_date))
+                       FROM   run_stats WHERE search_id = ?""",
+                    (search_id,),
+                ).fetchone()[0] or 0
+                bin_by = "day" if span <= 90 else "week" if span <= 365 else "month"
+            rows = conn.execute(
+                """
+                SELECT datetime(AVG(julianday(run_date)))    AS run_date,
+                       AVG(COALESCE(sqm_median, sqm_mean))   AS sqm_level,
+                       AVG(sqm_q1)                           AS sqm_q1,
+                       AVG(sqm_q3)                           AS sqm_q3,
+                       AVG(active_count)                     AS active_count,
+                       COUNT(*)                              AS run_count
+                FROM   run_stats
+                WHERE  search_id = ?
+                GROUP  BY strftime(?, run_date)
+                ORDER  BY MIN(run_date)
+                """,
+                (search_id, self._BIN_FORMATS[bin_by]),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    def get_active_sqm_points(self, search_id: int) -> Dict[str, np.ndarray]:
+        """
+        Return the Active listings of a search that have a €/m² as aligned
+        NumPy arrays for a scatter plot, from one query over numeric
+        columns: {"id", "first_seen" (days since 1970-01-01, NaN if
+        unknown), "sqm" (price_per_sqm_eur), "deal" (deal_score.is_deal)}.
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """
+                SELECT id,
+                       julianday(first_seen) - 2440587.5 AS first_seen,
+                       price_per_sqm_eur,
+                       COALESCE(deal_score >= ?, 0) OR COALESCE(deal_area_score >= ?, 0) AS deal
+                FROM   properties
+                WHERE  search_id = ? AND status = 'Active' AND price_per_sqm_eur IS NOT NULL
+                """,
+                (deal_score.DEAL_THRESHOLD, deal_score.DEAL_THRESHOLD, search_id),
+            ).fetchall()
+        return {
+            "id":         np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)),
+            "first_seen": np.array([r[1] for r in rows], dtype=float),
+            "sqm":        np.fromiter((r[2] for r in rows), dtype=float, count=len(rows)),
+            "deal":       np.fromiter((bool(r[3]) for r in rows), dtype=bool, count=len(rows)),
+        }
+
+    def get_run_stats_history(self, search_id: int, limit: int = 365) -> List[Dict]:
+        """
+        Return the run_stats rows of a search, oldest first (for charting):
+        the *limit* most recent runs. Runs recorded before run_stats existed
+        carry only sqm_mean and the counts.
+        """
+        with self._get_connection() as conn:
+            rows = conn.execute(
+                """SELECT * FROM (
+                       SELECT * FROM run_stats
+                       WHERE  search_id = ?
+                       ORDER  BY run_date DESC, run_id DESC
+                       LIMIT  ?
+                   ) ORDER BY run_date ASC, run_id ASC""",
+                (search_id, limit),
+            ).fetchall()
+            return [dict(r) for r in rows]
+
+    # ------------------------------------------------------------------
+    # Bulk export
+    # ------------------------------------------------------------------
+
+    # export name → (source table / view, column compared with *since*,
+    # column compared with *until*, search filter, ORDER BY). A properties row
+    # is in a date range when it was seen during it.
+    EXPORT_TABLES = {
+        "properties":    ("properties", "last_seen", "first_seen", "search_id = ?", None),
+        "price_history": ("price_history", "recorded_at", "recorded_at",
+                          "property_id IN (SELECT listing_id FROM search_membership"
+                          " WHERE search_id = ?)", "id"),
+        "scrape_runs":   ("scrape_runs", "run_date", "run_date", "search_id = ?", "id"),
+        "run_stats":     ("run_stats", "run_date", "run_date", "search_id = ?", "run_id"),
+        "area_stats":    ("search_area_stats", "snapshot_date", "snapshot_date", "search_id = ?", "id"),
+    }
+
+    def export_table(self, table: str, path: str, fmt: str = "csv",
+                     search_id: Optional[int] = None, since: Optional[str] = None,
+                     until: Optional[str] = None, chunk_size: int = 50_000) -> int:
+        """
+        Stream one of EXPORT_TABLES to *path* as CSV, JSONL or Parquet (see
+        database/bulk_io.py), optionally only for *search_id* and the date
+        range since ≤ date < until ("YYYY-MM-DD" or full timestamps).
+        Rows are pulled from the cursor with fetchmany(*chunk_size*) while
+        the file is written, so memory stays flat whatever the table size.
+        Returns the number of rows written.
+        """
+        source, since_col, until_col, search_sql, order = self.EXPORT_TABLES[table]
+        where, params = [], []
+        if search_id is not None:
+            where.append(search_sql)
+            params.append(search_id)
+        if since:
+            where.append(f"{since_col} >= ?")
+            params.append(since)
+        if until:
+            where.append(f"{until_col} < ?")
+            params.append(until)
+        sql = f"SELECT * FROM {source}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if order:
+            sql += f" ORDER BY {order}"
+
+        started = time.perf_counter()
+        with self._get_connection() as conn:
+            types = {r["name"]: r["type"] for r in conn.execute(f"PRAGMA table_info({source})")}
+            cursor = conn.execute(sql, params)
+            columns = [d[0] for d in cursor.description]
+
+            def _chunks():
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield [tuple(r) for r in rows]
+
+            n = bulk_io.write(path, fmt, columns, [types.get(c, "") for c in columns], _chunks())
+        elapsed = time.perf_counter() - started
+        logger.info(f"Exported {n} {table} rows to {path} in {elapsed:.1f}s "
+                    f"({n / elapsed if elapsed else 0:,.0f} rows/s)")
+        return n
+
+    def export(self, out_dir: str, fmt: str = "csv", tables: Optional[List[str]] = None,
+               search_id: Optional[int] = None, since: Optional[str] = None,
+               until: Optional[str] = None, chunk_size: int = 50_000) -> Dict[str, int]:
+        """
+        Export *tables* (default: all of EXPORT_TABLES) into *out_dir* as
+        <table>.csv / .jsonl / .parquet, with the filters of export_table.
+        Returns {table: rows written}.
+        """
+        if fmt not in bulk_io.FORMATS:
+            raise ValueError(f"Unknown export format {fmt!r} (expected one of {', '.join(bulk_io.FORMATS)})")
+        os.makedirs(out_dir, exist_ok=True)
+        return {
+            table: self.export_table(table, os.path.join(out_dir, table + bulk_io.FORMATS[fmt]),
+                                     fmt, search_id, since, until, chunk_size)
+            for table in (tables or self.EXPORT_TABLES)
+        }
+
+    # ------------------------------------------------------------------
+    # Bulk import
+    # ------------------------------------------------------------------
+
+    # Rejected rows reported back (with their line number) by import_file
+    IMPORT_MAX_ERRORS = 20
+
+    def import_file(self, path: str, fmt: Optional[str] = None,
+                    chunk_size: int = 50_000) -> Dict:
+        """
+        Load a historical CSV / JSONL / Parquet dump (one row per observation
+        of a listing, see bulk_io.IMPORT_COLUMNS) into searches, listings,
+        search_membership and price_history.
+
+        Rows are validated by bulk_io.import_row and staged chunk by chunk
+        into a TEMP table, then merged with set-based statements — all in
+        one transaction, so a failed import leaves the database unchanged:
+          - searches are created by name (url from search_url, "" if none);
+          - listings are inserted or only have their empty fields filled from
+            the latest observation — scraped data always wins;
+          - memberships span the first to the last observation, with the
+            status of the latest; existing ones only widen first / last_seen;
+          - each price change becomes a price_history row, merged into the
+            listing's existing history by recorded_at (seq renumbered, repeats
+            of the previous price dropped, rows already present skipped), and
+            the denormalised current / previous price columns are refreshed.
+        Locations are interned and the touched searches re-scored afterwards.
+        Re-importing the same file adds nothing.
+
+        Returns {"rows", "rejected", "errors" (first IMPORT_MAX_ERRORS as
+        "line N: reason"), "searches" (created), "listings" (created),
+        "prices" (history rows added), "seconds", "rows_per_s"}.
+        """
+        started = time.perf_counter()
+        total = rejected = 0
+        errors: List[str] = []
+        placeholders = ", ".join("?" * 22)
+        with _DB_WRITE_LATENCY.time(op="bulk_import"), self._get_connection() as conn:
+            conn.execute("DROP TABLE IF EXISTS temp.import_staging")
+            conn.execute("""
+                CREATE TEMP TABLE import_staging (
+                    n INTEGER PRIMARY KEY, search_name TEXT NOT NULL, search_url TEXT NOT NULL,
+                    record_id TEXT NOT NULL, recorded_at TEXT NOT NULL, price TEXT NOT NULL,
+                    amount REAL, currency TEXT, vat_excluded INTEGER, price_eur REAL,
+                    title TEXT, location TEXT, description TEXT, link TEXT,
+                    price_per_sqm TEXT, area_sqm TEXT, floor TEXT, yard_sqm TEXT,
+                    price_per_sqm_eur REAL, area_sqm_value REAL, yard_sqm_value REAL,
+                    status TEXT NOT NULL, listing_id INTEGER, search_id INTEGER
+                )
+            """)
+            for chunk in bulk_io.read(path, fmt, chunk_size):
+                staged = []
+                for row in chunk:
+                    total += 1
+                    try:
+                        staged.append((total,) + bulk_io.import_row(row))
+                    except ValueError as e:
+                        rejected += 1
+                        if len(errors) < self.IMPORT_MAX_ERRORS:
+                            errors.append(f"line {total}: {e}")
+                conn.executemany(f"""
+                    INSERT INTO import_staging
+                        (n, search_name, search_url, record_id, recorded_at, price,
+                         amount, currency, vat_excluded, price_eur,
+                         title, location, description, link,
+                         price_per_sqm, area_sqm, floor, yard_sqm,
+                         price_per_sqm_eur, area_sqm_value, yard_sqm_value, status)
+                    VALUES ({placeholders})
+                """, staged)
+            counts = self._merge_import_staging(conn)
+            conn.execute("DROP TABLE temp.import_staging")
+
+        elapsed = time.perf_counter() - started
+        report = {"rows": total, "rejected": rejected, "errors": errors, **counts,
+                  "seconds": round(elapsed, 2),
+                  "rows_per_s": round(total / elapsed) if elapsed else 0}
+        logger.info(f"Imported {path}: {total} rows ({rejected} rejected), "
+                    f"{counts['searches']} new searches, {counts['listings']} new listings, "
+                    f"{counts['prices']} price rows in {elapsed:.1f}s ({report['rows_per_s']:,} rows/s)")
+        return report
+
+    def _merge_import_staging(self, conn: sqlite3.Connection) -> Dict[str, int]:
+        """Merge temp.import_staging into the live tables on *conn*; see import_file."""
+        conn.execute("CREATE INDEX temp.idx_import_staging_record ON import_staging(record_id, recorded_at)")
+        listings_before = conn.execute("SELECT COALESCE(MAX(id), 0) FROM listings").fetchone()[0]
+
+        searches = conn.execute("""
+            INSERT INTO searches (search_name, url)
+            SELECT search_name, MAX(search_url) FROM import_staging WHERE true GROUP BY search_name
+            ON CONFLICT(search_name) DO NOTHING
+        """).rowcount
+
+        # One listing row per record_id, from its latest observation
+        conn.execute("""
+            INSERT INTO listings (record_id, title, location, description, link,
+                                  price_per_sqm, area_sqm, floor, yard_sqm,
+                                  price_per_sqm_eur, area_sqm_value, yard_sqm_value)
+            SELECT record_id, title, location, description, link,
+                   price_per_sqm, area_sqm, floor, yard_sqm,
+                   price_per_sqm_eur, area_sqm_value, yard_sqm_value
+            FROM  (SELECT *, ROW_NUMBER() OVER (PARTITION BY record_id
+                                                ORDER BY recorded_at DESC, n DESC) AS rn
+                   FROM   import_staging)
+            WHERE  rn = 1
+            ON CONFLICT(record_id) DO UPDATE SET
+                title             = COALESCE(listings.title,             excluded.title),
+                location          = COALESCE(listings.location,          excluded.location),
+                description       = COALESCE(listings.description,       excluded.description),
+                link              = COALESCE(listings.link,              excluded.link),
+                price_per_sqm     = COALESCE(listings.price_per_sqm,     excluded.price_per_sqm),
+                area_sqm          = COALESCE(listings.area_sqm,          excluded.area_sqm),
+                floor             = COALESCE(listings.floor,             excluded.floor),
+                yard_sqm          = COALESCE(listings.yard_sqm,          excluded.yard_sqm),
+                price_per_sqm_eur = COALESCE(listings.price_per_sqm_eur, excluded.price_per_sqm_eur),
+                area_sqm_value    = COALESCE(listings.area_sqm_value,    excluded.area_sqm_value),
+                yard_sqm_value    = COALESCE(listings.yard_sqm_value,    excluded.yard_sqm_value)
+        """)
+        conn.execute("""
+            UPDATE import_staging
+            SET    listing_id = l.id, search_id = s.id
+            FROM   listings l, searches s
+            WHERE  l.record_id = import_staging.record_id
+              AND  s.search_name = import_staging.search_name
+        """)
+
+        conn.execute("""
+            INSERT INTO search_membership (listing_id, search_id, status, first_seen, last_seen,
+                                           inactivated_at)
+            SELECT listing_id, search_id, MAX(latest_status), MIN(recorded_at), MAX(recorded_at),
+                   CASE WHEN MAX(latest_status) = 'Inactive' THEN MAX(recorded_at) END
+            FROM  (SELECT listing_id, search_id, recorded_at,
+                          FIRST_VALUE(status) OVER (PARTITION BY listing_id, search_id
+                                                    ORDER BY recorded_at DESC, n DESC) AS latest_status
+                   FROM   import_staging)
+            WHERE  true
+            GROUP  BY listing_id, search_id
+            ON CONFLICT(listing_id, search_id) DO UPDATE SET
+                first_seen = MIN(search_membership.first_seen, excluded.first_seen),
+                last_seen  = MAX(search_membership.last_seen,  excluded.last_seen)
+        """)
+
+        # Price changes within the file (a listing seen by several searches
+        # counts once), minus rows a previous import already stored. They go
+        # in at negative seq so they can't collide with the existing 1..n.
+        prices = conn.execute("""
+            INSERT INTO price_history (property_id, seq, price, recorded_at,
+                                       amount, currency, vat_excluded, price_eur)
+            SELECT listing_id, -ROW_NUMBER() OVER (PARTITION BY listing_id ORDER BY recorded_at),
+                   price, recorded_at, amount, currency, vat_excluded, price_eur
+            FROM  (SELECT listing_id, recorded_at, price, amount, currency, vat_excluded, price_eur,
+                          LAG(price) OVER (PARTITION BY listing_id ORDER BY recorded_at, n) AS prev
+                   FROM  (SELECT *, ROW_NUMBER() OVER (PARTITION BY listing_id, recorded_at
+                                                       ORDER BY n) AS dup
+                          FROM   import_staging)
+                   WHERE  dup = 1) AS obs
+            WHERE  prev IS NOT price
+              AND  NOT EXISTS (SELECT 1 FROM price_history h
+                               WHERE  h.property_id = obs.listing_id
+                                 AND  h.recorded_at = obs.recorded_at AND h.price = obs.price)
+        """).rowcount
+        conn.execute("DROP TABLE IF EXISTS temp.import_touched")
+        conn.execute("""
+            CREATE TEMP TABLE import_touched AS
+            SELECT DISTINCT property_id AS listing_id FROM price_history WHERE seq < 0
+        """)
+        # Merged into the existing history, a row may now repeat the price
+        # before it (a new one, or the existing one after a new one)
+        prices -= conn.execute("""
+            DELETE FROM price_history WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, seq, price,
+                           LAG(price) OVER (PARTITION BY property_id ORDER BY recorded_at, id) AS prev
+                    FROM   price_history
+                    WHERE  property_id IN (SELECT listing_id FROM import_touched))
+                WHERE  price = prev)
+        """).rowcount
+        # Renumber the touched histories by time in two passes, each free of
+        # (property_id, seq) collisions: first above every existing seq, then down.
+        conn.execute("""
+            UPDATE price_history
+            SET    seq = 1000000000 + h.rn, is_new = (h.rn = 1)
+            FROM  (SELECT id, ROW_NUMBER() OVER (PARTITION BY property_id
+                                                 ORDER BY recorded_at, id) AS rn
+                   FROM   price_history
+                   WHERE  property_id IN (SELECT listing_id FROM import_touched)) AS h
+            WHERE  price_history.id = h.id
+        """)
+        conn.execute("""
+            UPDATE price_history SET seq = seq - 1000000000
+            WHERE  property_id IN (SELECT listing_id FROM import_touched)
+        """)
+        conn.execute("""
+            UPDATE listings
+            SET    current_price        = h.price,
+                   current_price_eur    = h.price_eur,
+                   current_vat_excluded = h.vat_excluded,
+                   previous_price       = h.prev,
+                   price_changed_at     = CASE WHEN h.prev IS NULL THEN NULL ELSE h.recorded_at END
+            FROM  (SELECT property_id, seq, price, price_eur, vat_excluded, recorded_at,
+                          LAG(price) OVER (PARTITION BY property_id ORDER BY seq) AS prev,
+                          COUNT(*)   OVER (PARTITION BY property_id) AS n
+                   FROM   price_history
+                   WHERE  property_id IN (SELECT listing_id FROM import_touched)) AS h
+            WHERE  listings.id = h.property_id AND h.seq = h.n
+        """)
+        conn.execute("DROP TABLE temp.import_touched")
+        # New memberships start from the listing's current price
+        conn.execute("""
+            UPDATE search_membership
+            SET    last_price = (SELECT current_price FROM listings WHERE id = listing_id)
+            WHERE  last_price IS NULL
+              AND  listing_id IN (SELECT listing_id FROM import_staging)
+        """)
+
+        self._intern_pending_locations(conn)
+        for (search_id,) in conn.execute("SELECT DISTINCT search_id FROM import_staging").fetchall():
+            self._write_deal_scores(conn, search_id)
+
+        listings = conn.execute("SELECT COUNT(*) FROM listings WHERE id > ?",
+                                (listings_before,)).fetchone()[0]
+        return {"searches": searches, "listings": listings, "prices": prices}
+
     # ------------------------------------------------------------------
     # Backup & Restore
     # ------------------------------------------------------------------
 
     _BACKUP_PREFIX = "imot_scraper_"
-    _BACKUP_SUFFIX = ".db"
+    _BACKUP_SUFFIX = ".db"                      # full copies made before incremental backups
+    _SEGMENT_SUFFIXES = {"full": ".full.z", "delta": ".delta.z"}
+    _BACKUP_MANIFEST = "imot_scraper_backups.json"
+    _PAGE_DIGESTS = ".page_digests.bin"         # page digests of the newest segment (local only)
     _GDRIVE_FOLDER_NAME = "ImotScraperBackups"
+    _backup_lock = threading.Lock()
 
     def _backup_dir(self) -> str:
         return os.path.join(os.path.dirname(os.path.abspath(self.db_path)), "backups")
@@ -833,10 +3017,13 @@ class DatabaseManager:
             logger.warning(f"GDrive: could not get/create folder: {exc}")
             return None
 
-    def _gdrive_upload(self, backup_path: str, keep: int = 1) -> bool:
+    def _gdrive_upload(self, backup_path: str, keep: int = 1, keep_names: Optional[set] = None,
+                       mimetype: str = "application/x-sqlite3") -> bool:
         """
         Upload *backup_path* to the ImotScraperBackups Drive folder.
         Keeps only the newest *keep* backup(s) on Drive; older ones are deleted.
+        With *keep_names*, keeps instead the newest file of each of those
+        names and deletes every other backup file.
         Returns True on success.
         """
         try:
@@ -851,7 +3038,7 @@ class DatabaseManager:
                 return False
 
             filename = os.path.basename(backup_path)
-            media    = MediaFileUpload(backup_path, mimetype="application/x-sqlite3", resumable=False)
+            media    = MediaFileUpload(backup_path, mimetype=mimetype, resumable=False)
             meta     = {"name": filename, "parents": [folder_id]}
             service.files().create(body=meta, media_body=media, fields="id").execute()
             logger.info(f"GDrive: uploaded {filename}")
@@ -863,7 +3050,16 @@ class DatabaseManager:
                 orderBy="createdTime desc",
             ).execute()
             all_drive = resp.get("files", [])
-            for old in all_drive[keep:]:
+            if keep_names is None:
+                stale = all_drive[keep:]
+            else:
+                seen: set = set()
+                stale = []
+                for f in all_drive:
+                    if f["name"] not in keep_names or f["name"] in seen:
+                        stale.append(f)
+                    seen.add(f["name"])
+            for old in stale:
                 service.files().delete(fileId=old["id"]).execute()
                 logger.debug(f"GDrive: deleted old backup {old['name']}")
 
@@ -892,6 +3088,8 @@ class DatabaseManager:
             ).execute()
             results = []
             for f in resp.get("files", []):
+                if f.get("name") == self._BACKUP_MANIFEST:
+                    continue
                 results.append({
                     "name":          f.get("name", ""),
                     "size":          int(f["size"]) if f.get("size") else None,
@@ -908,11 +3106,10 @@ class DatabaseManager:
         """
         Download a backup from Drive by its file ID into *dest_dir*
         (defaults to the local backups folder).  Returns the local path.
+        For a backup segment, the segments it builds on (and, if the local
+        manifest doesn't know its chain, the Drive manifest) come too.
         """
         try:
-            import io
-            from googleapiclient.http import MediaIoBaseDownload
-
             service = self._gdrive_service()
             if service is None:
                 return None
@@ -923,117 +3120,227 @@ class DatabaseManager:
             os.makedirs(target_dir, exist_ok=True)
             dest_path = os.path.join(target_dir, filename)
 
-            request = service.files().get_media(fileId=drive_id)
-            buf = io.FileIO(dest_path, "wb")
-            downloader = MediaIoBaseDownload(buf, request)
-            done = False
-            while not done:
-                _, done = downloader.next_chunk()
-            buf.close()
+            self._gdrive_fetch(service, drive_id, dest_path)
             logger.info(f"GDrive: downloaded {filename} to {dest_path}")
+            if self._is_backup_segment(filename):
+                self._gdrive_fetch_chain(service, filename, target_dir)
             return dest_path
         except Exception as exc:
             logger.warning(f"GDrive: download failed: {exc}")
             return None
 
+    @staticmethod
+    def _gdrive_fetch(service, drive_id: str, dest_path: str) -> None:
+        """Download the Drive file *drive_id* to *dest_path* in chunks."""
+        import io
+        from googleapiclient.http import MediaIoBaseDownload
+
+        request = service.files().get_media(fileId=drive_id)
+        with io.FileIO(dest_path, "wb") as buf:
+            downloader = MediaIoBaseDownload(buf, request)
+            done = False
+            while not done:
+                _, done = downloader.next_chunk()
+
+    def _gdrive_fetch_named(self, service, name: str, dest_path: str) -> bool:
+        """Download the newest backup-folder file called *name*; False if there is none."""
+        folder_id = self._gdrive_get_or_create_folder(service)
+        if folder_id is None:
+            return False
+        files = service.files().list(
+            q=f"'{folder_id}' in parents and trashed=false and name = '{name}'",
+            fields="files(id)", orderBy="createdTime desc",
+        ).execute().get("files", [])
+        if not files:
+            return False
+        self._gdrive_fetch(service, files[0]["id"], dest_path)
+        return True
+
+    def _gdrive_fetch_chain(self, service, segment_name: str, target_dir: str) -> None:
+        """Bring the chain of *segment_name* into *target_dir*: manifest entry and segments."""
+        manifest = self._read_backup_manifest(target_dir)
+        if self._backup_chain(manifest, segment_name) is None:
+            drive_copy = os.path.join(target_dir, self._BACKUP_MANIFEST + ".gdrive")
+            if self._gdrive_fetch_named(service, self._BACKUP_MANIFEST, drive_copy):
+                with open(drive_copy, encoding="utf-8") as f:
+                    drive_chains = json.load(f)["chains"]
+                os.remove(drive_copy)
+                bases = {c["segments"][0]["name"] for c in manifest["chains"]}
+                manifest["chains"] = sorted(
+                    manifest["chains"] + [c for c in drive_chains if c["segments"][0]["name"] not in bases],
+                    key=lambda c: c["segments"][0]["name"])
+                self._write_backup_manifest(target_dir, manifest)
+        for seg in self._backup_chain(manifest, segment_name) or []:
+            path = os.path.join(target_dir, seg["name"])
+            if not os.path.exists(path) and self._gdrive_fetch_named(service, seg["name"], path):
+                logger.info(f"GDrive: downloaded {seg['name']} (backup chain)")
+
+    @classmethod
+    def _is_backup_segment(cls, name: str) -> bool:
+        return name.startswith(cls._BACKUP_PREFIX) and name.endswith(tuple(cls._SEGMENT_SUFFIXES.values()))
+
+    def _read_backup_manifest(self, target_dir: str) -> Dict:
+        """The manifest of backup chains in *target_dir* (empty if there is none yet)."""
+        try:
+            with open(os.path.join(target_dir, self._BACKUP_MANIFEST), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"format": 1, "chains": []}
+
+    def _write_backup_manifest(self, target_dir: str, manifest: Dict) -> None:
+        path = os.path.join(target_dir, self._BACKUP_MANIFEST)
+        with open(path + ".part", "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1)
+        os.replace(path + ".part", path)
+
+    @staticmethod
+    def _backup_chain(manifest: Dict, name: str) -> Optional[List[Dict]]:
+        """Segments to replay, base first, to bring back the segment *name*; None if unknown."""
+        for chain in manifest["chains"]:
+            names = [seg["name"] for seg in chain["segments"]]
+            if name in names:
+                return chain["segments"][:names.index(name) + 1]
+        return None
+
+    def _read_page_digests(self, target_dir: str, segment: Dict) -> Optional[bytes]:
+        """Page digests saved with *segment*, or None if they are missing or belong to another."""
+        try:
+            with open(os.path.join(target_dir, self._PAGE_DIGESTS), "rb") as f:
+                tag, digests = f.read(64).decode("ascii", "replace"), f.read()
+        except FileNotFoundError:
+            return None
+        if tag != segment["sha256"] or len(digests) != segment["page_count"] * page_backup.DIGEST_SIZE:
+            return None
+        return digests
+
     def backup(self, backup_dir: str = None, keep_local: int = 3,
-               keep_drive: int = 1, every_n_days: int = 5) -> str:
+               keep_drive: int = 1, every_n_days: int = 1, full_every: int = 7) -> str:
         """
-        Create a timestamped local backup using SQLite's online backup API
-        (safe while the DB is open in WAL mode), then upload a copy to
-        Google Drive (if credentials are configured).
+        Back up the database incrementally: a consistent snapshot is taken
+        with SQLite's online backup API (safe while the DB is open in WAL
+        mode), and only its pages that changed since the previous backup are
+        written, zlib-compressed, to a delta segment (database/page_backup.py).
+        A chain starts with a full base segment; a new base is written after
+        *full_every* deltas, or when the previous one can't be diffed against
+        (page size changed, digests missing). The chains are described in
+        imot_scraper_backups.json, and restore_from_backup replays one.
+        The new segment and the manifest are then uploaded to Google Drive
+        (if credentials are configured).
 
         Frequency: only one backup per *every_n_days* period.  If a backup
                    already exists that is less than *every_n_days* old the
-                   call returns the path of that existing backup immediately.
-        Local:     keeps the newest backup per calendar day, retaining the
-                   last *keep_local* such days (default 3).
-        Drive:     keeps newest *keep_drive* files  (default 1).
+                   call returns the path of that existing segment immediately.
+        Local:     keeps the newest *keep_local* chains (default 3).
+        Drive:     keeps the newest *keep_drive* chains (default 1).
 
-        Returns the path of the backup file (new or existing).
+        Returns the path of the segment (new or existing).
         """
         target_dir = backup_dir if backup_dir else self._backup_dir()
         os.makedirs(target_dir, exist_ok=True)
 
-        # ── Skip if a backup already exists within the last every_n_days ─────
-        prefix_len = len(self._BACKUP_PREFIX)
-        existing = sorted(
-            f for f in os.listdir(target_dir)
-            if f.startswith(self._BACKUP_PREFIX) and f.endswith(self._BACKUP_SUFFIX)
-        )
-        if existing:
-            newest_name = existing[-1]
-            date_str = newest_name[prefix_len:prefix_len + 8]   # YYYYMMDD
-            try:
-                newest_date = datetime.strptime(date_str, "%Y%m%d").date()
-                days_since = (datetime.now().date() - newest_date).days
+        with self._backup_lock:
+            manifest = self._read_backup_manifest(target_dir)
+            chains = manifest["chains"]
+            last = chains[-1]["segments"][-1] if chains else None
+
+            # ── Skip if a backup already exists within the last every_n_days ─
+            if last:
+                days_since = (datetime.now().date()
+                              - datetime.strptime(last["created"][:10], "%Y-%m-%d").date()).days
                 if days_since < every_n_days:
                     logger.debug(
                         f"Backup skipped — last backup is {days_since} day(s) old "
                         f"(threshold: {every_n_days} days)."
                     )
-                    return os.path.join(target_dir, newest_name)
-            except ValueError:
-                pass   # malformed filename — proceed with backup
+                    return os.path.join(target_dir, last["name"])
 
-        timestamp   = datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = os.path.join(target_dir, f"{self._BACKUP_PREFIX}{timestamp}{self._BACKUP_SUFFIX}")
-
-        src_conn = self._get_connection()
-        dst_conn = sqlite3.connect(backup_path)
-        try:
-            src_conn.backup(dst_conn)
-        finally:
-            dst_conn.close()
-
-        logger.info(f"Database backed up to: {backup_path}")
-
-        # ── Rotate local backups: one file per day, keep last keep_local days ─
-        all_local = sorted(
-            f for f in os.listdir(target_dir)
-            if f.startswith(self._BACKUP_PREFIX) and f.endswith(self._BACKUP_SUFFIX)
-        )
+            snapshot = os.path.join(target_dir, f".{self._BACKUP_PREFIX}snapshot.db")
+            dst_conn = sqlite3.connect(snapshot)
+            try:
+                self._get_connection().backup(dst_conn)
+            finally:
+                dst_conn.close()
 
-        # Group by date prefix (first 8 chars after the backup prefix: YYYYMMDD)
-        by_day: dict[str, list[str]] = {}
-        for fname in all_local:
-            day_key = fname[prefix_len:prefix_len + 8]
-            by_day.setdefault(day_key, []).append(fname)
-
-        # Within each day keep only the newest file; delete the rest
-        latest_per_day: list[str] = []
-        for day_key in sorted(by_day):
-            day_files = sorted(by_day[day_key])
-            for old_file in day_files[:-1]:
-                try:
-                    os.remove(os.path.join(target_dir, old_file))
-                    logger.debug(f"Removed same-day duplicate backup: {old_file}")
-                except OSError as exc:
-                    logger.warning(f"Could not remove duplicate backup {old_file}: {exc}")
-            latest_per_day.append(day_files[-1])
-
-        # Trim to keep_local days
-        for old_file in latest_per_day[:-keep_local]:
             try:
-                os.remove(os.path.join(target_dir, old_file))
-                logger.debug(f"Removed old local backup: {old_file}")
-            except OSError as exc:
-                logger.warning(f"Could not remove old backup {old_file}: {exc}")
+                previous = None
+                if last and len(chains[-1]["segments"]) <= full_every \
+                        and page_backup.page_size_of(snapshot) == last["page_size"]:
+                    previous = self._read_page_digests(target_dir, last)
+                kind = "delta" if previous is not None else "full"
+
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                name = f"{self._BACKUP_PREFIX}{timestamp}{self._SEGMENT_SUFFIXES[kind]}"
+                n = 1
+                while os.path.exists(os.path.join(target_dir, name)):
+                    n += 1
+                    name = f"{self._BACKUP_PREFIX}{timestamp}_{n}{self._SEGMENT_SUFFIXES[kind]}"
+                backup_path = os.path.join(target_dir, name)
+                info = page_backup.write_segment(backup_path + ".part", snapshot, previous)
+                os.replace(backup_path + ".part", backup_path)
+            finally:
+                os.remove(snapshot)
+
+            segment = {"name": name, "kind": kind, "created": self._local_now(),
+                       "page_size": info.page_size, "page_count": info.page_count,
+                       "pages_written": info.pages_written, "bytes": info.bytes,
+                       "sha256": info.sha256}
+            if kind == "full":
+                chains.append({"segments": [segment]})
+            else:
+                chains[-1]["segments"].append(segment)
+
+            digests_path = os.path.join(target_dir, self._PAGE_DIGESTS)
+            with open(digests_path + ".part", "wb") as f:
+                f.write(info.sha256.encode("ascii"))
+                f.write(info.digests)
+            os.replace(digests_path + ".part", digests_path)
+
+            # ── Rotate local chains: a chain goes as a whole ─────────────────
+            for old in chains[:-keep_local]:
+                for seg in old["segments"]:
+                    try:
+                        os.remove(os.path.join(target_dir, seg["name"]))
+                        logger.debug(f"Removed old backup segment: {seg['name']}")
+                    except FileNotFoundError:
+                        pass
+                    except OSError as exc:
+                        logger.warning(f"Could not remove old backup {seg['name']}: {exc}")
+            manifest["chains"] = chains[-keep_local:]
+            self._write_backup_manifest(target_dir, manifest)
+
+        logger.info(f"Database backed up to: {backup_path} ({kind}, {info.pages_written} of "
+                    f"{info.page_count} pages, {info.bytes / 1024 / 1024:.1f} MB)")
 
         # Upload to Drive (best-effort — never raises)
-        self._gdrive_upload(backup_path, keep=keep_drive)
+        keep_names = {seg["name"] for chain in manifest["chains"][-keep_drive:]
+                      for seg in chain["segments"]} | {self._BACKUP_MANIFEST}
+        if self._gdrive_upload(backup_path, keep_names=keep_names, mimetype="application/octet-stream"):
+            self._gdrive_upload(os.path.join(target_dir, self._BACKUP_MANIFEST),
+                                keep_names=keep_names, mimetype="application/json")
 
         return backup_path
 
     def list_local_backups(self) -> List[Dict]:
         """
-        Return local backup files sorted newest-first.
+        Return local restore points sorted newest-first: every segment of
+        the backup chains, then full copies made by earlier versions.
         Each dict has: name, path, size (bytes), modified_time (str), source='local'.
         """
         target_dir = self._backup_dir()
         if not os.path.isdir(target_dir):
             return []
         results = []
+        for chain in reversed(self._read_backup_manifest(target_dir)["chains"]):
+            for seg in reversed(chain["segments"]):
+                full = os.path.join(target_dir, seg["name"])
+                if os.path.exists(full):
+                    results.append({
+                        "name":          seg["name"],
+                        "path":          full,
+                        "size":          seg["bytes"],
+                        "modified_time": seg["created"],
+                        "source":        "local",
+                    })
         for fname in sorted(os.listdir(target_dir), reverse=True):
             if fname.startswith(self._BACKUP_PREFIX) and fname.endswith(self._BACKUP_SUFFIX):
                 full = os.path.join(target_dir, fname)
@@ -1047,11 +3354,35 @@ class DatabaseManager:
                 })
         return results
 
+    def _rebuild_from_chain(self, segment_path: str, out_path: str) -> None:
+        """
+        Write the database as it was at the segment *segment_path* to
+        *out_path* by replaying its chain from the base, and check it
+        against the SHA-256 the manifest recorded for that segment.
+        """
+        target_dir, name = os.path.split(os.path.abspath(segment_path))
+        chain = self._backup_chain(self._read_backup_manifest(target_dir), name)
+        if chain is None:
+            raise ValueError(f"{name} is not listed in {self._BACKUP_MANIFEST}")
+        missing = [seg["name"] for seg in chain
+                   if not os.path.exists(os.path.join(target_dir, seg["name"]))]
+        if missing:
+            raise FileNotFoundError(f"Backup chain of {name} is incomplete, missing: {', '.join(missing)}")
+        with open(out_path, "w+b") as f:
+            for seg in chain:
+                page_backup.apply_segment(os.path.join(target_dir, seg["name"]), f)
+            if page_backup.file_sha256(f) != chain[-1]["sha256"]:
+                raise ValueError(f"Restored database does not match the checksum of {name}")
+
     def restore_from_backup(self, backup_path: str) -> None:
         """
-        Overwrite the live database with *backup_path*.
-        Closes the thread-local connection first, copies the file, then
-        re-opens the database so the instance is usable again.
+        Overwrite the live database with *backup_path* — a backup segment
+        (its chain is replayed and verified) or an older full copy.
+        The restored file is assembled next to the database first; then the
+        thread-local connection is closed, the file copied over the database
+        (with the old WAL / shared-memory files removed, so no stale frames
+        are replayed onto it) and the database re-opened so the instance is
+        usable again.
         Raises on any error so the caller can show a message to the user.
         """
         import shutil
@@ -1059,6 +3390,17 @@ class DatabaseManager:
         if not os.path.isfile(backup_path):
             raise FileNotFoundError(f"Backup file not found: {backup_path}")
 
+        restored = self.db_path + ".restoring"
+        try:
+            if self._is_backup_segment(os.path.basename(backup_path)):
+                self._rebuild_from_chain(backup_path, restored)
+            else:
+                shutil.copy2(backup_path, restored)
+        except Exception:
+            if os.path.exists(restored):
+                os.remove(restored)
+            raise
+
         # Close this thread's connection before overwriting
         conn = getattr(self._local, "conn", None)
         if conn:
@@ -1068,7 +3410,16 @@ class DatabaseManager:
                 pass
             self._local.conn = None
 
-        shutil.copy2(backup_path, self.db_path)
+        for suffix in ("-wal", "-shm"):
+            try:
+                os.remove(self.db_path + suffix)
+            except FileNotFoundError:
+                pass
+            except OSError as exc:
+                logger.warning(f"Could not remove {self.db_path}{suffix} before restore: {exc}")
+        # Copied over rather than renamed: other threads may still hold the file open
+        shutil.copyfile(restored, self.db_path)
+        os.remove(restored)
         logger.info(f"Database restored from: {backup_path}")
 
         # Re-initialize so the instance works normally after restore
@@ -1080,10 +3431,10 @@ class DatabaseManager:
 
     def close_all_connections(self):
         """Close any thread-local connection held by the calling thread."""
-        conn = getattr(self._local, "connection", None)
+        conn = getattr(self._local, "conn", None)
         if conn:
             conn.close()
-            self._local.connection = None
+            self._local.conn = None
 
     def get_all_searches(self) -> List[Dict]:
         """Return all saved searches."""
@@ -1115,8 +3466,8 @@ class DatabaseManager:
 
     def delete_search(self, search_id: int):
         """
-        Delete a search and all its associated properties, price history,
-        and scrape run logs.
+        Delete a search, its memberships and scrape run logs, and the
+        listings (with their price history and images) no other search has.
         """
         with self._get_connection() as conn:
             conn.execute("PRAGMA foreign_keys = ON")
@@ -1127,16 +3478,17 @@ class DatabaseManager:
                 return
             search_name = row["search_name"]
 
-            # Manually delete price_history via property_id (no direct FK to searches)
+            # Listings only this search found; price_history, property_images
+            # and the membership rows cascade from them, and image_blobs no
+            # other listing uses go with their last property_images row
             conn.execute("""
-                DELETE FROM price_history
-                WHERE property_id IN (
-                    SELECT id FROM properties WHERE search_id = ?
-                )
-            """, (search_id,))
+                DELETE FROM listings
+                WHERE  id IN (SELECT listing_id FROM search_membership WHERE search_id = ?)
+                  AND  NOT EXISTS (SELECT 1 FROM search_membership o
+                                   WHERE o.listing_id = listings.id AND o.search_id <> ?)
+            """, (search_id, search_id))
 
-            # properties and scrape_runs both have search_id now
-            conn.execute("DELETE FROM properties  WHERE search_id = ?",   (search_id,))
+            # Remaining memberships cascade from searches
             conn.execute("DELETE FROM scrape_runs WHERE search_id = ? OR search_name = ?",
                          (search_id, search_name))
             conn.execute("DELETE FROM searches    WHERE id = ?",          (search_id,))
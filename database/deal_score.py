@@ -0,0 +1,94 @@
+"""
+Deal score module for ImotScraper - handles the area- and floor-adjusted
+underpricing scores of a search's Active listings.
+"""
+
+import re
+from typing import Dict, Hashable, Optional, Sequence
+
+import numpy as np
+
+MIN_SAMPLE = 8          # fewer Active listings with a €/m² → no scores
+MIN_AREA_SAMPLE = 5     # fewer in one location → no area_score there
+DEAL_THRESHOLD = 1.5    # score (or area_score) at / above which a listing is a deal (~7 % of normal data)
+_MAD_SCALE = 1.4826     # MAD → standard deviation for normal data
+
+_FLOOR_RE = re.compile(r"-?\d+")
+
+def floor_features(floor: Optional[str]) -> tuple:
+    """(ground, first, top) flags of a floor string: "Партер" / "Сутерен" /
+    "0" are ground, "1-ви" first, "Последен" or "5-ти от 5" top. Unknown
+    floors have no flags."""
+    text = (floor or "").casefold()
+    if "партер" in text or "сутерен" in text:
+        return 1.0, 0.0, 0.0
+    numbers = [int(n) for n in _FLOOR_RE.findall(text)]
+    top = "последен" in text or (len(numbers) >= 2 and numbers[0] >= numbers[1] > 1)
+    level = numbers[0] if numbers else None
+    return (float(level is not None and level <= 0),
+            float(level == 1),
+            float(top))
+
+
+def is_deal(score: Optional[float], area_score: Optional[float] = None) -> bool:
+    """True when either score reaches DEAL_THRESHOLD."""
+    return any(s is not None and s >= DEAL_THRESHOLD for s in (score, area_score))
+
+
+def _robust_z(residuals: np.ndarray, fallback_scale: float = 0.0) -> np.ndarray:
+    """(median − r) / (1.4826 · MAD); falls back to *fallback_scale*, then
+    the standard deviation, when the MAD is 0."""
+    centre = np.median(residuals)
+    scale = _MAD_SCALE * np.median(np.abs(residuals - centre))
+    if scale <= 0:
+        scale = fallback_scale or float(residuals.std())
+    if scale <= 0:
+        return np.zeros_like(residuals)
+    return (centre - residuals) / scale
+
+
+def scores(sqm: Sequence[Optional[float]],
+           area: Sequence[Optional[float]],
+           floors: Sequence[Optional[str]],
+           locations: Sequence[Optional[Hashable]]) -> Dict[str, np.ndarray]:
+    """
+    Return {"score", "area_score", "percentile"} arrays aligned with the
+    inputs (one entry per listing). Listings without a positive €/m² — and
+    every listing when fewer than MIN_SAMPLE have one — get NaN.
+    *locations* are group keys (location ids); None has no area_score.
+    """
+    n = len(sqm)
+    out = {k: np.full(n, np.nan) for k in ("score", "area_score", "percentile")}
+    y = np.array([v if v is not None else np.nan for v in sqm], dtype=float)
+    ok = np.isfinite(y) & (y > 0)
+    m = int(ok.sum())
+    if m < MIN_SAMPLE:
+        return out
+
+    y = np.log(y[ok])
+    a = np.array([v if v is not None else np.nan for v in area], dtype=float)[ok]
+    a[~(a > 0)] = np.nan
+    log_area = np.log(a)
+    log_area[np.isnan(log_area)] = np.nanmedian(log_area) if np.isfinite(log_area).any() else 0.0
+    flags = np.array([floor_features(f) for f, keep in zip(floors, ok) if keep], dtype=float)
+    X = np.column_stack([np.ones(m), log_area, flags.reshape(m, 3)])
+
+    beta, *_ = np.linalg.lstsq(X, y, rcond=None)
+    residuals = y - X @ beta
+
+    z = _robust_z(residuals)
+    out["score"][ok] = z
+    ordered = np.sort(residuals)
+    out["percentile"][ok] = 100.0 * np.searchsorted(ordered, residuals, side="left") / (m - 1)
+
+    search_scale = _MAD_SCALE * float(np.median(np.abs(residuals - np.median(residuals))))
+    groups: Dict[Hashable, list] = {}
+    for i, loc in enumerate(loc for loc, keep in zip(locations, ok) if keep):
+        if loc is not None:
+            groups.setdefault(loc, []).append(i)
+    area_z = np.full(m, np.nan)
+    for members in groups.values():
+        if len(members) >= MIN_AREA_SAMPLE:
+            area_z[members] = _robust_z(residuals[members], fallback_scale=search_scale)
+    out["area_score"][ok] = area_z
+    return out
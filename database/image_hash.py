@@ -0,0 +1,44 @@
+"""
+Image hash module for ImotScraper - handles perceptual dHash of listing
+photos and the 16-bit bands they are indexed by for cross-listing matching.
+"""
+
+import io
+from typing import List, Optional
+
+from PIL import Image
+
+BANDS = 4                   # 64 bits → 4 bands of 16
+BAND_BITS = 64 // BANDS
+MAX_DISTANCE = BANDS - 1    # largest distance the band lookup is guaranteed to find
+
+_SIZE = (9, 8)              # 8 rows × 9 columns → 8 × 8 comparisons
+
+
+def dhash(image_data: bytes) -> Optional[int]:
+    """64-bit difference hash of an encoded image as a signed int, or None
+    if the bytes are not a readable image."""
+    try:
+        with Image.open(io.BytesIO(image_data)) as img:
+            img.draft("L", (_SIZE[0] * 4, _SIZE[1] * 4))     # JPEG: decode at reduced size
+            pixels = img.convert("L").resize(_SIZE, Image.Resampling.LANCZOS).tobytes()
+    except Exception:
+        return None
+    bits = 0
+    for row in range(_SIZE[1]):
+        base = row * _SIZE[0]
+        for col in range(_SIZE[0] - 1):
+            bits = (bits << 1) | (pixels[base + col] < pixels[base + col + 1])
+    return bits - (1 << 64) if bits >= 1 << 63 else bits
+
+
+def bands(h: int) -> List[int]:
+    """The BANDS values of a hash, lowest bits first."""
+    mask = (1 << BAND_BITS) - 1
+    u = h & ((1 << 64) - 1)
+    return [(u >> (i * BAND_BITS)) & mask for i in range(BANDS)]
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two 64-bit hashes."""
+    return bin((a ^ b) & ((1 << 64) - 1)).count("1")
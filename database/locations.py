@@ -0,0 +1,56 @@
+"""
+Location module for ImotScraper - handles parsing scraped location text
+into (city, district, neighbourhood) and the key it is interned under.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+# "гр. София" / "град София" / "с. Бистрица" / "село Бистрица"
+_CITY_RE = re.compile(r"^(?:гр|град|с|село)\.?\s+(.+)$", re.IGNORECASE)
+# "област София" / "обл. София" / "община Столична" / "район Витоша"
+_DISTRICT_RE = re.compile(r"^(?:област|обл|община|общ|район|р-н)\.?\s+(.+)$", re.IGNORECASE)
+# "кв. Лозенец" / "ж.к. Младост 1" / "жк Люлин" / "м-т Евксиноград"
+_NEIGHBOURHOOD_PREFIX_RE = re.compile(r"^(?:кв|ж\.\s?к|жк|м-т|местност)\.?\s+", re.IGNORECASE)
+_SPACES_RE = re.compile(r"\s+")
+
+
+class ParsedLocation(NamedTuple):
+    city:          Optional[str]    # town or village, without "гр." / "с."
+    district:      Optional[str]    # province / municipality / city district, if stated
+    neighbourhood: Optional[str]    # quarter within the city, without "кв." / "ж.к."
+
+
+def parse(location: Optional[str]) -> Optional[ParsedLocation]:
+    """
+    Split a scraped location string into its parts. The first part marked
+    "гр." / "с." (or, failing that, the first unmarked part) is the city,
+    parts marked "област" / "община" / "район" the district and the next
+    unmarked part the neighbourhood; anything after that is dropped.
+    Returns None for an empty location.
+    """
+    parts = [_SPACES_RE.sub(" ", p).strip(" .") for p in (location or "").split(",")]
+    city = district = neighbourhood = None
+    unmarked = []
+    for part in filter(None, parts):
+        m = _CITY_RE.match(part)
+        if m and city is None:
+            city = m.group(1)
+            continue
+        m = _DISTRICT_RE.match(part)
+        if m:
+            district = district or m.group(1)
+            continue
+        unmarked.append(_NEIGHBOURHOOD_PREFIX_RE.sub("", part))
+    if city is None and unmarked:
+        city = unmarked.pop(0)
+    if unmarked:
+        neighbourhood = unmarked[0]
+    if city is None and district is None and neighbourhood is None:
+        return None
+    return ParsedLocation(city, district, neighbourhood)
+
+
+def key(parsed: ParsedLocation) -> str:
+    """Casefolded "city|district|neighbourhood" identity of a parsed location."""
+    return "|".join((p or "").casefold() for p in parsed)
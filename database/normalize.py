@@ -0,0 +1,103 @@
+"""
+Normalisation module for ImotScraper - handles parsing scraped price, area
+and €/m² strings into numbers that SQL can aggregate and sort.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+# Fixed conversion rate of the Bulgarian lev to the euro.
+BGN_PER_EUR = 1.95583
+
+_NUMBER_RE = re.compile(r"\d[\d\s .,]*")
+
+
+class ParsedPrice(NamedTuple):
+    amount:       float
+    currency:     Optional[str]    # "EUR", "BGN" or None if not stated
+    vat_excluded: bool             # listing says "Без ДДС" (price without VAT)
+    price_eur:    Optional[float]  # amount converted to EUR (None for unknown currency)
+
+
+def parse_number(raw: Optional[str]) -> Optional[float]:
+    """
+    Extract the first number from a display string, handling space / NBSP
+    thousands separators and either "." or "," as the decimal mark:
+      "85 000" → 85000, "85.000" → 85000, "1,5" → 1.5, "10.43" → 10.43
+    Returns None if no number is present.
+    """
+    if not raw:
+        return None
+    m = _NUMBER_RE.search(str(raw))
+    if not m:
+        return None
+    digits = re.sub(r"[\s ]", "", m.group(0)).rstrip(".,")
+    if "," in digits and "." in digits:
+        # Both present: the last one is the decimal separator
+        if digits.rfind(",") > digits.rfind("."):
+            digits = digits.replace(".", "").replace(",", ".")
+        else:
+            digits = digits.replace(",", "")
+    elif "," in digits or "." in digits:
+        sep = "," if "," in digits else "."
+        parts = digits.split(sep)
+        if len(parts) > 2 or (len(parts) == 2 and len(parts[1]) == 3 and sep == ","):
+            digits = digits.replace(sep, "")           # thousands grouping
+        elif len(parts) == 2 and len(parts[1]) == 3 and len(parts[0]) <= 3 and sep == ".":
+            digits = digits.replace(sep, "")           # "85.000" EU thousands
+        else:
+            digits = digits.replace(",", ".")
+    try:
+        return float(digits)
+    except ValueError:
+        return None
+
+
+def parse_price(raw: Optional[str]) -> Optional[ParsedPrice]:
+    """Parse a listing price string; None for "—", empty or non-numeric text."""
+    if not raw or raw.strip() == "—":
+        return None
+    main = raw.split("|")[0]
+    amount = parse_number(main)
+    if amount is None:
+        return None
+    upper = main.upper()
+    if "EUR" in upper or "€" in main:
+        currency, price_eur = "EUR", amount
+    elif "ЛВ" in upper or "BGN" in upper:
+        currency, price_eur = "BGN", round(amount / BGN_PER_EUR, 2)
+    else:
+        currency, price_eur = None, None
+    return ParsedPrice(amount, currency, "без ддс" in raw.lower(), price_eur)
+
+
+def parse_price_per_sqm(raw: Optional[str]) -> Optional[float]:
+    """'1686 €/m²' → 1686.0 (the scraper always stores the EUR figure)."""
+    return parse_number(raw)
+
+
+def parse_area(raw: Optional[str]) -> Optional[float]:
+    """'54 m²' / '1 200 кв.м' → square metres as float."""
+    return parse_number(raw)
+
+
+# ── Scalar wrappers for sqlite3.Connection.create_function ────────────────────
+
+def sql_price_amount(raw):
+    p = parse_price(raw)
+    return p.amount if p else None
+
+
+def sql_price_currency(raw):
+    p = parse_price(raw)
+    return p.currency if p else None
+
+
+def sql_price_vat_excluded(raw):
+    p = parse_price(raw)
+    return (1 if p.vat_excluded else 0) if p else None
+
+
+def sql_price_eur(raw):
+    p = parse_price(raw)
+    return p.price_eur if p else None
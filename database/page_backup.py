@@ -0,0 +1,147 @@
+"""
+Page backup module for ImotScraper - handles the compressed full / delta
+page segments that incremental database backups are made of.
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Tuple
+
+MAGIC = b"IMOTPAGES1\n"
+DIGEST_SIZE = 16                   # blake2b digest bytes kept per page
+COMPRESSION_LEVEL = 6
+READ_CHUNK = 1 << 20
+
+_HEADER = struct.Struct(">II")     # page size, page count
+_RECORD = struct.Struct(">I")      # page number (1-based), followed by the page
+
+
+class SegmentInfo(NamedTuple):
+    page_size:     int
+    page_count:    int
+    pages_written: int     # pages stored in the segment
+    bytes:         int     # compressed size on disk
+    sha256:        str     # of the whole database file the segment brings back
+    digests:       bytes   # DIGEST_SIZE bytes per page, for the next delta
+
+
+def page_size_of(path: str) -> int:
+    """Page size from an SQLite file header (bytes 16-17; 1 means 65536)."""
+    with open(path, "rb") as f:
+        header = f.read(100)
+    if len(header) < 100 or not header.startswith(b"SQLite format 3\0"):
+        raise ValueError(f"{path} is not an SQLite database")
+    size = struct.unpack(">H", header[16:18])[0]
+    return 65536 if size == 1 else size
+
+
+def _pages(path: str, page_size: int) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            page = f.read(page_size)
+            if not page:
+                return
+            yield page
+
+
+def write_segment(path: str, snapshot: str, previous: Optional[bytes] = None) -> SegmentInfo:
+    """
+    Write the pages of the database file *snapshot* to the segment *path*:
+    every page when *previous* is None (a full base), otherwise only those
+    whose digest differs from *previous* (the digests of the last backup,
+    as returned in SegmentInfo.digests). Reads *snapshot* once, in order.
+    """
+    page_size = page_size_of(snapshot)
+    page_count = os.path.getsize(snapshot) // page_size
+    whole = hashlib.sha256()
+    digests = bytearray()
+    written = 0
+    compressor = zlib.compressobj(COMPRESSION_LEVEL)
+    with open(path, "wb") as out:
+        out.write(compressor.compress(MAGIC + _HEADER.pack(page_size, page_count)))
+        for pgno, page in enumerate(_pages(snapshot, page_size), start=1):
+            whole.update(page)
+            digest = hashlib.blake2b(page, digest_size=DIGEST_SIZE).digest()
+            digests += digest
+            start = (pgno - 1) * DIGEST_SIZE
+            if previous is None or previous[start:start + DIGEST_SIZE] != digest:
+                out.write(compressor.compress(_RECORD.pack(pgno) + page))
+                written += 1
+        out.write(compressor.flush())
+    return SegmentInfo(page_size, page_count, written, os.path.getsize(path),
+                       whole.hexdigest(), bytes(digests))
+
+
+def _inflate(f: BinaryIO, decompressor) -> bytes:
+    chunk = f.read(READ_CHUNK)
+    if not chunk:
+        raise ValueError(f"{f.name} is truncated")
+    try:
+        return decompressor.decompress(chunk)
+    except zlib.error as exc:
+        raise ValueError(f"{f.name} is damaged: {exc}") from None
+
+
+def _records(f: BinaryIO, decompressor, buf: bytearray, page_size: int) -> Iterator[Tuple[int, bytes]]:
+    record = _RECORD.size + page_size
+    while True:
+        usable = len(buf) - len(buf) % record
+        for at in range(0, usable, record):
+            yield _RECORD.unpack_from(buf, at)[0], bytes(buf[at + _RECORD.size:at + record])
+        del buf[:usable]
+        if decompressor.eof:
+            break
+        buf += _inflate(f, decompressor)
+    if buf:
+        raise ValueError(f"{f.name} ends inside a page")
+
+
+def read_segment(path: str) -> Tuple[int, int, Iterator[Tuple[int, bytes]]]:
+    """
+    Open a segment: returns (page size, page count, records), records
+    yielding (page number, page) while the stream is decompressed.
+    """
+    f = open(path, "rb")
+    decompressor = zlib.decompressobj()
+    buf = bytearray()
+    need = len(MAGIC) + _HEADER.size
+    try:
+        while len(buf) < need and not decompressor.eof:
+            buf += _inflate(f, decompressor)
+    except ValueError:
+        buf.clear()
+    if len(buf) < need or bytes(buf[:len(MAGIC)]) != MAGIC:
+        f.close()
+        raise ValueError(f"{path} is not a backup segment")
+    page_size, page_count = _HEADER.unpack_from(buf, len(MAGIC))
+    del buf[:need]
+
+    def records():
+        with f:
+            yield from _records(f, decompressor, buf, page_size)
+    return page_size, page_count, records()
+
+
+def apply_segment(path: str, db: BinaryIO) -> int:
+    """
+    Replay the segment *path* onto the open database file *db* (opened
+    "r+b"): write its pages in place and cut the file to its page count.
+    Returns the page count.
+    """
+    page_size, page_count, records = read_segment(path)
+    for pgno, page in records:
+        db.seek((pgno - 1) * page_size)
+        db.write(page)
+    db.truncate(page_count * page_size)
+    return page_count
+
+
+def file_sha256(db: BinaryIO) -> str:
+    """SHA-256 of a whole open file, read in chunks from the start."""
+    whole = hashlib.sha256()
+    db.seek(0)
+    for chunk in iter(lambda: db.read(READ_CHUNK), b""):
+        whole.update(chunk)
+    return whole.hexdigest()
@@ -0,0 +1,68 @@
+"""
+Run statistics module for ImotScraper - handles the robust per-run €/m²
+and price summaries (median, quartiles, trimmed mean) stored in run_stats.
+"""
+
+from typing import Dict, Hashable, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Fraction cut from *each* end before averaging (10 % → mean of P10..P90).
+TRIM_FRACTION = 0.10
+
+# Percentile → column suffix, in the order np.percentile returns them.
+_PERCENTILES = (("p10", 10), ("q1", 25), ("median", 50), ("q3", 75), ("p90", 90))
+
+STAT_SUFFIXES = ("count", "mean") + tuple(name for name, _ in _PERCENTILES) + ("trimmed_mean",)
+
+
+def summarise(values: Iterable[Optional[float]], prefix: str) -> Dict[str, Optional[float]]:
+    """
+    Return {<prefix>_count, <prefix>_mean, <prefix>_p10, _q1, _median, _q3,
+    _p90, <prefix>_trimmed_mean} for *values*, ignoring None. Figures are
+    rounded to 2 decimals; all but the count are None when there are no values.
+    """
+    arr = np.fromiter((v for v in values if v is not None), dtype=float)
+    out: Dict[str, Optional[float]] = {f"{prefix}_{s}": None for s in STAT_SUFFIXES}
+    out[f"{prefix}_count"] = int(arr.size)
+    if not arr.size:
+        return out
+
+    arr.sort()
+    out[f"{prefix}_mean"] = round(float(arr.mean()), 2)
+    for (name, _), value in zip(_PERCENTILES, np.percentile(arr, [q for _, q in _PERCENTILES])):
+        out[f"{prefix}_{name}"] = round(float(value), 2)
+    k = int(arr.size * TRIM_FRACTION)
+    out[f"{prefix}_trimmed_mean"] = round(float(arr[k:arr.size - k].mean()), 2)
+    return out
+
+
+def group_medians(keys: Sequence[Optional[Hashable]],
+                  values: Sequence[Optional[float]]) -> Dict[Hashable, Tuple[int, int, Optional[float]]]:
+    """
+    Return {key: (count, value_count, median)} over aligned *keys* and
+    *values*: count is the number of entries of the group, value_count and
+    median (rounded to 2 decimals, None if no values) ignore None values.
+    Entries with a None key are skipped.
+    """
+    counts: Dict[Hashable, int] = {}
+    for k in keys:
+        if k is not None:
+            counts[k] = counts.get(k, 0) + 1
+    out = {k: (n, 0, None) for k, n in counts.items()}
+
+    pairs = [(k, v) for k, v in zip(keys, values) if k is not None and v is not None]
+    if not pairs:
+        return out
+    codes = {k: i for i, k in enumerate(counts)}
+    k_arr = np.fromiter((codes[k] for k, _ in pairs), dtype=np.int64, count=len(pairs))
+    v_arr = np.fromiter((v for _, v in pairs), dtype=float, count=len(pairs))
+    order = np.lexsort((v_arr, k_arr))           # by group, then value
+    k_arr, v_arr = k_arr[order], v_arr[order]
+    groups, start, sizes = np.unique(k_arr, return_index=True, return_counts=True)
+    medians = (v_arr[start + (sizes - 1) // 2] + v_arr[start + sizes // 2]) / 2
+    names = list(counts)
+    for g, size, median in zip(groups, sizes, medians):
+        name = names[g]
+        out[name] = (counts[name], int(size), round(float(median), 2))
+    return out
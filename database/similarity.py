@@ -0,0 +1,86 @@
+"""
+Similarity module for ImotScraper - handles near-duplicate detection of
+relisted flats with MinHash signatures and LSH banding over descriptions.
+"""
+
+import hashlib
+import re
+import zlib
+from typing import Dict, List, Optional, Set
+
+import numpy as np
+
+NUM_PERM  = 64        # signature length
+BANDS     = 16        # LSH bands …
+ROWS      = NUM_PERM // BANDS   # … of 4 values each
+SHINGLE   = 3         # words per shingle
+MIN_SHINGLES = 5      # shorter descriptions ("Тухла.") can't tell flats apart
+THRESHOLD = 0.6       # estimated Jaccard needed to call two descriptions the same flat
+AREA_TOLERANCE = 0.05  # relative area difference still considered the same flat
+
+_WORD_RE = re.compile(r"\w+")
+_PRIME = np.uint64((1 << 61) - 1)
+_rng = np.random.RandomState(42)   # fixed: stored signatures must stay comparable
+_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def shingles(text: Optional[str]) -> Set[int]:
+    """crc32 of every SHINGLE-word window of the casefolded text (the whole
+    text as one shingle when it is shorter)."""
+    words = _WORD_RE.findall((text or "").casefold())
+    if not words:
+        return set()
+    n = max(1, len(words) - SHINGLE + 1)
+    return {zlib.crc32(" ".join(words[i:i + SHINGLE]).encode("utf-8")) for i in range(n)}
+
+
+def signature(text: Optional[str]) -> Optional[np.ndarray]:
+    """MinHash signature (uint32[NUM_PERM]) of *text*, or None when it has
+    fewer than MIN_SHINGLES distinct shingles."""
+    sh = shingles(text)
+    if len(sh) < MIN_SHINGLES:
+        return None
+    hv = np.fromiter(sh, dtype=np.uint64, count=len(sh))
+    # One universal hash per permutation, all shingles at once; uint64
+    # wrap-around is harmless, it only has to be deterministic.
+    perm = (hv[:, None] * _A + _B) % _PRIME
+    return (perm & np.uint64(0xFFFFFFFF)).min(axis=0).astype(np.uint32)
+
+
+def to_blob(sig: np.ndarray) -> bytes:
+    return sig.astype("<u4").tobytes()
+
+
+def from_blob(blob: bytes) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<u4")
+
+
+def band_keys(sig: np.ndarray) -> List[int]:
+    """One signed 64-bit bucket key per band (SQLite INTEGER range)."""
+    raw = to_blob(sig)
+    step = ROWS * 4
+    return [int.from_bytes(hashlib.blake2b(raw[i:i + step], digest_size=8).digest(),
+                           "little", signed=True)
+            for i in range(0, len(raw), step)]
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity: the fraction of agreeing signature values."""
+    return float(np.count_nonzero(a == b)) / NUM_PERM
+
+
+def attributes_match(a: Dict, b: Dict) -> bool:
+    """
+    True unless the structured fields contradict each other: area_sqm_value
+    differs by more than AREA_TOLERANCE, or floor / location differ. A field
+    missing on either side doesn't count against the match.
+    """
+    area_a, area_b = a.get("area_sqm_value"), b.get("area_sqm_value")
+    if area_a and area_b and abs(area_a - area_b) > AREA_TOLERANCE * max(area_a, area_b):
+        return False
+    for field in ("floor", "location"):
+        x, y = (a.get(field) or "").strip().casefold(), (b.get(field) or "").strip().casefold()
+        if x and y and x != y:
+            return False
+    return True
@@ -10,7 +10,8 @@ import os
 import re
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
-from typing import List, Dict
+from typing import List, Dict, DefaultDict
+from collections import defaultdict
 
 # --- Constants for formatting ---
 NEW_LINE = '\n'
@@ -48,13 +49,29 @@ class ReportMailer:
         if not self.is_configured:
             logging.warning("ReportMailer initialized with incomplete credentials. Will not be able to send emails.")
 
+        # Listing events collected during the current run, keyed by search name.
+        # Filled by collect_listing_event (subscribed to the scraper event bus).
+        self.run_events: DefaultDict[str, list] = defaultdict(list)
+
+    def collect_listing_event(self, event) -> None:
+        """
+        Event bus subscriber for new / changed / removed listings.
+        Runs on the scraper thread; only appends, so it never slows the scrape.
+        """
+        self.run_events[event.search_name].append(event)
+
     def send_reports_or_failure_notification(self, success: bool, data_dir="data", input_csv="data/inputURLS.csv"):
         """
         Sends emails based on the scraper's run status.
         If success is True, sends customized reports to all relevant users. 
         If success is False, sends a failure email ONLY to the administrator.
         """
-        logging.info("Email notifications disabled - email functionality will be restored in the future.")
+        collected = sum(len(v) for v in self.run_events.values())
+        logging.info(
+            f"Email notifications disabled - email functionality will be restored in the future "
+            f"({collected} listing event(s) collected this run)."
+        )
+        self.run_events.clear()
         return
 
     def _generate_report_summary(self, filename: str, data_dir: str) -> str:
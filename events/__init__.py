@@ -0,0 +1,12 @@
+"""Event module for ImotScraper"""
+from .event_bus import (
+    EventBus, ScraperEvent, SearchStarted, SearchFinished, ScrapeProgress,
+    ListingEvent, ListingNew, ListingRelisted, ListingChanged, ListingRemoved,
+    ListingUnderpriced,
+)
+
+__all__ = [
+    'EventBus', 'ScraperEvent', 'SearchStarted', 'SearchFinished', 'ScrapeProgress',
+    'ListingEvent', 'ListingNew', 'ListingRelisted', 'ListingChanged', 'ListingRemoved',
+    'ListingUnderpriced',
+]
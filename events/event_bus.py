@@ -0,0 +1,155 @@
+"""
+Event module for ImotScraper - typed scraper events and a small publish /
+subscribe bus.
+
+The scraper publishes structured events (new / relisted / changed / removed / underpriced listings,
+search started / finished, page progress) instead of consumers parsing its
+log lines.  Subscribers are called synchronously on the publishing thread
+(the scraper thread), so GUI subscribers must hop to the Qt main thread
+with a signal — exactly like the old logging handler did.
+
+Self-contained: no GUI, scraper or database imports.
+"""
+
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, ClassVar, Dict, List, Optional, Type
+
+logger = logging.getLogger(__name__)
+
+
+# ── Event types ───────────────────────────────────────────────────────────────
+
+@dataclass(frozen=True)
+class ScraperEvent:
+    """Base class for everything the scraper publishes."""
+    search_id:   int
+    search_name: str
+
+
+@dataclass(frozen=True)
+class SearchStarted(ScraperEvent):
+    """A search is about to be scraped (index is 1-based)."""
+    index: int = 1
+    total: int = 1
+
+
+@dataclass(frozen=True)
+class SearchFinished(ScraperEvent):
+    """A search finished — counters mirror the scrape_runs row."""
+    success:        bool = True
+    records_found:  int = 0
+    new_count:      int = 0
+    changed_count:  int = 0
+    inactive_count: int = 0
+    relisted_count: int = 0
+    deal_count:     int = 0
+    error_message:  Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ScrapeProgress(ScraperEvent):
+    """One result page of a search has been processed."""
+    page:          int = 1
+    records_found: int = 0
+
+
+@dataclass(frozen=True)
+class ListingEvent(ScraperEvent):
+    """Base class for per-listing events; *kind* is the feed label."""
+    kind: ClassVar[str] = ""
+
+    property_id: Optional[int] = None
+    record_id:   str = ""
+    title:       str = ""
+    link:        str = ""
+    price:       Optional[str] = None
+    is_favorite: bool = False
+
+
+@dataclass(frozen=True)
+class ListingNew(ListingEvent):
+    kind: ClassVar[str] = "NEW"
+
+
+@dataclass(frozen=True)
+class ListingRelisted(ListingNew):
+    """A new listing matched to an earlier one of the same flat (a repost)."""
+    kind: ClassVar[str] = "RELISTED"
+
+    relisted_from_id:     Optional[int] = None
+    relisted_from_record: str = ""
+
+
+@dataclass(frozen=True)
+class ListingChanged(ListingEvent):
+    kind: ClassVar[str] = "CHANGED"
+
+    old_price: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class ListingRemoved(ListingEvent):
+    kind: ClassVar[str] = "DEACTIVATED"
+
+
+@dataclass(frozen=True)
+class ListingUnderpriced(ListingEvent):
+    """A listing new or re-priced this run scored as a deal once the search
+    was re-scored (published after its NEW / CHANGED event)."""
+    kind: ClassVar[str] = "DEAL"
+
+    deal_score:      Optional[float] = None
+    deal_area_score: Optional[float] = None
+    deal_percentile: Optional[float] = None
+
+
+# ── Bus ───────────────────────────────────────────────────────────────────────
+
+Subscriber = Callable[[ScraperEvent], None]
+
+
+class EventBus:
+    """
+    Thread-safe publish / subscribe dispatcher keyed by event class.
+
+    Subscribing to a base class (e.g. ListingEvent or ScraperEvent) receives
+    every subclass event.  A failing subscriber is logged and skipped — it
+    never interrupts the publisher or the other subscribers.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Type[ScraperEvent], List[Subscriber]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type: Type[ScraperEvent],
+                  callback: Subscriber) -> Callable[[], None]:
+        """Register *callback* for *event_type*; returns an unsubscribe function."""
+        with self._lock:
+            self._subscribers.setdefault(event_type, []).append(callback)
+        return lambda: self.unsubscribe(event_type, callback)
+
+    def unsubscribe(self, event_type: Type[ScraperEvent], callback: Subscriber) -> None:
+        with self._lock:
+            callbacks = self._subscribers.get(event_type, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def has_subscribers(self) -> bool:
+        with self._lock:
+            return any(self._subscribers.values())
+
+    def publish(self, event: ScraperEvent) -> None:
+        """Deliver *event* to every subscriber of its class or a base class."""
+        with self._lock:
+            targets = [
+                cb
+                for cls in type(event).__mro__
+                for cb in self._subscribers.get(cls, ())
+            ]
+        for callback in targets:
+            try:
+                callback(event)
+            except Exception as exc:
+                logger.error(f"Event subscriber {callback!r} failed on {type(event).__name__}: {exc}")
@@ -17,19 +17,23 @@ import os
 import queue
 import re
 import threading
-from typing import Optional
+import time
+from collections import Counter, OrderedDict, deque
+from typing import NamedTuple, Optional
 
+import numpy as np
 from PyQt6.QtCore import (
     Qt, QSize, QTimer, pyqtSignal, QObject, QRect, QUrl,
+    QAbstractTableModel, QModelIndex, QBuffer, QByteArray,
 )
 from PyQt6.QtGui import (
-    QColor, QFont, QBrush, QPixmap, QImage, QIcon, QPainter, QDesktopServices,
+    QColor, QFont, QBrush, QPixmap, QImage, QImageReader, QIcon, QPainter, QDesktopServices,
 )
 from PyQt6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QDialog,
     QVBoxLayout, QHBoxLayout, QGridLayout, QFormLayout,
     QSplitter, QGroupBox, QLabel, QPushButton, QLineEdit,
-    QTableWidget, QTableWidgetItem, QHeaderView,
+    QTableWidget, QTableWidgetItem, QTableView, QHeaderView,
     QListWidget, QListWidgetItem,
     QAbstractItemView, QScrollArea,
     QMessageBox, QSizePolicy, QFrame, QTextEdit,
@@ -37,7 +41,9 @@ from PyQt6.QtWidgets import (
     QSlider,
 )
 
+from database import deal_score
 from gui.theme_qt import AppTheme as T, build_stylesheet, make_button
+from events.event_bus import ListingEvent, ScraperEvent, SearchStarted
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -86,12 +92,12 @@ def _dim_label(text: str) -> QLabel:
     return lbl
 
 
-# ── Feed row delegate — bypasses QSS so setBackground() colours show ─────────
+# ── Feed row delegate — bypasses QSS so model/item colours show ──────────────
 
 class _FeedDelegate(QStyledItemDelegate):
     """
-    Paints feed table cells using each item's own background/foreground
-    colours (set via setBackground / setForeground) without letting
+    Paints feed table cells using each index's own background/foreground
+    colours (BackgroundRole / ForegroundRole from the model) without letting
     the global QSS override them.  Also suppresses the focus rectangle
     so no button-shaped frame appears when a cell is clicked.
     """
@@ -138,6 +144,159 @@ class _FeedDelegate(QStyledItemDelegate):
         painter.restore()
 
 
+# ── Live feed model — batched inserts, bounded rows ──────────────────────────
+
+class FeedTableModel(QAbstractTableModel):
+    """
+    Model behind the live feed (QTableView + _FeedDelegate).
+
+    Events are queued by enqueue() and inserted in one beginInsertRows()
+    batch every FLUSH_MS, so a burst of thousands of NEW events costs a
+    handful of view updates instead of one per event.  Only the newest
+    MAX_ROWS events are retained (oldest rows are dropped in one batch);
+    per-kind counters keep running totals for the whole run regardless.
+
+    When empty, an optional placeholder row is shown — the view spans it
+    across all columns.
+    """
+
+    HEADERS  = ("Search", "Type", "Title", "Price")
+    MAX_ROWS = 5000
+    FLUSH_MS = 150
+
+    batch_flushed = pyqtSignal(int)   # number of rows inserted
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._rows: deque = deque()
+        self._pending: list = []
+        self._placeholder = ""
+        self.counts: Counter = Counter()   # kind → events seen since clear()
+
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.FLUSH_MS)
+        self._flush_timer.timeout.connect(self.flush)
+
+        # Shared role values — built once, not per cell
+        self._font = _bold_font()
+        self._fg = QBrush(QColor(T.FG_WHITE))
+        self._dim = QBrush(QColor(T.FG_DIM))
+        self._bg = {
+            "NEW":         QBrush(QColor(T.FEED_NEW_BG)),
+            "RELISTED":    QBrush(QColor(T.FEED_RELISTED_BG)),
+            "CHANGED":     QBrush(QColor(T.FEED_CHANGED_BG)),
+            "DEACTIVATED": QBrush(QColor(T.FEED_DELETED_BG)),
+            "DEAL":        QBrush(QColor(T.FEED_UNDERPRICED_BG)),
+        }
+        self._bg_default = QBrush(QColor(T.BG2))
+
+    # ── Feeding ───────────────────────────────────────────────────────────────
+
+    def enqueue(self, event) -> None:
+        """Queue a ListingEvent; it appears on the next timer flush."""
+        self._pending.append(event)
+        self.counts[event.kind] += 1
+        if not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def flush(self) -> None:
+        """Insert every queued event now (one batch), trimming to MAX_ROWS."""
+        self._flush_timer.stop()
+        if not self._pending:
+            return
+        batch = self._pending[-self.MAX_ROWS:]
+        self._pending = []
+
+        if self._placeholder:
+            self.beginResetModel()
+            self._placeholder = ""
+            self.endResetModel()
+
+        overflow = len(self._rows) + len(batch) - self.MAX_ROWS
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self._rows.popleft()
+            self.endRemoveRows()
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
+        self.batch_flushed.emit(len(batch))
+
+    def clear(self, placeholder: str = "") -> None:
+        """Drop all rows, pending events and counters."""
+        self._flush_timer.stop()
+        self.beginResetModel()
+        self._rows.clear()
+        self._pending = []
+        self._placeholder = placeholder
+        self.counts.clear()
+        self.endResetModel()
+
+    def has_placeholder(self) -> bool:
+        return bool(self._placeholder)
+
+    def event_at(self, row: int):
+        """Return the ListingEvent shown on *row*, or None."""
+        if self._placeholder or not 0 <= row < len(self._rows):
+            return None
+        return self._rows[row]
+
+    # ── QAbstractTableModel ───────────────────────────────────────────────────
+
+    def rowCount(self, parent=QModelIndex()) -> int:   # noqa: N802 — Qt API
+        if parent.isValid():
+            return 0
+        return 1 if self._placeholder else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:   # noqa: N802 — Qt API
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):   # noqa: N802
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if self._placeholder:
+            if role == Qt.ItemDataRole.DisplayRole and index.column() == 0:
+                return self._placeholder
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return self._dim
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter
+            return None
+
+        event = self._rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            col = index.column()
+            if col == 0:
+                return event.search_name
+            if col == 1:
+                return event.kind
+            if col == 2:
+                # Favourites are prefixed with a star
+                return ("🌟 " + event.title) if event.is_favorite else event.title
+            price = event.price or "—"
+            if event.kind == "DEAL":
+                return f"{price}  ·  score {event.deal_score:+.1f}"
+            return f"{event.old_price} → {price}" if event.kind == "CHANGED" else price
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return self._bg.get(event.kind, self._bg_default)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self._fg
+        if role == Qt.ItemDataRole.FontRole:
+            return self._font
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        return None
+
+
 class _ListDelegate(QStyledItemDelegate):
     """
     Suppresses the focus-rect 'rounded button' artefact on QListWidget rows.
@@ -156,66 +315,19 @@ class _ListDelegate(QStyledItemDelegate):
 # ── Feed event bridge ─────────────────────────────────────────────────────────
 
 class FeedBridge(QObject):
-    """Emits feed events (dict) on the Qt main thread via a signal."""
-    event_received  = pyqtSignal(dict)
-    search_progress = pyqtSignal(str)   # emits search_name when scraper starts each search
-
-
-class ResultsFeedHandler(logging.Handler):
     """
-    Intercepts scraper log lines and forwards structured dicts to
-    a FeedBridge signal (thread-safe — Qt handles cross-thread signals).
-
-    Line formats:
-      "New listing: <title> | price: <price> | search: <search> | <link>"
-      "Price change: <title> | old: <old> | new: <new> | search: <search>"
+    Forwards typed scraper events (events.event_bus) to the Qt main thread.
+    The scraper publishes on its own thread; Qt queues cross-thread signals.
     """
+    event_received  = pyqtSignal(object)   # ListingEvent
+    search_progress = pyqtSignal(str)      # emits search_name when scraper starts each search
 
-    _RE_NEW        = re.compile(r"New listing: (.+?) \| price: (.+?) \| search: (.+?) \| (https?://\S+)")
-    _RE_CHANGED    = re.compile(r"Price change: (.+?) \| old: (.+?) \| new: (.+?) \| search: (.+?) \| (https?://\S+)")
-    _RE_DELETED    = re.compile(r"Removed listing: (.+?) \| search: (.+?) \| (https?://\S*)")
-    _RE_PROCESSING = re.compile(r"Processing: (.+)")
-
-    def __init__(self, bridge: FeedBridge) -> None:
-        super().__init__()
-        self._bridge = bridge
-
-    def emit(self, record: logging.LogRecord) -> None:
-        msg = record.getMessage()
-        m = self._RE_NEW.search(msg)
-        if m:
-            self._bridge.event_received.emit({
-                "kind":        "NEW",
-                "title":       m.group(1).strip(),
-                "price":       m.group(2).strip(),
-                "search_name": m.group(3).strip(),
-                "link":        m.group(4).strip(),
-            })
-            return
-        m = self._RE_CHANGED.search(msg)
-        if m:
-            self._bridge.event_received.emit({
-                "kind":        "CHANGED",
-                "title":       m.group(1).strip(),
-                "old_price":   m.group(2).strip(),
-                "price":       m.group(3).strip(),
-                "search_name": m.group(4).strip(),
-                "link":        m.group(5).strip(),
-            })
-            return
-        m = self._RE_DELETED.search(msg)
-        if m:
-            self._bridge.event_received.emit({
-                "kind":        "DEACTIVATED",
-                "title":       m.group(1).strip(),
-                "price":       "—",
-                "search_name": m.group(2).strip(),
-                "link":        m.group(3).strip(),
-            })
-            return
-        m = self._RE_PROCESSING.search(msg)
-        if m:
-            self._bridge.search_progress.emit(m.group(1).strip())
+    def on_scraper_event(self, event) -> None:
+        """EventBus subscriber — runs on the scraper thread."""
+        if isinstance(event, ListingEvent):
+            self.event_received.emit(event)
+        elif isinstance(event, SearchStarted):
+            self.search_progress.emit(event.search_name)
 
 
 # ── Add / Edit Search dialog ───────────────────────────────────────────────────
@@ -334,14 +446,20 @@ class MortgageCalculatorDialog(QDialog):
     _TAX_RATE = 3.0   # fixed transfer-tax percentage
     _VAT_RATE = 1.20  # 20% VAT multiplier when listing says "Без ДДС"
 
-    def __init__(self, parent: QWidget, price_text: str) -> None:
+    def __init__(self, parent: QWidget, price_text: str,
+                 price_eur: float | None = None,
+                 vat_excluded: bool | None = None) -> None:
+        """
+        *price_eur* / *vat_excluded* are the normalised columns stored at
+        ingest; when absent (older rows) the display string is parsed instead.
+        """
         super().__init__(parent)
         self.setWindowTitle("Mortgage Calculator")
         self.setMinimumWidth(420)
         _set_dark_titlebar(self)
 
-        self._has_vat = "Без ДДС" in price_text
-        base_price = self._parse_price(price_text)
+        self._has_vat = bool(vat_excluded) if vat_excluded is not None else "Без ДДС" in price_text
+        base_price = price_eur if price_eur is not None else self._parse_price(price_text)
         self._price_eur = (base_price * self._VAT_RATE) if (base_price and self._has_vat) else base_price
         self._build_ui(price_text)
         self._recalculate()
@@ -589,6 +707,59 @@ class MortgageCalculatorDialog(QDialog):
 
 # ── Gallery window ─────────────────────────────────────────────────────────────
 
+class _GalleryImageLoader(QObject):
+    """
+    Loads gallery images one at a time on a daemon thread.
+
+    Each request reads a single BLOB via db.read_image_blob() (incremental
+    blob I/O) and decodes it with QImageReader straight to the requested
+    display size, so full-resolution frames never reach the GUI thread.
+    Newest requests are served first (LIFO): the image being shown is
+    queued after its neighbours and therefore loads before them.
+    """
+
+    # index, decoded image (null on failure), True if the source was larger than delivered
+    loaded = pyqtSignal(int, QImage, bool)
+
+    def __init__(self, db, parent=None) -> None:
+        super().__init__(parent)
+        self._db = db
+        self._queue: queue.LifoQueue = queue.LifoQueue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="GalleryImageLoader")
+        self._thread.start()
+
+    def request(self, index: int, image_id: int, target: QSize) -> None:
+        self._queue.put((index, image_id, QSize(target)))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._queue.put(None)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            job = self._queue.get()
+            if job is None or self._stopped.is_set():
+                break
+            index, image_id, target = job
+            image, downscaled = QImage(), False
+            try:
+                blob = self._db.read_image_blob(image_id)
+                if blob:
+                    buf = QBuffer()
+                    buf.setData(QByteArray(blob))
+                    reader = QImageReader(buf)
+                    size = reader.size()
+                    if size.isValid() and (size.width() > target.width() or size.height() > target.height()):
+                        reader.setScaledSize(size.scaled(target, Qt.AspectRatioMode.KeepAspectRatio))
+                        downscaled = True
+                    image = reader.read()
+            except Exception as exc:
+                logging.debug(f"Gallery image {image_id} failed to load: {exc}")
+            if not self._stopped.is_set():
+                self.loaded.emit(index, image, downscaled)
+
+
 class GalleryWindow(QDialog):
     """
     Image gallery for a single property.
@@ -598,6 +769,9 @@ class GalleryWindow(QDialog):
     # Emitted when the user toggles the favorite button
     favorite_toggled = pyqtSignal(str, bool)   # record_id, is_now_favorite
 
+    # Display-sized pixmaps kept in memory (current image + neighbours)
+    PIXMAP_CACHE_SIZE = 5
+
     def __init__(self, parent: QWidget, prop: dict, controller) -> None:
         super().__init__(parent)
         title_text = prop.get("title") or "—"
@@ -610,13 +784,20 @@ class GalleryWindow(QDialog):
         self._controller = controller
         self._images     = []
         self._idx        = 0
-        self._pixmap_cache: dict[int, QPixmap] = {}
+        # LRU of display-sized pixmaps: index → (pixmap, source was downscaled)
+        self._pixmap_cache: OrderedDict[int, tuple[QPixmap, bool]] = OrderedDict()
+        self._in_flight: set[int] = set()
+        self._loader: Optional[_GalleryImageLoader] = None
 
-        # Load data
+        # Load metadata only — image bytes are streamed on demand
         db = controller.db if controller else None
         if db:
-            self._images       = db.get_images(prop["id"])
+            self._images       = db.get_image_ids(prop["id"])
             self._price_history = db.get_price_history(prop["id"])
+            if self._images:
+                self._loader = _GalleryImageLoader(db, self)
+                self._loader.loaded.connect(self._on_image_loaded)
+                self.finished.connect(lambda _r: self._loader.stop())
         else:
             self._price_history = []
 
@@ -655,10 +836,17 @@ class GalleryWindow(QDialog):
         )
         self._fav_btn.clicked.connect(self._toggle_favorite)
 
+        # Other listings with the same photos (reposts, other agencies)
+        self._same_photos_btn = _styled_btn("🖼  Same Photos", min_width=130)
+        self._same_photos_btn.setToolTip("Find other listings that use these photos")
+        self._same_photos_btn.setEnabled(bool(self._images))
+        self._same_photos_btn.clicked.connect(self._show_shared_photos)
+
         nav_layout.addWidget(self._btn_prev)
         nav_layout.addStretch()
         nav_layout.addWidget(self._counter_lbl)
         nav_layout.addStretch()
+        nav_layout.addWidget(self._same_photos_btn)
         nav_layout.addWidget(self._fav_btn)
         nav_layout.addWidget(self._btn_next)
         root_layout.addWidget(nav)
@@ -728,7 +916,8 @@ class GalleryWindow(QDialog):
         price_val.setCursor(Qt.CursorShape.PointingHandCursor)
         price_val.setToolTip("Click to open mortgage calculator")
         def _open_mortgage(_event, p=price_text) -> None:
-            MortgageCalculatorDialog(self, p).exec()
+            MortgageCalculatorDialog(self, p, prop.get("current_price_eur"),
+                                     prop.get("current_vat_excluded")).exec()
         price_val.mousePressEvent = _open_mortgage
         info_layout.addWidget(price_lbl_key, row, 0, Qt.AlignmentFlag.AlignTop)
         info_layout.addWidget(price_val, row, 1, Qt.AlignmentFlag.AlignTop)
@@ -820,6 +1009,11 @@ class GalleryWindow(QDialog):
 
         self.favorite_toggled.emit(record_id, is_now_fav)
 
+    def _show_shared_photos(self) -> None:
+        if not self._controller:
+            return
+        SharedPhotosDialog(self, self._prop, self._controller).exec()
+
     def _show_image(self, idx: int) -> None:
         if not self._images:
             self._img_label.setText("No images stored.")
@@ -833,28 +1027,59 @@ class GalleryWindow(QDialog):
         self._btn_prev.setEnabled(idx > 0)
         self._btn_next.setEnabled(idx < total - 1)
 
-        # Use cached pixmap or decode from blob
-        if idx not in self._pixmap_cache:
-            raw = self._images[idx].get("image_data")
-            if raw:
-                qimg = QImage.fromData(raw)
-                self._pixmap_cache[idx] = QPixmap.fromImage(qimg)
-            else:
-                self._pixmap_cache[idx] = QPixmap()
+        # Neighbours first, current last — the loader serves newest requests first
+        for n in (idx + 1, idx - 1):
+            if 0 <= n < total and n not in self._pixmap_cache:
+                self._request_image(n)
 
-        px = self._pixmap_cache[idx]
+        cached = self._pixmap_cache.get(idx)
+        if cached is None:
+            self._img_label.setPixmap(QPixmap())
+            self._img_label.setText("Loading…")
+            self._request_image(idx)
+            return
+
+        self._pixmap_cache.move_to_end(idx)
+        px, downscaled = cached
         if px.isNull():
             self._img_label.setText(
                 self._images[idx].get("url", "Image data unavailable")
             )
-        else:
-            available = self._img_label.size()
-            scaled = px.scaled(
-                available,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
-            self._img_label.setPixmap(scaled)
+            return
+        available = self._img_label.size()
+        if downscaled and (px.width() < available.width() and px.height() < available.height()):
+            # Window grew beyond the decoded size — fetch a sharper copy
+            self._request_image(idx, force=True)
+        scaled = px.scaled(
+            available,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+        self._img_label.setPixmap(scaled)
+
+    def _request_image(self, idx: int, force: bool = False) -> None:
+        if not self._loader or idx in self._in_flight:
+            return
+        if idx in self._pixmap_cache and not force:
+            return
+        self._in_flight.add(idx)
+        # Decode at display size; the floor covers the label before its first layout
+        target = self._img_label.size().expandedTo(QSize(800, 600))
+        self._loader.request(idx, self._images[idx]["id"], target)
+
+    def _on_image_loaded(self, idx: int, image: QImage, downscaled: bool) -> None:
+        """Slot — a decoded image arrived from the loader thread."""
+        self._in_flight.discard(idx)
+        self._pixmap_cache[idx] = (QPixmap.fromImage(image), downscaled)
+        self._pixmap_cache.move_to_end(idx)
+        while len(self._pixmap_cache) > self.PIXMAP_CACHE_SIZE:
+            oldest = next(iter(self._pixmap_cache))
+            if oldest == self._idx:
+                self._pixmap_cache.move_to_end(oldest)
+                continue
+            del self._pixmap_cache[oldest]
+        if idx == self._idx:
+            self._show_image(idx)
 
     def resizeEvent(self, event) -> None:  # type: ignore[override]
         super().resizeEvent(event)
@@ -872,12 +1097,225 @@ class GalleryWindow(QDialog):
 
 # ── Results window ─────────────────────────────────────────────────────────────
 
+class _ThumbnailLoader(QObject):
+    """
+    Loads first-image thumbnails on a daemon thread, on demand.
+
+    request() is called from ResultsTableModel.data() for rows the view is
+    actually painting; the newest requests are served first (LIFO) so a
+    fast scroll fills the visible page before stale ones.  Decoding and
+    scaling happen off the GUI thread; the scaled QImage comes back via
+    the loaded signal.
+    """
+
+    loaded = pyqtSignal(int, QImage)   # property_id, scaled thumbnail (may be null)
+
+    def __init__(self, db, parent=None) -> None:
+        super().__init__(parent)
+        self._db = db
+        self._queue: queue.LifoQueue = queue.LifoQueue()
+        self._requested: set[int] = set()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ThumbnailLoader")
+        self._thread.start()
+
+    def request(self, property_id: int) -> None:
+        if property_id in self._requested:
+            return
+        self._requested.add(property_id)
+        self._queue.put(property_id)
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._queue.put(None)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            property_id = self._queue.get()
+            if property_id is None or self._stopped.is_set():
+                break
+            image = QImage()
+            try:
+                blob = self._db.get_first_image(property_id)
+                if blob:
+                    decoded = QImage.fromData(blob)
+                    if not decoded.isNull():
+                        image = decoded.scaled(
+                            T.THUMB_W, T.THUMB_H - 4,
+                            Qt.AspectRatioMode.KeepAspectRatio,
+                            Qt.TransformationMode.SmoothTransformation,
+                        )
+            except Exception as exc:
+                logging.debug(f"Thumbnail load failed for property {property_id}: {exc}")
+            if not self._stopped.is_set():
+                self.loaded.emit(property_id, image)
+
+
+def _deal_tooltip(r: dict) -> str:
+    """Explain a row's deal scores (see database/deal_score.py)."""
+    lines = [f"{r['deal_score']:+.1f} σ vs. the search's expected €/m² for its size and floor"]
+    if r.get("deal_percentile") is not None:
+        lines.append(f"cheaper than {100 - r['deal_percentile']:.0f} % of active listings")
+    if r.get("deal_area_score") is not None:
+        lines.append(f"{r['deal_area_score']:+.1f} σ within {r.get('location') or 'its location'}")
+    return "\n".join(lines)
+
+
+class ResultsTableModel(QAbstractTableModel):
+    """
+    Table model for ResultsWindow over the rows of db.get_property_rows().
+
+    Everything shown is derived once at construction (no per-row queries,
+    no date parsing); thumbnails are requested lazily from _ThumbnailLoader
+    only when the view asks for a row's decoration, i.e. when it is visible.
+    """
+
+    HEADERS = ["", "Status", "Title", "Location", "Price", "€/m²", "Deal",
+               "First Seen", "Deactivated At", "Days on Market", "Images", "Link"]
+    COL_THUMB, COL_TITLE, COL_PRICE, COL_DEAL, COL_LINK = 0, 2, 4, 6, 11
+    _CENTERED = (1, 5, 6, 7, 8, 9, 10)
+    # Numeric columns sort on the normalised values stored at ingest
+    _SORT_FIELDS = {4: "current_price_eur", 5: "price_per_sqm_eur", 6: "deal_score",
+                    9: "days_on_market", 10: "image_count"}
+
+    def __init__(self, rows: list[dict],
+                 loader: Optional[_ThumbnailLoader], parent=None) -> None:
+        super().__init__(parent)
+        self._rows = rows
+        self._loader = loader
+        self._thumbs: dict[int, QPixmap] = {}
+        self._row_of: dict[int, int] = {}
+
+        self._font = QFont(T.FONT_FAMILY, T.FONT_SIZE)
+        self._font_inactive = QFont(T.FONT_FAMILY, T.FONT_SIZE)
+        self._font_inactive.setItalic(True)
+        self._fg = QBrush(QColor(T.FG_WHITE))
+        self._fg_inactive = QBrush(QColor(T.FG_DIM))
+        self._bg_active = QBrush(QColor(T.BG2))
+        self._bg_inactive = QBrush(QColor(T.BG))
+        self._bg_underpriced = QBrush(QColor(T.FEED_UNDERPRICED_BG))
+
+        for row in rows:
+            row["current_price"] = row.get("current_price") or "—"
+            row["_active"] = row["status"] == "Active"
+            # Underpriced = deal score from the last scoring pass (score_search)
+            row["_underpriced"] = row["_active"] and deal_score.is_deal(
+                row.get("deal_score"), row.get("deal_area_score"))
+        self._reindex()
+
+        if loader:
+            loader.loaded.connect(self._on_thumbnail_loaded)
+
+    def _reindex(self) -> None:
+        self._row_of = {r["id"]: i for i, r in enumerate(self._rows)}
+
+    def row_dict(self, row: int) -> Optional[dict]:
+        return self._rows[row] if 0 <= row < len(self._rows) else None
+
+    def refresh_row(self, row: int) -> None:
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.HEADERS) - 1))
+
+    def _cell_text(self, r: dict, col: int) -> str:
+        if col == 1:
+            return f"{r['status']} ↻" if r.get("relisted_from_id") else r["status"]
+        if col == 2:
+            return ("🌟 " if r.get("is_favorite") else "") + (r.get("title") or "—")
+        if col == 3:
+            return r.get("location") or "—"
+        if col == 4:
+            return r["current_price"]
+        if col == 5:
+            return r.get("price_per_sqm") or "—"
+        if col == 6:
+            score = r.get("deal_score")
+            return f"{score:+.1f}" if score is not None else "—"
+        if col == 7:
+            return r["first_seen"][:16] if r.get("first_seen") else "—"
+        if col == 8:
+            return r["inactivated_at"][:16] if r.get("inactivated_at") else "—"
+        if col == 9:
+            dom = r.get("days_on_market")
+            return str(dom) if dom is not None else "—"
+        if col == 10:
+            return f"🖼 {r['image_count']}" if r.get("image_count") else "—"
+        if col == 11:
+            return r.get("link") or "—"
+        return ""
+
+    def _on_thumbnail_loaded(self, property_id: int, image: QImage) -> None:
+        if not image.isNull():
+            self._thumbs[property_id] = QPixmap.fromImage(image)
+        row = self._row_of.get(property_id)
+        if row is not None and not image.isNull():
+            idx = self.index(row, self.COL_THUMB)
+            self.dataChanged.emit(idx, idx, [Qt.ItemDataRole.DecorationRole])
+
+    # ── QAbstractTableModel ───────────────────────────────────────────────────
+
+    def rowCount(self, parent=QModelIndex()) -> int:   # noqa: N802 — Qt API
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:   # noqa: N802 — Qt API
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):   # noqa: N802
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        r = self._rows[index.row()]
+        col = index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._cell_text(r, col) if col else None
+        if role == Qt.ItemDataRole.ToolTipRole and col == 1 and r.get("relisted_from_id"):
+            return f"Relisted — likely a repost of listing {r.get('relisted_from_record') or '?'}"
+        if role == Qt.ItemDataRole.ToolTipRole and col == self.COL_DEAL and r.get("deal_score") is not None:
+            return _deal_tooltip(r)
+        if role == Qt.ItemDataRole.DecorationRole and col == self.COL_THUMB:
+            pix = self._thumbs.get(r["id"])
+            if pix is None and self._loader and r.get("image_count"):
+                self._loader.request(r["id"])
+            return pix
+        if role == Qt.ItemDataRole.BackgroundRole:
+            if r["_underpriced"]:
+                return self._bg_underpriced
+            return self._bg_active if r["_active"] else self._bg_inactive
+        if role == Qt.ItemDataRole.ForegroundRole:
+            return self._fg if r["_active"] else self._fg_inactive
+        if role == Qt.ItemDataRole.FontRole:
+            return self._font if r["_active"] else self._font_inactive
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if col in self._CENTERED:
+                return Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter
+            return Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
+        return None
+
+    def sort(self, column: int, order=Qt.SortOrder.AscendingOrder) -> None:
+        """Sort in place — numbers numerically, everything else as text."""
+        if column <= self.COL_THUMB or column >= len(self.HEADERS):
+            return
+        field = self._SORT_FIELDS.get(column)
+        if field:
+            key = lambda r: r[field] if r.get(field) is not None else float("inf")
+        else:
+            key = lambda r: self._cell_text(r, column).casefold()
+        self.layoutAboutToBeChanged.emit()
+        self._rows.sort(key=key, reverse=(order == Qt.SortOrder.DescendingOrder))
+        self._reindex()
+        self.layoutChanged.emit()
+
+
 class ResultsWindow(QDialog):
     """Shows all properties for a saved search in a sortable table."""
 
     def __init__(self, parent: QWidget, search_name: str,
                  properties: list[dict], controller,
                  search_id: int | None = None) -> None:
+        """*properties* are rows from controller.get_property_rows()."""
         super().__init__(parent)
         self.setWindowTitle(f"Results — {search_name}")
         self.resize(1300, 620)
@@ -892,47 +1330,49 @@ class ResultsWindow(QDialog):
         layout.setContentsMargins(8, 8, 8, 8)
         layout.setSpacing(6)
 
-        # Table
-        cols = ["", "Status", "Title", "Location", "Price", "€/m²",
-                "First Seen", "Deactivated At", "Days on Market", "Images", "Link"]
-        self._table = QTableWidget(0, len(cols))
-        self._table.setHorizontalHeaderLabels(cols)
+        # Latest area median €/m² (from run_stats) for the summary bar
+        self._area_avg: float | None = None
+        if controller and search_id is not None:
+            history = controller.get_run_stats_history(search_id, limit=1)
+            if history:
+                self._area_avg = _run_sqm_level(history[-1])
+
+        # Table — model/view; thumbnails load lazily for visible rows only
+        db = controller.db if controller else None
+        self._thumb_loader = _ThumbnailLoader(db, self) if db else None
+        self._model = ResultsTableModel(properties, self._thumb_loader, self)
+
+        self._table = QTableView()
+        self._table.setModel(self._model)
         self._table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         self._table.horizontalHeader().setStretchLastSection(True)
+        self._table.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
         self._table.verticalHeader().setVisible(False)
+        self._table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self._table.verticalHeader().setDefaultSectionSize(T.THUMB_H)
         self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self._table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self._table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
         self._table.setFocusPolicy(Qt.FocusPolicy.NoFocus)   # no focus rect on click
         self._table.setAlternatingRowColors(True)
-        self._table.setSortingEnabled(False)   # enabled AFTER populate to avoid row scrambling
+        self._table.setSortingEnabled(True)   # keeps the query's Active-first order until a header is clicked
         self._table.setShowGrid(True)
         self._table.setIconSize(QSize(70, 52))
 
-        # Column widths (0=Thumb, 1=Status, 2=Title, 3=Location, 4=Price, 5=€/m²,
-        #                6=First Seen, 7=Deactivated At, 8=Days on Market, 9=Images, 10=Link)
+        # Column widths (0=Thumb, 1=Status, 2=Title, 3=Location, 4=Price, 5=€/m², 6=Deal,
+        #                7=First Seen, 8=Deactivated At, 9=Days on Market, 10=Images, 11=Link)
         self._table.setColumnWidth(0, 78)
         self._table.setColumnWidth(1, 80)
         self._table.setColumnWidth(2, 220)
         self._table.setColumnWidth(3, 180)
         self._table.setColumnWidth(4, 130)
         self._table.setColumnWidth(5, 90)
-        self._table.setColumnWidth(6, 130)
+        self._table.setColumnWidth(6, 60)
         self._table.setColumnWidth(7, 130)
-        self._table.setColumnWidth(8, 110)
-        self._table.setColumnWidth(9, 60)
-
-        # Fetch latest area avg for underpriced highlighting
-        self._area_avg: float | None = None
-        if controller and search_id is not None:
-            history = controller.get_area_stats_history(search_id, limit=1)
-            if history:
-                self._area_avg = history[-1].get("avg_price_per_sqm")
+        self._table.setColumnWidth(8, 130)
+        self._table.setColumnWidth(9, 110)
+        self._table.setColumnWidth(10, 60)
 
-        self._populate(
-            sorted(properties, key=lambda p: (0 if p["status"] == "Active" else 1)),
-            controller,
-        )
         layout.addWidget(self._table)
 
         # Summary bar
@@ -960,136 +1400,30 @@ class ResultsWindow(QDialog):
 
         layout.addLayout(summary_bar)
 
-        self._table.cellDoubleClicked.connect(self._on_double_click)
-        self._table.cellClicked.connect(self._on_click)
-
-    def _populate(self, properties: list[dict], controller) -> None:
-        from datetime import datetime, date
-
-        db = controller.db if controller else None
-        self._table.setSortingEnabled(False)   # must stay off while inserting
-
-        today = date.today()
-
-        for prop in properties:
-            ph = db.get_price_history(prop["id"]) if db else []
-            current_price = next(
-                (r["price"] for r in ph if r["price_status"] == "Current"), "—"
-            )
-            img_count = db.get_image_count(prop["id"]) if db else 0
-            img_label = f"🖼 {img_count}" if img_count else "—"
-
-            # Thumbnail: first image blob
-            thumb_bytes = db.get_first_image(prop["id"]) if db else None
+        self._table.doubleClicked.connect(lambda idx: self._on_double_click(idx.row(), idx.column()))
+        self._table.clicked.connect(lambda idx: self._on_click(idx.row(), idx.column()))
+        self.finished.connect(self._stop_thumbnail_loader)
 
-            enriched = {**prop, "current_price": current_price}
-
-            row_idx = self._table.rowCount()
-            self._table.insertRow(row_idx)
-            self._table.setRowHeight(row_idx, T.THUMB_H)
-
-            sqm_val = prop.get("price_per_sqm") or "—"
-            is_active = (prop["status"] == "Active")
-
-            # ── Days on Market ─────────────────────────────────────────────
-            dom_str = "—"
-            fs_raw = prop.get("first_seen")
-            if fs_raw:
-                try:
-                    fs_date = datetime.strptime(fs_raw[:10], "%Y-%m-%d").date()
-                    if is_active:
-                        dom_str = str((today - fs_date).days)
-                    else:
-                        end_raw = prop.get("inactivated_at") or prop.get("last_seen")
-                        if end_raw:
-                            end_date = datetime.strptime(end_raw[:10], "%Y-%m-%d").date()
-                            dom_str = str((end_date - fs_date).days)
-                except (ValueError, TypeError):
-                    pass
-
-            # Columns 1..10 text content (col 0 is the thumbnail)
-            cells = [
-                prop["status"],
-                ("🌟 " if bool(prop.get("is_favorite")) else "") + (prop.get("title") or "—"),
-                prop.get("location") or "—",
-                current_price,
-                sqm_val,
-                prop["first_seen"][:16] if prop.get("first_seen") else "—",
-                prop["inactivated_at"][:16] if prop.get("inactivated_at") else "—",
-                dom_str,
-                img_label,
-                prop.get("link") or "—",
-            ]
-
-            # Determine if this row is underpriced (active only; needs numeric sqm)
-            is_underpriced = False
-            if is_active and self._area_avg and sqm_val != "—":
-                try:
-                    sqm_float = float(sqm_val.split()[0].replace(",", "."))
-                    is_underpriced = sqm_float < self._area_avg * 0.9
-                except (ValueError, IndexError):
-                    pass
-
-            if is_underpriced:
-                row_bg = QColor(T.FEED_UNDERPRICED_BG)
-            elif is_active:
-                row_bg = QColor(T.BG2)
-            else:
-                row_bg = QColor(T.BG)
-
-            text_fg  = QColor(T.FG_WHITE) if is_active else QColor(T.FG_DIM)
-            row_font = QFont(T.FONT_FAMILY, T.FONT_SIZE)
-            if not is_active:
-                row_font.setItalic(True)
-
-            # Col 0 — thumbnail
-            thumb_item = QTableWidgetItem()
-            thumb_item.setBackground(QBrush(row_bg))
-            thumb_item.setData(Qt.ItemDataRole.UserRole, enriched)
-            if thumb_bytes:
-                qimg = QImage.fromData(thumb_bytes)
-                if not qimg.isNull():
-                    pix = QPixmap.fromImage(qimg).scaled(
-                        T.THUMB_W, T.THUMB_H - 4,
-                        Qt.AspectRatioMode.KeepAspectRatio,
-                        Qt.TransformationMode.SmoothTransformation,
-                    )
-                    thumb_item.setIcon(QIcon(pix))
-            self._table.setItem(row_idx, 0, thumb_item)
-
-            # Cols 1..10 — text cells
-            for col, val in enumerate(cells, start=1):
-                item = QTableWidgetItem(str(val))
-                item.setForeground(QBrush(text_fg))
-                item.setBackground(QBrush(row_bg))
-                item.setFont(row_font)
-                item.setTextAlignment(
-                    Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter
-                    if col in (1, 5, 6, 7, 8, 9)
-                    else Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
-                )
-                self._table.setItem(row_idx, col, item)
-
-        # Enable sorting now that all rows + UserRole data are in place
-        self._table.setSortingEnabled(True)
+    def _stop_thumbnail_loader(self, *_args) -> None:
+        if self._thumb_loader:
+            self._thumb_loader.stop()
 
     def _on_click(self, row: int, col: int) -> None:
         """Single click on Link column → browser; Price column → mortgage calculator."""
-        if col == 10:
-            link = self._table.item(row, col)
-            if link and link.text() != "—":
-                QDesktopServices.openUrl(QUrl(link.text()))
-        elif col == 4:
-            price_item = self._table.item(row, col)
-            if price_item and price_item.text() != "—":
-                MortgageCalculatorDialog(self, price_item.text()).exec()
+        prop = self._model.row_dict(row)
+        if not prop:
+            return
+        if col == ResultsTableModel.COL_LINK:
+            if prop.get("link"):
+                QDesktopServices.openUrl(QUrl(prop["link"]))
+        elif col == ResultsTableModel.COL_PRICE:
+            if prop["current_price"] != "—":
+                MortgageCalculatorDialog(self, prop["current_price"],
+                                         prop.get("current_price_eur"),
+                                         prop.get("current_vat_excluded")).exec()
 
     def _on_double_click(self, row: int, _col: int) -> None:
-        # Prop is stored on the thumbnail cell (col 0) via UserRole
-        thumb_item = self._table.item(row, 0)
-        if not thumb_item:
-            return
-        prop = thumb_item.data(Qt.ItemDataRole.UserRole)
+        prop = self._model.row_dict(row)
         if not prop:
             return
         gw = GalleryWindow(self, prop, self._controller)
@@ -1098,11 +1432,8 @@ class ResultsWindow(QDialog):
         record_id = prop.get("record_id")
         search_id = prop.get("search_id")
         if record_id and search_id is not None and self._controller:
-            is_fav = self._controller.is_favorite(record_id, search_id)
-            title_item = self._table.item(row, 2)
-            if title_item:
-                raw_title = prop.get("title") or "—"
-                title_item.setText(("🌟 " if is_fav else "") + raw_title)
+            prop["is_favorite"] = 1 if self._controller.is_favorite(record_id, search_id) else 0
+            self._model.refresh_row(row)
 
     def _on_favorite_changed(self, record_id: str, is_now_favorite: bool) -> None:
         pass  # kept for compat — actual update happens in _on_double_click after exec()
@@ -1120,371 +1451,439 @@ class ResultsWindow(QDialog):
 
 # ── Shared charting helper ─────────────────────────────────────────────────────
 
-def _bin_series(dates: list, values: list, bin_by: str = "auto") -> tuple[list, list]:
-    """
-    Aggregate (dates, values) into fewer points for readability.
+def _rolling_avg(values, win: int) -> np.ndarray:
+    """Centred rolling mean with the given window size (clipped at the ends),
+    from one cumulative sum: O(n) whatever the window."""
+    v = np.asarray(values, dtype=float)
+    n = v.size
+    lo = np.maximum(0, np.arange(n) - win // 2)
+    hi = np.minimum(n, lo + win)
+    csum = np.concatenate(([0.0], np.cumsum(v)))
+    return (csum[hi] - csum[lo]) / (hi - lo)
 
-    bin_by:
-      "auto"  – chooses based on span: <90 pts → day, <365 pts → week, else → month
-      "day"   – average per calendar day
-      "week"  – average per ISO week
-      "month" – average per calendar month
 
-    Returns (binned_dates, binned_values) with the bin's midpoint date and mean value.
+def _lttb(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets downsampling: indices of *n_out* points
+    of the series (x ascending) that keep its visual shape — the first and
+    last point, plus from each of n_out − 2 equal buckets the point forming
+    the largest triangle with the previously kept point and the mean of the
+    next bucket. Returns every index when the series is already short enough.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi, next_hi = edges[i], edges[i + 1], edges[i + 2]
+        avg_x, avg_y = x[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def _bin_dates(rows: list[dict]) -> np.ndarray:
+    """Matplotlib date numbers of the run_date of get_run_stats_binned() rows."""
+    import matplotlib.dates as mdates
+    from datetime import datetime
+    return mdates.date2num([datetime.strptime(r["run_date"], "%Y-%m-%d %H:%M:%S") for r in rows])
+
+
+def _run_sqm_level(run: dict) -> float | None:
+    """The area €/m² level of a run_stats row: the median, or the mean for
+    runs recorded before per-run medians were stored."""
+    median = run.get("sqm_median")
+    return median if median is not None else run.get("sqm_mean")
+
+
+class _ChartRender(NamedTuple):
+    """A chart rendered off the GUI thread."""
+    image:  QImage          # null when there is nothing to plot (see message)
+    points: np.ndarray      # (n, 2) widget pixel positions of the clickable dots
+    ids:    np.ndarray      # property id of each clickable dot
+    note:   str             # hint shown under the chart, or the reason there is no chart
+
+
+# Rendered charts keyed by (chart, search, newest finished run id, size):
+# finishing a scrape run changes the key, so stale charts are never served.
+_CHART_CACHE: OrderedDict[tuple, _ChartRender] = OrderedDict()
+_CHART_CACHE_SIZE = 8
+_CHART_CACHE_LOCK = threading.Lock()
+
+
+class _ChartRenderer(QObject):
+    """
+    Renders a chart dialog's figure on a daemon worker thread with the Agg
+    backend: the database reads, downsampling and drawing all happen off the
+    GUI thread, which only receives the finished QImage via *rendered*.
+    Only the newest request is rendered — a resize burst yields one figure.
     """
-    from datetime import datetime, timedelta
-    from collections import defaultdict
-
-    if not dates:
-        return [], []
-
-    span_days = (dates[-1] - dates[0]).days if len(dates) > 1 else 0
-
-    if bin_by == "auto":
-        if span_days <= 90:
-            bin_by = "day"
-        elif span_days <= 365:
-            bin_by = "week"
-        else:
-            bin_by = "month"
-
-    buckets: dict[str, list] = defaultdict(list)
-    for d, v in zip(dates, values):
-        if v is None:
-            continue
-        if bin_by == "day":
-            key = d.strftime("%Y-%m-%d")
-        elif bin_by == "week":
-            key = f"{d.isocalendar()[0]}-W{d.isocalendar()[1]:02d}"
-        else:  # month
-            key = d.strftime("%Y-%m")
-        buckets[key].append((d, v))
-
-    result_dates, result_values = [], []
-    for key in sorted(buckets.keys()):
-        pairs = buckets[key]
-        mid_d = pairs[len(pairs) // 2][0]   # median date in bucket
-        mean_v = sum(p[1] for p in pairs) / len(pairs)
-        result_dates.append(mid_d)
-        result_values.append(mean_v)
-
-    return result_dates, result_values
-
-
-def _rolling_avg(values: list[float], win: int) -> list[float]:
-    """Centred rolling mean with the given window size."""
-    roll = []
-    for i in range(len(values)):
-        lo = max(0, i - win // 2)
-        hi = min(len(values), lo + win)
-        roll.append(sum(values[lo:hi]) / (hi - lo))
-    return roll
 
+    rendered = pyqtSignal(object)   # _ChartRender
 
-# ── Area Average Price Chart ───────────────────────────────────────────────────
+    def __init__(self, render, parent=None) -> None:
+        super().__init__(parent)
+        self._render = render
+        self._queue: queue.Queue = queue.Queue()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name="ChartRenderer")
+        self._thread.start()
+
+    def request(self, width: int, height: int, dpr: float) -> None:
+        self._queue.put((width, height, dpr))
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._queue.put(None)
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            job = self._queue.get()
+            while job is not None and not self._queue.empty():
+                job = self._queue.get()          # skip to the newest size
+            if job is None or self._stopped.is_set():
+                break
+            try:
+                result = self._render(*job)
+            except Exception as exc:
+                logging.error(f"Chart rendering failed: {exc}", exc_info=True)
+                result = _ChartRender(QImage(), np.empty((0, 2)), np.empty(0, dtype=np.int64),
+                                      f"Chart could not be drawn: {exc}")
+            if not self._stopped.is_set():
+                self.rendered.emit(result)
 
-class AreaAvgChartDialog(QDialog):
-    """Line chart of the daily area-average price-per-m² stored in scrape_runs.
 
-    • Each scrape run stores avg_price_per_sqm; multiple runs per day are averaged.
-    • Long histories are binned automatically (day / week / month).
-    • Active property dots are overlaid at their first_seen date.
-    • Click any dot to open that property's gallery.
-    • Green shaded band shows the ±10 % range around the most recent avg.
+class _ChartDialog(QDialog):
+    """
+    Base of the chart dialogs. The figure is drawn by _ChartRenderer on a
+    worker thread at the canvas' pixel size (re-drawn after a resize) and
+    shown as a pixmap; clicking within CLICK_RADIUS pixels of a dot opens
+    the nearest property's gallery. Renders are cached in _CHART_CACHE until
+    the search's next scrape run. Subclasses implement _plot().
     """
 
-    def __init__(self, parent: QWidget, search_name: str,
-                 search_id: int | None, controller) -> None:
+    CLICK_RADIUS = 8      # px
+    RESIZE_DEBOUNCE_MS = 150
+
+    def __init__(self, parent: QWidget, title: str, search_id: int | None,
+                 controller, size: QSize) -> None:
         super().__init__(parent)
-        self.setWindowTitle(f"Area Avg Price/m² — {search_name}")
-        self.resize(960, 540)
-        self.setMinimumSize(500, 320)
+        self.setWindowTitle(title)
+        self.resize(size)
+        self.setMinimumSize(500, 300)
         _set_dark_titlebar(self)
 
         self._controller = controller
         self._search_id  = search_id
-        self._dot_props: dict = {}
+        self._render: Optional[_ChartRender] = None
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(8, 8, 8, 8)
-
-        runs: list[dict] = []
-        if controller and search_id is not None:
-            runs = controller.get_scrape_history(search_id, limit=365)
-
-        # Filter to runs that actually have an avg stored
-        runs_with_avg = [r for r in runs if r.get("avg_price_per_sqm") is not None]
-
-        if not runs_with_avg:
-            layout.addWidget(_dim_label(
-                "No area average data yet. Run a scrape first — avg €/m² is stored per run."
-            ))
-            return
-
+        self._canvas = QLabel("Rendering chart…")
+        self._canvas.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._canvas.setMinimumSize(1, 1)
+        self._canvas.setSizePolicy(QSizePolicy.Policy.Ignored, QSizePolicy.Policy.Ignored)
+        self._canvas.mousePressEvent = self._on_canvas_click
+        layout.addWidget(self._canvas, 1)
+        self._hint = _dim_label("")
+        self._hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self._hint.hide()
+        layout.addWidget(self._hint)
+
+        self._renderer = _ChartRenderer(self._render_cached, self)
+        self._renderer.rendered.connect(self._on_rendered)
+        self.finished.connect(lambda _r: self._renderer.stop())
+        self._resize_timer = QTimer(self)
+        self._resize_timer.setSingleShot(True)
+        self._resize_timer.setInterval(self.RESIZE_DEBOUNCE_MS)
+        self._resize_timer.timeout.connect(self._request_render)
+        QTimer.singleShot(0, self._request_render)     # once laid out
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._resize_timer.start()
+
+    def _request_render(self) -> None:
+        size = self._canvas.size()
+        self._renderer.request(size.width(), size.height(), self.devicePixelRatioF())
+
+    # ── Worker thread ────────────────────────────────────────────────────────
+
+    def _render_cached(self, width: int, height: int, dpr: float) -> _ChartRender:
+        last_run = None
+        if self._controller and self._search_id is not None:
+            # A run still in progress mustn't key a render of its partial data
+            last_run = self._controller.get_last_finished_run_id(self._search_id)
+        key = (type(self).__name__, self._search_id, last_run, width, height, dpr)
+        with _CHART_CACHE_LOCK:
+            if key in _CHART_CACHE:
+                _CHART_CACHE.move_to_end(key)
+                return _CHART_CACHE[key]
+        result = self._draw(width, height, dpr)
+        with _CHART_CACHE_LOCK:
+            _CHART_CACHE[key] = result
+            while len(_CHART_CACHE) > _CHART_CACHE_SIZE:
+                _CHART_CACHE.popitem(last=False)
+        return result
+
+    def _draw(self, width: int, height: int, dpr: float) -> _ChartRender:
+        no_dots = (np.empty((0, 2)), np.empty(0, dtype=np.int64))
         try:
-            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
             from matplotlib.figure import Figure
-            import matplotlib.dates as mdates
-            from datetime import datetime
-
-            # Build raw series (one point per run, oldest first)
-            raw_dates: list[datetime] = []
-            raw_values: list[float]   = []
-            for r in reversed(runs_with_avg):   # runs are newest-first from DB
-                try:
-                    raw_dates.append(datetime.strptime(r["run_date"][:16], "%Y-%m-%d %H:%M"))
-                    raw_values.append(float(r["avg_price_per_sqm"]))
-                except (ValueError, TypeError):
-                    pass
-
-            # Dynamic binning
-            dates, values = _bin_series(raw_dates, raw_values, bin_by="auto")
-
-            if not dates:
-                layout.addWidget(_dim_label("No valid area average data to display."))
-                return
-
-            # ── Scatter dots for active properties ────────────────────────────
-            prop_dots: list[dict] = []
-            if controller and search_id is not None:
-                db = controller.db
-                if db:
-                    # Fetch all properties and explicitly filter to currently Active
-                    # so we do not show dots for inactive listings.
-                    all_props = db.get_properties(search_id, status=None)
-                    fallback_x = dates[-1]
-                    for p in all_props:
-                        # Only show currently active properties
-                        if p.get("status") != "Active":
-                            continue
-
-                        # Parse first_seen if present — use it for the x coordinate
-                        # but do not exclude properties based on first_seen.
-                        fs = p.get("first_seen")
-                        try:
-                            first_seen_dt = datetime.strptime(fs[:16], "%Y-%m-%d %H:%M") if fs else None
-                        except Exception:
-                            first_seen_dt = None
-
-                        raw = p.get("price_per_sqm")
-                        if not raw or raw == "—":
-                            continue
-                        try:
-                            val = float(raw.split()[0].replace(",", "."))
-                        except (ValueError, IndexError):
-                            continue
-
-                        # Place the dot at the property's current €/m² value. Use
-                        # first_seen if available, otherwise place at the latest avg
-                        # point on the x-axis (fallback).
-                        dot_x = first_seen_dt or fallback_x
-                        ph = db.get_price_history(p["id"])
-                        p["current_price"] = next(
-                            (r["price"] for r in ph if r["price_status"] == "Current"), "—"
-                        )
-                        prop_dots.append({"x": dot_x, "y": val, "prop": p})
-
-            # ── Figure ────────────────────────────────────────────────────────
-            fig = Figure(figsize=(9.5, 4.8), tight_layout=True, facecolor="#1e1e1e")
-            ax  = fig.add_subplot(111)
-            ax.set_facecolor("#2b2b2b")
-
-            # Main avg line
-            ax.plot(dates, values, color="#0d7aff", linewidth=2.0, marker="o",
-                    markersize=4, label="Avg €/m²", zorder=2)
-
-            # Rolling trend line (7-pt centred window, or fewer if little data)
-            if len(values) >= 2:
-                win = min(7, len(values))
-                roll = _rolling_avg(values, win)
-                ax.plot(dates, roll, color="#4caf50", linewidth=1.8,
-                        linestyle="--", alpha=0.85, label=f"{win}-pt trend", zorder=3)
-
-            # Green ±10 % band around the most-recent avg value
-            last_avg = values[-1]
-            ax.axhspan(last_avg * 0.9, last_avg * 1.1, alpha=0.07,
-                       color="#4caf50",
-                       label=f"±10 % of latest ({last_avg:.0f} €/m²)")
-
-            # Annotate latest point
-            ax.annotate(f"{last_avg:.2f}",
-                        xy=(dates[-1], last_avg),
-                        xytext=(10, 6), textcoords="offset points",
-                        color="#ffffff", fontsize=8)
-
-            # Property scatter dots
-            if prop_dots:
-                xs = [d["x"] for d in prop_dots]
-                ys = [d["y"] for d in prop_dots]
-                colors = [
-                    "#ff9800" if d["y"] < last_avg * 0.9 else "#e0e0e0"
-                    for d in prop_dots
-                ]
-                sc = ax.scatter(xs, ys, c=colors, s=55, zorder=4,
-                                picker=8, edgecolors="#555555", linewidths=0.5,
-                                label=f"Active listings ({len(prop_dots)})")
-                self._dot_props[sc] = prop_dots
-
-            # ── Axis padding so sparse data isn't crammed in a corner ────────
-            from datetime import timedelta as _td
-            all_x = dates + ([d["x"] for d in prop_dots] if prop_dots else [])
-            all_y = values + ([d["y"] for d in prop_dots] if prop_dots else [])
-            if all_x:
-                x_lo, x_hi = min(all_x), max(all_x)
-                span = x_hi - x_lo if x_hi != x_lo else _td(days=1)
-                x_pad = max(_td(days=1), span * 0.05)
-                ax.set_xlim(x_lo - x_pad, x_hi + x_pad)
-            if all_y:
-                y_lo, y_hi = min(all_y), max(all_y)
-                y_margin = max(1.0, (y_hi - y_lo) * 0.15) if y_hi != y_lo else max(1.0, y_hi * 0.10)
-                ax.set_ylim(y_lo - y_margin, y_hi + y_margin)
-
-            # Axes formatting
-            ax.xaxis.set_major_formatter(mdates.DateFormatter("%d %b '%y"))
-            ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-            fig.autofmt_xdate(rotation=30)
-            ax.set_ylabel("€/m²", color="#e8e8e8")
-            ax.set_xlabel("Date", color="#e8e8e8")
-            ax.tick_params(colors="#888888")
-            ax.spines[:].set_color("#333333")
-            ax.legend(facecolor="#2b2b2b", labelcolor="#e8e8e8",
-                      framealpha=0.8, fontsize=8)
-
-            canvas = FigureCanvasQTAgg(fig)
-            layout.addWidget(canvas)
-
-            if prop_dots:
-                hint = _dim_label(
-                    "Click a dot to open the property gallery  •  orange = >10 % below latest avg"
-                )
-                hint.setAlignment(Qt.AlignmentFlag.AlignCenter)
-                layout.addWidget(hint)
-
-                def _on_pick(event) -> None:
-                    artist = event.artist
-                    if artist not in self._dot_props:
-                        return
-                    idx = event.ind[0]
-                    prop = self._dot_props[artist][idx]["prop"]
-                    gw = GalleryWindow(self, prop, self._controller)
-                    gw.exec()
-
-                fig.canvas.mpl_connect("pick_event", _on_pick)
-
         except ImportError:
-            layout.addWidget(_dim_label(
-                "matplotlib is not installed. Run:  pip install matplotlib"
-            ))
-
+            return _ChartRender(QImage(), *no_dots,
+                                "matplotlib is not installed. Run:  pip install matplotlib")
+
+        fig = Figure(figsize=(width / 100, height / 100), dpi=100 * dpr,
+                     tight_layout=True, facecolor="#1e1e1e")
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot(111)
+        ax.set_facecolor("#2b2b2b")
+        plotted = self._plot(ax, width)
+        if isinstance(plotted, str):                 # nothing to plot
+            return _ChartRender(QImage(), *no_dots, plotted)
+        dots, ids, note = plotted
+        ax.tick_params(colors="#888888")
+        ax.spines[:].set_color("#333333")
+        ax.legend(facecolor="#2b2b2b", labelcolor="#e8e8e8", framealpha=0.8, fontsize=8)
+        canvas.draw()
+
+        w_px, h_px = canvas.get_width_height()
+        rgba = np.asarray(canvas.buffer_rgba())
+        image = QImage(rgba.data, w_px, h_px, 4 * w_px, QImage.Format.Format_RGBA8888).copy()
+        image.setDevicePixelRatio(dpr)
+        points = np.empty((0, 2))
+        if len(dots):
+            # Display coordinates are device pixels from the bottom-left corner
+            disp = ax.transData.transform(dots)
+            points = np.column_stack((disp[:, 0], h_px - disp[:, 1])) / dpr
+        return _ChartRender(image, points, ids, note)
+
+    def _plot(self, ax, width: int):
+        """Plot onto *ax* (on the worker thread) for a canvas *width* px wide.
+        Return (dots (n, 2) data coordinates, property ids, hint) or a
+        message string when there is nothing to plot."""
+        raise NotImplementedError
+
+    # ── GUI thread ───────────────────────────────────────────────────────────
+
+    def _on_rendered(self, render: _ChartRender) -> None:
+        self._render = render
+        if render.image.isNull():
+            self._canvas.setPixmap(QPixmap())
+            self._canvas.setText(render.note)
+            self._hint.hide()
+            return
+        self._canvas.setAlignment(Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop)
+        self._canvas.setPixmap(QPixmap.fromImage(render.image))
+        self._hint.setText(render.note)
+        self._hint.setVisible(bool(render.note))
+
+    def _on_canvas_click(self, event) -> None:
+        render = self._render
+        if render is None or not len(render.points) or not self._controller or not self._controller.db:
+            return
+        pos = event.position()
+        dist = np.hypot(render.points[:, 0] - pos.x(), render.points[:, 1] - pos.y())
+        nearest = int(dist.argmin())
+        if dist[nearest] > self.CLICK_RADIUS:
+            return
+        prop = self._controller.db.get_property(int(render.ids[nearest]), self._search_id)
+        if not prop:
+            return
+        prop["current_price"] = prop.get("current_price") or "—"
+        GalleryWindow(self, prop, self._controller).exec()
 
-# ── Active Listings History Chart ──────────────────────────────────────────────
 
-class ListingsFoundChartDialog(QDialog):
-    """Line chart of active listing counts over time, sourced from scrape_runs.
+# ── Area Average Price Chart ───────────────────────────────────────────────────
 
-    Multiple runs on the same day are averaged.
-    Long histories are binned automatically (day / week / month).
+class AreaAvgChartDialog(_ChartDialog):
+    """Line chart of the area median price-per-m² stored per run in run_stats.
+
+    • Each scrape run stores a robust summary (median, quartiles, P10/P90);
+      runs are averaged per day / week / month in SQL
+      (get_run_stats_binned). Runs recorded before the summary existed fall
+      back to their mean.
+    • The shaded band is the interquartile range (Q1–Q3) of €/m².
+    • Active property dots are overlaid at their first_seen date, from the
+      numeric arrays of get_active_sqm_points, LTTB-downsampled to the
+      canvas width (deals are always drawn).
+    • Click any dot to open that property's gallery.
+    • Green shaded band shows the ±10 % range around the most recent median.
     """
 
     def __init__(self, parent: QWidget, search_name: str,
                  search_id: int | None, controller) -> None:
-        super().__init__(parent)
-        self.setWindowTitle(f"Active Listings History — {search_name}")
-        self.resize(960, 500)
-        self.setMinimumSize(500, 300)
-        _set_dark_titlebar(self)
+        super().__init__(parent, f"Area Median Price/m² — {search_name}",
+                         search_id, controller, QSize(960, 540))
 
-        layout = QVBoxLayout(self)
-        layout.setContentsMargins(8, 8, 8, 8)
+    def _plot(self, ax, width: int):
+        import matplotlib.dates as mdates
+        from datetime import datetime
 
-        runs: list[dict] = []
+        controller, search_id = self._controller, self._search_id
+        bins: list[dict] = []
+        if controller and search_id is not None:
+            bins = controller.get_run_stats_binned(search_id)
+
+        # Only bins with a €/m² figure stored
+        bins = [b for b in bins if b["sqm_level"] is not None]
+        if not bins:
+            return "No area price data yet. Run a scrape first — €/m² statistics are stored per run."
+
+        dates  = _bin_dates(bins)
+        values = np.array([b["sqm_level"] for b in bins], dtype=float)
+        q1     = np.array([b["sqm_q1"] for b in bins], dtype=float)    # None → NaN gap
+        q3     = np.array([b["sqm_q3"] for b in bins], dtype=float)
+        keep   = _lttb(dates, values, width)
+        roll   = _rolling_avg(values, min(7, len(values)))[keep]
+        dates, values, q1, q3 = dates[keep], values[keep], q1[keep], q3[keep]
+
+        # ── Scatter dots for active properties ────────────────────────────────
+        # Numeric arrays from one query; dots without a first_seen sit at the
+        # latest bin on the x-axis. Downsampled to the canvas width by LTTB
+        # over the non-deal dots; every deal stays.
+        points = None
         if controller and search_id is not None:
-            runs = controller.get_scrape_history(search_id, limit=365)
+            points = controller.get_active_sqm_points(search_id)
+        if points is None:
+            points = {"id": np.empty(0, dtype=np.int64), "first_seen": np.empty(0),
+                      "sqm": np.empty(0), "deal": np.empty(0, dtype=bool)}
+        epoch = mdates.date2num(datetime(1970, 1, 1))
+        all_x = np.where(np.isnan(points["first_seen"]), dates[-1], points["first_seen"] + epoch)
+        total = all_x.size
+        order = np.argsort(all_x, kind="stable")
+        plain = order[~points["deal"][order]]
+        shown = np.concatenate((plain[_lttb(all_x[plain], points["sqm"][plain], width)],
+                                np.flatnonzero(points["deal"])))
+        dot_x, dot_y = all_x[shown], points["sqm"][shown]
+        dot_ids, dot_deal = points["id"][shown], points["deal"][shown]
+
+        ax.xaxis_date()
+
+        # Interquartile band, then the main median line
+        if np.isfinite(q1).any():
+            ax.fill_between(dates, q1, q3, color="#0d7aff", alpha=0.12,
+                            linewidth=0, label="Q1–Q3 €/m²", zorder=1)
+        ax.plot(dates, values, color="#0d7aff", linewidth=2.0, marker="o",
+                markersize=4, label="Median €/m²", zorder=2)
+
+        # Rolling trend line (7-pt centred window, or fewer if little data)
+        if len(values) >= 2:
+            ax.plot(dates, roll, color="#4caf50", linewidth=1.8, linestyle="--", alpha=0.85,
+                    label=f"{min(7, len(bins))}-pt trend", zorder=3)
+
+        # Green ±10 % band around the most-recent median value
+        last_avg = float(values[-1])
+        ax.axhspan(last_avg * 0.9, last_avg * 1.1, alpha=0.07,
+                   color="#4caf50",
+                   label=f"±10 % of latest ({last_avg:.0f} €/m²)")
+
+        # Annotate latest point
+        ax.annotate(f"{last_avg:.2f}",
+                    xy=(dates[-1], last_avg),
+                    xytext=(10, 6), textcoords="offset points",
+                    color="#ffffff", fontsize=8)
+
+        # Property scatter dots
+        if dot_y.size:
+            ax.scatter(dot_x, dot_y, c=np.where(dot_deal, "#ff9800", "#e0e0e0"), s=55, zorder=4,
+                       edgecolors="#555555", linewidths=0.5,
+                       label=f"Active listings ({total})")
+
+        # ── Axis padding so sparse data isn't crammed in a corner ────────────
+        span_x = np.concatenate((dates, dot_x))
+        span_y = np.concatenate((values, dot_y))
+        x_lo, x_hi = float(span_x.min()), float(span_x.max())
+        x_pad = max(1.0, (x_hi - x_lo) * 0.05)          # date numbers are days
+        ax.set_xlim(x_lo - x_pad, x_hi + x_pad)
+        y_lo, y_hi = float(span_y.min()), float(span_y.max())
+        y_margin = max(1.0, (y_hi - y_lo) * 0.15) if y_hi != y_lo else max(1.0, y_hi * 0.10)
+        ax.set_ylim(y_lo - y_margin, y_hi + y_margin)
+
+        # Axes formatting
+        ax.xaxis.set_major_formatter(mdates.DateFormatter("%d %b '%y"))
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        ax.figure.autofmt_xdate(rotation=30)
+        ax.set_ylabel("€/m²", color="#e8e8e8")
+        ax.set_xlabel("Date", color="#e8e8e8")
+
+        note = ""
+        if dot_y.size:
+            note = "Click a dot to open the property gallery  •  orange = underpriced (deal score)"
+            if dot_y.size < total:
+                note += f"  •  {dot_y.size} of {total} listings drawn"
+        return np.column_stack((dot_x, dot_y)), dot_ids, note
 
-        if not runs:
-            layout.addWidget(_dim_label("No scrape runs yet for this search."))
-            return
 
-        try:
-            from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
-            from matplotlib.figure import Figure
-            import matplotlib.dates as mdates
-            from datetime import datetime
+# ── Active Listings History Chart ──────────────────────────────────────────────
 
-            # Build raw series oldest-first; prefer active_count, fall back to records_found
-            raw_dates: list[datetime] = []
-            raw_values: list[float]   = []
-            for r in reversed(runs):
-                try:
-                    raw_dates.append(datetime.strptime(r["run_date"][:16], "%Y-%m-%d %H:%M"))
-                    v = r.get("active_count")
-                    if v is None:
-                        v = r.get("records_found", 0)
-                    raw_values.append(float(v))
-                except (ValueError, TypeError):
-                    pass
-
-            dates, values = _bin_series(raw_dates, raw_values, bin_by="auto")
-
-            if not dates:
-                layout.addWidget(_dim_label("No valid data to display."))
-                return
+class ListingsFoundChartDialog(_ChartDialog):
+    """Line chart of active listing counts over time, sourced from run_stats.
 
-            fig = Figure(figsize=(9.5, 4.5), tight_layout=True, facecolor="#1e1e1e")
-            ax  = fig.add_subplot(111)
-            ax.set_facecolor("#2b2b2b")
-
-            # Line + markers (no fill_between — it fills from y=0 and looks wrong
-            # with only a few data points)
-            ax.plot(dates, values, color="#0d7aff", linewidth=2.0, marker="o",
-                    markersize=6, label="Active listings", zorder=2)
-
-            # Rolling trend line (only meaningful with 3+ points)
-            if len(values) >= 3:
-                win = min(7, len(values))
-                roll = _rolling_avg(values, win)
-                ax.plot(dates, roll, color="#4caf50", linewidth=1.8,
-                        linestyle="--", alpha=0.9, label=f"{win}-pt trend", zorder=3)
-
-            # Annotate latest point
-            ax.annotate(f"{values[-1]:.0f}",
-                        xy=(dates[-1], values[-1]),
-                        xytext=(0, 10), textcoords="offset points",
-                        ha="center", color="#ffffff", fontsize=9)
-
-            # ── Axis padding so a single point isn't crammed in a corner ─────
-            from datetime import timedelta
-            if len(dates) == 1:
-                # Single point: centre it with ±1 day x-margin and ±10 % y-margin
-                ax.set_xlim(dates[0] - timedelta(days=1), dates[0] + timedelta(days=1))
-            else:
-                span = dates[-1] - dates[0]
-                pad = max(timedelta(days=1), span * 0.05)
-                ax.set_xlim(dates[0] - pad, dates[-1] + pad)
-
-            if values:
-                lo, hi = min(values), max(values)
-                margin = max(1.0, (hi - lo) * 0.15) if hi != lo else max(1.0, hi * 0.15)
-                ax.set_ylim(max(0, lo - margin), hi + margin)
-
-            ax.xaxis.set_major_formatter(mdates.DateFormatter("%d %b '%y"))
-            ax.xaxis.set_major_locator(mdates.AutoDateLocator())
-            fig.autofmt_xdate(rotation=30)
-            ax.set_ylabel("Active listings", color="#e8e8e8")
-            ax.set_xlabel("Date", color="#e8e8e8")
-            ax.tick_params(colors="#888888")
-            ax.spines[:].set_color("#333333")
-            ax.legend(facecolor="#2b2b2b", labelcolor="#e8e8e8",
-                      framealpha=0.8, fontsize=8)
-
-            canvas = FigureCanvasQTAgg(fig)
-            layout.addWidget(canvas)
-
-        except ImportError:
-            layout.addWidget(_dim_label(
-                "matplotlib is not installed. Run:  pip install matplotlib"
-            ))
+    Runs are averaged per day / week / month in SQL (get_run_stats_binned),
+    so long histories stay a few dozen points; longer series are
+    LTTB-downsampled to the canvas width.
+    """
 
+    def __init__(self, parent: QWidget, search_name: str,
+                 search_id: int | None, controller) -> None:
+        super().__init__(parent, f"Active Listings History — {search_name}",
+                         search_id, controller, QSize(960, 500))
+
+    def _plot(self, ax, width: int):
+        import matplotlib.dates as mdates
+
+        bins: list[dict] = []
+        if self._controller and self._search_id is not None:
+            bins = self._controller.get_run_stats_binned(self._search_id)
+        if not bins:
+            return "No scrape runs yet for this search."
+
+        dates  = _bin_dates(bins)
+        values = np.array([b["active_count"] for b in bins], dtype=float)
+        keep   = _lttb(dates, values, width)
+        roll   = _rolling_avg(values, min(7, len(values)))[keep]
+        dates, values = dates[keep], values[keep]
+
+        ax.xaxis_date()
+
+        # Line + markers (no fill_between — it fills from y=0 and looks wrong
+        # with only a few data points)
+        ax.plot(dates, values, color="#0d7aff", linewidth=2.0, marker="o",
+                markersize=6, label="Active listings", zorder=2)
+
+        # Rolling trend line (only meaningful with 3+ points)
+        if len(values) >= 3:
+            ax.plot(dates, roll, color="#4caf50", linewidth=1.8, linestyle="--", alpha=0.9,
+                    label=f"{min(7, len(bins))}-pt trend", zorder=3)
+
+        # Annotate latest point
+        ax.annotate(f"{values[-1]:.0f}",
+                    xy=(dates[-1], values[-1]),
+                    xytext=(0, 10), textcoords="offset points",
+                    ha="center", color="#ffffff", fontsize=9)
+
+        # ── Axis padding so a single point isn't crammed in a corner ─────────
+        # (date numbers are days: at least ±1 day)
+        pad = max(1.0, float(dates[-1] - dates[0]) * 0.05)
+        ax.set_xlim(dates[0] - pad, dates[-1] + pad)
+
+        lo, hi = float(values.min()), float(values.max())
+        margin = max(1.0, (hi - lo) * 0.15) if hi != lo else max(1.0, hi * 0.15)
+        ax.set_ylim(max(0, lo - margin), hi + margin)
+
+        ax.xaxis.set_major_formatter(mdates.DateFormatter("%d %b '%y"))
+        ax.xaxis.set_major_locator(mdates.AutoDateLocator())
+        ax.figure.autofmt_xdate(rotation=30)
+        ax.set_ylabel("Active listings", color="#e8e8e8")
+        ax.set_xlabel("Date", color="#e8e8e8")
+        return np.empty((0, 2)), np.empty(0, dtype=np.int64), ""
 
 
 class ImotScraperMainWindow(QMainWindow):
@@ -1512,25 +1911,22 @@ class ImotScraperMainWindow(QMainWindow):
         self._scheduler_running = False
         self._scrape_running    = False   # True while any scrape (manual or scheduled) is active
 
-        # Feed bridge: log handler → Qt signal → slot on main thread
+        # Feed bridge: scraper event bus → Qt signal → slot on main thread
         self._feed_bridge = FeedBridge()
         self._feed_bridge.event_received.connect(self._append_feed_row)
         self._feed_bridge.search_progress.connect(self._on_search_progress)
-        self._feed_link_map: dict[int, str] = {}   # feed table row → link
-
-        self._feed_handler = ResultsFeedHandler(self._feed_bridge)
-        root_logger = logging.getLogger()
-        if not any(isinstance(h, ResultsFeedHandler) for h in root_logger.handlers):
-            root_logger.addHandler(self._feed_handler)
-        root_logger.setLevel(logging.INFO)
+        self._unsubscribe_feed = (
+            self.controller.subscribe_events(ScraperEvent, self._feed_bridge.on_scraper_event)
+            if self.controller else (lambda: None)
+        )
+        logging.getLogger().setLevel(logging.INFO)
 
         self._scrape_finished.connect(self._on_scrape_finished)
         self._scrape_starting.connect(self._on_scrape_starting)
         self._sched_prepare.connect(self._on_sched_prepare)
 
         self._build_ui()
-        self._load_searches()
-        self._load_view_buttons()
+        self._load_when_db_ready()
 
     # ── UI Construction ────────────────────────────────────────────────────────
 
@@ -1609,6 +2005,13 @@ class ImotScraperMainWindow(QMainWindow):
         run_bar = QWidget()
         run_layout = QHBoxLayout(run_bar)
         run_layout.setContentsMargins(0, 0, 0, 0)
+        # Full-text search across all saved searches' listings
+        self._search_edit = QLineEdit()
+        self._search_edit.setPlaceholderText("🔍  Search all listings (title, location, description)…")
+        self._search_edit.setClearButtonEnabled(True)
+        self._search_edit.setMinimumWidth(320)
+        self._search_edit.returnPressed.connect(self._open_listing_search)
+        run_layout.addWidget(self._search_edit, stretch=1)
         run_layout.addStretch()
         self._run_btn = _styled_btn("▶  Run Scraping Now", style="green", min_width=180)
         self._run_btn.clicked.connect(self.start_scraping)
@@ -1666,9 +2069,11 @@ class ImotScraperMainWindow(QMainWindow):
         feed_layout = QVBoxLayout(feed_group)
         feed_layout.setContentsMargins(6, 12, 6, 6)   # top=12 keeps text clear of groupbox title
 
-        self._feed_table = QTableWidget(0, 4)
+        self._feed_model = FeedTableModel(self)
+        self._feed_model.batch_flushed.connect(self._on_feed_flushed)
+        self._feed_table = QTableView()
         self._feed_table.setObjectName("feedTable")
-        self._feed_table.setHorizontalHeaderLabels(["Search", "Type", "Title", "Price"])
+        self._feed_table.setModel(self._feed_model)
         self._feed_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
         self._feed_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)
         self._feed_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)
@@ -1677,6 +2082,9 @@ class ImotScraperMainWindow(QMainWindow):
         self._feed_table.setColumnWidth(1, 110)
         self._feed_table.setColumnWidth(3, 264)
         self._feed_table.verticalHeader().setVisible(False)
+        # Uniform fixed row height — the view never measures rows individually
+        self._feed_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self._feed_table.verticalHeader().setDefaultSectionSize(T.ROW_H + 6)
         self._feed_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self._feed_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self._feed_table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
@@ -1684,7 +2092,11 @@ class ImotScraperMainWindow(QMainWindow):
         self._feed_table.setShowGrid(True)
         self._feed_table.setGridStyle(Qt.PenStyle.SolidLine)
         self._feed_table.setItemDelegate(_FeedDelegate(self._feed_table))
-        self._feed_table.cellDoubleClicked.connect(self._on_feed_double_click)
+        self._feed_table.doubleClicked.connect(
+            lambda index: self._on_feed_double_click(index.row(), index.column())
+        )
+        self._feed_follow_tail = True
+        self._feed_table.verticalScrollBar().valueChanged.connect(self._on_feed_scrolled)
 
         feed_layout.addWidget(self._feed_table)
         lower_layout.addWidget(feed_group, stretch=1)
@@ -1697,6 +2109,21 @@ class ImotScraperMainWindow(QMainWindow):
 
     # ── Search list ───────────────────────────────────────────────────────────
 
+    def _load_when_db_ready(self) -> None:
+        """Load searches now, or poll while a background schema migration runs."""
+        if self.controller and not self.controller.is_db_ready():
+            progress = self.controller.db_migration_progress()
+            detail = f" — step {progress[0]}/{progress[1]}: {progress[2]}" if progress else ""
+            self._status_lbl.setText(f"  ⏳  Upgrading database{detail}…")
+            self._status_lbl.setStyleSheet(f"color: {T.YELLOW}; font-size: 12px;")
+            QTimer.singleShot(100, self._load_when_db_ready)
+            return
+        if "Upgrading database" in self._status_lbl.text():
+            self._status_lbl.setText("  No scrape run yet")
+            self._status_lbl.setStyleSheet(f"color: {T.FG_DIM}; font-size: 12px;")
+        self._load_searches()
+        self._load_view_buttons()
+
     def _load_searches(self) -> None:
         self._search_list.clear()
         self._search_ids.clear()
@@ -1812,11 +2239,11 @@ class ImotScraperMainWindow(QMainWindow):
     # ── Results / Gallery ──────────────────────────────────────────────────────
 
     def _open_results(self, search_name: str) -> None:
+        search_id = self._search_ids.get(search_name)
         props = (
-            self.controller.get_properties_for_search(search_name)
-            if self.controller else []
+            self.controller.get_property_rows(search_id)
+            if self.controller and search_id is not None else []
         )
-        search_id = self._search_ids.get(search_name)
         win = ResultsWindow(self, search_name, props, self.controller, search_id=search_id)
         win.exec()
 
@@ -1828,79 +2255,37 @@ class ImotScraperMainWindow(QMainWindow):
 
     def _show_feed_placeholder(self) -> None:
         """Clear feed and show a single centred hint row."""
-        self._feed_table.setRowCount(0)
-        self._feed_link_map.clear()
-
-        hint_row = 0
-        self._feed_table.insertRow(hint_row)
-        self._feed_table.setRowHeight(hint_row, T.ROW_H)
-        hint_item = QTableWidgetItem("Run a scrape to see results here")
-        hint_item.setForeground(QBrush(QColor(T.FG_DIM)))
-        hint_item.setTextAlignment(
-            Qt.AlignmentFlag.AlignCenter | Qt.AlignmentFlag.AlignVCenter
-        )
-        self._feed_table.setItem(hint_row, 0, hint_item)
-        self._feed_table.setSpan(hint_row, 0, 1, 4)
-
-    def _append_feed_row(self, event: dict) -> None:
-        """Slot — called on main thread via FeedBridge signal."""
-        kind        = event["kind"]
-        title       = event["title"]
-        price       = event["price"]
-        search_name = event.get("search_name", "")
-        link        = event.get("link", "")
-
-        price_display = (
-            f"{event['old_price']} → {price}"
-            if kind == "CHANGED" else price
-        )
+        self._feed_model.clear(placeholder="Run a scrape to see results here")
+        self._feed_table.setSpan(0, 0, 1, len(FeedTableModel.HEADERS))
 
-        # Pick colours — favorites override the kind-based colour
-        bg_map = {
-            "NEW":         T.FEED_NEW_BG,
-            "CHANGED":     T.FEED_CHANGED_BG,
-            "DEACTIVATED": T.FEED_DELETED_BG,
-        }
-        kind_color = QColor(bg_map.get(kind, T.BG2))
-
-        # Check if this listing is a favorite
-        is_fav = False
-        if link and self.controller and self.controller.db:
-            prop = self.controller.db.get_property_by_link(link)
-            if prop:
-                is_fav = bool(prop.get("is_favorite"))
-
-        bg_color = kind_color
-        fg_color = QColor(T.FG_WHITE)
-        font     = _bold_font()
-
-        # Prefix title with star if favorite
-        display_title = ("🌟 " + title) if is_fav else title
-
-        row = self._feed_table.rowCount()
-        self._feed_table.insertRow(row)
-        self._feed_table.setRowHeight(row, T.ROW_H + 6)
-
-        for col, text in enumerate((search_name, kind, display_title, price_display)):
-            item = QTableWidgetItem(text)
-            item.setBackground(QBrush(bg_color))
-            item.setForeground(QBrush(fg_color))
-            item.setFont(font)
-            item.setTextAlignment(
-                Qt.AlignmentFlag.AlignCenter
-                if col in (0, 1, 2, 3)
-                else Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignLeft
-            )
-            self._feed_table.setItem(row, col, item)
+    def _clear_feed(self) -> None:
+        self._feed_table.clearSpans()
+        self._feed_model.clear()
+        self._feed_follow_tail = True
+
+    def _append_feed_row(self, event: ListingEvent) -> None:
+        """Slot — called on main thread via FeedBridge signal.
+        Only queues the event; FeedTableModel inserts rows in timed batches."""
+        if self._feed_model.has_placeholder():
+            self._feed_table.clearSpans()
+        self._feed_model.enqueue(event)
+
+    def _on_feed_flushed(self, _count: int) -> None:
+        """Follow the tail once per batch — unless the user scrolled up to read."""
+        if self._feed_follow_tail:
+            self._feed_table.scrollToBottom()
 
-        self._feed_link_map[row] = link
-        self._feed_table.scrollToBottom()
+    def _on_feed_scrolled(self, value: int) -> None:
+        self._feed_follow_tail = value >= self._feed_table.verticalScrollBar().maximum()
 
     def _on_feed_double_click(self, row: int, _col: int) -> None:
-        link = self._feed_link_map.get(row, "")
-        if not link or not self.controller or not self.controller.db:
+        event = self._feed_model.event_at(row)
+        if not event or not self.controller or not self.controller.db:
             return
-        prop = self.controller.db.get_property_by_link(link)
+        if event.property_id is not None:
+            prop = self.controller.db.get_property(event.property_id)
+        else:
+            prop = self.controller.db.get_property_by_link(event.link)
         if not prop:
             QMessageBox.information(
                 self, "Not found",
@@ -1908,10 +2293,7 @@ class ImotScraperMainWindow(QMainWindow):
                 "It may still be saving — try again in a moment.",
             )
             return
-        ph = self.controller.db.get_price_history(prop["id"])
-        prop["current_price"] = next(
-            (r["price"] for r in ph if r["price_status"] == "Current"), "—"
-        )
+        prop["current_price"] = prop.get("current_price") or "—"
         self._open_gallery(prop)
 
     # ── Scheduler ─────────────────────────────────────────────────────────────
@@ -1986,9 +2368,7 @@ class ImotScraperMainWindow(QMainWindow):
         self._scrape_running = True
         self._run_btn.setEnabled(False)
         self._run_btn.setText("Scraping...")
-        self._feed_table.clearContents()
-        self._feed_table.setRowCount(0)
-        self._feed_link_map.clear()
+        self._clear_feed()
         self._status_lbl.setText("  ⏳  Starting scrape…")
         self._status_lbl.setStyleSheet(f"color: {T.YELLOW}; font-size: 12px;")
         self._status_counts_lbl.setText("")
@@ -2059,22 +2439,20 @@ class ImotScraperMainWindow(QMainWindow):
             except Exception as exc:
                 logging.error(f"Error sending email reports: {exc}")
 
-        row_count = self._feed_table.rowCount()
-        n_new = n_chg = 0
-        for r in range(row_count):
-            kind_item = self._feed_table.item(r, 1)   # col 1 = "Type"
-            if kind_item:
-                if kind_item.text() == "NEW":
-                    n_new += 1
-                elif kind_item.text() == "CHANGED":
-                    n_chg += 1
+        # Running counters — no rescan of the feed rows
+        self._feed_model.flush()
+        n_new = self._feed_model.counts["NEW"]
+        n_rel = self._feed_model.counts["RELISTED"]
+        n_chg = self._feed_model.counts["CHANGED"]
+        n_deal = self._feed_model.counts["DEAL"]
 
         self._status_lbl.setText("  Last run finished")
         self._status_lbl.setStyleSheet(f"color: {T.FG_DIM}; font-size: 12px;")
-        summary = f"✔  {n_new} new  |  {n_chg} changed"
+        summary = f"✔  {n_new} new  |  {n_rel} relisted  |  {n_chg} changed  |  {n_deal} deals"
         self._status_counts_lbl.setText(f"{summary}  ")
 
-        logging.info(f"Scraping completed — {n_new} new, {n_chg} changed.")
+        logging.info(f"Scraping completed — {n_new} new, {n_rel} relisted, {n_chg} changed, "
+                     f"{n_deal} deals.")
         self._run_btn.setEnabled(True)
         self._run_btn.setText("▶  Run Scraping Now")
 
@@ -2093,8 +2471,15 @@ class ImotScraperMainWindow(QMainWindow):
 
     # ── Run history ───────────────────────────────────────────────────────────
 
+    def _open_listing_search(self) -> None:
+        query = self._search_edit.text().strip()
+        if not query:
+            return
+        dlg = ListingSearchDialog(self, query, self.controller)
+        dlg.exec()
+
     def _open_run_history(self) -> None:
-        dlg = RunHistoryDialog(self, self.controller)
+        dlg = RunHistoryDialog(self, self.controller, scrape_running=self._scrape_running)
         _set_dark_titlebar(dlg)
         dlg.exec()
 
@@ -2110,6 +2495,7 @@ class ImotScraperMainWindow(QMainWindow):
             logging.info("Stopping scheduler before exit...")
             if self.controller:
                 self.controller.stop_scheduler()
+        self._unsubscribe_feed()
         event.accept()
 
     # ── Qt invokable slots for cross-thread calls ─────────────────────────────
@@ -2279,7 +2665,7 @@ class RestoreDialog(QDialog):
         # Back up current DB before overwriting
         try:
             if self._controller:
-                self._controller.backup_database()
+                self._controller.backup_database(force=True)
         except Exception:
             pass
 
@@ -2325,11 +2711,14 @@ class RunHistoryDialog(QDialog):
     Shows one row per scrape execution (each execution = one call to execute()).
     The Searches column shows the comma-joined list of search names that ran.
     Failed runs are tinted red; the Errors column shows the error message inline.
+    A run still open is RUNNING while the app is scraping and it is its
+    search's newest row, INTERRUPTED otherwise (the scrape died mid-run).
+    Runs executed in profiling mode show a 📄 link that opens the report.
     """
 
-    _COLS = ["Date", "Searches", "Found", "New", "Changed", "Inactive", "Status", "Errors"]
+    _COLS = ["Date", "Searches", "Found", "New", "Changed", "Inactive", "Status", "Profile", "Errors"]
 
-    def __init__(self, parent: QWidget, controller) -> None:
+    def __init__(self, parent: QWidget, controller, scrape_running: bool = False) -> None:
         super().__init__(parent)
         self.setWindowTitle("Run History")
         self.setMinimumSize(900, 480)
@@ -2349,38 +2738,49 @@ class RunHistoryDialog(QDialog):
         hdr.setSectionResizeMode(4, QHeaderView.ResizeMode.Fixed)          # Changed
         hdr.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)          # Inactive
         hdr.setSectionResizeMode(6, QHeaderView.ResizeMode.Fixed)          # Status
-        hdr.setSectionResizeMode(7, QHeaderView.ResizeMode.Stretch)        # Errors
+        hdr.setSectionResizeMode(7, QHeaderView.ResizeMode.Fixed)          # Profile
+        hdr.setSectionResizeMode(8, QHeaderView.ResizeMode.Stretch)        # Errors
         self._table.setColumnWidth(0, 148)
         self._table.setColumnWidth(2, 58)
         self._table.setColumnWidth(3, 48)
         self._table.setColumnWidth(4, 72)
         self._table.setColumnWidth(5, 68)
         self._table.setColumnWidth(6, 72)
+        self._table.setColumnWidth(7, 64)
         self._table.verticalHeader().setVisible(False)
         self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self._table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self._table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
         self._table.setAlternatingRowColors(False)
+        self._table.cellClicked.connect(self._on_click)
         layout.addWidget(self._table, stretch=1)
 
         btn_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         btn_box.rejected.connect(self.reject)
         layout.addWidget(btn_box)
 
-        self._populate(controller)
+        self._populate(controller, scrape_running)
 
-    def _populate(self, controller) -> None:
+    def _populate(self, controller, scrape_running: bool = False) -> None:
         runs = controller.get_all_scrape_runs() if controller else []
         self._table.setSortingEnabled(False)
         self._table.setRowCount(len(runs))
+        newest_seen = set()   # search ids whose newest row (runs are newest first) was passed
 
         for row, run in enumerate(runs):
-            failed       = not bool(run.get("success", 1))
+            is_newest    = run.get("search_id") not in newest_seen
+            newest_seen.add(run.get("search_id"))
+            if run.get("status") == "running":
+                state = "RUNNING" if scrape_running and is_newest else "INTERRUPTED"
+            else:
+                state = "OK" if run.get("success", 1) else "FAILED"
+            failed       = state in ("FAILED", "INTERRUPTED")
             # New rows have a dedicated `searches` column; fall back to `search_name` for
             # legacy rows written before Migration 10.
             searches_str = (run.get("searches") or run.get("search_name") or "").strip()
             errors_str   = (run.get("error_message") or "").strip()
             raw_date     = str(run.get("run_date", ""))
+            profile_path = run.get("profile_path") or ""
 
             row_bg = QColor(T.FEED_DELETED_BG) if failed else QColor(T.BG2)
             row_fg = QColor(T.FG_WHITE)
@@ -2392,7 +2792,8 @@ class RunHistoryDialog(QDialog):
                 str(run.get("new_records",    0) or 0) or "—",
                 str(run.get("changed_prices", 0) or 0) or "—",
                 str(run.get("inactive_count", 0) or 0) or "—",
-                "FAILED" if failed else "OK",
+                state,
+                "📄 View" if profile_path else "",
                 errors_str,
             ]
 
@@ -2400,9 +2801,17 @@ class RunHistoryDialog(QDialog):
                 item = QTableWidgetItem(val)
                 item.setBackground(QBrush(row_bg))
 
-                if col == 7 and errors_str:
+                if col == 7 and profile_path:
+                    item.setData(Qt.ItemDataRole.UserRole, profile_path)
+                    item.setForeground(QBrush(QColor(T.ACCENT)))
+                    item.setToolTip(profile_path)
+                elif col == 8 and errors_str:
                     item.setForeground(QBrush(QColor(T.BTN_RED_H)))
                     item.setToolTip(errors_str)
+                elif col == 6 and state == "RUNNING":
+                    item.setForeground(QBrush(QColor(T.YELLOW)))
+                elif col == 6 and state == "INTERRUPTED":
+                    item.setForeground(QBrush(QColor(T.ORANGE)))
                 elif col == 6 and failed:
                     item.setForeground(QBrush(QColor(T.BTN_RED_H)))
                 else:
@@ -2424,6 +2833,234 @@ class RunHistoryDialog(QDialog):
 
         self._table.setSortingEnabled(True)
 
+    def _on_click(self, row: int, col: int) -> None:
+        """Single click on the Profile column → open the profiling report."""
+        if col != 7:
+            return
+        item = self._table.item(row, col)
+        path = item.data(Qt.ItemDataRole.UserRole) if item else None
+        if not path:
+            return
+        if os.path.isfile(path):
+            QDesktopServices.openUrl(QUrl.fromLocalFile(path))
+        else:
+            QMessageBox.information(self, "Report missing",
+                                    f"The profiling report no longer exists:\n{path}")
+
+
+# ── Listing Search Dialog ─────────────────────────────────────────────────────
+
+class ListingSearchDialog(QDialog):
+    """
+    Full-text search across the listings of every saved search
+    (controller.search_listings → FTS5 index over title, location and
+    description). Results are ranked best-first; the Match column shows the
+    matching fragment with hits in «». Typing re-runs the query after a
+    short pause; double-click a row to open the property gallery.
+    """
+
+    _COLS = ["Search", "Status", "Title", "Location", "Price", "Match"]
+    _DEBOUNCE_MS = 200
+    _LIMIT = 200
+
+    def __init__(self, parent: QWidget, query: str, controller) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("Search Listings")
+        self.resize(1200, 600)
+        self.setMinimumSize(800, 400)
+        _set_dark_titlebar(self)
+
+        self._controller = controller
+        self._results: list[dict] = []
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(8)
+
+        self._query_edit = QLineEdit(query)
+        self._query_edit.setPlaceholderText("Words from the title, location or description…")
+        self._query_edit.setClearButtonEnabled(True)
+        layout.addWidget(self._query_edit)
+
+        self._summary_lbl = _dim_label("")
+        layout.addWidget(self._summary_lbl)
+
+        self._table = QTableWidget(0, len(self._COLS))
+        self._table.setHorizontalHeaderLabels(self._COLS)
+        hdr = self._table.horizontalHeader()
+        hdr.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)     # Search
+        hdr.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)           # Status
+        hdr.setSectionResizeMode(2, QHeaderView.ResizeMode.Interactive)     # Title
+        hdr.setSectionResizeMode(3, QHeaderView.ResizeMode.Interactive)     # Location
+        hdr.setSectionResizeMode(4, QHeaderView.ResizeMode.Fixed)           # Price
+        hdr.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)         # Match
+        self._table.setColumnWidth(0, 120)
+        self._table.setColumnWidth(1, 70)
+        self._table.setColumnWidth(2, 260)
+        self._table.setColumnWidth(3, 200)
+        self._table.setColumnWidth(4, 120)
+        self._table.verticalHeader().setVisible(False)
+        self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self._table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self._table.cellDoubleClicked.connect(self._on_double_click)
+        layout.addWidget(self._table, stretch=1)
+
+        btn_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        btn_box.rejected.connect(self.reject)
+        layout.addWidget(btn_box)
+
+        # Re-query once typing pauses rather than on every keystroke
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self._DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._run_query)
+        self._query_edit.textChanged.connect(lambda _t: self._debounce.start())
+        self._query_edit.returnPressed.connect(self._run_query)
+
+        self._run_query()
+
+    def _run_query(self) -> None:
+        self._debounce.stop()
+        query = self._query_edit.text().strip()
+        t0 = time.perf_counter()
+        self._results = (
+            self._controller.search_listings(query, limit=self._LIMIT)
+            if self._controller and query else []
+        )
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+        self._populate()
+
+        if not query:
+            self._summary_lbl.setText("Type to search every saved search's listings.")
+        else:
+            more = "+" if len(self._results) >= self._LIMIT else ""
+            self._summary_lbl.setText(
+                f"{len(self._results)}{more} matching listings  •  {elapsed_ms:.0f} ms"
+                "  •  double-click a row to open the gallery"
+            )
+
+    def _populate(self) -> None:
+        self._table.setRowCount(len(self._results))
+        fg_active   = QBrush(QColor(T.FG_WHITE))
+        fg_inactive = QBrush(QColor(T.FG_DIM))
+        for row, prop in enumerate(self._results):
+            active = prop.get("status") == "Active"
+            values = [
+                prop.get("search_name") or "",
+                prop.get("status") or "",
+                prop.get("title") or "—",
+                prop.get("location") or "",
+                prop.get("current_price") or "—",
+                " ".join((prop.get("snippet") or "").split()),
+            ]
+            for col, val in enumerate(values):
+                item = QTableWidgetItem(val)
+                item.setForeground(fg_active if active else fg_inactive)
+                if col in (2, 5):
+                    item.setToolTip(val)
+                self._table.setItem(row, col, item)
+
+    def _on_double_click(self, row: int, _col: int) -> None:
+        if not 0 <= row < len(self._results):
+            return
+        prop = dict(self._results[row])
+        prop["current_price"] = prop.get("current_price") or "—"
+        gw = GalleryWindow(self, prop, self._controller)
+        gw.exec()
+
+
+class SharedPhotosDialog(QDialog):
+    """
+    Listings that share photos with one property
+    (controller.find_listings_sharing_photos → exact SHA-1 matches plus
+    near-identical dHashes). Most shared photos first; double-click a row
+    to open that listing's gallery.
+    """
+
+    _COLS = ["Search", "Status", "Title", "Location", "Price", "Photos"]
+
+    def __init__(self, parent: QWidget, prop: dict, controller) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(f"Same Photos  —  {prop.get('title') or '—'}")
+        self.resize(1000, 400)
+        self.setMinimumSize(700, 250)
+        _set_dark_titlebar(self)
+
+        self._controller = controller
+        t0 = time.perf_counter()
+        self._results: list[dict] = (
+            controller.find_listings_sharing_photos(prop["id"]) if controller else []
+        )
+        elapsed_ms = (time.perf_counter() - t0) * 1000
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(10, 10, 10, 10)
+        layout.setSpacing(8)
+
+        summary = (
+            f"{len(self._results)} other listings share photos with this one  •  {elapsed_ms:.0f} ms"
+            "  •  double-click a row to open the gallery"
+            if self._results else "No other listing uses these photos."
+        )
+        layout.addWidget(_dim_label(summary))
+
+        self._table = QTableWidget(len(self._results), len(self._COLS))
+        self._table.setHorizontalHeaderLabels(self._COLS)
+        hdr = self._table.horizontalHeader()
+        hdr.setSectionResizeMode(0, QHeaderView.ResizeMode.Interactive)     # Search
+        hdr.setSectionResizeMode(1, QHeaderView.ResizeMode.Fixed)           # Status
+        hdr.setSectionResizeMode(2, QHeaderView.ResizeMode.Stretch)         # Title
+        hdr.setSectionResizeMode(3, QHeaderView.ResizeMode.Interactive)     # Location
+        hdr.setSectionResizeMode(4, QHeaderView.ResizeMode.Fixed)           # Price
+        hdr.setSectionResizeMode(5, QHeaderView.ResizeMode.Fixed)           # Photos
+        self._table.setColumnWidth(0, 120)
+        self._table.setColumnWidth(1, 70)
+        self._table.setColumnWidth(3, 200)
+        self._table.setColumnWidth(4, 120)
+        self._table.setColumnWidth(5, 60)
+        self._table.verticalHeader().setVisible(False)
+        self._table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self._table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self._table.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self._table.cellDoubleClicked.connect(self._on_double_click)
+        layout.addWidget(self._table, stretch=1)
+
+        btn_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
+        btn_box.rejected.connect(self.reject)
+        layout.addWidget(btn_box)
+
+        self._populate()
+
+    def _populate(self) -> None:
+        fg_active   = QBrush(QColor(T.FG_WHITE))
+        fg_inactive = QBrush(QColor(T.FG_DIM))
+        for row, prop in enumerate(self._results):
+            active = prop.get("status") == "Active"
+            values = [
+                prop.get("search_name") or "",
+                prop.get("status") or "",
+                prop.get("title") or "—",
+                prop.get("location") or "",
+                prop.get("current_price") or "—",
+                str(prop.get("shared_photos") or 0),
+            ]
+            for col, val in enumerate(values):
+                item = QTableWidgetItem(val)
+                item.setForeground(fg_active if active else fg_inactive)
+                if col == 2:
+                    item.setToolTip(val)
+                if col == 5:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self._table.setItem(row, col, item)
+
+    def _on_double_click(self, row: int, _col: int) -> None:
+        if not 0 <= row < len(self._results):
+            return
+        prop = dict(self._results[row])
+        prop["current_price"] = prop.get("current_price") or "—"
+        GalleryWindow(self, prop, self._controller).exec()
+
 
 # ── Entry point ───────────────────────────────────────────────────────────────
 
@@ -50,9 +50,10 @@ class AppTheme:
 
     # ── Feed row backgrounds ──────────────────────────────────────────────────
     FEED_NEW_BG         = "#1e5c1a"   # new listing      — dark green, visible on dark bg
+    FEED_RELISTED_BG    = "#1a3a5c"   # repost of a known listing — dark blue
     FEED_CHANGED_BG     = "#5c4a00"   # price change     — dark amber
     FEED_DELETED_BG     = "#5c1a1a"   # inactive         — dark red
-    FEED_UNDERPRICED_BG = "#1a3a3a"   # below area avg   — dark teal/cyan
+    FEED_UNDERPRICED_BG = "#1a3a3a"   # deal score ≥ threshold — dark teal/cyan
     FEED_FAVORITE_BG    = "#3b1f5e"   # favorited listing — dark purple
 
     # ── Typography ────────────────────────────────────────────────────────────
@@ -247,7 +248,7 @@ QHeaderView::section {{
 QHeaderView::section:hover {{
     background-color: {t.BG2};
 }}
-QTableWidget::item {{
+QTableView::item {{
     /* Absolutely no border, no radius — prevents Qt from rendering a
        button-shaped focus frame around each cell on click */
     border: none;
@@ -255,7 +256,7 @@ QTableWidget::item {{
     outline: 0px;
     padding: 2px 6px;
 }}
-QTableWidget::item:selected {{
+QTableView::item:selected {{
     background-color: {t.ACCENT};
     color: {t.FG_WHITE};
     border: none;
@@ -272,12 +273,12 @@ QListWidget::item:selected {{
 }}
 
 /* ── Feed table — row separator via gridline colour ──────────────────────── */
-QTableWidget#feedTable {{
+QTableView#feedTable {{
     gridline-color: {t.BG};
     border: 1px solid {t.BG3};
     background-color: {t.BG};
 }}
-QTableWidget#feedTable::item {{
+QTableView#feedTable::item {{
     border: none;
     border-radius: 0px;
     outline: 0px;
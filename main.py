@@ -3,6 +3,7 @@ Main entry point for ImotScraper application.
 Initializes all components and coordinates their execution.
 """
 
+import argparse
 import logging
 import sys
 import os
@@ -26,18 +27,84 @@ logging.basicConfig(
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from controller.app_controller import AppController
+from database import bulk_io
+from database.db_manager import DatabaseManager
 from scraper.imotBgScraper import ImotScraper
 from email_service_module.email_service import ReportMailer
 from scheduler.scheduler_service import ScraperScheduler
+from metrics.metrics_service import MetricsServer
+from events.event_bus import ListingEvent
 from gui.imot_gui_qt import ImotScraperMainWindow, build_stylesheet
 from PyQt6.QtWidgets import QApplication
 
 
+def _parse_args(argv: list[str]) -> tuple[argparse.Namespace, list[str]]:
+    """Parse app options; unknown arguments are passed through to Qt."""
+    parser = argparse.ArgumentParser(prog="ImotScraper")
+    parser.add_argument(
+        "--profile", action="store_true",
+        default=os.environ.get("IMOT_PROFILE", "").strip().lower() in ("1", "true", "yes"),
+        help="Profile every scrape run (cProfile + tracemalloc); reports go to data/profiles",
+    )
+    export = parser.add_argument_group("export / import (run without the GUI)")
+    export.add_argument("--export", metavar="DIR",
+                        help="Write properties, price history, scrape runs and area stats to DIR and exit")
+    export.add_argument("--import", dest="import_file", metavar="FILE",
+                        help="Load historical listings and prices from FILE (.csv / .jsonl / .parquet) and exit")
+    export.add_argument("--format", choices=sorted(bulk_io.FORMATS),
+                        help="Export file format (default csv; parquet needs pyarrow), "
+                             "or import format if FILE's extension doesn't tell")
+    export.add_argument("--search", metavar="NAME", help="Export only this saved search")
+    export.add_argument("--since", metavar="DATE", help="Export only rows dated on or after DATE (YYYY-MM-DD)")
+    export.add_argument("--until", metavar="DATE", help="Export only rows dated before DATE (YYYY-MM-DD)")
+    return parser.parse_known_args(argv[1:])
+
+
+def _run_export(args: argparse.Namespace, data_dir: str) -> int:
+    """Headless --export: stream the database to files, print the row counts."""
+    db = DatabaseManager(db_path=os.path.join(data_dir, "imot_scraper.db"))
+    search_id = None
+    if args.search:
+        match = [s for s in db.get_all_searches() if s["search_name"] == args.search]
+        if not match:
+            print(f"No saved search named {args.search!r}", file=sys.stderr)
+            return 2
+        search_id = match[0]["id"]
+    try:
+        counts = db.export(args.export, args.format or "csv", search_id=search_id,
+                           since=args.since, until=args.until)
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    for table, n in counts.items():
+        print(f"{table}: {n} rows")
+    return 0
+
+
+def _run_import(args: argparse.Namespace, data_dir: str) -> int:
+    """Headless --import: merge a historical dump into the database, print the report."""
+    db = DatabaseManager(db_path=os.path.join(data_dir, "imot_scraper.db"))
+    try:
+        report = db.import_file(args.import_file, args.format)
+    except (OSError, RuntimeError, ValueError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    for error in report["errors"]:
+        print(f"rejected {error}", file=sys.stderr)
+    print(f"{report['rows']} rows read, {report['rejected']} rejected; "
+          f"{report['searches']} new searches, {report['listings']} new listings, "
+          f"{report['prices']} price history rows in {report['seconds']}s "
+          f"({report['rows_per_s']} rows/s)")
+    return 0
+
+
 def main():
     """
     Initialize all application components and start the GUI.
     """
     try:
+        args, qt_argv = _parse_args(sys.argv)
+
         # Resolve data directory relative to the exe (or script) so the DB is
         # always written next to the executable, not in a temp / CWD folder.
         if getattr(sys, 'frozen', False):
@@ -48,9 +115,26 @@ def main():
             base_dir = os.path.dirname(os.path.abspath(__file__))
 
         data_dir = os.path.join(base_dir, 'data')
+        if args.export:
+            sys.exit(_run_export(args, data_dir))
+        if args.import_file:
+            sys.exit(_run_import(args, data_dir))
 
         # Initialize core components
-        scraper = ImotScraper(data_dir=data_dir)
+        # Schema upgrades run in the background; the window waits for them
+        # before loading searches instead of blocking start-up.
+        scraper = ImotScraper(data_dir=data_dir, profile=args.profile,
+                              background_migrations=True)
+        if args.profile:
+            logging.info("Profiling mode enabled — reports will be written to data/profiles")
+
+        # Optional local Prometheus endpoint — enabled by IMOT_METRICS_PORT
+        metrics_port = os.environ.get("IMOT_METRICS_PORT", "").strip()
+        if metrics_port:
+            try:
+                MetricsServer(port=int(metrics_port)).start()
+            except ValueError:
+                logging.warning(f"Ignoring invalid IMOT_METRICS_PORT={metrics_port!r}")
 
         email_service = ReportMailer()
         scheduler = ScraperScheduler(
@@ -65,9 +149,10 @@ def main():
             email_service=email_service,
             scheduler=scheduler
         )
+        controller.subscribe_events(ListingEvent, email_service.collect_listing_event)
 
         # Initialize and run Qt GUI
-        app = QApplication(sys.argv)
+        app = QApplication(sys.argv[:1] + qt_argv)
         app.setStyleSheet(build_stylesheet())
         win = ImotScraperMainWindow(controller=controller)
         controller.gui = win
@@ -0,0 +1,4 @@
+"""Metrics module for ImotScraper"""
+from .metrics_service import REGISTRY, MetricsRegistry, MetricsServer
+
+__all__ = ['REGISTRY', 'MetricsRegistry', 'MetricsServer']
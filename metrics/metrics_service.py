@@ -0,0 +1,305 @@
+"""
+Metrics module for ImotScraper - live counters, gauges and histograms.
+Exposes them on an optional local HTTP endpoint in the Prometheus text
+exposition format so an existing monitoring stack can scrape the app.
+
+This module is self-contained: no GUI, scraper or database imports.
+The scraper and DatabaseManager record into the shared REGISTRY; the
+endpoint itself is only started when IMOT_METRICS_PORT is configured.
+"""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Latency buckets (seconds) — cover fast DB writes up to slow detail pages.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+
+
+def _escape_label(value: str) -> str:
+    """Escape a label value per the Prometheus text format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base class: one named metric family with a fixed set of label names."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, object]) -> Tuple[str, ...]:
+        unknown = set(labels) - set(self.label_names)
+        if unknown:
+            raise ValueError(f"Unknown label(s) for {self.name}: {sorted(unknown)}")
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def _label_str(self, key: Tuple[str, ...], extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(self.label_names, key)]
+        if extra:
+            pairs.append(f'{extra[0]}="{_escape_label(extra[1])}"')
+        return "{" + ",".join(pairs) + "}" if pairs else ""
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:   # pragma: no cover - overridden
+        return []
+
+
+class Counter(_Metric):
+    """Monotonically increasing value (e.g. requests issued)."""
+
+    type_name = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._label_str(k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down (e.g. requests in flight)."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        """Increment for the duration of the ``with`` block."""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{self._label_str(k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """Bucketed distribution of observations (e.g. request latency)."""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help_text, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # key → [per-bucket counts..., sum, count]
+        self._data: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            data = self._data.get(key)
+            if data is None:
+                data = self._data[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+                    break
+            data[-2] += value
+            data[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the wall-clock duration of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            data = self._data.get(self._key(labels))
+            return int(data[-1]) if data else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._data.items())
+        lines: List[str] = []
+        for key, data in items:
+            cumulative = 0.0
+            for bound, n in zip(self.buckets, data):
+                cumulative += n
+                lines.append(
+                    f"{self.name}_bucket{self._label_str(key, ('le', _format_value(bound)))} "
+                    f"{_format_value(cumulative)}"
+                )
+            lines.append(
+                f"{self.name}_bucket{self._label_str(key, ('le', '+Inf'))} {_format_value(data[-1])}"
+            )
+            lines.append(f"{self.name}_sum{self._label_str(key)} {_format_value(data[-2])}")
+            lines.append(f"{self.name}_count{self._label_str(key)} {_format_value(data[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Holds every metric family by name.  The counter/gauge/histogram
+    factories are get-or-create, so modules can declare their metrics at
+    import time without caring about import order.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, help_text: str, label_names, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, label_names, **kwargs)
+            elif not isinstance(metric, cls) or metric.label_names != tuple(label_names):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def counter(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, help_text, label_names)
+
+    def gauge(self, name: str, help_text: str, label_names: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, help_text, label_names)
+
+    def histogram(self, name: str, help_text: str, label_names: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, help_text, label_names, buckets=buckets)
+
+    def render(self) -> str:
+        """Return every metric in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Shared process-wide registry used by the scraper and the database layer.
+REGISTRY = MetricsRegistry()
+
+
+class MetricsServer:
+    """
+    Serves ``GET /metrics`` from a registry on a daemon thread.
+    Binds to localhost by default — the endpoint is meant for a monitoring
+    agent running on the same machine, not for the network.
+    """
+
+    CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+    def __init__(self, port: int = 9464, host: str = "127.0.0.1",
+                 registry: MetricsRegistry = REGISTRY):
+        self.host = host
+        self.port = port
+        self.registry = registry
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _make_handler(self):
+        registry = self.registry
+        content_type = self.CONTENT_TYPE
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):   # noqa: N802 — http.server naming
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, fmt, *args):
+                logger.debug("metrics: " + fmt % args)
+
+        return _Handler
+
+    def start(self) -> bool:
+        """Start serving in the background. Returns False if the port is unavailable."""
+        if self._httpd:
+            return True
+        try:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        except OSError as exc:
+            logger.warning(f"Metrics endpoint could not bind {self.host}:{self.port}: {exc}")
+            self._httpd = None
+            return False
+        self.port = self._httpd.server_address[1]   # resolves port=0 to the real port
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True,
+                                        name="MetricsServer")
+        self._thread.start()
+        logger.info(f"Metrics endpoint listening on http://{self.host}:{self.port}/metrics")
+        return True
+
+    def stop(self) -> None:
+        """Shut the HTTP server down and release the port."""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+            self._thread = None
@@ -11,9 +11,42 @@ from typing import List, Tuple, Dict, Optional
 from requests.adapters import HTTPAdapter
 from requests.packages.urllib3.util.retry import Retry
 import logging
+import time
 from time import sleep
 
+from database import deal_score
 from database.db_manager import DatabaseManager
+from events.event_bus import (
+    EventBus, SearchStarted, SearchFinished, ScrapeProgress,
+    ListingEvent, ListingNew, ListingRelisted, ListingChanged, ListingRemoved,
+    ListingUnderpriced,
+)
+from metrics.metrics_service import REGISTRY
+from scraper.run_profiler import RunProfiler
+
+# ── Live metrics (served by metrics.MetricsServer when enabled) ───────────────
+_HTTP_REQUESTS = REGISTRY.counter(
+    "imot_http_requests_total", "HTTP requests issued by the scraper.", ("kind", "outcome"))
+_HTTP_LATENCY = REGISTRY.histogram(
+    "imot_http_request_duration_seconds", "HTTP request latency in seconds.", ("kind",))
+_HTTP_IN_FLIGHT = REGISTRY.gauge(
+    "imot_http_requests_in_flight", "HTTP requests currently in flight.")
+_PAGES_PROCESSED = REGISTRY.counter(
+    "imot_pages_processed_total", "Search result pages processed.", ("search",))
+_LISTINGS_PROCESSED = REGISTRY.counter(
+    "imot_listings_processed_total", "Listings seen on result pages by outcome.", ("search", "outcome"))
+_QUEUE_DEPTH = REGISTRY.gauge(
+    "imot_queue_depth", "Work items waiting to be processed.", ("queue",))
+_RUN_IN_PROGRESS = REGISTRY.gauge(
+    "imot_scrape_run_in_progress", "1 while a scrape run is executing.")
+_LAST_RUN_SUCCESS = REGISTRY.gauge(
+    "imot_last_run_success", "1 if the most recent scrape run succeeded, 0 otherwise.")
+_LAST_RUN_TIMESTAMP = REGISTRY.gauge(
+    "imot_last_run_timestamp_seconds", "Unix time at which the most recent scrape run finished.")
+_LAST_RUN_DURATION = REGISTRY.gauge(
+    "imot_last_run_duration_seconds", "Wall-clock duration of the most recent scrape run.")
+_SEARCH_LAST_SUCCESS = REGISTRY.gauge(
+    "imot_search_last_run_success", "1 if the last scrape of this search succeeded.", ("search",))
 
 
 class ImotScraper:
@@ -23,27 +56,65 @@ class ImotScraper:
         'BASE_URL': 'http://imot.bg',
         'REQUEST_DELAY': 1,
         'DETAIL_DELAY': 0.3,
-        'DATA_DIR': 'data'
+        'DATA_DIR': 'data',
+        'PROFILE': False,
     }
 
-    def __init__(self, data_dir='data'):
-        """Initialize the scraper with configuration"""
+    def __init__(self, data_dir='data', profile: bool = False,
+                 background_migrations: bool = False):
+        """Initialize the scraper with configuration.
+
+        profile: wrap every execute() in cProfile + tracemalloc and write a
+                 report to <data_dir>/profiles (linked from the run history).
+        background_migrations: upgrade an old database schema on a background
+                 thread; DB calls wait until it is done (see DatabaseManager).
+        """
         self.config = self.CONFIG.copy()
         self.config['DATA_DIR'] = data_dir
+        self.config['PROFILE'] = profile
         self.logger = logging.getLogger(__name__)
-        self.db = DatabaseManager(db_path=os.path.join(data_dir, "imot_scraper.db"))
-
+        self.db = DatabaseManager(db_path=os.path.join(data_dir, "imot_scraper.db"),
+                                  background_migrations=background_migrations)
+        # Typed events for the live feed / email / other consumers
+        self.events = EventBus()
         if not os.path.exists(self.config['DATA_DIR']):
             os.makedirs(self.config['DATA_DIR'])
 
     def execute(self) -> bool:
-        """Execute the scraping job. Reads searches from DB, persists results to DB."""
+        """Execute the scraping job. Reads searches from DB, persists results to DB.
+
+        In profiling mode the run is wrapped by RunProfiler and the report path
+        is attached to the scrape_runs rows this run opened.
+        """
+        if not self.config['PROFILE']:
+            return self._execute_searches()
+
+        # Collected per call: the scheduler and the GUI may overlap executions
+        run_ids: List[int] = []
+        profiler = RunProfiler(os.path.join(self.config['DATA_DIR'], "profiles"), label="scrape")
+        success, report_path = profiler.run(lambda: self._execute_searches(run_ids))
+        if report_path:
+            try:
+                self.db.attach_profile_report(run_ids, report_path)
+            except Exception as e:
+                self.logger.warning(f"Could not link profiling report to run history: {e}")
+        return success
+
+    def _execute_searches(self, run_ids: Optional[List[int]] = None) -> bool:
+        """Scrape every saved search once. Returns True if all searches succeeded.
+
+        The ids of the scrape_runs rows opened are appended to *run_ids*, if given.
+        """
+        started = time.perf_counter()
+        success = False
+        _RUN_IN_PROGRESS.set(1)
         try:
             self.logger.info("Starting scraper execution - reading searches from database.")
 
             searches = self.db.get_all_searches()
             if not searches:
                 self.logger.warning("No searches found in the database. Add searches via the GUI.")
+                success = True
                 return True
 
             session = self._create_session()
@@ -51,50 +122,78 @@ class ImotScraper:
             all_success     = True
             all_errors: list[str] = []
 
-            for search in searches:
+            _QUEUE_DEPTH.set(len(searches), queue="searches")
+            for index, search in enumerate(searches, start=1):
                 self.logger.info(f"Processing: {search['search_name']}")
-                result = self._scrape_search(session, search["url"], search["search_name"], search["id"])
+                self.events.publish(SearchStarted(
+                    search_id=search["id"], search_name=search["search_name"],
+                    index=index, total=len(searches),
+                ))
+                result = self._scrape_search(session, search["url"], search["search_name"], search["id"],
+                                             run_ids)
+                _QUEUE_DEPTH.dec(queue="searches")
+                _SEARCH_LAST_SUCCESS.set(1 if result["success"] else 0, search=search["search_name"])
                 if not result["success"]:
                     all_success = False
                     if result["error_message"]:
                         all_errors.append(f"{search['search_name']}: {result['error_message']}")
 
+            # Perceptual hashes of this execution's new photos (cross-listing
+            # photo matching) — once, after every search; a failure only
+            # delays matching until the next execution.
+            try:
+                self.db.hash_pending_images()
+            except Exception as e:
+                self.logger.warning(f"Could not hash new listing photos: {e}")
+
+            success = all_success
             return all_success
 
         except Exception as e:
             self.logger.error(f"Scraper failed with exception: {e}")
             return False
-
-    def _scrape_search(self, session: requests.Session, base_url: str, search_name: str, search_id: int) -> dict:
+        finally:
+            _QUEUE_DEPTH.set(0, queue="searches")
+            _RUN_IN_PROGRESS.set(0)
+            _LAST_RUN_SUCCESS.set(1 if success else 0)
+            _LAST_RUN_TIMESTAMP.set(time.time())
+            _LAST_RUN_DURATION.set(time.perf_counter() - started)
+
+    def _scrape_search(self, session: requests.Session, base_url: str, search_name: str, search_id: int,
+                       run_ids: Optional[List[int]] = None) -> dict:
         """Scrape all pages for one search entry and persist results.
 
         Returns a dict with counters for aggregation in execute():
           records_found, new_records, changed_prices, inactive_count,
-          active_count, sqm_values (list[float]), success, error_message.
+          active_count, success, error_message. The id of the scrape_runs
+          row it opens is appended to *run_ids*, if given.
         """
-        active_record_ids: List[str] = []
         records_found = 0
         new_count = 0
+        relisted_count = 0
+        retired: set = set()   # record_ids superseded by a relisting this run
+        fresh: Dict[int, ListingEvent] = {}   # property_id → event, new / changed this run
+        deal_count = 0
         changed_count = 0
+        run_id: Optional[int] = None
 
         try:
+            # Every listing seen in this run is stamped with run_id; whatever
+            # is left unstamped afterwards has disappeared from the site.
+            run_id = self.db.begin_scrape_run(search_name, search_id)
+            if run_ids is not None:
+                run_ids.append(run_id)
+
             # Pre-load known prices for this search into a dict to avoid one DB
             # round-trip per listing inside the loop.
             known = self._load_known_prices(search_id)
 
-            # Snapshot which record_ids are Active RIGHT NOW (before the scrape loop)
-            # so we can later distinguish truly-new inactivations from ones that were
-            # already Inactive in a previous run.
-            known_active_before: set[str] = {
-                p["record_id"]
-                for p in self.db.get_properties(search_id, status="Active")
-            }
-
             page = 1
             while True:
                 soup = self._process_page(session, base_url, page)
                 if not soup:
                     break
+                _PAGES_PROCESSED.inc(search=search_name)
 
                 listings = soup.find_all("div", class_=lambda x: x and x.startswith('item'))
                 if not listings:
@@ -102,6 +201,8 @@ class ImotScraper:
                         self.logger.warning(f"No listings found on page 1 for {search_name}")
                     break
 
+                unchanged_ids: List[str] = []
+                unchanged_prices: List[str] = []
                 for listing in listings:
                     result = self._extract_listing_data(listing)
                     if not result:
@@ -109,34 +210,50 @@ class ImotScraper:
 
                     list_title, price_text, link, record_id = result
                     records_found += 1
-                    active_record_ids.append(record_id)
 
-                    existing_price, existing_title, existing_location = known.get(record_id, (None, None, None))
+                    existing = known.get(record_id)
+                    existing_price = existing["price"] if existing else None
 
                     if existing_price is None:
-                        # Brand new listing — fetch detail page for clean title, location, description, images, price/m²
-                        title, location, description, image_urls, price_per_sqm, area_sqm, floor, yard_sqm = self._extract_title_and_location(session, link)
-                        if not title:
-                            title = list_title
-                        is_new = True
-                        new_count += 1
-                        self.logger.info(f"New listing: {title} | price: {price_text} | search: {search_name} | {link}")
+                        shared = self.db.get_listing(record_id)
+                        if shared:
+                            # New to this search but already stored by another one —
+                            # reuse its content and images; re-fetch only a changed price/m²
+                            title = shared["title"] or list_title
+                            location = shared["location"] or ""
+                            description = image_urls = area_sqm = floor = yard_sqm = None
+                            price_per_sqm = None
+                            if shared["current_price"] != price_text:
+                                _, _, _, _, price_per_sqm, *_ = self._extract_title_and_location(session, link)
+                        else:
+                            # Brand new listing — fetch detail page for clean title, location, description, images, price/m²
+                            title, location, description, image_urls, price_per_sqm, area_sqm, floor, yard_sqm = self._extract_title_and_location(session, link)
+                            if not title:
+                                title = list_title
+                        is_new = True   # counted as new or relisted once it is stored
                     elif existing_price != price_text:
                         # Price changed — reuse stored title/location/description, no detail fetch needed
-                        title = existing_title or list_title
-                        location = existing_location or ""
+                        title = existing["title"] or list_title
+                        location = existing["location"] or ""
                         description = None   # COALESCE keeps existing value in DB
                         image_urls  = None   # no re-fetch; images already stored
                         area_sqm    = None   # COALESCE keeps existing value in DB
                         floor       = None   # COALESCE keeps existing value in DB
                         yard_sqm    = None   # COALESCE keeps existing value in DB
-                        # Re-fetch detail page only for the updated price/m²
-                        _, _, _, _, price_per_sqm, *_ = self._extract_title_and_location(session, link)
+                        # Re-fetch detail page only for the updated price/m² — unless
+                        # another search already stored this price (and its price/m²)
+                        price_per_sqm = None
+                        if existing["current_price"] != price_text:
+                            _, _, _, _, price_per_sqm, *_ = self._extract_title_and_location(session, link)
                         is_new = False
                         changed_count += 1
+                        _LISTINGS_PROCESSED.inc(search=search_name, outcome="changed")
                         self.logger.info(f"Price change: {title} | old: {existing_price} | new: {price_text} | search: {search_name} | {link}")
                     else:
-                        # Unchanged — skip detail fetch and DB write entirely.
+                        # Unchanged — skip the detail fetch; stamped in bulk per page.
+                        _LISTINGS_PROCESSED.inc(search=search_name, outcome="unchanged")
+                        unchanged_ids.append(record_id)
+                        unchanged_prices.append(price_text)
                         continue
 
                     property_id = self.db.upsert_property(
@@ -152,6 +269,7 @@ class ImotScraper:
                         area_sqm=area_sqm,
                         floor=floor,
                         yard_sqm=yard_sqm,
+                        run_id=run_id,
                     )
 
                     # Store images only for new listings (detail page already fetched)
@@ -159,47 +277,124 @@ class ImotScraper:
                         n = self.db.upsert_images(property_id, image_urls, session=session)
                         self.logger.debug(f"  Stored {n}/{len(image_urls)} images")
 
+                    # Published after the write so consumers can open the row by id
+                    if is_new:
+                        # A repost of a listing we already have is reported as
+                        # relisted, and its predecessor's removal is not reported
+                        predecessor = self.db.link_relisting(property_id)
+                        if predecessor:
+                            relisted_count += 1
+                            retired.add(predecessor["record_id"])
+                            _LISTINGS_PROCESSED.inc(search=search_name, outcome="relisted")
+                            self.logger.info(
+                                f"Relisted listing: {title} | was: {predecessor['record_id']} | "
+                                f"price: {price_text} | search: {search_name} | {link}"
+                            )
+                            event = ListingRelisted(
+                                search_id=search_id, search_name=search_name,
+                                property_id=property_id, record_id=record_id,
+                                title=title, link=link, price=price_text,
+                                relisted_from_id=predecessor["id"],
+                                relisted_from_record=predecessor["record_id"],
+                            )
+                        else:
+                            new_count += 1
+                            _LISTINGS_PROCESSED.inc(search=search_name, outcome="new")
+                            self.logger.info(f"New listing: {title} | price: {price_text} | search: {search_name} | {link}")
+                            event = ListingNew(
+                                search_id=search_id, search_name=search_name,
+                                property_id=property_id, record_id=record_id,
+                                title=title, link=link, price=price_text,
+                            )
+                    else:
+                        event = ListingChanged(
+                            search_id=search_id, search_name=search_name,
+                            property_id=property_id, record_id=record_id,
+                            title=title, link=link, price=price_text,
+                            old_price=existing_price,
+                            is_favorite=existing["is_favorite"],
+                        )
+                    self.events.publish(event)
+                    fresh[property_id] = event
+
+                self.db.touch_properties(search_id, unchanged_ids, run_id, unchanged_prices)
+
+                self.events.publish(ScrapeProgress(
+                    search_id=search_id, search_name=search_name,
+                    page=page, records_found=records_found,
+                ))
                 if not soup.find('a', class_='saveSlink next'):
                     break
                 page += 1
 
-            # Mark anything not seen this run as Inactive
-            inactive_count = self.db.mark_inactive(search_id, active_record_ids)
-
-            # Emit a feed log line only for listings that were Active BEFORE this run
-            # and are now gone — skip ones that were already Inactive from a previous run.
-            # known_active_before was captured before the scrape loop started.
-            if inactive_count > 0:
-                active_set = set(active_record_ids)
-                for rid in known_active_before:
-                    if rid not in active_set:
-                        price, title, location = known[rid]
-                        link = self.db.get_link_for_record(rid, search_id)
-                        self.logger.info(
-                            f"Removed listing: {title or rid} | search: {search_name} | {link or ''}"
-                        )
+            # Mark anything not seen this run as Inactive.  Only rows that were
+            # Active are touched, so every returned id is a fresh removal.
+            inactivated = self.db.mark_inactive(search_id, run_id)
+            inactive_count = len(inactivated)
+            removed_count = inactive_count
+
+            for rid in inactivated:
+                gone = known.get(rid)
+                if rid in retired:
+                    # Superseded by its relisting this run — not a removal
+                    removed_count -= 1
+                    self.logger.debug(f"Retired relisted listing: {rid} | search: {search_name}")
+                elif gone:
+                    self.logger.info(
+                        f"Removed listing: {gone['title'] or rid} | search: {search_name} | {gone['link'] or ''}"
+                    )
+                    self.events.publish(ListingRemoved(
+                        search_id=search_id, search_name=search_name,
+                        property_id=gone["id"], record_id=rid,
+                        title=gone["title"] or rid, link=gone["link"] or "",
+                        price=gone["price"], is_favorite=gone["is_favorite"],
+                    ))
 
             # Record area avg snapshot for this search after the run
             self.db.record_area_stats_snapshot(search_id)
 
-            # Compute avg €/m² and active count for this search
-            active_props = self.db.get_properties(search_id, status="Active")
-            active_count = len(active_props)
-            sqm_values: list[float] = []
-            for p in active_props:
-                raw = p.get("price_per_sqm")
-                if raw:
-                    try:
-                        sqm_values.append(float(raw.split()[0].replace(",", ".")))
-                    except (ValueError, IndexError):
-                        pass
+            # Intern new / changed locations before scoring and per-location stats
+            self.db.intern_pending_locations()
+
+            # Avg €/m² and active count for this search — O(1) read of the
+            # running aggregates the DB keeps up to date on every write
+            stats = self.db.get_active_price_stats(search_id)
+            active_count = stats["active_count"]
+            avg_sqm = stats["avg_price_per_sqm"]
+
+            # Re-score the whole Active set, then alert on this run's new / changed deals
+            scores = self.db.score_search(search_id)
+            for property_id, event in fresh.items():
+                score = scores.get(property_id)
+                if not score or not deal_score.is_deal(score["deal_score"], score["deal_area_score"]):
+                    continue
+                deal_count += 1
+                _LISTINGS_PROCESSED.inc(search=search_name, outcome="deal")
+                self.logger.info(
+                    f"Underpriced listing: {event.title} | score: {score['deal_score']} | "
+                    f"price: {event.price} | search: {search_name} | {event.link}"
+                )
+                self.events.publish(ListingUnderpriced(
+                    search_id=search_id, search_name=search_name,
+                    property_id=property_id, record_id=event.record_id,
+                    title=event.title, link=event.link, price=event.price,
+                    is_favorite=event.is_favorite,
+                    deal_score=score["deal_score"], deal_area_score=score["deal_area_score"],
+                    deal_percentile=score["deal_percentile"],
+                ))
 
             self.logger.info(
                 f"Done '{search_name}': {records_found} found, "
-                f"{new_count} new, {changed_count} changed, {inactive_count} inactive."
+                f"{new_count} new, {relisted_count} relisted, {changed_count} changed, "
+                f"{inactive_count} inactive, {deal_count} underpriced."
             )
 
-            avg_sqm = round(sum(sqm_values) / len(sqm_values), 2) if sqm_values else None
+            self.events.publish(SearchFinished(
+                search_id=search_id, search_name=search_name, success=True,
+                records_found=records_found, new_count=new_count,
+                changed_count=changed_count, inactive_count=inactive_count,
+                relisted_count=relisted_count, deal_count=deal_count,
+            ))
             self.db.log_scrape_run(
                 searches=search_name,
                 records_found=records_found,
@@ -210,21 +405,30 @@ class ImotScraper:
                 avg_price_per_sqm=avg_sqm,
                 active_count=active_count,
                 search_id=search_id,
+                run_id=run_id,
             )
+            # Robust per-run summary (median / quartiles) for charts
+            self.db.record_run_stats(search_id, run_id, new_count, removed_count)
 
             return {
                 "records_found":  records_found,
                 "new_records":    new_count,
+                "relisted":       relisted_count,
+                "deals":          deal_count,
                 "changed_prices": changed_count,
                 "inactive_count": inactive_count,
                 "active_count":   active_count,
-                "sqm_values":     sqm_values,
                 "success":        True,
                 "error_message":  None,
             }
 
         except Exception as e:
             self.logger.error(f"Error scraping '{search_name}': {e}")
+            self.events.publish(SearchFinished(
+                search_id=search_id, search_name=search_name, success=False,
+                records_found=records_found, new_count=new_count,
+                changed_count=changed_count, error_message=str(e),
+            ))
             self.db.log_scrape_run(
                 searches=search_name,
                 records_found=records_found,
@@ -236,6 +440,7 @@ class ImotScraper:
                 avg_price_per_sqm=None,
                 active_count=0,
                 search_id=search_id,
+                run_id=run_id,
             )
             return {
                 "records_found":  records_found,
@@ -243,7 +448,6 @@ class ImotScraper:
                 "changed_prices": changed_count,
                 "inactive_count": 0,
                 "active_count":   0,
-                "sqm_values":     [],
                 "success":        False,
                 "error_message":  str(e),
             }
@@ -251,23 +455,26 @@ class ImotScraper:
     def _load_known_prices(self, search_id: int) -> dict:
         """
         Load all known properties for this search into a dict keyed by record_id.
-        Value is (current_price, title, location) — single DB read before the scrape loop.
+        Value is a dict with id, price (the last one this search saw),
+        current_price (the listing's, possibly stored by another search),
+        title, location, link and is_favorite — everything the loop and the
+        published events need, read once before the scrape loop from the
+        denormalised properties columns.
         Returns {} if no properties exist yet.
         """
-        props = self.db.get_properties(search_id, status=None)
-        if not props:
-            return {}
-
-        conn = self.db._get_connection()
-        result = {}
-        for p in props:
-            row = conn.execute(
-                "SELECT price FROM price_history WHERE property_id = ? AND price_status = 'Current'",
-                (p["id"],)
-            ).fetchone()
-            if row:
-                result[p["record_id"]] = (row["price"], p.get("title", ""), p.get("location", ""))
-        return result
+        return {
+            p["record_id"]: {
+                "id":            p["id"],
+                "price":         p["last_price"],
+                "current_price": p["current_price"],
+                "title":         p.get("title", ""),
+                "location":      p.get("location", ""),
+                "link":          p.get("link", ""),
+                "is_favorite":   bool(p.get("is_favorite")),
+            }
+            for p in self.db.get_properties(search_id, status=None)
+            if p["last_price"] is not None
+        }
 
     def _create_session(self) -> requests.Session:
         """Create a session with retry logic"""
@@ -281,6 +488,18 @@ class ImotScraper:
         session.mount('https://', HTTPAdapter(max_retries=retries))
         return session
 
+    @staticmethod
+    def _http_get(session: requests.Session, url: str, kind: str, **kwargs) -> requests.Response:
+        """session.get() wrapped with request count / latency / in-flight metrics."""
+        outcome = "error"
+        try:
+            with _HTTP_IN_FLIGHT.track_inprogress(), _HTTP_LATENCY.time(kind=kind):
+                response = session.get(url, **kwargs)
+            outcome = str(response.status_code)
+            return response
+        finally:
+            _HTTP_REQUESTS.inc(kind=kind, outcome=outcome)
+
     def _extract_listing_data(self, listing: BeautifulSoup) -> Optional[Tuple[str, str, str, str]]:
         """Extract data from a listing card. Returns (title, price_text, link, record_id)."""
         try:
@@ -359,7 +578,7 @@ class ImotScraper:
         """Fetch and parse an individual property detail page."""
         try:
             sleep(self.config['DETAIL_DELAY'])
-            response = session.get(url, timeout=15)
+            response = self._http_get(session, url, "detail", timeout=15)
             response.raise_for_status()
             return BeautifulSoup(response.content, "html.parser")
         except Exception as e:
@@ -485,7 +704,7 @@ class ImotScraper:
                 else:
                     page_url = f"{url.rstrip('/')}/p-{page}"
             
-            response = session.get(page_url)
+            response = self._http_get(session, page_url, "page")
             response.raise_for_status()
             return BeautifulSoup(response.content, "html.parser")
         except Exception as e:
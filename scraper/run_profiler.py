@@ -0,0 +1,183 @@
+"""
+Profiling support for scrape runs.
+
+RunProfiler wraps a callable with cProfile (CPU) and tracemalloc (Python
+allocations) and writes a plain-text report — top functions, top
+allocation sites, peak traced memory and peak RSS — plus the raw .prof
+stats file into the profiles folder of the data dir.
+
+Self-contained: no GUI or database imports.
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Callable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """Return the process peak resident set size in bytes, or None if unknown."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports KiB, macOS reports bytes
+        return peak if sys.platform == "darwin" else peak * 1024
+    except ImportError:
+        pass
+    try:
+        import ctypes
+        import ctypes.wintypes
+
+        class _ProcessMemoryCounters(ctypes.Structure):
+            _fields_ = [
+                ("cb",                         ctypes.wintypes.DWORD),
+                ("PageFaultCount",             ctypes.wintypes.DWORD),
+                ("PeakWorkingSetSize",         ctypes.c_size_t),
+                ("WorkingSetSize",             ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage",    ctypes.c_size_t),
+                ("QuotaPagedPoolUsage",        ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage",     ctypes.c_size_t),
+                ("PagefileUsage",              ctypes.c_size_t),
+                ("PeakPagefileUsage",          ctypes.c_size_t),
+            ]
+
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return int(counters.PeakWorkingSetSize)
+    except Exception:
+        pass
+    return None
+
+
+def _fmt_mb(n: Optional[int]) -> str:
+    return f"{n / 1024 / 1024:.1f} MB" if n is not None else "n/a"
+
+
+class RunProfiler:
+    """
+    Profile one call and write a report into *profile_dir*.
+
+    Usage:
+        result, report_path = RunProfiler(dir).run(scraper_function)
+    """
+
+    TOP_FUNCTIONS   = 40
+    TOP_ALLOCATIONS = 25
+    TRACE_FRAMES    = 5
+
+    # tracemalloc is process-wide: overlapping runs share one trace, which
+    # the last of them to finish stops (unless it was already running).
+    _trace_lock  = threading.Lock()
+    _trace_runs  = 0
+    _trace_owned = False
+
+    def __init__(self, profile_dir: str, label: str = "run"):
+        self.profile_dir = profile_dir
+        self.label = label
+
+    def run(self, func: Callable[[], Any]) -> Tuple[Any, Optional[str]]:
+        """
+        Call *func* under cProfile + tracemalloc.
+        Returns (func's return value, report path or None if writing failed).
+        Exceptions from *func* propagate after the report is written.
+        """
+        os.makedirs(self.profile_dir, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")  # overlapping runs get their own
+        base = os.path.join(self.profile_dir, f"profile_{self.label}_{stamp}")
+
+        profiler = cProfile.Profile()
+        with RunProfiler._trace_lock:
+            if RunProfiler._trace_runs == 0:
+                RunProfiler._trace_owned = not tracemalloc.is_tracing()
+                if RunProfiler._trace_owned:
+                    tracemalloc.start(self.TRACE_FRAMES)
+            RunProfiler._trace_runs += 1
+        tracemalloc.reset_peak()
+
+        result: Any = None
+        error: Optional[BaseException] = None
+        t0 = time.perf_counter()
+        try:
+            profiler.enable()
+        except ValueError as exc:
+            # Another profiler is already active in this thread — run unprofiled.
+            logger.warning(f"CPU profiling unavailable for this run: {exc}")
+            profiler = None
+        try:
+            result = func()
+        except BaseException as exc:
+            error = exc
+        finally:
+            if profiler:
+                profiler.disable()
+            duration = time.perf_counter() - t0
+            snapshot = tracemalloc.take_snapshot()
+            _, traced_peak = tracemalloc.get_traced_memory()
+            with RunProfiler._trace_lock:
+                RunProfiler._trace_runs -= 1
+                if RunProfiler._trace_runs == 0 and RunProfiler._trace_owned:
+                    tracemalloc.stop()
+
+        report_path: Optional[str] = None
+        try:
+            report_path = self._write_report(base, profiler, snapshot, traced_peak,
+                                             duration, result, error)
+            logger.info(f"Profiling report written to: {report_path}")
+        except Exception as exc:
+            logger.warning(f"Could not write profiling report: {exc}")
+
+        if error is not None:
+            raise error
+        return result, report_path
+
+    def _write_report(self, base: str, profiler: Optional[cProfile.Profile],
+                      snapshot: tracemalloc.Snapshot, traced_peak: int,
+                      duration: float, result: Any,
+                      error: Optional[BaseException]) -> str:
+        report_path = base + ".txt"
+        out = io.StringIO()
+        out.write(f"ImotScraper profiling report — {self.label}\n")
+        out.write(f"Finished:          {datetime.now():%Y-%m-%d %H:%M:%S}\n")
+        out.write(f"Duration:          {duration:.2f} s\n")
+        out.write(f"Result:            {'exception: ' + repr(error) if error else repr(result)}\n")
+        out.write(f"Peak traced (Py):  {_fmt_mb(traced_peak)}\n")
+        out.write(f"Peak RSS:          {_fmt_mb(_peak_rss_bytes())}  (process lifetime)\n")
+
+        out.write(f"\n── Top {self.TOP_FUNCTIONS} functions by cumulative time "
+                  f"{'─' * 30}\n")
+        if profiler:
+            profiler.dump_stats(base + ".prof")
+            stats = pstats.Stats(profiler, stream=out)
+            stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(self.TOP_FUNCTIONS)
+            out.write(f"── Top {self.TOP_FUNCTIONS} functions by own time {'─' * 36}\n")
+            stats.sort_stats(pstats.SortKey.TIME).print_stats(self.TOP_FUNCTIONS)
+        else:
+            out.write("CPU profile unavailable.\n")
+
+        out.write(f"\n── Top {self.TOP_ALLOCATIONS} allocation sites (live at end of run) "
+                  f"{'─' * 20}\n")
+        filtered = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+        for stat in filtered.statistics("lineno")[:self.TOP_ALLOCATIONS]:
+            frame = stat.traceback[0]
+            out.write(f"{stat.size / 1024:10.1f} KiB  {stat.count:8d} blocks  "
+                      f"{frame.filename}:{frame.lineno}\n")
+
+        with open(report_path, "w", encoding="utf-8") as fh:
+            fh.write(out.getvalue())
+        return report_path
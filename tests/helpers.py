@@ -0,0 +1,34 @@
+"""
+Helpers shared by the test modules: opening a database at an older schema
+version and seeding it, so a migration test can upgrade data stored the
+way that release stored it.
+"""
+from database.db_manager import DatabaseManager
+
+
+def old_db(path, version):
+    """Open *path* as a release at schema *version* would, leaving it there."""
+    class _OldDB(DatabaseManager):
+        MIGRATIONS = DatabaseManager.MIGRATIONS[:version]
+        SCHEMA_VERSION = version
+    return _OldDB(db_path=path)
+
+
+def add_listing(db, search_id, record_id, price="1 EUR", **columns):
+    """
+    Store a listing found by *search_id* with plain INSERTs: its listings
+    row (*columns* plus current_price), an Active membership and the first
+    price_history row. For seeding old_db databases, whose schema the
+    current upsert_property no longer matches. Returns the listing id.
+    """
+    columns = {"link": f"https://example.com/{record_id}", **columns}
+    with db._get_connection() as conn:
+        listing_id = conn.execute(
+            f"INSERT INTO listings (record_id, current_price, {', '.join(columns)}) "
+            f"VALUES (?, ?{', ?' * len(columns)})",
+            (record_id, price, *columns.values())).lastrowid
+        conn.execute("INSERT INTO search_membership (listing_id, search_id) VALUES (?, ?)",
+                     (listing_id, search_id))
+        conn.execute("INSERT INTO price_history (property_id, seq, price, is_new) VALUES (?, 1, ?, 1)",
+                     (listing_id, price))
+    return listing_id
@@ -0,0 +1,135 @@
+"""
+Test incremental backups: DatabaseManager.backup writing a full base
+segment and then page-level deltas (database/page_backup.py), the manifest
+describing the chains, rotation of whole chains, and restore_from_backup
+replaying a chain up to any segment — checked against its SHA-256.
+"""
+import sys, os, json, shutil, sqlite3, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import page_backup
+from database.db_manager import DatabaseManager
+
+
+def _add_flats(db, sid, start, n):
+    for i in range(start, start + n):
+        db.upsert_property(f"r{i}", sid, f"Flat {i}", "гр. София, Лозенец", os.urandom(1000).hex(),
+                           f"https://example.com/{i}", f"{100_000 + i} EUR", is_new=True)
+
+
+def _record_ids(db):
+    with db._get_connection() as conn:
+        return {r[0] for r in conn.execute("SELECT record_id FROM listings")}
+
+
+def test_segments_round_trip():
+    d = tempfile.mkdtemp()
+    path = os.path.join(d, "a.db")
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("CREATE TABLE t (x BLOB)")
+    conn.executemany("INSERT INTO t VALUES (?)", [(os.urandom(400),) for _ in range(3000)])
+    base = page_backup.write_segment(os.path.join(d, "base.z"), path)
+    assert base.pages_written == base.page_count == os.path.getsize(path) // base.page_size
+
+    conn.execute("UPDATE t SET x = randomblob(400) WHERE rowid = 1500")
+    delta = page_backup.write_segment(os.path.join(d, "delta.z"), path, base.digests)
+    assert 1 <= delta.pages_written <= 3 and delta.bytes < base.bytes / 50
+
+    with open(os.path.join(d, "out.db"), "w+b") as f:
+        page_backup.apply_segment(os.path.join(d, "base.z"), f)
+        assert page_backup.file_sha256(f) == base.sha256
+        page_backup.apply_segment(os.path.join(d, "delta.z"), f)
+        assert page_backup.file_sha256(f) == delta.sha256
+
+    try:
+        page_backup.read_segment(path)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("an SQLite file was read as a segment")
+
+
+def test_incremental_backup_and_restore():
+    d = tempfile.mkdtemp()
+    db = DatabaseManager(db_path=os.path.join(d, "imot_scraper.db"))
+    sid = db.add_search("test", "https://example.com")
+    _add_flats(db, sid, 0, 300)
+
+    first = db.backup(every_n_days=0)
+    assert first.endswith(".full.z")
+    assert db.backup() == first                       # one per day by default
+    _add_flats(db, sid, 300, 5)
+    second = db.backup(every_n_days=0)
+    _add_flats(db, sid, 305, 5)
+    third = db.backup(every_n_days=0)
+    assert second.endswith(".delta.z") and third.endswith(".delta.z")
+
+    with open(os.path.join(d, "backups", "imot_scraper_backups.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    (chain,) = manifest["chains"]
+    full, delta1, delta2 = chain["segments"]
+    assert [s["kind"] for s in chain["segments"]] == ["full", "delta", "delta"]
+    assert delta1["pages_written"] < full["page_count"] / 4
+    assert delta1["bytes"] < full["bytes"] / 4
+    assert [b["path"] for b in db.list_local_backups()] == [third, second, first]
+
+    # Replay the chain up to the middle segment
+    _add_flats(db, sid, 310, 5)
+    db.restore_from_backup(second)
+    assert _record_ids(db) == {f"r{i}" for i in range(305)}
+    db.restore_from_backup(third)
+    assert _record_ids(db) == {f"r{i}" for i in range(310)}
+    with db._get_connection() as conn:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+
+    # A damaged or missing segment is refused and the live DB is left alone
+    shutil.copy(second, second + ".bak")
+    with open(second, "r+b") as f:
+        f.seek(40)
+        f.write(b"\0" * 16)
+    try:
+        db.restore_from_backup(third)
+    except Exception:
+        pass
+    else:
+        raise AssertionError("restored from a damaged chain")
+    os.remove(second)
+    try:
+        db.restore_from_backup(third)
+    except FileNotFoundError as e:
+        assert os.path.basename(second) in str(e)
+    else:
+        raise AssertionError("restored from an incomplete chain")
+    assert _record_ids(db) == {f"r{i}" for i in range(310)}
+    os.replace(second + ".bak", second)
+
+
+def test_chain_rotation_and_legacy_copies():
+    d = tempfile.mkdtemp()
+    db = DatabaseManager(db_path=os.path.join(d, "imot_scraper.db"))
+    sid = db.add_search("test", "https://example.com")
+    backups = os.path.join(d, "backups")
+    os.makedirs(backups)
+    legacy = os.path.join(backups, "imot_scraper_20240101_000000.db")
+    db._get_connection().backup(sqlite3.connect(legacy))   # as earlier versions did
+
+    paths = []
+    for n in range(5):
+        _add_flats(db, sid, n, 1)
+        paths.append(db.backup(keep_local=2, every_n_days=0, full_every=1))
+    # full, delta | full, delta | full → the first chain is gone
+    assert [os.path.basename(p)[-7:] for p in paths] == \
+        [".full.z", "delta.z", ".full.z", "delta.z", ".full.z"]
+    assert not os.path.exists(paths[0]) and not os.path.exists(paths[1])
+    listed = [b["path"] for b in db.list_local_backups()]
+    assert listed == [paths[4], paths[3], paths[2], legacy]
+
+    db.restore_from_backup(legacy)
+    assert _record_ids(db) == set()
+
+
+if __name__ == '__main__':
+    test_segments_round_trip()
+    test_incremental_backup_and_restore()
+    test_chain_rotation_and_legacy_copies()
+    print("PASS")
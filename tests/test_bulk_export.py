@@ -0,0 +1,81 @@
+"""
+Test the streaming bulk export: DatabaseManager.export writing properties,
+price history, scrape runs and area stats as CSV, JSONL and (when pyarrow
+is installed) Parquet, in small fetchmany chunks, filtered by search and
+date range.
+"""
+import sys, os, csv, json, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import bulk_io
+from database.db_manager import DatabaseManager
+
+
+def _db():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    a = db.add_search("a", "https://example.com/a")
+    b = db.add_search("b", "https://example.com/b")
+    for sid, prefix, n in ((a, "a", 7), (b, "b", 3)):
+        run = db.begin_scrape_run(prefix, sid)
+        for i in range(n):
+            db.upsert_property(f"{prefix}{i}", sid, f"Flat {i}", "гр. София, Лозенец", "",
+                               f"https://example.com/{prefix}{i}", f"{100_000 + i} EUR",
+                               is_new=True, price_per_sqm=f"{1500 + i} €/m²", run_id=run)
+        db.log_scrape_run(prefix, n, n, 0, 0, True, search_id=sid, run_id=run)
+        db.record_run_stats(sid, run, new_count=n, removed_count=0)
+        db.record_area_stats_snapshot(sid)
+    return db, a, b
+
+
+def test_export_csv_and_jsonl():
+    db, a, b = _db()
+    out = tempfile.mkdtemp()
+    counts = db.export(out, "csv", chunk_size=3)
+    assert counts == {"properties": 10, "price_history": 10, "scrape_runs": 2,
+                      "run_stats": 2, "area_stats": 2}
+    with open(os.path.join(out, "price_history.csv"), encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert len(rows) == 10 and rows[0]["price"] == "100000 EUR"
+    assert sorted(os.listdir(out)) == sorted(t + ".csv" for t in counts)   # no .part left
+
+    counts = db.export(out, "jsonl", search_id=a, chunk_size=4)
+    assert counts["properties"] == 7 and counts["price_history"] == 7 and counts["scrape_runs"] == 1
+    with open(os.path.join(out, "properties.jsonl"), encoding="utf-8") as f:
+        props = [json.loads(line) for line in f]
+    assert {p["search_id"] for p in props} == {a}
+    assert props[0]["location"] == "гр. София, Лозенец" and props[0]["price_per_sqm_eur"] == 1500.0
+
+    # Everything was recorded today: a range ending today is empty
+    with db._get_connection() as conn:
+        today = conn.execute("SELECT date('now', 'localtime')").fetchone()[0]
+    assert set(db.export(out, "csv", until=today).values()) == {0}
+    assert db.export(out, "csv", since=today)["price_history"] == 10
+
+    try:
+        db.export(out, "xlsx")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("unknown format accepted")
+
+
+def test_export_parquet():
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        print("SKIP: pyarrow not installed")
+        return
+    db, a, b = _db()
+    out = tempfile.mkdtemp()
+    assert db.export(out, "parquet", search_id=b, chunk_size=2)["price_history"] == 3
+    table = pq.read_table(os.path.join(out, "price_history.parquet"))
+    assert table.num_rows == 3 and str(table.schema.field("amount").type) == "double"
+    assert table.column("price").to_pylist() == ["100000 EUR", "100001 EUR", "100002 EUR"]
+    assert pq.ParquetFile(os.path.join(out, "price_history.parquet")).metadata.num_row_groups == 2
+    assert bulk_io.FORMATS["parquet"] == ".parquet"
+
+
+if __name__ == '__main__':
+    test_export_csv_and_jsonl()
+    test_export_parquet()
+    print("PASS")
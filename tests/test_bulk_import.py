@@ -0,0 +1,103 @@
+"""
+Test the bulk importer: DatabaseManager.import_file validating rows,
+creating searches / listings / memberships, merging price changes into
+existing histories by date, refreshing the denormalised price columns,
+and re-imports adding nothing.
+"""
+import sys, os, csv, json, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import bulk_io
+from database.db_manager import DatabaseManager
+
+HEADER = ["search_name", "search_url", "record_id", "recorded_at", "price",
+          "title", "location", "price_per_sqm", "status"]
+ROWS = [
+    ["old", "https://example.com/old", "h1", "2022-01-10", "80 000 EUR", "Flat 1", "гр. София, Лозенец", "1 000 €/m²", ""],
+    ["old", "",                        "h1", "2022-02-10", "80 000 EUR", "Flat 1", "гр. София, Лозенец", "1 000 €/m²", ""],
+    ["old", "",                        "h1", "2022-03-10", "78 000 EUR", "Flat 1", "гр. София, Лозенец", "975 €/m²",  ""],
+    ["old", "",                        "h2", "2022-03-10", "60 000 EUR", "Flat 2", "гр. София, Младост", "",          "active"],
+    ["",    "",                        "h3", "2022-03-10", "1 EUR",      "",       "",                   "",          ""],
+    ["old", "",                        "h4", "not a date", "1 EUR",      "",       "",                   "",          ""],
+    # A listing the live scraper already tracks, seen earlier at two prices
+    ["live", "",                       "r1", "2020-01-01", "90 000 EUR", "Old title", "",               "",          ""],
+    ["live", "",                       "r1", "2020-06-01", "95 000 EUR", "Old title", "",               "",          ""],
+]
+
+
+def _write_csv(rows):
+    path = os.path.join(tempfile.mkdtemp(), "history.csv")
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        writer.writerows(rows)
+    return path
+
+
+def test_import_row():
+    row = bulk_io.import_row({"search_name": "s", "record_id": "1", "recorded_at": "2023-05-01T08:30",
+                              "price": "85 000 EUR", "area_sqm": "68 m²", "status": "ACTIVE"})
+    assert row[3] == "2023-05-01 08:30:00" and row[5:9] == (85000.0, "EUR", 0, 85000.0)
+    assert row[18] == 68.0 and row[-1] == "Active"
+    for bad, reason in (({"search_name": "s", "record_id": "1", "recorded_at": "2023-05-01"}, "price"),
+                        ({"search_name": "s", "record_id": "1", "recorded_at": "2023-05-01",
+                          "price": "1 EUR", "status": "sold"}, "status")):
+        try:
+            bulk_io.import_row(bad)
+        except ValueError as e:
+            assert reason in str(e)
+        else:
+            raise AssertionError(f"accepted {bad}")
+
+
+def test_import_merges_history():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    live = db.add_search("live", "https://example.com/live")
+    r1 = db.upsert_property("r1", live, "Live title", "", "", "https://example.com/r1",
+                            "95 000 EUR", is_new=True)
+
+    report = db.import_file(_write_csv(ROWS), chunk_size=3)
+    assert report["rows"] == 8 and report["rejected"] == 2
+    assert report["errors"] == ["line 5: missing search_name", "line 6: bad recorded_at 'not a date'"]
+    assert (report["searches"], report["listings"]) == (1, 2)
+    assert report["rows_per_s"] > 0
+
+    old = [s for s in db.get_all_searches() if s["search_name"] == "old"][0]
+    assert old["url"] == "https://example.com/old"
+    props = {p["record_id"]: p for p in db.get_properties(old["id"])}
+    h1, h2 = props["h1"], props["h2"]
+    assert (h1["status"], h1["first_seen"], h1["last_seen"]) == \
+        ("Inactive", "2022-01-10 00:00:00", "2022-03-10 00:00:00")
+    assert h2["status"] == "Active" and h2["location_id"] is not None
+    assert (h1["current_price"], h1["previous_price"], h1["price_per_sqm_eur"]) == \
+        ("78 000 EUR", "80 000 EUR", 975.0)
+    assert [(h["price"], h["price_status"]) for h in db.get_price_history(h1["id"])] == \
+        [("78 000 EUR", "Current"), ("80 000 EUR", "Previous")]
+
+    # r1: 90 000 → 95 000 merged before the live 95 000, which now repeats it
+    with db._get_connection() as conn:
+        history = [tuple(r) for r in conn.execute(
+            "SELECT seq, price, is_new, recorded_at FROM price_history WHERE property_id = ? ORDER BY seq",
+            (r1,))]
+    assert history == [(1, "90 000 EUR", 1, "2020-01-01 00:00:00"),
+                       (2, "95 000 EUR", 0, "2020-06-01 00:00:00")]
+    r1_row = db.get_property(r1, live)
+    assert r1_row["title"] == "Live title"                 # scraped data wins
+    assert (r1_row["current_price"], r1_row["previous_price"]) == ("95 000 EUR", "90 000 EUR")
+    assert r1_row["first_seen"] == "2020-01-01 00:00:00" and r1_row["status"] == "Active"
+
+    # The same file again adds nothing; JSONL reads the same way
+    again = db.import_file(_write_csv(ROWS))
+    assert (again["searches"], again["listings"], again["prices"]) == (0, 0, 0)
+    path = os.path.join(tempfile.mkdtemp(), "more.jsonl")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"search_name": "old", "record_id": "h1", "recorded_at": "2022-04-01",
+                            "price": 77000, "status": "Inactive"}) + "\n")
+    assert db.import_file(path)["prices"] == 1
+    assert db.get_property(h1["id"], old["id"])["current_price"] == "77000"
+
+
+if __name__ == '__main__':
+    test_import_row()
+    test_import_merges_history()
+    print("PASS")
@@ -0,0 +1,134 @@
+"""
+Test the chart pipeline: LTTB downsampling and the O(n) rolling mean, and
+AreaAvgChartDialog rendering on its worker thread — cached per search until
+the next finished run, with clicks mapped to the nearest dot.  Runs headless
+(offscreen Qt platform).
+"""
+import sys, os, time, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import numpy as np
+from PyQt6.QtCore import QPointF
+from PyQt6.QtWidgets import QApplication
+
+from controller.app_controller import AppController
+from scraper.imotBgScraper import ImotScraper
+import gui.imot_gui_qt as gui
+
+_app = QApplication.instance() or QApplication([])
+
+
+def test_lttb_and_rolling_avg():
+    x = np.arange(10_000, dtype=float)
+    y = np.sin(x / 500)
+    y[4321] = 5.0                                     # a spike must survive
+    idx = gui._lttb(x, y, 300)
+    assert len(idx) == 300 and idx[0] == 0 and idx[-1] == 9_999
+    assert (np.diff(idx) > 0).all() and 4321 in idx
+    assert list(gui._lttb(x[:10], y[:10], 300)) == list(range(10))
+
+    assert list(gui._rolling_avg([1, 2, 3, 4, 5, 6, 7, 8], 3)) == [2, 2, 3, 4, 5, 6, 7, 7.5]
+
+
+class _Click:
+    """Stand-in for the QMouseEvent of a click at (x, y)."""
+    def __init__(self, x, y):
+        self._pos = QPointF(x, y)
+
+    def position(self):
+        return self._pos
+
+
+def _wait_rendered(dialog, timeout=20.0):
+    deadline = time.time() + timeout
+    while dialog._render is None and time.time() < deadline:
+        _app.processEvents()
+        time.sleep(0.01)
+    return dialog._render
+
+
+def test_area_chart_renders_off_thread_and_caches():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp())
+    db = scraper.db
+    sid = db.add_search("test", "https://example.com")
+    run = db.begin_scrape_run("test", sid)
+    for n in range(5):
+        db.upsert_property(f"r{n}", sid, f"Flat {n}", "", "", f"https://example.com/{n}",
+                           "100 000 EUR", is_new=True, price_per_sqm=f"{1500 + 100 * n} €/m²",
+                           run_id=run)
+    db.log_scrape_run("test", 5, 5, 0, 0, True, search_id=sid, run_id=run)
+    db.record_run_stats(sid, run, new_count=5, removed_count=0)
+    controller = AppController(scraper=scraper)
+
+    gui._CHART_CACHE.clear()
+    dialog = gui.AreaAvgChartDialog(None, "test", sid, controller)
+    dialog.show()
+    render = _wait_rendered(dialog)
+    assert render is not None and not render.image.isNull()
+    assert len(render.points) == 5 and len(gui._CHART_CACHE) == 1
+
+    # A click near dot 2 opens its gallery; one far from every dot does nothing
+    opened = []
+    original, gui.GalleryWindow.exec = gui.GalleryWindow.exec, lambda self: opened.append(self._prop["id"])
+    try:
+        x, y = render.points[2]
+        dialog._on_canvas_click(_Click(x + 3, y - 2))
+        dialog._on_canvas_click(_Click(x + 40, y))
+    finally:
+        gui.GalleryWindow.exec = original
+    assert opened == [int(render.ids[2])]
+    dialog.done(0)
+
+    # Same search, same run → served from the cache; a new run invalidates it
+    again = gui.AreaAvgChartDialog(None, "test", sid, controller)
+    again.show()
+    assert _wait_rendered(again) is render
+    again.done(0)
+    db.log_scrape_run("test", 5, 0, 0, 0, True, search_id=sid, run_id=db.begin_scrape_run("test", sid))
+    fresh = gui.AreaAvgChartDialog(None, "test", sid, controller)
+    fresh.show()
+    assert _wait_rendered(fresh) is not render
+    fresh.done(0)
+
+
+def test_chart_opened_mid_run_is_not_cached_as_fresh():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp())
+    db = scraper.db
+    sid = db.add_search("test", "https://example.com")
+    controller = AppController(scraper=scraper)
+
+    def scrape(run, numbers):
+        for n in numbers:
+            db.upsert_property(f"r{n}", sid, f"Flat {n}", "", "", f"https://example.com/{n}",
+                               "100 000 EUR", is_new=True, price_per_sqm=f"{1500 + 100 * n} €/m²",
+                               run_id=run)
+
+    def open_chart():
+        dialog = gui.AreaAvgChartDialog(None, "test", sid, controller)
+        dialog.show()
+        render = _wait_rendered(dialog)
+        dialog.done(0)
+        return render
+
+    first = db.begin_scrape_run("test", sid)
+    scrape(first, range(2))
+    db.log_scrape_run("test", 2, 2, 0, 0, True, search_id=sid, run_id=first)
+    db.record_run_stats(sid, first, new_count=2, removed_count=0)
+
+    # Opened between begin_scrape_run and log_scrape_run: sees part of the run
+    gui._CHART_CACHE.clear()
+    second = db.begin_scrape_run("test", sid)
+    scrape(second, range(2, 4))
+    assert len(open_chart().points) == 4
+    scrape(second, range(4, 5))
+    db.log_scrape_run("test", 5, 3, 0, 0, True, search_id=sid, run_id=second)
+    db.record_run_stats(sid, second, new_count=3, removed_count=0)
+    assert len(open_chart().points) == 5
+
+
+if __name__ == '__main__':
+    test_lttb_and_rolling_avg()
+    test_area_chart_renders_off_thread_and_caches()
+    test_chart_opened_mid_run_is_not_cached_as_fresh()
+    print("PASS")
@@ -0,0 +1,67 @@
+"""
+Test the denormalised current / previous price columns on properties:
+kept in step by upsert_property and backfilled by migration 15.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+from tests.helpers import old_db
+
+
+def test_upsert_maintains_current_price():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    pid = db.upsert_property("a1", sid, "Flat", "Sofia", "", "https://example.com/a1",
+                             "100 000 EUR | Без ДДС", is_new=True)
+    p = db.get_property(pid)
+    assert p["current_price"] == "100 000 EUR | Без ДДС"
+    assert p["current_price_eur"] == 100000.0 and p["current_vat_excluded"] == 1
+    assert p["previous_price"] is None and p["price_changed_at"] is None
+
+    db.upsert_property("a1", sid, "Flat", "Sofia", None, "https://example.com/a1",
+                       "100 000 EUR | Без ДДС", is_new=False)       # unchanged: no new history row
+    assert len(db.get_price_history(pid)) == 1
+
+    db.upsert_property("a1", sid, "Flat", "Sofia", None, "https://example.com/a1",
+                       "95 000 EUR", is_new=False)
+    p = db.get_property(pid)
+    assert p["current_price"] == "95 000 EUR" and p["current_vat_excluded"] == 0
+    assert p["previous_price"] == "100 000 EUR | Без ДДС"
+    assert p["price_changed_at"] is not None
+
+    report = db.get_new_and_changed_since_last_run(sid)
+    assert report == {"new": [], "changed": []}          # no successful run yet
+    db.log_scrape_run("test", 1, 1, 1, 0, True, search_id=sid)
+    with db._get_connection() as conn:
+        conn.execute("UPDATE scrape_runs SET run_date = '2000-01-01 00:00:00'")
+    report = db.get_new_and_changed_since_last_run(sid)
+    assert [r["price"] for r in report["new"]] == ["95 000 EUR"]
+    assert [(r["current_price"], r["previous_price"]) for r in report["changed"]] == [
+        ("95 000 EUR", "100 000 EUR | Без ДДС")]
+
+
+def test_migration_backfills_current_price():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 14)                     # before the denormalised price columns
+    sid = old.add_search("test", "https://example.com")
+    with old._get_connection() as conn:
+        pid = conn.execute(
+            "INSERT INTO properties (record_id, search_id, title, location, link) "
+            "VALUES ('a1', ?, 'Flat', 'Sofia', 'https://example.com/a1')", (sid,)).lastrowid
+        conn.executemany(
+            "INSERT INTO price_history (property_id, price, price_status, is_new, recorded_at, "
+            "amount, currency, vat_excluded, price_eur) VALUES (?, ?, ?, ?, ?, ?, 'EUR', 0, ?)",
+            [(pid, "80 000 EUR", "Previous", 1, "2025-01-01 08:00:00", 80000.0, 80000.0),
+             (pid, "75 000 EUR", "Current", 0, "2025-02-01 08:00:00", 75000.0, 75000.0)])
+    old.close_all_connections()
+
+    p = DatabaseManager(db_path=path).get_property(pid)
+    assert p["current_price"] == "75 000 EUR" and p["current_price_eur"] == 75000.0
+    assert p["previous_price"] == "80 000 EUR" and p["price_changed_at"] is not None
+
+
+if __name__ == '__main__':
+    test_upsert_maintains_current_price()
+    test_migration_backfills_current_price()
+    print("PASS")
@@ -0,0 +1,99 @@
+"""
+Test underpricing scores: database.deal_score adjusting €/m² for area and
+floor before scoring, score_search storing the scores per search
+membership, get_top_deals reading them back, and migration 23 scoring the
+searches of an existing database.
+"""
+import sys, os, math, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import deal_score, locations
+from database.db_manager import DatabaseManager
+from tests.helpers import add_listing, old_db
+
+
+# (area m², €/m², floor, location): small flats cost more per m², so the
+# 35 m² flat at 2300 €/m² is fair while the 90 m² one at 1300 €/m² is cheap
+FLATS = [
+    (35, 2300, "3-ти", "гр. София, Лозенец"),
+    (40, 2200, "4-ти", "гр. София, Лозенец"),
+    (50, 2000, "2-ри", "гр. София,  Лозенец"),
+    (60, 1900, "5-ти", "гр. София, Лозенец"),
+    (70, 1800, "3-ти", "гр. София, Лозенец"),
+    (80, 1700, "6-ти", "гр. София, Младост"),
+    (90, 1300, "4-ти", "гр. София, Младост"),
+    (100, 1600, "2-ри", "гр. София, Младост"),
+    (110, 1550, "7-ми", "гр. София, Младост"),
+    (120, 1500, "3-ти", "гр. София, Младост"),
+]
+
+
+def test_scores():
+    area, sqm, floors, keys = zip(*[(a, s, f, locations.key(locations.parse(l)))
+                                    for a, s, f, l in FLATS])
+    out = deal_score.scores(list(sqm), list(area), list(floors), list(keys))
+    score = out["score"]
+    assert int(score.argmax()) == 6 and deal_score.is_deal(score[6])
+    assert not deal_score.is_deal(score[0])                 # dearest per m², but small
+    assert out["percentile"][6] == 0.0
+    assert all(math.isfinite(v) for v in out["area_score"])  # both locations have 5
+    assert out["area_score"][6] > deal_score.DEAL_THRESHOLD
+
+    # Too few priced listings: nothing is scored
+    few = deal_score.scores([1000, None, 1200], [50, 60, 70], [None] * 3, [None] * 3)
+    assert all(math.isnan(v) for v in few["score"])
+
+    assert deal_score.floor_features("Партер") == (1.0, 0.0, 0.0)
+    assert deal_score.floor_features("1-ви") == (0.0, 1.0, 0.0)
+    assert deal_score.floor_features("6-ти от 6") == (0.0, 0.0, 1.0)
+    assert deal_score.floor_features(None) == (0.0, 0.0, 0.0)
+
+
+def _add_flats(db, sid, run_id=None):
+    return [db.upsert_property(f"r{n}", sid, f"Flat {n}", location, "", f"https://example.com/{n}",
+                               f"{area * sqm} EUR", is_new=True, price_per_sqm=f"{sqm} €/m²",
+                               area_sqm=f"{area} m²", floor=floor, run_id=run_id)
+            for n, (area, sqm, floor, location) in enumerate(FLATS)]
+
+
+def test_score_search():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    pids = _add_flats(db, sid)
+    db.intern_pending_locations()
+
+    scored = db.score_search(sid)
+    assert set(scored) == set(pids)
+    assert deal_score.is_deal(scored[pids[6]]["deal_score"])
+    top = db.get_top_deals(sid, limit=3)
+    assert top[0]["id"] == pids[6] and len(top) == 3
+    assert top[0]["deal_score"] >= top[1]["deal_score"] >= top[2]["deal_score"]
+    row = next(r for r in db.get_property_rows(sid) if r["id"] == pids[6])
+    assert row["deal_percentile"] == 0.0 and row["deal_area_score"] is not None
+
+    # An inactive listing loses its score on the next pass
+    run = db.begin_scrape_run("test", sid)
+    db.touch_properties(sid, [f"r{n}" for n in range(len(FLATS)) if n != 6], run)
+    db.mark_inactive(sid, run)
+    db.score_search(sid)
+    assert pids[6] not in {r["id"] for r in db.get_top_deals(sid)}
+
+
+def test_migration_scores_existing_searches():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 22)                     # before deal scores
+    sid = old.add_search("test", "https://example.com")
+    pids = [add_listing(old, sid, f"r{n}", f"{area * sqm} EUR", location=location, floor=floor,
+                        price_per_sqm_eur=sqm, area_sqm_value=area)
+            for n, (area, sqm, floor, location) in enumerate(FLATS)]
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    assert db.get_top_deals(sid, limit=1)[0]["id"] == pids[6]
+
+
+if __name__ == '__main__':
+    test_scores()
+    test_score_search()
+    test_migration_scores_existing_searches()
+    print("PASS")
@@ -0,0 +1,53 @@
+"""
+Test the scraper event bus: typed dispatch, base-class subscriptions,
+unsubscribe and isolation of failing subscribers.
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from events.event_bus import (
+    EventBus, ScraperEvent, ListingEvent, ListingNew, ListingChanged,
+    ListingRemoved, SearchStarted,
+)
+
+
+def test_dispatch_by_type_and_base_class():
+    bus = EventBus()
+    new_only, listings, everything = [], [], []
+    bus.subscribe(ListingNew, new_only.append)
+    bus.subscribe(ListingEvent, listings.append)
+    bus.subscribe(ScraperEvent, everything.append)
+
+    bus.publish(SearchStarted(search_id=1, search_name="Sofia", index=1, total=2))
+    bus.publish(ListingNew(search_id=1, search_name="Sofia", property_id=7,
+                           record_id="1a", title="Flat", link="http://x", price="100 000 EUR"))
+    bus.publish(ListingChanged(search_id=1, search_name="Sofia", property_id=7,
+                               price="95 000 EUR", old_price="100 000 EUR", is_favorite=True))
+    bus.publish(ListingRemoved(search_id=1, search_name="Sofia", property_id=8))
+
+    assert [type(e) for e in new_only] == [ListingNew]
+    assert [e.kind for e in listings] == ["NEW", "CHANGED", "DEACTIVATED"]
+    assert len(everything) == 4
+    assert listings[1].is_favorite and listings[1].old_price == "100 000 EUR"
+
+
+def test_unsubscribe_and_failing_subscriber():
+    bus = EventBus()
+    received = []
+
+    def broken(_event):
+        raise RuntimeError("boom")
+
+    bus.subscribe(ListingEvent, broken)
+    unsubscribe = bus.subscribe(ListingEvent, received.append)
+    bus.publish(ListingNew(search_id=1, search_name="s"))   # broken must not stop delivery
+    assert len(received) == 1
+
+    unsubscribe()
+    bus.publish(ListingNew(search_id=1, search_name="s"))
+    assert len(received) == 1
+
+
+if __name__ == '__main__':
+    test_dispatch_by_type_and_base_class()
+    test_unsubscribe_and_failing_subscriber()
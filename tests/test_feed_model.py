@@ -0,0 +1,69 @@
+"""
+Test the live feed model: batched inserts, the MAX_ROWS ring buffer and
+running counters.  Runs headless (offscreen Qt platform).
+"""
+import sys, os
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from events.event_bus import ListingNew, ListingChanged
+from gui.imot_gui_qt import FeedTableModel
+
+_app = QApplication.instance() or QApplication([])
+
+
+def _new(i):
+    return ListingNew(search_id=1, search_name="Sofia", property_id=i,
+                      title=f"Flat {i}", price="100 000 EUR")
+
+
+def test_batched_insert_and_counters():
+    model = FeedTableModel()
+    inserts = []
+    model.rowsInserted.connect(lambda _p, first, last: inserts.append((first, last)))
+
+    for i in range(250):
+        model.enqueue(_new(i))
+    model.enqueue(ListingChanged(search_id=1, search_name="Sofia", property_id=999,
+                                 title="Flat", price="90 000 EUR", old_price="95 000 EUR",
+                                 is_favorite=True))
+    assert model.rowCount() == 0          # nothing shown until the timer flushes
+    model.flush()
+
+    assert inserts == [(0, 250)]          # one batch, not 251 single-row inserts
+    assert model.counts["NEW"] == 250 and model.counts["CHANGED"] == 1
+    assert model.data(model.index(250, 3)) == "95 000 EUR → 90 000 EUR"
+    assert model.data(model.index(250, 2)).startswith("🌟 ")
+
+
+def test_ring_buffer_keeps_newest_rows():
+    model = FeedTableModel()
+    model.MAX_ROWS = 100
+    for i in range(80):
+        model.enqueue(_new(i))
+    model.flush()
+    for i in range(80, 150):
+        model.enqueue(_new(i))
+    model.flush()
+
+    assert model.rowCount() == 100
+    assert model.event_at(0).property_id == 50
+    assert model.event_at(99).property_id == 149
+    assert model.counts["NEW"] == 150     # counters cover evicted rows too
+
+
+def test_placeholder_row():
+    model = FeedTableModel()
+    model.clear(placeholder="Run a scrape")
+    assert model.rowCount() == 1 and model.event_at(0) is None
+    model.enqueue(_new(1))
+    model.flush()
+    assert model.rowCount() == 1 and model.event_at(0).property_id == 1
+
+
+if __name__ == '__main__':
+    test_batched_insert_and_counters()
+    test_ring_buffer_keeps_newest_rows()
+    test_placeholder_row()
@@ -0,0 +1,62 @@
+"""
+Test the FTS5 listing search: the index follows inserts, text changes and
+deletes, results are ranked with title hits first, user input can't break
+the MATCH syntax, and migration 19 indexes existing listings.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+from tests.helpers import old_db
+
+
+def _add(db, rid, sid, title, location="", description=""):
+    return db.upsert_property(rid, sid, title, location, description,
+                              f"https://example.com/{sid}/{rid}", "100 000 EUR", is_new=True)
+
+
+def test_search_follows_writes_and_ranks():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    a = db.add_search("a", "https://example.com/a")
+    b = db.add_search("b", "https://example.com/b")
+    _add(db, "1", a, "Продава 2-СТАЕН", "гр. София, Лозенец", "Ново строителство, южно изложение")
+    _add(db, "2", b, "Ново строителство в Бояна", "гр. София, Бояна", "Тухла")
+    _add(db, "3", b, "Продава 3-СТАЕН", "гр. София, Център", "Стара тухла")
+
+    hits = db.search_listings("ново строит")
+    assert [h["record_id"] for h in hits] == ["2", "1"]          # title beats description
+    assert hits[0]["search_name"] == "b" and "«Ново»" in hits[0]["snippet"]
+    assert [h["record_id"] for h in db.search_listings("ЛОЗЕНЕЦ")] == ["1"]
+    assert [h["record_id"] for h in db.search_listings("ново", search_id=a)] == ["1"]
+
+    # Re-sighting with a new title re-indexes it; description is never overwritten
+    db.upsert_property("3", b, "Продава 3-СТАЕН, ново", "гр. София, Център", None,
+                       "https://example.com/b/3", "100 000 EUR", is_new=False)
+    assert {h["record_id"] for h in db.search_listings("ново")} == {"1", "2", "3"}
+    assert [h["record_id"] for h in db.search_listings("стара тухла")] == ["3"]
+
+    db.delete_search(b)
+    assert [h["record_id"] for h in db.search_listings("софия")] == ["1"]
+
+    for query in ('"', "OR", "NEAR(", "title:*", "", "   "):
+        db.search_listings(query)                                 # never a syntax error
+    assert db.search_listings("") == []
+
+
+def test_migration_indexes_existing_listings():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 18)                     # before the full-text index
+    sid = old.add_search("test", "https://example.com")
+    with old._get_connection() as conn:
+        conn.execute("INSERT INTO properties (record_id, search_id, title, location, description, link) "
+                     "VALUES ('1', ?, 'Мезонет', 'гр. Пловдив', 'С гледка към тепетата', '')", (sid,))
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    assert [h["record_id"] for h in db.search_listings("тепета")] == ["1"]
+
+
+if __name__ == '__main__':
+    test_search_follows_writes_and_ranks()
+    test_migration_indexes_existing_listings()
+    print("PASS")
@@ -0,0 +1,34 @@
+"""
+Test streaming image access: metadata without BLOBs, and chunked
+incremental blob reads of a single image.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+
+
+def test_image_ids_and_chunked_blob_read():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    pid = db.upsert_property("a1", sid, "Flat", "Sofia", "", "https://example.com/a1",
+                             "100 000 EUR", is_new=True)
+    big = os.urandom(300_000)
+    with db._get_connection() as conn:
+        for url, data, pos in [("second", b"small", 1), ("first", big, 0)]:
+            blob_id = conn.execute("INSERT INTO image_blobs (sha1, image_data) VALUES (?, ?) RETURNING id",
+                                   (url.encode(), data)).fetchone()[0]
+            conn.execute("INSERT INTO property_images (property_id, url, blob_id, position) "
+                         "VALUES (?, ?, ?, ?)", (pid, url, blob_id, pos))
+
+    images = db.get_image_ids(pid)
+    assert [i["url"] for i in images] == ["first", "second"]
+    assert "image_data" not in images[0] and images[0]["size"] == len(big)
+
+    assert db.read_image_blob(images[0]["id"], chunk_size=4096) == big
+    assert db.read_image_blob(images[1]["id"]) == b"small"
+    assert db.read_image_blob(999_999) is None
+
+
+if __name__ == '__main__':
+    test_image_ids_and_chunked_blob_read()
@@ -0,0 +1,146 @@
+"""
+Test photo de-duplication and matching: byte-identical images stored once
+in image_blobs, dHash in database.image_hash, and
+DatabaseManager.find_listings_sharing_photos finding re-encoded copies of a
+listing's photos through the band index, and ImotScraper hashing new
+photos once per execution.
+"""
+import sys, os, io, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from PIL import Image, ImageDraw
+
+from database import image_hash
+from database.db_manager import DatabaseManager
+from scraper.imotBgScraper import ImotScraper
+from tests.helpers import add_listing, old_db
+
+
+def _photo(seed: int, size=(320, 240), fmt="PNG", quality=90) -> bytes:
+    """A synthetic 'photo': shapes placed by *seed* on a gradient, drawn at
+    320×240 and saved at *size*."""
+    w, h = 320, 240
+    img = Image.new("RGB", (w, h))
+    draw = ImageDraw.Draw(img)
+    for x in range(w):
+        draw.line([(x, 0), (x, h)], fill=(x * 255 // w, 80, 160))
+    for i in range(6):
+        x0, y0 = (seed * 53 + i * 71) % (w - 60), (seed * 29 + i * 43) % (h - 60)
+        draw.ellipse([x0, y0, x0 + 40 + i * 5, y0 + 40], fill=((seed * 37 + i * 90) % 256, 20, 40))
+    if size != (w, h):
+        img = img.resize(size, Image.Resampling.BICUBIC)
+    buf = io.BytesIO()
+    img.save(buf, fmt, **({"quality": quality} if fmt == "JPEG" else {}))
+    return buf.getvalue()
+
+
+class _FakeSession:
+    """Serves url → bytes so upsert_images stores without the network."""
+    def __init__(self, files):
+        self.files = files
+
+    def get(self, url, timeout=None):
+        data = self.files[url]
+        class _Response:
+            content = data
+            def raise_for_status(self):
+                pass
+        return _Response()
+
+
+def test_dhash():
+    original = _photo(1)
+    resized = _photo(1, size=(640, 480), fmt="JPEG", quality=60)
+    other = _photo(7)
+    a, b, c = (image_hash.dhash(x) for x in (original, resized, other))
+    assert -(1 << 63) <= a < (1 << 63)
+    assert image_hash.hamming(a, b) <= image_hash.MAX_DISTANCE
+    assert image_hash.hamming(a, c) > 10
+    assert image_hash.dhash(b"not an image") is None
+    assert len(image_hash.bands(a)) == image_hash.BANDS
+    assert all(0 <= v < 1 << image_hash.BAND_BITS for v in image_hash.bands(a))
+
+
+def test_find_listings_sharing_photos():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    files = {"a/1": _photo(1), "a/2": _photo(2),
+             "b/1": _photo(1),                                          # same bytes
+             "c/1": _photo(2, size=(640, 480), fmt="JPEG", quality=60),  # re-encoded
+             "d/1": _photo(9), "d/2": b"<html>not found</html>"}
+    session = _FakeSession(files)
+    pids = {}
+    for rid in "abcd":
+        pids[rid] = db.upsert_property(rid, sid, f"Flat {rid}", "Sofia", "", f"https://example.com/{rid}",
+                                       "100 000 EUR", is_new=True)
+        db.upsert_images(pids[rid], sorted(u for u in files if u.startswith(rid)), session=session)
+
+    with db._get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0] == 5
+    assert db.get_images(pids["b"])[0]["image_data"] == files["b/1"]
+
+    # Before hashing only the byte-identical copy is found
+    assert [r["record_id"] for r in db.find_listings_sharing_photos(pids["a"])] == ["b"]
+
+    assert db.hash_pending_images(max_workers=2, batch_size=2) == 4
+    with db._get_connection() as conn:                  # d/2 can't be decoded: tried once only
+        assert conn.execute("SELECT COUNT(*) FROM image_blobs WHERE dhash IS NULL AND hash_failed = 0"
+                            ).fetchone()[0] == 0
+    assert db.hash_pending_images() == 0
+    shared = db.find_listings_sharing_photos(pids["a"])
+    assert {r["record_id"]: r["shared_photos"] for r in shared} == {"b": 1, "c": 1}
+    assert shared[0]["search_name"] == "test" and shared[0]["status"] == "Active"
+    assert db.find_listings_sharing_photos(pids["d"]) == []
+
+    # Blobs go with the last listing using them
+    with db._get_connection() as conn:
+        conn.execute("DELETE FROM listings WHERE id = ?", (pids["b"],))
+        assert conn.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0] == 5
+        conn.execute("DELETE FROM listings WHERE id = ?", (pids["a"],))      # a/1 and a/2 go
+        assert conn.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0] == 3
+        assert conn.execute("SELECT COUNT(DISTINCT blob_id) FROM image_dhash_bands").fetchone()[0] == 2
+
+
+def test_migration_deduplicates_images():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 21)                     # image bytes stored per listing
+    sid = old.add_search("test", "https://example.com")
+    a = add_listing(old, sid, "a", title="A")
+    b = add_listing(old, sid, "b", title="B")
+    with old._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO property_images (property_id, url, image_data, position) VALUES (?, ?, ?, ?)",
+            [(a, "a/1", b"same", 0), (a, "a/2", b"other", 1), (b, "b/1", b"same", 0)])
+        image_id = conn.execute("SELECT id FROM property_images WHERE url = 'a/2'").fetchone()[0]
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    with db._get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM image_blobs").fetchone()[0] == 2
+    assert [i["url"] for i in db.get_image_ids(a)] == ["a/1", "a/2"]
+    assert db.read_image_blob(image_id) == b"other"
+    assert db.get_first_image(b) == b"same"
+    assert [r["record_id"] for r in db.find_listings_sharing_photos(a)] == ["b"]
+
+
+
+def test_execute_hashes_once_after_all_searches():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp())
+    for name in ("a", "b"):
+        scraper.db.add_search(name, f"https://example.com/{name}")
+    scraper._process_page = lambda session, url, page: None  # offline: every search is empty
+    calls = []
+
+    def failing_hash():
+        calls.append(len(scraper.db.get_all_scrape_runs()))
+        raise OSError("disk full")
+    scraper.db.hash_pending_images = failing_hash
+    assert scraper.execute() is True                         # a hashing failure isn't a failed run
+    assert calls == [2]
+
+if __name__ == '__main__':
+    test_dhash()
+    test_find_listings_sharing_photos()
+    test_migration_deduplicates_images()
+    test_execute_hashes_once_after_all_searches()
+    print("PASS")
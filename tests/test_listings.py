@@ -0,0 +1,153 @@
+"""
+Test the shared listing entity: a record found by several searches is one
+listings row (content, price history, images) with a search_membership row
+per search (which remembers the last price that search saw), and
+migration 20 merges the per-search duplicates of older
+databases into it.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from bs4 import BeautifulSoup
+
+from database.db_manager import DatabaseManager
+from events.event_bus import ListingChanged
+from scraper.imotBgScraper import ImotScraper
+from tests.helpers import old_db
+
+
+def _upsert(db, sid, price, is_new, run_id=None, description=None):
+    return db.upsert_property("r1", sid, "Flat", "Sofia", description, "https://example.com/r1",
+                              price, is_new=is_new, price_per_sqm="1000 €/m²", run_id=run_id)
+
+
+def test_searches_share_one_listing():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    a = db.add_search("a", "https://example.com/a")
+    b = db.add_search("b", "https://example.com/b")
+
+    pid = _upsert(db, a, "100 000 EUR", is_new=True, description="Тухла")
+    assert _upsert(db, b, "100 000 EUR", is_new=True) == pid
+    with db._get_connection() as conn:
+        conn.execute("INSERT INTO image_blobs (id, sha1, image_data) VALUES (1, x'01', x'00')")
+        conn.executemany(
+            "INSERT INTO property_images (property_id, url, blob_id) VALUES (?, ?, 1)",
+            [(pid, "u1"), (pid, "u2")])
+
+    # A sees the drop first; B seeing the same price adds nothing
+    _upsert(db, a, "90 000 EUR", is_new=False)
+    _upsert(db, b, "90 000 EUR", is_new=False)
+    assert [h["price"] for h in db.get_price_history(pid)] == ["90 000 EUR", "100 000 EUR"]
+    assert db.get_listing("r1")["description"] == "Тухла"
+    assert db.get_image_count(pid) == 2
+
+    # Status and favourite are per search
+    assert db.toggle_favorite("r1", a) is True
+    assert db.is_favorite("r1", a) and not db.is_favorite("r1", b)
+    run = db.begin_scrape_run("a", a)
+    assert db.mark_inactive(a, run) == ["r1"]
+    assert db.get_properties(a)[0]["status"] == "Inactive"
+    assert db.get_properties(b)[0]["status"] == "Active"
+    assert db.get_active_price_stats(a)["active_count"] == 0
+    assert db.get_active_price_stats(b)["active_count"] == 1
+
+    hits = db.search_listings("flat")
+    assert len(hits) == 1 and hits[0]["search_name"] == "a, b"
+    assert hits[0]["status"] == "Active" and hits[0]["is_favorite"] == 1
+
+    # The listing outlives a search while another one still has it
+    db.delete_search(a)
+    assert db.get_listing("r1")["id"] == pid and db.get_image_count(pid) == 2
+    db.delete_search(b)
+    assert db.get_listing("r1") is None
+    assert db.get_price_history(pid) == [] and db.get_image_count(pid) == 0
+
+
+def _results_page(price):
+    return BeautifulSoup(
+        '<div class="item" id="ad-r1"><a class="title saveSlink">Flat</a>'
+        f'<div class="price"><div>{price}</div></div></div>', "html.parser")
+
+
+def test_each_search_sees_a_shared_price_change():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp())
+    db = scraper.db
+    a = db.add_search("a", "https://example.com/a")
+    b = db.add_search("b", "https://example.com/b")
+    for sid in (a, b):
+        _upsert(db, sid, "100 000 EUR", is_new=True)
+
+    detail_fetches = []
+    scraper._process_page = lambda session, url, page: _results_page("90 000 EUR") if page == 1 else None
+    scraper._extract_title_and_location = lambda session, url: (
+        detail_fetches.append(url) or ("Flat", "Sofia", None, [], "900 €/m²", None, None, None))
+    changed = []
+    scraper.events.subscribe(ListingChanged, changed.append)
+
+    results = [scraper._scrape_search(None, f"https://example.com/{name}", name, sid)
+               for name, sid in (("a", a), ("b", b))]
+    assert [r["changed_prices"] for r in results] == [1, 1]
+    assert [(e.search_id, e.old_price, e.price) for e in changed] == [
+        (a, "100 000 EUR", "90 000 EUR"), (b, "100 000 EUR", "90 000 EUR")]
+    assert len(detail_fetches) == 1                  # b reuses the €/m² a fetched
+
+    pid = db.get_listing("r1")["id"]
+    assert [h["price"] for h in db.get_price_history(pid)] == ["90 000 EUR", "100 000 EUR"]
+    assert {db.get_property(pid, sid)["last_price"] for sid in (a, b)} == {"90 000 EUR"}
+
+    # The next run finds both unchanged
+    results = [scraper._scrape_search(None, f"https://example.com/{name}", name, sid)
+               for name, sid in (("a", a), ("b", b))]
+    assert [r["changed_prices"] for r in results] == [0, 0] and len(changed) == 2
+
+
+def test_migration_merges_duplicates():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 19)                     # one properties row per (record, search)
+    a = old.add_search("a", "https://example.com/a")
+    b = old.add_search("b", "https://example.com/b")
+    with old._get_connection() as conn:
+        older = conn.execute(
+            "INSERT INTO properties (record_id, search_id, title, location, description, link, "
+            "status, first_seen, last_seen, is_favorite, price_per_sqm_eur) VALUES "
+            "('r1', ?, 'Flat', 'Sofia', 'Тухла', 'https://example.com/r1', 'Inactive', "
+            "'2025-01-01 08:00:00', '2025-02-01 08:00:00', 1, 1000.0)", (a,)).lastrowid
+        newer = conn.execute(
+            "INSERT INTO properties (record_id, search_id, title, location, link, status, "
+            "first_seen, last_seen, price_per_sqm_eur) VALUES "
+            "('r1', ?, 'Flat, renovated', 'Sofia', 'https://example.com/r1', 'Active', "
+            "'2025-01-15 08:00:00', '2025-03-01 08:00:00', 1000.0)", (b,)).lastrowid
+        conn.execute("INSERT INTO properties (record_id, search_id, link) VALUES ('r2', ?, '')", (a,))
+        conn.executemany(
+            "INSERT INTO price_history (property_id, seq, price, is_new, recorded_at) VALUES (?, ?, ?, ?, ?)",
+            [(older, 1, "100 000 EUR", 1, "2025-01-01 08:00:00"),
+             (older, 2, "90 000 EUR", 0, "2025-01-20 08:00:00"),
+             (newer, 1, "90 000 EUR", 1, "2025-01-15 08:00:00"),
+             (newer, 2, "85 000 EUR", 0, "2025-02-15 08:00:00")])
+        conn.execute("INSERT INTO property_images (property_id, url, image_data) "
+                     "VALUES (?, 'u1', x'00')", (older,))
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    listing = db.get_listing("r1")
+    assert listing["id"] == newer                       # the most recently seen copy survives
+    assert listing["title"] == "Flat, renovated" and listing["description"] == "Тухла"
+    assert listing["current_price"] == "85 000 EUR" and listing["previous_price"] == "90 000 EUR"
+    history = db.get_price_history(newer)
+    assert [(h["seq"], h["price"]) for h in history] == [
+        (3, "85 000 EUR"), (2, "90 000 EUR"), (1, "100 000 EUR")]
+    assert db.get_image_count(newer) == 1
+
+    by_search = {s: db.get_properties(s) for s in (a, b)}
+    assert {p["record_id"]: p["status"] for p in by_search[a]} == {"r1": "Inactive", "r2": "Active"}
+    assert [(p["id"], p["status"]) for p in by_search[b]] == [(newer, "Active")]
+    assert db.is_favorite("r1", a) and not db.is_favorite("r1", b)
+    assert db.get_active_price_stats(b)["avg_price_per_sqm"] == 1000.0
+    assert [h["record_id"] for h in db.search_listings("тухла")] == ["r1"]
+
+
+if __name__ == '__main__':
+    test_searches_share_one_listing()
+    test_each_search_sees_a_shared_price_change()
+    test_migration_merges_duplicates()
+    print("PASS")
@@ -0,0 +1,113 @@
+"""
+Test the locations dictionary: database.locations parsing scraped location
+strings, intern_pending_locations interning them into locations, record_run_stats
+writing per-location counts and median €/m² to location_stats, and
+migration 24 interning the locations of an existing database.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import locations, run_stats
+from database.db_manager import DatabaseManager
+from tests.helpers import add_listing, old_db
+
+
+def test_parse():
+    assert locations.parse("гр. София, Лозенец") == ("София", None, "Лозенец")
+    assert locations.parse("град  София, кв. Лозенец") == ("София", None, "Лозенец")
+    assert locations.parse("с. Панчарево, област София") == ("Панчарево", "София", None)
+    assert locations.parse("гр. София, район Витоша, ж.к. Младост 1") == ("София", "Витоша", "Младост 1")
+    assert locations.parse("София, Лозенец") == ("София", None, "Лозенец")
+    assert locations.parse("") is None and locations.parse(None) is None
+
+    same = {locations.key(locations.parse(s))
+            for s in ("гр. София, Лозенец", "град София,  кв. Лозенец", "ГР. СОФИЯ, ЛОЗЕНЕЦ")}
+    assert same == {"софия||лозенец"}
+
+
+def test_group_medians():
+    out = run_stats.group_medians([7, 7, 9, 7, None], [1500, None, 2000, 1700, 900])
+    assert out == {7: (3, 2, 1600.0), 9: (1, 1, 2000.0)}
+    assert run_stats.group_medians([3], [None]) == {3: (1, 0, None)}
+
+
+# (location, €/m²) — two spellings of Лозенец share one location row; the
+# last one can't be parsed
+FLATS = [("гр. София, Лозенец", 2000), ("град София, кв. Лозенец", 2400),
+         ("гр. София, Лозенец", 2200), ("гр. София, Младост", 1500), ("", 1800), (" , . ", 1700)]
+
+
+def _add_flats(db, sid, run_id=None):
+    return [db.upsert_property(f"r{n}", sid, f"Flat {n}", location, "", f"https://example.com/{n}",
+                               f"{sqm * 60} EUR", is_new=True, price_per_sqm=f"{sqm} €/m²",
+                               run_id=run_id)
+            for n, (location, sqm) in enumerate(FLATS)]
+
+
+def test_location_stats():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    run = db.begin_scrape_run("test", sid)
+    pids = _add_flats(db, sid, run)
+    assert db.intern_pending_locations() == 5 and db.intern_pending_locations() == 0
+
+    ids = [db.get_property(pid)["location_id"] for pid in pids]
+    assert ids[0] == ids[1] == ids[2] != ids[3] and ids[4] is None and ids[5] is None
+    with db._get_connection() as conn:                  # not pending: parsed once only
+        assert conn.execute("SELECT location_id FROM listings WHERE id = ?",
+                            (pids[5],)).fetchone()[0] == db.UNPARSED_LOCATION_ID
+    assert db.get_property(pids[1])["location"] == "град София, кв. Лозенец"   # text kept for display
+
+    db.log_scrape_run("test", 5, 5, 0, 0, True, search_id=sid, run_id=run)
+    db.record_run_stats(sid, run, new_count=5, removed_count=0)
+    stats = db.get_location_stats(sid)
+    assert [(s["neighbourhood"], s["active_count"], s["sqm_median"]) for s in stats] == \
+        [("Лозенец", 3, 2200.0), ("Младост", 1, 1500.0)]
+    assert stats[0]["city"] == "София"
+    assert db.get_location_stats(sid, run) == stats
+
+    # A changed location text is re-interned on the next pass
+    db.upsert_property("r3", sid, "Flat 3", "гр. София, Лозенец", "", "https://example.com/3",
+                       "90000 EUR", is_new=False)
+    assert db.get_property(pids[3])["location_id"] is None
+    db.intern_pending_locations()
+    assert db.get_property(pids[3])["location_id"] == ids[0]
+
+    db.delete_search(sid)
+    assert db.get_location_stats(sid, run) == []
+
+
+def test_migration_interns_existing_locations():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 23)                     # before the locations dictionary
+    sid = old.add_search("test", "https://example.com")
+    pids = [add_listing(old, sid, f"r{n}", f"{sqm * 60} EUR", location=location, price_per_sqm_eur=sqm)
+            for n, (location, sqm) in enumerate(FLATS)]
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    ids = [db.get_property(pid)["location_id"] for pid in pids]
+    assert ids[0] == ids[1] == ids[2] != ids[3] and ids[4] is None and ids[5] is None
+    assert db.intern_pending_locations() == 0
+
+
+def test_migration_settles_unparseable_locations():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 26)                     # unparseable text stays pending
+    sid = old.add_search("test", "https://example.com")
+    pid = add_listing(old, sid, "r0", location=" , . ")
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    assert db.intern_pending_locations() == 0 and db.get_property(pid)["location_id"] is None
+    with db._get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM listings WHERE location_id IS NULL").fetchone()[0] == 0
+
+
+if __name__ == '__main__':
+    test_parse()
+    test_group_medians()
+    test_location_stats()
+    test_migration_interns_existing_locations()
+    test_migration_settles_unparseable_locations()
+    print("PASS")
@@ -0,0 +1,73 @@
+"""
+Test run-id based inactivation: listings stamped with the current run stay
+Active, everything else in the search is inactivated by one UPDATE —
+including searches larger than SQLite's bound-variable limit.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+
+
+def _db():
+    return DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+
+
+def test_unstamped_listings_are_inactivated():
+    db = _db()
+    sid = db.add_search("test", "https://example.com")
+    other = db.add_search("other", "https://example.com/other")
+
+    run1 = db.begin_scrape_run("test", sid)
+    for rid in ("a", "b", "c"):
+        db.upsert_property(rid, sid, rid, "", "", f"https://example.com/{rid}", "1 EUR",
+                           is_new=True, run_id=run1)
+    db.upsert_property("x", other, "x", "", "", "https://example.com/x", "1 EUR", is_new=True)
+    assert db.mark_inactive(sid, run1) == []
+
+    # Run 2: "a" unchanged, "b" changed price, "c" gone
+    run2 = db.begin_scrape_run("test", sid)
+    db.touch_properties(sid, ["a"], run2)
+    db.upsert_property("b", sid, "b", "", None, "https://example.com/b", "2 EUR",
+                       is_new=False, run_id=run2)
+    assert db.mark_inactive(sid, run2) == ["c"]
+
+    status = {p["record_id"]: p["status"] for p in db.get_properties(sid)}
+    assert status == {"a": "Active", "b": "Active", "c": "Inactive"}
+    assert db.get_properties(other)[0]["status"] == "Active"   # other searches untouched
+
+    # Run 3: "c" reappears unchanged and is live again
+    run3 = db.begin_scrape_run("test", sid)
+    db.touch_properties(sid, ["a", "b", "c"], run3)
+    assert db.mark_inactive(sid, run3) == []
+    assert all(p["status"] == "Active" and p["inactivated_at"] is None
+               for p in db.get_properties(sid))
+
+    db.log_scrape_run("test", 3, 0, 0, 0, True, search_id=sid, run_id=run3)
+    runs = db.get_scrape_history(sid)
+    assert [r["id"] for r in runs][0] == run3 and runs[0]["success"] == 1
+    assert runs[0]["error_message"] is None and runs[0]["records_found"] == 3
+
+
+def test_beyond_variable_limit():
+    db = _db()
+    sid = db.add_search("big", "https://example.com")
+    n = 40000
+    with db._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO listings (id, record_id, link) VALUES (?, ?, '')",
+            [(i + 1, f"r{i}") for i in range(n)],
+        )
+        conn.executemany(
+            "INSERT INTO search_membership (listing_id, search_id) VALUES (?, ?)",
+            [(i + 1, sid) for i in range(n)],
+        )
+    run = db.begin_scrape_run("big", sid)
+    db.touch_properties(sid, [f"r{i}" for i in range(n - 1)], run)
+    assert db.mark_inactive(sid, run) == [f"r{n - 1}"]
+
+
+if __name__ == '__main__':
+    test_unstamped_listings_are_inactivated()
+    test_beyond_variable_limit()
+    print("PASS")
@@ -0,0 +1,65 @@
+"""
+Test the metrics registry text exposition and the local HTTP endpoint.
+"""
+import sys, os, urllib.request
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from metrics.metrics_service import MetricsRegistry, MetricsServer
+
+
+def test_render_prometheus_text_format():
+    reg = MetricsRegistry()
+    requests_total = reg.counter("imot_test_requests_total", "Requests.", ("kind",))
+    in_flight = reg.gauge("imot_test_in_flight", "In flight.")
+    latency = reg.histogram("imot_test_latency_seconds", "Latency.", ("kind",), buckets=(0.1, 1.0))
+
+    requests_total.inc(kind="page")
+    requests_total.inc(2, kind="page")
+    in_flight.set(3)
+    latency.observe(0.05, kind="page")
+    latency.observe(0.5, kind="page")
+    latency.observe(5, kind="page")
+
+    text = reg.render()
+    assert "# TYPE imot_test_requests_total counter" in text
+    assert 'imot_test_requests_total{kind="page"} 3' in text
+    assert "imot_test_in_flight 3" in text
+    # Buckets are cumulative and +Inf equals the count
+    assert 'imot_test_latency_seconds_bucket{kind="page",le="0.1"} 1' in text
+    assert 'imot_test_latency_seconds_bucket{kind="page",le="1"} 2' in text
+    assert 'imot_test_latency_seconds_bucket{kind="page",le="+Inf"} 3' in text
+    assert 'imot_test_latency_seconds_count{kind="page"} 3' in text
+
+    # get-or-create returns the same family; a conflicting re-registration fails
+    assert reg.counter("imot_test_requests_total", "Requests.", ("kind",)) is requests_total
+    try:
+        reg.gauge("imot_test_requests_total", "Requests.")
+        assert False, "re-registering with another type should raise"
+    except ValueError:
+        pass
+
+
+def test_label_values_are_escaped():
+    reg = MetricsRegistry()
+    reg.counter("imot_test_total", "x", ("search",)).inc(search='Sofia "centre"\n')
+    assert 'search="Sofia \\"centre\\"\\n"' in reg.render()
+
+
+def test_server_serves_metrics():
+    reg = MetricsRegistry()
+    reg.gauge("imot_last_run_success", "Last run outcome.").set(1)
+    server = MetricsServer(port=0, registry=reg)
+    assert server.start()
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{server.port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"].startswith("text/plain")
+        assert "imot_last_run_success 1" in body
+    finally:
+        server.stop()
+
+
+if __name__ == '__main__':
+    test_render_prometheus_text_format()
+    test_label_values_are_escaped()
+    test_server_serves_metrics()
@@ -76,12 +76,13 @@ def test_recovers_from_stranded_properties_old():
         db = DatabaseManager(tmp)
 
         conn = sqlite3.connect(tmp)
-        tables_after = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()}
+        tables_after = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')").fetchall()}
         props_cols = [r[1] for r in conn.execute("PRAGMA table_info(properties)").fetchall()]
         conn.close()
 
         assert 'properties_old' not in tables_after, "properties_old should have been cleaned up"
-        assert 'properties' in tables_after, "properties table should exist"
+        assert 'properties' in tables_after, "properties (now a view over listings) should exist"
+        assert 'listings' in tables_after, "listings table should exist"
         assert 'search_id' in props_cols, "properties should have search_id column"
         assert 'search_name' not in props_cols, "properties should NOT have search_name column"
 
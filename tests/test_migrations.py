@@ -0,0 +1,108 @@
+"""
+Test the versioned migration engine: PRAGMA user_version fast path, the
+set-based price_status recalculation and background migrations.
+"""
+import sys, os, sqlite3, tempfile, threading
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+
+
+def make_legacy_db(path):
+    """A pre-migration-1 database: price_history still has old_price."""
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE searches (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            search_name TEXT NOT NULL UNIQUE,
+            url         TEXT NOT NULL,
+            emails      TEXT NOT NULL DEFAULT '',
+            created_at  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO searches (search_name, url) VALUES ('test', 'https://example.com');
+
+        CREATE TABLE properties (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            record_id   TEXT NOT NULL,
+            search_id   INTEGER NOT NULL REFERENCES searches(id) ON DELETE CASCADE,
+            title       TEXT,
+            link        TEXT,
+            status      TEXT NOT NULL DEFAULT 'Active',
+            first_seen  DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            last_seen   DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            UNIQUE (record_id, search_id)
+        );
+        INSERT INTO properties (record_id, search_id, title) VALUES ('a', 1, 'A'), ('b', 1, 'B');
+
+        CREATE TABLE price_history (
+            id          INTEGER PRIMARY KEY AUTOINCREMENT,
+            property_id INTEGER NOT NULL,
+            price       TEXT NOT NULL,
+            old_price   TEXT,
+            is_new      INTEGER NOT NULL DEFAULT 0,
+            recorded_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+        INSERT INTO price_history (property_id, price, recorded_at) VALUES
+            (1, '100 EUR', '2024-01-01'), (1, '90 EUR', '2024-02-01'),
+            (1, '80 EUR',  '2024-03-01'), (2, '50 EUR', '2024-01-05');
+    """)
+    conn.commit()
+    conn.close()
+
+
+def test_legacy_db_upgrades_with_set_based_statuses():
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    make_legacy_db(path)
+    steps = []
+    db = DatabaseManager(path, on_migration_progress=lambda i, n, d: steps.append((i, n)))
+
+    assert steps == [(i, DatabaseManager.SCHEMA_VERSION) for i in range(1, DatabaseManager.SCHEMA_VERSION + 1)]
+    with db._get_connection() as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == DatabaseManager.SCHEMA_VERSION
+    statuses = [(r["price"], r["price_status"]) for r in db.get_price_history(1)]
+    assert statuses == [("80 EUR", "Current"), ("90 EUR", "Previous"), ("100 EUR", "Older")]
+    assert db.get_price_history(2)[0]["price_status"] == "Current"
+
+
+def test_current_schema_skips_migrations():
+    path = os.path.join(tempfile.mkdtemp(), "t.db")
+    DatabaseManager(path).close_all_connections()
+
+    original = DatabaseManager._migrate
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("migrations re-ran on a current schema")
+    DatabaseManager._migrate = _fail
+    try:
+        db = DatabaseManager(path)
+        assert db.is_ready()
+        assert db.get_all_searches() == []
+    finally:
+        DatabaseManager._migrate = original
+
+
+def test_background_migration_gates_queries():
+    path = os.path.join(tempfile.mkdtemp(), "legacy.db")
+    make_legacy_db(path)
+    release = threading.Event()
+    seen = []
+
+    def _progress(step, total, description):
+        seen.append(step)
+        release.wait(5)          # hold the migration until the test checks the gate
+
+    db = DatabaseManager(path, background_migrations=True, on_migration_progress=_progress)
+    assert not db.is_ready()
+    assert not db.wait_until_ready(timeout=0.05)
+    release.set()
+
+    searches = db.get_all_searches()     # waits for the migration to finish
+    assert db.is_ready() and [s["search_name"] for s in searches] == ["test"]
+    assert seen == list(range(1, DatabaseManager.SCHEMA_VERSION + 1))
+    assert db.migration_progress is None
+
+
+if __name__ == '__main__':
+    test_legacy_db_upgrades_with_set_based_statuses()
+    test_current_schema_skips_migrations()
+    test_background_migration_gates_queries()
+    print("PASS")
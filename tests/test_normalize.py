@@ -0,0 +1,82 @@
+"""
+Test the numeric normalisation of scraped display strings: the parsers in
+database.normalize, the values stored on write, and the migration 12
+backfill of databases created before the numeric columns existed.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import normalize
+from database.db_manager import DatabaseManager
+from tests.helpers import old_db
+
+
+def test_parsers():
+    p = normalize.parse_price("123 456 EUR | Без ДДС")
+    assert p.amount == 123456.0 and p.currency == "EUR"
+    assert p.vat_excluded and p.price_eur == 123456.0
+
+    p = normalize.parse_price("195 583 лв.")
+    assert p.currency == "BGN" and not p.vat_excluded
+    assert p.price_eur == 100000.0
+
+    assert normalize.parse_price("—") is None
+    assert normalize.parse_price("") is None
+    assert normalize.parse_price("По договаряне") is None
+
+    assert normalize.parse_price_per_sqm("1686 €/m²") == 1686.0
+    assert normalize.parse_price_per_sqm("1 234,5 EUR/m²") == 1234.5
+    assert normalize.parse_area("54 m²") == 54.0
+    assert normalize.parse_number("85.000") == 85000.0
+    assert normalize.parse_number("10.43") == 10.43
+
+
+def test_numeric_columns_written_and_aggregated():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    a = db.upsert_property("a1", sid, "Flat A", "Sofia", "", "https://example.com/a1",
+                           "100 000 EUR | Без ДДС", is_new=True,
+                           price_per_sqm="2000 €/m²", area_sqm="50 m²")
+    db.upsert_property("b2", sid, "Flat B", "Sofia", "", "https://example.com/b2",
+                       "90 000 EUR", is_new=True, price_per_sqm="1000 €/m²")
+    db.upsert_property("c3", sid, "Flat C", "Sofia", "", "https://example.com/c3",
+                       "—", is_new=True)
+
+    prop = db.get_property(a)
+    assert prop["price_per_sqm_eur"] == 2000.0 and prop["area_sqm_value"] == 50.0
+    current = db.get_price_history(a)[0]
+    assert current["price_eur"] == 100000.0 and current["vat_excluded"] == 1
+
+    stats = db.get_active_price_stats(sid)
+    assert stats == {"active_count": 3, "avg_price_per_sqm": 1500.0, "sqm_count": 2,
+                     "min_price_per_sqm": 1000.0, "max_price_per_sqm": 2000.0,
+                     "stddev_price_per_sqm": 500.0}
+
+
+def test_migration_backfills_old_rows():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 11)                     # before the numeric columns
+    sid = old.add_search("test", "https://example.com")
+    with old._get_connection() as conn:
+        pid = conn.execute(
+            "INSERT INTO properties (record_id, search_id, title, location, link, "
+            "price_per_sqm, area_sqm, yard_sqm) VALUES ('a1', ?, 'Flat A', 'Sofia', "
+            "'https://example.com/a1', '1 700 €/m²', '50 m²', '200 m²')", (sid,)).lastrowid
+        conn.execute("INSERT INTO price_history (property_id, price, price_status, is_new) "
+                     "VALUES (?, '85 000 EUR', 'Current', 1)", (pid,))
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    prop = db.get_property(pid)
+    assert prop["price_per_sqm_eur"] == 1700.0
+    assert prop["area_sqm_value"] == 50.0 and prop["yard_sqm_value"] == 200.0
+    current = db.get_price_history(pid)[0]
+    assert current["amount"] == 85000.0 and current["currency"] == "EUR"
+    assert current["vat_excluded"] == 0
+
+
+if __name__ == '__main__':
+    test_parsers()
+    test_numeric_columns_written_and_aggregated()
+    test_migration_backfills_old_rows()
+    print("PASS")
@@ -0,0 +1,51 @@
+"""
+Test the append-only price history: a price change is a single INSERT with the
+next per-property seq, earlier rows are never rewritten, and Current /
+Previous / Older is derived from seq order on read.
+"""
+import sys, os, re, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+
+
+def test_price_changes_only_append():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    pid = db.upsert_property("a1", sid, "Flat A", "Sofia", "", "https://example.com/a1",
+                             "100 EUR", is_new=True)
+    db.upsert_property("a1", sid, "Flat A", "Sofia", None, "https://example.com/a1",
+                       "90 EUR", is_new=False)
+    before = {r["id"]: (r["seq"], r["price"], r["recorded_at"]) for r in db.get_price_history(pid)}
+
+    conn = db._get_connection()
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        db.upsert_property("a1", sid, "Flat A", "Sofia", None, "https://example.com/a1",
+                           "80 EUR", is_new=False)
+        db.upsert_property("a1", sid, "Flat A", "Sofia", None, "https://example.com/a1",
+                           "80 EUR", is_new=False)           # unchanged: no history write
+    finally:
+        conn.set_trace_callback(None)
+
+    writes = [s for s in statements if re.search(r"\b(INSERT|UPDATE|DELETE)\b[^;]*\bprice_history\b", s, re.I)
+              and not re.search(r"\bUPDATE\s+properties\b", s, re.I)]
+    assert len(writes) == 1 and writes[0].lstrip().upper().startswith("INSERT")
+
+    history = db.get_price_history(pid)
+    assert [(r["seq"], r["price"], r["price_status"]) for r in history] == [
+        (3, "80 EUR", "Current"), (2, "90 EUR", "Previous"), (1, "100 EUR", "Older")]
+    assert all(before[r["id"]] == (r["seq"], r["price"], r["recorded_at"])
+               for r in history if r["id"] in before)
+
+    with db._get_connection() as conn:
+        view = conn.execute("SELECT price, price_status FROM price_history_status "
+                            "WHERE property_id = ? ORDER BY seq DESC", (pid,)).fetchall()
+    assert [tuple(r) for r in view] == [("80 EUR", "Current"), ("90 EUR", "Previous"),
+                                        ("100 EUR", "Older")]
+
+
+if __name__ == '__main__':
+    test_price_changes_only_append()
+    print("PASS")
@@ -0,0 +1,43 @@
+"""
+Test DatabaseManager.get_property_rows — the single query behind the
+results table: current price, image count and days on market per row.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+
+
+def test_property_rows_aggregates_in_one_query():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+
+    a = db.upsert_property("a1", sid, "Flat A", "Sofia", "", "https://example.com/a1",
+                           "100 000 EUR", is_new=True)
+    db.upsert_property("a1", sid, "Flat A", "Sofia", None, "https://example.com/a1",
+                       "95 000 EUR", is_new=False)
+    b = db.upsert_property("b2", sid, "Flat B", "Sofia", "", "https://example.com/b2",
+                           "80 000 EUR", is_new=True)
+    with db._get_connection() as conn:
+        conn.execute("INSERT INTO image_blobs (id, sha1, image_data) VALUES (1, x'01', x'00')")
+        conn.executemany(
+            "INSERT INTO property_images (property_id, url, blob_id, position) VALUES (?, ?, 1, ?)",
+            [(a, "u1", 0), (a, "u2", 1)],
+        )
+        conn.execute("UPDATE search_membership SET first_seen = date('now', 'localtime', '-10 days') "
+                     "WHERE listing_id = ?", (a,))
+        conn.execute(
+            "UPDATE search_membership SET status = 'Inactive', first_seen = '2024-01-01 08:00:00', "
+            "inactivated_at = '2024-01-31 09:00:00' WHERE listing_id = ?", (b,))
+
+    rows = db.get_property_rows(sid)
+    assert [r["id"] for r in rows] == [a, b]          # active first, one row per property
+    by_id = {r["id"]: r for r in rows}
+    assert by_id[a]["current_price"] == "95 000 EUR"
+    assert by_id[a]["image_count"] == 2 and by_id[b]["image_count"] == 0
+    assert by_id[a]["days_on_market"] == 10
+    assert by_id[b]["days_on_market"] == 30
+
+
+if __name__ == '__main__':
+    test_property_rows_aggregates_in_one_query()
@@ -0,0 +1,238 @@
+"""
+Query-plan regression test: run every DatabaseManager read/write query (and
+the scraper's known-price pre-load) against a large synthetic database,
+capture the SQL actually executed, and fail if EXPLAIN QUERY PLAN shows a
+hot table being scanned instead of searched through an index.
+
+  bare "SCAN <table>"          → missing index, always a failure
+  "AUTOMATIC ... INDEX"        → SQLite had to build a temporary index
+  "SCAN <table> USING INDEX"   → full index walk, allowed only with LIMIT
+  "SCAN <fts> VIRTUAL TABLE INDEX 0:M…" → FTS5 MATCH lookup, allowed
+"""
+import sys, os, re, json, sqlite3, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scraper.imotBgScraper import ImotScraper
+
+SEARCHES   = 4
+PROPERTIES = 5000     # per search
+RUNS       = 500      # per search
+
+# Small lookup tables that are fine to scan
+_SMALL_TABLES = {"searches"}
+
+# Deliberate scans on rare, non-hot paths
+_ALLOWED_SCANS = {
+    # Legacy scrape_runs rows written before search_id existed are matched by name
+    "delete_search": {"scrape_runs"},
+    # The importer walks its own staging tables once, by design (obs / h are
+    # window subqueries over the staged rows / the touched listings' history)
+    "import_file": {"import_staging", "import_touched", "obs", "h"},
+}
+
+# Transaction control, and "-- ..." traces of statements SQLite runs
+# internally (trigger bodies, FTS5 shadow tables) — those are planned as
+# part of the statement that fired them.
+_SKIP = re.compile(r"^\s*(--|(BEGIN|COMMIT|ROLLBACK|PRAGMA|SAVEPOINT|RELEASE)\b)", re.I)
+
+# Temp tables a path creates and drops again: replayed so its queries can be planned
+_TEMP_DDL = re.compile(r"^\s*(CREATE|DROP)\b", re.I)
+
+
+class _OfflineSession:
+    """Stands in for requests.Session so upsert_images stores without the network."""
+    class _Response:
+        content = b"img"
+        def raise_for_status(self):
+            pass
+
+    def get(self, url, timeout=None):
+        return self._Response()
+
+
+def _build_large_db():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp())
+    db = scraper.db
+    conn = db._get_connection()
+    with conn:
+        for s in range(1, SEARCHES + 1):
+            conn.execute("INSERT INTO searches (id, search_name, url) VALUES (?, ?, ?)",
+                         (s, f"search {s}", f"https://example.com/{s}"))
+        conn.executemany(
+            "INSERT INTO listings (id, record_id, title, location, link, price_per_sqm, price_per_sqm_eur) "
+            "VALUES (?, ?, ?, 'Sofia', ?, '1500 €/m²', 1500.0)",
+            [(i, f"r{i}", f"Flat {i}", f"https://example.com/a/{i}")
+             for i in range(1, SEARCHES * PROPERTIES + 1)],
+        )
+        # Every listing in one search, every 10th also in the next one
+        conn.executemany(
+            "INSERT INTO search_membership (listing_id, search_id, status, first_seen, last_seen) "
+            "VALUES (?, ?, ?, '2025-01-01 08:00:00', '2025-06-01 08:00:00')",
+            [(i, 1 + (i + k) % SEARCHES, "Active" if i % 3 else "Inactive")
+             for i in range(1, SEARCHES * PROPERTIES + 1) for k in ((0, 1) if i % 10 == 0 else (0,))],
+        )
+        conn.executemany(
+            "INSERT INTO price_history (property_id, seq, price, is_new, recorded_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [row for i in range(1, SEARCHES * PROPERTIES + 1) for row in (
+                (i, 1, "100 000 EUR", 1, "2025-01-01 08:00:00"),
+                (i, 2, "95 000 EUR", 0, "2025-03-01 08:00:00"),
+            )],
+        )
+        conn.executemany(
+            "INSERT INTO scrape_runs (search_id, search_name, run_date, records_found) "
+            "VALUES (?, ?, datetime('2024-01-01', ? || ' hours'), 100)",
+            [(s, f"search {s}", str(n)) for s in range(1, SEARCHES + 1) for n in range(RUNS)],
+        )
+        conn.executemany(
+            "INSERT INTO search_area_stats (search_id, snapshot_date, avg_price_per_sqm) "
+            "VALUES (?, datetime('2024-01-01', ? || ' hours'), 1500.0)",
+            [(s, str(n)) for s in range(1, SEARCHES + 1) for n in range(RUNS)],
+        )
+        conn.executemany(
+            "INSERT INTO image_blobs (id, sha1, image_data, dhash) VALUES (?, ?, x'00', ?)",
+            [(i, i.to_bytes(4, "big"), i * 0x9E3779B97F4A7C15 % (1 << 63))
+             for i in range(1, SEARCHES * PROPERTIES + 1, 4)],
+        )
+        conn.executemany(
+            "INSERT INTO image_dhash_bands (band, value, blob_id) "
+            "SELECT b.band, (dhash >> (16 * b.band)) & 65535, id FROM image_blobs, "
+            "(SELECT 0 AS band UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3) b "
+            "WHERE id = ?",
+            [(i,) for i in range(1, SEARCHES * PROPERTIES + 1, 4)],
+        )
+        conn.executemany(
+            "INSERT INTO property_images (property_id, url, blob_id, position) VALUES (?, ?, ?, 0)",
+            [(i, f"https://example.com/img/{i}", i) for i in range(1, SEARCHES * PROPERTIES + 1, 4)],
+        )
+    return scraper
+
+
+def _hot_paths(scraper):
+    """(name, callable) for every query path worth guarding."""
+    db = scraper.db
+    pid = 5
+    out_dir = tempfile.mkdtemp()
+    import_path = os.path.join(out_dir, "import.jsonl")
+    with open(import_path, "w", encoding="utf-8") as f:
+        for n in range(0, 40, 3):
+            f.write(json.dumps({"search_name": "search 2", "record_id": f"r{n}", "price": "70 000 EUR",
+                                "recorded_at": "2020-01-01", "title": f"Flat {n}"}) + "\n")
+    return [
+        ("upsert_property (new)",     lambda: db.upsert_property(
+            "new1", 1, "New", "Sofia", "", "https://example.com/new1", "70 000 EUR", is_new=True,
+            price_per_sqm="1400 €/m²")),
+        ("upsert_property (changed)", lambda: db.upsert_property(
+            "r5", 2, "Flat 5", "Sofia", None, "https://example.com/a/5", "90 000 EUR", is_new=False)),
+        ("link_relisting",            lambda: db.link_relisting(db.upsert_property(
+            "new2", 1, "New", "Sofia", "Тухла, южно изложение, две тераси, близо до метро",
+            "https://example.com/new2", "80 000 EUR", is_new=True))),
+        ("upsert_images",             lambda: db.upsert_images(pid, ["https://example.com/x"], _OfflineSession())),
+        ("get_images",                lambda: db.get_images(pid)),
+        ("get_image_count",           lambda: db.get_image_count(pid)),
+        ("get_first_image",           lambda: db.get_first_image(pid)),
+        ("get_image_ids",             lambda: db.get_image_ids(pid)),
+        ("read_image_blob",           lambda: db.read_image_blob(1)),
+        ("hash_pending_images",       lambda: db.hash_pending_images()),
+        ("find_listings_sharing_photos", lambda: db.find_listings_sharing_photos(pid)),
+        ("score_search",              lambda: db.score_search(2)),
+        ("get_top_deals",             lambda: db.get_top_deals(2)),
+        ("begin_scrape_run",          lambda: db.begin_scrape_run("search 3", 3)),
+        ("touch_properties",          lambda: db.touch_properties(3, ["r3", "r7", "r11"], 1)),
+        ("mark_inactive",             lambda: db.mark_inactive(3, 1)),
+        ("log_scrape_run",            lambda: db.log_scrape_run("search 1", 1, 0, 0, 0, True, search_id=1)),
+        ("log_scrape_run (run_id)",   lambda: db.log_scrape_run("search 3", 3, 0, 0, 0, True, run_id=1)),
+        ("attach_profile_report",     lambda: db.attach_profile_report([1, 2], "x.txt")),
+        ("get_properties",            lambda: db.get_properties(1)),
+        ("get_properties (status)",   lambda: db.get_properties(1, status="Active")),
+        ("get_property_rows",         lambda: db.get_property_rows(1)),
+        ("get_link_for_record",       lambda: db.get_link_for_record("r5", 2)),
+        ("get_property_by_link",      lambda: db.get_property_by_link("https://example.com/a/5")),
+        ("get_property",              lambda: db.get_property(pid)),
+        ("get_listing",               lambda: db.get_listing("r5")),
+        ("is_favorite",               lambda: db.is_favorite("r5", 2)),
+        ("toggle_favorite",           lambda: db.toggle_favorite("r5", 2)),
+        ("get_price_history",         lambda: db.get_price_history(pid)),
+        ("search_listings",           lambda: db.search_listings("flat 5")),
+        ("search_listings (search)",  lambda: db.search_listings("sofia", search_id=2)),
+        ("get_new_and_changed_since_last_run", lambda: db.get_new_and_changed_since_last_run(1)),
+        ("get_scrape_history",        lambda: db.get_scrape_history(1)),
+        ("get_all_scrape_runs",       lambda: db.get_all_scrape_runs()),
+        ("backfill_price_per_sqm",    lambda: db.backfill_price_per_sqm("r5", 2, "1600 €/m²")),
+        ("get_active_price_stats",    lambda: db.get_active_price_stats(1)),
+        ("record_area_stats_snapshot", lambda: db.record_area_stats_snapshot(1)),
+        ("get_area_stats_history",    lambda: db.get_area_stats_history(1)),
+        ("record_run_stats",          lambda: db.record_run_stats(1, 1, 0, 0)),
+        ("get_run_stats_history",     lambda: db.get_run_stats_history(1)),
+        ("get_run_stats_binned",      lambda: db.get_run_stats_binned(1)),
+        ("get_active_sqm_points",     lambda: db.get_active_sqm_points(1)),
+        ("get_location_stats",        lambda: db.get_location_stats(1)),
+        ("intern_pending_locations",  lambda: db.intern_pending_locations()),
+        ("import_file",               lambda: db.import_file(import_path)),
+        ("_load_known_prices",        lambda: scraper._load_known_prices(1)),
+    ] + [
+        (f"export_table ({table}, search)",
+         lambda table=table: db.export_table(table, os.path.join(out_dir, table + ".csv"), search_id=1))
+        for table in db.EXPORT_TABLES
+    ] + [
+        ("delete_search",             lambda: db.delete_search(4)),
+    ]
+
+
+def _plan_problems(conn, sql, allowed):
+    problems = []
+    for _id, _parent, _unused, detail in conn.execute("EXPLAIN QUERY PLAN " + sql):
+        if "AUTOMATIC" in detail:
+            problems.append(detail)
+            continue
+        m = re.match(r"SCAN (\w+)", detail)
+        if not m or m.group(1) in _SMALL_TABLES or m.group(1) in allowed:
+            continue
+        if re.search(r"VIRTUAL TABLE INDEX \d+:M", detail):
+            continue   # FTS5 full-text index lookup (MATCH constraint)
+        if "USING" in detail and re.search(r"\bLIMIT\b", sql, re.I):
+            continue   # ordered index walk that stops early
+        problems.append(detail)
+    return problems
+
+
+def test_hot_queries_use_indexes():
+    scraper = _build_large_db()
+    conn = scraper.db._get_connection()
+    failures = []
+    for name, call in _hot_paths(scraper):
+        statements = []
+        conn.set_trace_callback(statements.append)
+        try:
+            call()
+        finally:
+            conn.set_trace_callback(None)
+        assert statements, f"{name} executed no SQL"
+        allowed = _ALLOWED_SCANS.get(name, set())
+        for sql in statements:
+            if _SKIP.match(sql):
+                continue
+            if _TEMP_DDL.match(sql):
+                if sql.lstrip().upper().startswith("CREATE"):
+                    conn.execute(sql)
+                continue
+            for detail in _plan_problems(conn, sql, allowed):
+                failures.append(f"{name}: {detail}\n    {' '.join(sql.split())[:200]}")
+    assert not failures, "Full scans on hot tables:\n" + "\n".join(failures)
+
+
+def test_migration_creates_hot_path_indexes():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp())
+    conn = scraper.db._get_connection()
+    names = {r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    for idx in ("idx_price_history_seq", "idx_membership_search", "idx_listings_link",
+                "idx_scrape_runs_search", "idx_scrape_runs_date", "idx_area_stats_search",
+                "idx_run_stats_search", "idx_property_images_blob", "idx_image_blobs_unhashed",
+                "idx_membership_deal", "idx_listings_location"):
+        assert idx in names, idx
+
+
+if __name__ == '__main__':
+    test_hot_queries_use_indexes()
+    test_migration_creates_hot_path_indexes()
+    print("PASS")
@@ -0,0 +1,72 @@
+"""
+Test the run lifecycle in scrape_runs: begin_scrape_run opening a row as
+'running', log_scrape_run finishing it, migration 26 recognising rows
+opened by older releases, and RunHistoryDialog telling RUNNING and
+INTERRUPTED runs apart from failed ones.  Runs headless (offscreen Qt).
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+from controller.app_controller import AppController
+from database.db_manager import DatabaseManager
+from scraper.imotBgScraper import ImotScraper
+from tests.helpers import old_db
+import gui.imot_gui_qt as gui
+
+_app = QApplication.instance() or QApplication([])
+
+
+def _statuses(db):
+    with db._get_connection() as conn:
+        return [tuple(r) for r in conn.execute(
+            "SELECT status, success, error_message FROM scrape_runs ORDER BY id")]
+
+
+def test_run_lifecycle_and_dialog():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp())
+    db = scraper.db
+    a = db.add_search("a", "https://example.com/a")
+    b = db.add_search("b", "https://example.com/b")
+    db.begin_scrape_run("a", a)                        # an execution that died mid-run
+    ok = db.begin_scrape_run("b", b)
+    db.log_scrape_run("b", 1, 1, 0, 0, True, search_id=b, run_id=ok)
+    failed = db.begin_scrape_run("b", b)
+    db.log_scrape_run("b", 0, 0, 0, 0, False, error_message="boom", search_id=b, run_id=failed)
+    db.begin_scrape_run("a", a)                        # the execution in progress
+    assert _statuses(db) == [("running", 0, None), ("finished", 1, None),
+                             ("finished", 0, "boom"), ("running", 0, None)]
+
+    controller = AppController(scraper=scraper)
+    states = {}
+    for scrape_running in (True, False):
+        dialog = gui.RunHistoryDialog(None, controller, scrape_running=scrape_running)
+        table = dialog._table
+        states[scrape_running] = [table.item(r, 6).text() for r in range(table.rowCount())]
+        dialog.close()
+    # Newest first; only the newest open row of a search can still be running
+    assert states[True] == ["RUNNING", "FAILED", "OK", "INTERRUPTED"]
+    assert states[False] == ["INTERRUPTED", "FAILED", "OK", "INTERRUPTED"]
+
+
+def test_migration_marks_open_runs():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 25)                             # in-progress runs read as failed
+    sid = old.add_search("test", "https://example.com")
+    with old._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO scrape_runs (search_name, search_id, success, error_message) VALUES (?, ?, ?, ?)",
+            [("test", sid, 0, "Run in progress (or interrupted)"), ("test", sid, 0, "boom"),
+             ("test", sid, 1, None)])
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    assert _statuses(db) == [("running", 0, None), ("finished", 0, "boom"), ("finished", 1, None)]
+
+
+if __name__ == '__main__':
+    test_run_lifecycle_and_dialog()
+    test_migration_marks_open_runs()
+    print("PASS")
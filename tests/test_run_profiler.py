@@ -0,0 +1,92 @@
+"""
+Test profiling mode: RunProfiler writing a report around a call and
+returning its result, and a profiled ImotScraper.execute() linking the
+report to the scrape_runs rows of that execution only.
+"""
+import sys, os, tempfile, threading, tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from scraper.imotBgScraper import ImotScraper
+from scraper.run_profiler import RunProfiler
+
+
+def _profile_paths(db):
+    with db._get_connection() as conn:
+        return dict(conn.execute("SELECT id, profile_path FROM scrape_runs").fetchall())
+
+
+def test_run_writes_report_and_returns_result():
+    out = tempfile.mkdtemp()
+    result, path = RunProfiler(out, label="unit").run(lambda: sum(range(1000)))
+    assert result == 499500
+    assert os.path.basename(path).startswith("profile_unit_") and os.path.exists(path[:-4] + ".prof")
+    with open(path, encoding="utf-8") as f:
+        report = f.read()
+    assert "Result:            499500" in report and "functions by cumulative time" in report
+
+    def boom():
+        raise KeyError("boom")
+    try:
+        RunProfiler(out, label="failing").run(boom)
+    except KeyError:
+        pass
+    else:
+        raise AssertionError("the wrapped exception was swallowed")
+    assert any(name.startswith("profile_failing_") and name.endswith(".txt") for name in os.listdir(out))
+
+
+def test_attach_profile_report_links_given_runs():
+    db = ImotScraper(data_dir=tempfile.mkdtemp()).db
+    sid = db.add_search("test", "https://example.com")
+    mine = [db.begin_scrape_run("test", sid) for _ in range(2)]
+    other = db.begin_scrape_run("test", sid)                 # same second, another execution
+    assert db.attach_profile_report(mine, "report.txt") == 2
+    assert db.attach_profile_report([], "report.txt") == 0
+    assert _profile_paths(db) == {mine[0]: "report.txt", mine[1]: "report.txt", other: None}
+
+
+def test_profiled_execute_links_its_own_runs():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp(), profile=True)
+    db = scraper.db
+    for name in ("a", "b"):
+        db.add_search(name, f"https://example.com/{name}")
+    scraper._process_page = lambda session, url, page: None  # offline: every search is empty
+    earlier = db.begin_scrape_run("manual", None)            # overlapping run outside execute()
+
+    assert scraper.execute() is True
+    paths = _profile_paths(db)
+    assert paths.pop(earlier) is None
+    assert len(paths) == 2 and len(set(paths.values())) == 1
+    (report,) = set(paths.values())
+    assert report.startswith(os.path.join(scraper.config['DATA_DIR'], "profiles")) and os.path.exists(report)
+
+
+
+def test_overlapping_executions_keep_their_own_runs():
+    scraper = ImotScraper(data_dir=tempfile.mkdtemp(), profile=True)
+    db = scraper.db
+    for name in ("a", "b"):
+        db.add_search(name, f"https://example.com/{name}")
+    # Lock-step: each execution opens a run, then waits for the other to open one
+    barrier = threading.Barrier(2, timeout=10)
+    scraper._process_page = lambda session, url, page: barrier.wait() and None
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(scraper.execute())) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [True, True]
+    paths = _profile_paths(db)
+    reports = set(paths.values())
+    assert len(paths) == 4 and len(reports) == 2
+    assert all(list(paths.values()).count(report) == 2 for report in reports)
+    assert not tracemalloc.is_tracing()
+
+if __name__ == '__main__':
+    test_run_writes_report_and_returns_result()
+    test_attach_profile_report_links_given_runs()
+    test_profiled_execute_links_its_own_runs()
+    test_overlapping_executions_keep_their_own_runs()
+    print("PASS")
@@ -0,0 +1,107 @@
+"""
+Test the robust per-run summary: database.run_stats.summarise, the run_stats
+row written by record_run_stats, the chart reads (get_run_stats_binned,
+get_active_sqm_points) and the migration 18 carry-over of the mean from
+earlier scrape runs.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import run_stats
+from database.db_manager import DatabaseManager
+from tests.helpers import old_db
+
+
+def test_summarise():
+    values = [1000, 1100, 1200, 1300, 1400, 1500, 1600, 1700, 1800, 20000, None]
+    s = run_stats.summarise(values, "sqm")
+    assert s["sqm_count"] == 10
+    assert s["sqm_median"] == 1450.0 and s["sqm_mean"] == 3260.0
+    assert s["sqm_q1"] == 1225.0 and s["sqm_q3"] == 1675.0
+    assert s["sqm_p10"] == 1090.0 and s["sqm_p90"] == 3620.0
+    assert s["sqm_trimmed_mean"] == 1450.0     # the 20 000 outlier is trimmed away
+
+    empty = run_stats.summarise([None], "price")
+    assert empty["price_count"] == 0
+    assert all(v is None for k, v in empty.items() if k != "price_count")
+
+
+def test_record_run_stats():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    run = db.begin_scrape_run("test", sid)
+    for n, (price, sqm) in enumerate([("100 000 EUR", "1000 €/m²"), ("200 000 EUR", "2000 €/m²"),
+                                      ("900 000 EUR", "9000 €/m²"), ("150 000 EUR", None)]):
+        db.upsert_property(f"r{n}", sid, "", "", "", f"https://example.com/{n}", price,
+                           is_new=True, price_per_sqm=sqm, run_id=run)
+    db.log_scrape_run("test", 4, 4, 0, 0, True, search_id=sid, run_id=run)
+
+    stored = db.record_run_stats(sid, run, new_count=4, removed_count=0)
+    history = db.get_run_stats_history(sid)
+    assert len(history) == 1 and history[0]["run_id"] == run
+    row = history[0]
+    assert row["run_date"] == db.get_scrape_history(sid)[0]["run_date"] == stored["run_date"]
+    assert (row["active_count"], row["new_count"], row["removed_count"]) == (4, 4, 0)
+    assert row["sqm_count"] == 3 and row["sqm_median"] == 2000.0
+    assert row["price_count"] == 4 and row["price_median"] == 175000.0
+
+    db.delete_search(sid)
+    assert db.get_run_stats_history(sid) == []
+
+
+def test_binned_history_and_sqm_points():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    sid = db.add_search("test", "https://example.com")
+    conn = db._get_connection()
+    conn.execute("PRAGMA foreign_keys = OFF")          # run_stats rows without scrape_runs
+    # Two runs a day for 10 days, then one run a month later; the first
+    # day's runs predate medians and only carry the mean
+    runs = [(day, hour, 1000 + day) for day in range(10) for hour in (8, 20)] + [(40, 8, 1100)]
+    conn.executemany(
+        """INSERT INTO run_stats (run_id, search_id, run_date, active_count, sqm_median, sqm_mean)
+           VALUES (?, ?, datetime('2025-01-01', ?, ?), ?, ?, ?)""",
+        [(n, sid, f"+{day} days", f"+{hour} hours", 10 + hour,
+          sqm if day else None, sqm - 50 if not day else None)
+         for n, (day, hour, sqm) in enumerate(runs, start=1)])
+    conn.commit()
+
+    daily = db.get_run_stats_binned(sid)                   # 40-day span → per day
+    assert len(daily) == 11 and [b["run_count"] for b in daily[:2]] == [2, 2]
+    assert daily[0]["run_date"] == "2025-01-01 14:00:00"    # mean of 08:00 and 20:00
+    assert daily[0]["sqm_level"] == 950.0 and daily[1]["sqm_level"] == 1001.0
+    assert daily[0]["active_count"] == 24.0
+    monthly = db.get_run_stats_binned(sid, "month")
+    assert [b["run_count"] for b in monthly] == [20, 1]
+
+    pids = [db.upsert_property(f"r{n}", sid, "", "", "", f"https://example.com/{n}", "1 EUR",
+                               is_new=True, price_per_sqm=sqm)
+            for n, sqm in enumerate(["1500 €/m²", None, "2500 €/m²"])]
+    conn.execute("UPDATE search_membership SET deal_score = 2.0 WHERE listing_id = ?", (pids[2],))
+    conn.commit()
+    points = db.get_active_sqm_points(sid)
+    assert list(points["id"]) == [pids[0], pids[2]]
+    assert list(points["sqm"]) == [1500.0, 2500.0] and list(points["deal"]) == [False, True]
+    assert points["first_seen"][0] > 20000                  # days since 1970
+
+
+def test_migration_carries_over_run_means():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 17)                     # before run_stats
+    sid = old.add_search("test", "https://example.com")
+    old.log_scrape_run("test", 10, 10, 0, 0, True, avg_price_per_sqm=1800.0,
+                       active_count=10, search_id=sid)
+    old.log_scrape_run("test", 0, 0, 0, 0, False, error_message="boom", search_id=sid)
+    old.close_all_connections()
+
+    history = DatabaseManager(db_path=path).get_run_stats_history(sid)
+    assert len(history) == 1                   # failed runs have no summary
+    assert history[0]["sqm_mean"] == 1800.0 and history[0]["sqm_median"] is None
+    assert history[0]["active_count"] == 10 and history[0]["new_count"] == 10
+
+
+if __name__ == '__main__':
+    test_summarise()
+    test_record_run_stats()
+    test_binned_history_and_sqm_points()
+    test_migration_carries_over_run_means()
+    print("PASS")
@@ -0,0 +1,79 @@
+"""
+Test the running per-search €/m² aggregates (search_stats): after any mix of
+inserts, re-prices, inactivations, reactivations and deletes they must match
+a full recompute over the Active listings, and migration 17 must seed them
+for existing data.
+"""
+import sys, os, random, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database.db_manager import DatabaseManager
+from tests.helpers import old_db
+
+
+def _recomputed(db, search_id):
+    with db._get_connection() as conn:
+        row = conn.execute(
+            """SELECT COUNT(*) AS n, COUNT(price_per_sqm_eur) AS k,
+                      AVG(price_per_sqm_eur) AS avg, MIN(price_per_sqm_eur) AS lo,
+                      MAX(price_per_sqm_eur) AS hi
+               FROM properties WHERE search_id = ? AND status = 'Active'""",
+            (search_id,),
+        ).fetchone()
+    return (row["n"], row["k"], None if row["avg"] is None else round(row["avg"], 2),
+            row["lo"], row["hi"])
+
+
+def _running(db, search_id):
+    s = db.get_active_price_stats(search_id)
+    return (s["active_count"], s["sqm_count"], s["avg_price_per_sqm"],
+            s["min_price_per_sqm"], s["max_price_per_sqm"])
+
+
+def test_running_stats_match_recompute():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    searches = [db.add_search(f"s{i}", f"https://example.com/{i}") for i in range(3)]
+    rng = random.Random(7)
+
+    for run in range(1, 6):
+        for sid in searches:
+            run_id = db.begin_scrape_run(f"s{sid}", sid)
+            seen = rng.sample(range(40), 25)
+            for n in seen:
+                sqm = rng.choice([None, f"{rng.randint(900, 3000)} €/m²"])
+                db.upsert_property(f"r{n}", sid, f"Flat {n}", "Sofia", "", f"https://example.com/{sid}/{n}",
+                                   f"{rng.randint(50, 300)} 000 EUR", is_new=run == 1,
+                                   price_per_sqm=sqm, run_id=run_id)
+            db.mark_inactive(sid, run_id)
+            db.backfill_price_per_sqm(f"r{seen[0]}", sid, "5000 €/m²")
+            for s in searches:
+                assert _running(db, s) == _recomputed(db, s), (run, s)
+
+    db.delete_search(searches[0])
+    assert _running(db, searches[0])[:2] == (0, 0)
+    for sid in searches[1:]:
+        assert _running(db, sid) == _recomputed(db, sid)
+
+
+def test_migration_seeds_existing_data():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 16)                     # before search_stats
+    sid = old.add_search("test", "https://example.com")
+    with old._get_connection() as conn:
+        conn.executemany(
+            "INSERT INTO properties (record_id, search_id, link, price_per_sqm_eur) VALUES (?, ?, '', ?)",
+            [(f"r{n}", sid, sqm) for n, sqm in enumerate((1000.0, 2000.0, None))])
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    assert db.get_active_price_stats(sid) == {
+        "active_count": 3, "avg_price_per_sqm": 1500.0, "sqm_count": 2,
+        "min_price_per_sqm": 1000.0, "max_price_per_sqm": 2000.0,
+        "stddev_price_per_sqm": 500.0,
+    }
+
+
+if __name__ == '__main__':
+    test_running_stats_match_recompute()
+    test_migration_seeds_existing_data()
+    print("PASS")
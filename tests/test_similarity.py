@@ -0,0 +1,91 @@
+"""
+Test relisting detection: MinHash signatures in database.similarity, and
+DatabaseManager.link_relisting matching a repost to its predecessor through
+the LSH buckets while the structured fields veto false matches.
+"""
+import sys, os, tempfile
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from database import similarity
+from database.db_manager import DatabaseManager
+from tests.helpers import add_listing, old_db
+
+DESCRIPTION = (
+    "Продава се светъл тристаен апартамент в тухлена сграда с акт 16, южно изложение, "
+    "две тераси, мазе и паркомясто. Близо до метростанция, училище и парк. "
+    "Апартаментът е напълно обзаведен, с нова баня и климатици във всяка стая."
+)
+REPOST = DESCRIPTION.replace("Продава се", "Агенция предлага") + " Без комисионна."
+OTHER = "Парцел в регулация с лице на асфалтов път, ток и вода на границата, подходящ за къща."
+
+
+def test_signatures():
+    a, b, c = (similarity.signature(t) for t in (DESCRIPTION, REPOST, OTHER))
+    assert a.dtype == "uint32" and a.shape == (similarity.NUM_PERM,)
+    assert similarity.similarity(a, b) >= similarity.THRESHOLD
+    assert similarity.similarity(a, c) < 0.2
+    assert (similarity.signature(DESCRIPTION.upper()) == a).all()      # case-insensitive
+    assert (similarity.from_blob(similarity.to_blob(a)) == a).all()
+    assert len(similarity.band_keys(a)) == similarity.BANDS
+    assert similarity.signature("  ,. ") is None
+    assert similarity.signature("Тухла, южно изложение.") is None      # too short to compare
+
+    assert similarity.attributes_match({"area_sqm_value": 80.0, "floor": "3-ти"},
+                                       {"area_sqm_value": 82.0, "floor": "3-ти", "location": "x"})
+    assert not similarity.attributes_match({"area_sqm_value": 80.0}, {"area_sqm_value": 95.0})
+    assert not similarity.attributes_match({"floor": "3-ти"}, {"floor": "5-ти"})
+
+
+def test_link_relisting():
+    db = DatabaseManager(db_path=os.path.join(tempfile.mkdtemp(), "t.db"))
+    a = db.add_search("a", "https://example.com/a")
+    b = db.add_search("b", "https://example.com/b")
+
+    def add(rid, sid, description, area="80 m²", location="гр. София, Лозенец"):
+        return db.upsert_property(rid, sid, "3-СТАЕН", location, description,
+                                  f"https://example.com/{rid}", "200 000 EUR", is_new=True,
+                                  area_sqm=area, floor="3-ти")
+
+    first = add("old", a, DESCRIPTION)
+    assert db.link_relisting(first) is None                        # nothing to match yet
+    assert db.link_relisting(add("plot", a, OTHER)) is None
+
+    repost = add("new", a, REPOST)
+    match = db.link_relisting(repost)
+    assert match["id"] == first and match["record_id"] == "old"
+    assert match["similarity"] >= similarity.THRESHOLD
+    rows = {r["record_id"]: r for r in db.get_property_rows(a)}
+    assert rows["new"]["relisted_from_id"] == first and rows["new"]["relisted_from_record"] == "old"
+
+    # Same text, different flat: the area vetoes the match
+    assert db.link_relisting(add("bigger", a, DESCRIPTION, area="120 m²")) is None
+
+    # Found again by another search: the stored link is returned, not recomputed
+    assert add("new", b, REPOST) == repost
+    assert db.link_relisting(repost)["record_id"] == "old"
+
+    # Deleting the predecessor clears the link and its buckets
+    db.delete_search(a)
+    assert db.get_listing("new")["relisted_from_id"] is None
+    with db._get_connection() as conn:
+        assert conn.execute("SELECT COUNT(DISTINCT listing_id) FROM listing_lsh").fetchone()[0] == 1
+
+
+def test_migration_indexes_existing_descriptions():
+    path = os.path.join(tempfile.mkdtemp(), "old.db")
+    old = old_db(path, 20)                     # before the similarity index
+    sid = old.add_search("test", "https://example.com")
+    add_listing(old, sid, "old", title="3-СТАЕН", description=DESCRIPTION)
+    old.close_all_connections()
+
+    db = DatabaseManager(db_path=path)
+    pid = db.upsert_property("new", sid, "3-СТАЕН", "", REPOST, "https://example.com/new",
+                             "1 EUR", is_new=True)
+    assert db.link_relisting(pid)["record_id"] == "old"
+
+
+if __name__ == '__main__':
+    test_signatures()
+    test_link_relisting()
+    test_migration_indexes_existing_descriptions()
+    print("PASS")